@@ -152,8 +152,9 @@ async def upload_file(
         import os
 
         with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as tmp:
-            content = await file.read()
-            tmp.write(content)
+            # Copy in 1 MB pieces rather than reading the whole upload into memory
+            while piece := await file.read(1024 * 1024):
+                tmp.write(piece)
             tmp.flush()
             temp_path = tmp.name
 
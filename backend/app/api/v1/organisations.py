@@ -6,7 +6,7 @@ from uuid import UUID
 import uuid
 
 from app.core.deps import get_db, get_current_active_user
-from app.core.cache import CacheService, invalidate_cache_pattern
+from app.core.cache import CacheService, invalidate_org_caches, invalidate_tags, user_tag
 from app.models.organisation import Organisation
 from app.models.user import User
 from app.models.role import ProjectRole, Permission, role_permissions
@@ -326,7 +326,7 @@ async def create_organisation(
     await db.refresh(new_organisation)
 
     # Invalidate user's org list cache
-    await invalidate_cache_pattern(f"orgs:user:{current_user.id}")
+    await invalidate_tags(user_tag(current_user.id))
 
     return new_organisation
 
@@ -19,6 +19,7 @@ from app.models.user import User
 from app.models.project import Project
 from app.models.performance import TestType, TestStatus, PerformanceSchedule
 from app.services.performance_testing_service import PerformanceTestingService
+from app.services.load_metrics_sink import get_live_snapshot, progress_broadcaster
 from sqlalchemy import select
 from app.schemas.performance import (
     PerformanceTestDetailResponse, PerformanceTestListResponse,
@@ -32,6 +33,9 @@ from app.schemas.performance import (
 
 router = APIRouter()
 
+# Max quiet period on the live progress channel before re-checking status in the DB
+LIVE_STATUS_CHECK_SECONDS = 15
+
 def get_performance_service(db: AsyncSession = Depends(get_db)) -> PerformanceTestingService:
     """Dependency to get performance service instance"""
     return PerformanceTestingService(
@@ -349,6 +353,8 @@ async def create_performance_test(
         ramp_down_seconds=test_data.ramp_down_seconds,
         load_profile=test_data.load_profile,
         stages=test_data.stages,
+        think_time=test_data.think_time,
+        scenarios=test_data.scenarios,
         thresholds=test_data.thresholds,
         tags=test_data.tags,
         audit_mode=test_data.audit_mode,
@@ -463,24 +469,53 @@ async def stream_test_progress(
     current_user: User = Depends(get_current_user),
     service: PerformanceTestingService = Depends(get_performance_service)
 ):
-    """Stream test progress via SSE"""
+    """Stream test progress via SSE (pushed over Redis pub/sub, DB polling as fallback)"""
+    terminal_statuses = {TestStatus.COMPLETED.value, TestStatus.FAILED.value, TestStatus.STOPPED.value}
+    
+    async def current_status():
+        # Bypass the session identity map so repeated reads see fresh rows
+        service.db.expire_all()
+        test = await service.get_test(test_id)
+        if not test:
+            return None
+        return {
+            "id": str(test.id),
+            "status": test.status,
+            "progress": test.progress_percentage
+        }
+    
     async def event_generator():
-        while True:
-            test = await service.get_test(test_id)
-            if not test:
-                break
+        data = await current_status()
+        if not data:
+            return
+        if data["status"] == TestStatus.RUNNING.value:
+            data = await get_live_snapshot(test_id) or data
+        yield f"data: {json.dumps(data)}\n\n"
+        if data["status"] in terminal_statuses:
+            return
+        
+        queue = await progress_broadcaster.subscribe(test_id)
+        try:
+            while True:
+                if queue is None:
+                    await asyncio.sleep(2)
+                    data = await current_status()
+                else:
+                    try:
+                        data = await asyncio.wait_for(queue.get(), timeout=LIVE_STATUS_CHECK_SECONDS)
+                    except asyncio.TimeoutError:
+                        # Quiet channel (e.g. AI analysis running): confirm status from the DB
+                        data = await current_status()
+                if not data:
+                    break
                 
-            data = {
-                "id": str(test.id),
-                "status": test.status,
-                "progress": test.progress_percentage
-            }
-            yield f"data: {json.dumps(data)}\n\n"
-            
-            if test.status in [TestStatus.COMPLETED, TestStatus.FAILED, TestStatus.STOPPED]:
-                break
+                yield f"data: {json.dumps(data)}\n\n"
                 
-            await asyncio.sleep(2)
+                if data["status"] in terminal_statuses:
+                    break
+        finally:
+            if queue is not None:
+                progress_broadcaster.unsubscribe(test_id, queue)
 
     return StreamingResponse(
         event_generator(),
@@ -10,7 +10,7 @@ from uuid import UUID
 from datetime import datetime
 import asyncio
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.api.v1.auth import get_current_user
 from app.models.user import User
 from app.models.project import Project
@@ -563,7 +563,7 @@ async def generate_ai_remediation(
 @router.get("/dashboard/{project_id}/stats", response_model=SecurityDashboardStats)
 async def get_dashboard_stats(
     project_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -596,7 +596,7 @@ async def get_dashboard_stats(
 @router.get("/dashboard/{project_id}/risk-score", response_model=RiskScoreResponse)
 async def get_risk_score(
     project_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
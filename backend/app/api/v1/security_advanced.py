@@ -64,7 +64,8 @@ async def create_sast_scan(
         languages=scan_data.languages,
         ruleset=scan_data.ruleset,
         exclude_patterns=scan_data.exclude_patterns,
-        created_by=current_user.id
+        created_by=current_user.id,
+        incremental=scan_data.incremental
     )
     
     # Run scan in background
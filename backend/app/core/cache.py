@@ -1,14 +1,40 @@
 import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+import asyncio
 import json
-from typing import Optional, Any
+import logging
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, List, Tuple
 from functools import wraps
 import hashlib
+import inspect
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Redis connection pool
 _redis_pool: Optional[redis.ConnectionPool] = None
 
+# After a connection failure get_or_set skips Redis for this long instead of
+# paying a failed connect on every lookup
+REDIS_RETRY_AFTER_SECONDS = 5.0
+_redis_unavailable_until = 0.0
+
+# Cross-worker invalidation of the in-process tier
+INVALIDATION_CHANNEL = "cache:invalidate"
+_INSTANCE_ID = uuid.uuid4().hex
+
+# Tag generation counters: cache:tag:<tag> -> int
+TAG_KEY_PREFIX = "cache:tag:"
+# Known tag generations kept per process before the map (and local tier) is reset
+MAX_KNOWN_TAGS = 100_000
+
 
 async def get_redis_client() -> redis.Redis:
     """
@@ -26,19 +52,313 @@ async def get_redis_client() -> redis.Redis:
     return redis.Redis(connection_pool=_redis_pool)
 
 
+def redis_available() -> bool:
+    """False while backing off after a Redis connection failure (see note_redis_error)"""
+    return time.monotonic() >= _redis_unavailable_until
+
+
+def note_redis_error(error: Exception) -> None:
+    """Record a failed Redis call; connection errors make redis_available() False for REDIS_RETRY_AFTER_SECONDS"""
+    global _redis_unavailable_until
+    if isinstance(error, (RedisConnectionError, RedisTimeoutError, OSError)):
+        _redis_unavailable_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+
+
 async def close_redis():
     """
     Close Redis connection pool.
     """
     global _redis_pool
+    await stop_cache_invalidation_listener()
     if _redis_pool is not None:
         await _redis_pool.disconnect()
         _redis_pool = None
 
 
+# ============================================================================
+# In-process tier
+# ============================================================================
+
+class _LocalEntry:
+    __slots__ = ("value", "size", "expires_at", "logical_expiry", "delta", "tags")
+
+    def __init__(self, value: Any, size: int, expires_at: float, logical_expiry: float, delta: float,
+                 tags: Optional[Dict[str, int]] = None):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at          # When this process drops its copy
+        self.logical_expiry = logical_expiry  # When the shared (Redis) value expires
+        self.delta = delta                    # Seconds it took to compute (early refresh)
+        self.tags = tags                      # Tag generations the value was computed under
+
+
+class LocalCache:
+    """
+    LRU cache with per-entry TTL, bounded by entry count and serialized size.
+    Values are the decoded objects shared by every caller, so treat them as
+    read-only.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evictions = 0
+        # Bumped by every remote invalidation so reads racing one don't cache a stale value
+        self.generation = 0
+        self._entries: "OrderedDict[str, _LocalEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[_LocalEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= (now or time.monotonic()):
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Any, size: int, ttl: float, logical_ttl: Optional[float] = None,
+            delta: float = 0.0, tags: Optional[Dict[str, int]] = None) -> None:
+        if size > self.max_bytes or ttl <= 0:
+            self.delete(key)
+            return
+        now = time.monotonic()
+        logical_expiry = now + (logical_ttl if logical_ttl is not None else ttl)
+        self.delete(key)
+        self._entries[key] = _LocalEntry(value, size, now + ttl, logical_expiry, delta, tags)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def delete_matching(self, pattern: str) -> int:
+        """Drop keys matching a Redis-style glob pattern"""
+        matched = [key for key in self._entries if fnmatchcase(key, pattern)]
+        for key in matched:
+            self._remove(key)
+        return len(matched)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+
+
+_local_cache = LocalCache(settings.CACHE_LOCAL_MAX_ENTRIES, settings.CACHE_LOCAL_MAX_BYTES)
+
+
+# ============================================================================
+# Per-prefix counters
+# ============================================================================
+
+_STAT_FIELDS = (
+    "local_hits", "redis_hits", "misses", "stale", "sets", "deletes",
+    "invalidations", "early_refreshes", "coalesced", "errors",
+)
+
+
+class CacheStats:
+    """Hit/miss/latency counters grouped by key prefix"""
+
+    def __init__(self):
+        self._prefixes: Dict[str, Dict[str, float]] = {}
+
+    def _bucket(self, prefix: str) -> Dict[str, float]:
+        bucket = self._prefixes.get(prefix)
+        if bucket is None:
+            bucket = dict.fromkeys(_STAT_FIELDS, 0)
+            bucket.update(get_count=0, get_ms_total=0.0, compute_count=0, compute_ms_total=0.0)
+            self._prefixes[prefix] = bucket
+        return bucket
+
+    def incr(self, prefix: str, field: str, amount: int = 1) -> None:
+        self._bucket(prefix)[field] += amount
+
+    def observe_get(self, prefix: str, elapsed_ms: float) -> None:
+        bucket = self._bucket(prefix)
+        bucket["get_count"] += 1
+        bucket["get_ms_total"] += elapsed_ms
+
+    def observe_compute(self, prefix: str, elapsed_ms: float) -> None:
+        bucket = self._bucket(prefix)
+        bucket["compute_count"] += 1
+        bucket["compute_ms_total"] += elapsed_ms
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for prefix, bucket in self._prefixes.items():
+            hits = bucket["local_hits"] + bucket["redis_hits"]
+            lookups = hits + bucket["misses"]
+            result[prefix] = {
+                **{field: bucket[field] for field in _STAT_FIELDS},
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "local_hit_ratio": bucket["local_hits"] / lookups if lookups else 0.0,
+                "avg_get_ms": bucket["get_ms_total"] / bucket["get_count"] if bucket["get_count"] else 0.0,
+                "avg_compute_ms": (
+                    bucket["compute_ms_total"] / bucket["compute_count"] if bucket["compute_count"] else 0.0
+                ),
+            }
+        return result
+
+    def reset(self) -> None:
+        self._prefixes.clear()
+
+
+_stats = CacheStats()
+
+
+def _stats_prefix(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+# ============================================================================
+# Tag generations
+# ============================================================================
+
+# Latest generation of each tag seen by this process (from Redis reads and
+# invalidation messages); a local entry computed under an older one is stale
+_tag_generations: Dict[str, int] = {}
+
+
+def tag_key(tag: str) -> str:
+    return f"{TAG_KEY_PREFIX}{tag}"
+
+
+def _observe_tag_generations(generations: Dict[str, int]) -> None:
+    if len(_tag_generations) + len(generations) > MAX_KNOWN_TAGS:
+        # Forgetting generations would make stale local entries look valid
+        _tag_generations.clear()
+        _local_cache.clear()
+    for tag, generation in generations.items():
+        if generation > _tag_generations.get(tag, 0):
+            _tag_generations[tag] = generation
+
+
+def _local_entry_current(entry: _LocalEntry) -> bool:
+    if not entry.tags:
+        return True
+    return all(_tag_generations.get(tag, 0) <= generation for tag, generation in entry.tags.items())
+
+
+# ============================================================================
+# Cross-worker invalidation
+# ============================================================================
+
+class _InvalidationListener:
+    """
+    Subscribes to the invalidation channel and evicts local entries written
+    or deleted by other workers. The local tier is only used while this is
+    subscribed, so a worker never serves a value another worker replaced.
+    """
+
+    def __init__(self):
+        self.active = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> bool:
+        if self._task is not None and not self._task.done():
+            return True
+        try:
+            client = await get_redis_client()
+            pubsub = client.pubsub()
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener unavailable, local tier disabled: {e}")
+            return False
+        self.active = True
+        self._task = asyncio.create_task(self._listen(pubsub))
+        return True
+
+    async def stop(self) -> None:
+        self.active = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        _local_cache.clear()
+
+    async def _listen(self, pubsub) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                apply_invalidation(json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener stopped, local tier disabled: {e}")
+        finally:
+            self.active = False
+            _local_cache.clear()
+            await pubsub.aclose()
+
+
+_listener = _InvalidationListener()
+
+
+async def start_cache_invalidation_listener() -> bool:
+    """Enable the in-process tier for this worker (call on startup)"""
+    if not settings.CACHE_LOCAL_ENABLED:
+        return False
+    return await _listener.start()
+
+
+async def stop_cache_invalidation_listener() -> None:
+    await _listener.stop()
+
+
+def apply_invalidation(message: Dict[str, Any]) -> None:
+    """Evict local entries named by an invalidation message from another worker"""
+    if message.get("origin") == _INSTANCE_ID:
+        return
+    _invalidate_local(message.get("keys") or (), message.get("patterns") or ())
+    if message.get("tags"):
+        _observe_tag_generations(message["tags"])
+
+
+def _invalidate_local(keys: Iterable[str] = (), patterns: Iterable[str] = ()) -> None:
+    _local_cache.generation += 1
+    for key in keys:
+        _local_cache.delete(key)
+    for pattern in patterns:
+        _local_cache.delete_matching(pattern)
+
+
+def _local_enabled() -> bool:
+    return _listener.active
+
+
+async def _publish_invalidation(client: redis.Redis, keys: Iterable[str] = (), patterns: Iterable[str] = (),
+                                tags: Optional[Dict[str, int]] = None) -> None:
+    if not settings.CACHE_LOCAL_ENABLED:
+        return
+    await client.publish(INVALIDATION_CHANNEL, json.dumps({
+        "origin": _INSTANCE_ID,
+        "keys": list(keys),
+        "patterns": list(patterns),
+        "tags": tags or {},
+    }))
+
+
 class CacheService:
     """
-    Redis caching service with common operations.
+    Two-tier cache: a per-process LRU in front of Redis.
+    Local copies live at most CACHE_LOCAL_TTL seconds and are evicted on
+    other workers' writes through Redis pub/sub.
     """
 
     @staticmethod
@@ -46,15 +366,37 @@ class CacheService:
         """
         Get value from cache.
         """
+        started = time.perf_counter()
+        prefix = _stats_prefix(key)
         try:
+            if _local_enabled():
+                entry = _local_cache.get(key)
+                if entry is not None:
+                    _stats.incr(prefix, "local_hits")
+                    return entry.value
+
             client = await get_redis_client()
-            value = await client.get(key)
+            generation = _local_cache.generation
+            if _local_enabled():
+                async with client.pipeline(transaction=False) as pipe:
+                    value, ttl_ms = await pipe.get(key).pttl(key).execute()
+            else:
+                value, ttl_ms = await client.get(key), None
+
             if value:
-                return json.loads(value)
+                decoded = json.loads(value)
+                _stats.incr(prefix, "redis_hits")
+                if ttl_ms is not None:
+                    CacheService._store_local(key, decoded, len(value), ttl_ms, generation=generation)
+                return decoded
+            _stats.incr(prefix, "misses")
             return None
         except Exception as e:
+            _stats.incr(prefix, "errors")
             print(f"Cache get error: {e}")
             return None
+        finally:
+            _stats.observe_get(prefix, (time.perf_counter() - started) * 1000)
 
     @staticmethod
     async def set(key: str, value: Any, ttl: Optional[int] = None) -> bool:
@@ -68,8 +410,12 @@ class CacheService:
                 await client.setex(key, ttl, serialized)
             else:
                 await client.set(key, serialized)
+            _stats.incr(_stats_prefix(key), "sets")
+            _invalidate_local(keys=[key])
+            await _publish_invalidation(client, keys=[key])
             return True
         except Exception as e:
+            _stats.incr(_stats_prefix(key), "errors")
             print(f"Cache set error: {e}")
             return False
 
@@ -78,9 +424,12 @@ class CacheService:
         """
         Delete key from cache.
         """
+        _invalidate_local(keys=[key])
         try:
             client = await get_redis_client()
             await client.delete(key)
+            _stats.incr(_stats_prefix(key), "deletes")
+            await _publish_invalidation(client, keys=[key])
             return True
         except Exception as e:
             print(f"Cache delete error: {e}")
@@ -90,13 +439,18 @@ class CacheService:
     async def delete_pattern(pattern: str) -> int:
         """
         Delete all keys matching pattern.
+
+        Walks the whole keyspace with SCAN; prefer tagging entries and
+        calling invalidate_tags.
         """
+        _invalidate_local(patterns=[pattern])
         try:
             client = await get_redis_client()
             keys = []
             async for key in client.scan_iter(match=pattern):
                 keys.append(key)
 
+            await _publish_invalidation(client, patterns=[pattern])
             if keys:
                 return await client.delete(*keys)
             return 0
@@ -128,6 +482,200 @@ class CacheService:
             print(f"Cache expire error: {e}")
             return False
 
+    @staticmethod
+    async def invalidate_tags(*tags: str) -> bool:
+        """
+        Invalidate every entry written by get_or_set/cache_result with any of
+        ``tags``. Bumps one counter per tag, independent of how many entries
+        carry it; stale entries are ignored on read and expire with their TTL.
+        """
+        if not tags:
+            return True
+        try:
+            client = await get_redis_client()
+            pipe = client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.incr(tag_key(tag))
+            generations = dict(zip(tags, await pipe.execute()))
+            _local_cache.generation += 1
+            _observe_tag_generations(generations)
+            for tag in tags:
+                _stats.incr(_stats_prefix(tag), "invalidations")
+            await _publish_invalidation(client, tags=generations)
+            return True
+        except Exception as e:
+            logger.warning(f"Cache tag invalidation error for {tags}: {e}")
+            return False
+
+    @staticmethod
+    async def get_or_set(
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        stats_prefix: Optional[str] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> Any:
+        """
+        Return the cached value for ``key``, computing and storing it on a miss.
+
+        Concurrent misses for the same key in this process share a single
+        ``compute`` call. Hot keys are refreshed probabilistically before
+        they expire (XFetch), so expiry does not send every caller to the
+        backend at once. ``None`` results are not cached.
+
+        ``tags`` (e.g. ``org:<id>``) let invalidate_tags drop the entry
+        without knowing its key.
+        """
+        ttl = ttl or settings.REDIS_CACHE_TTL
+        prefix = stats_prefix or _stats_prefix(key)
+        tags = tuple(tags or ())
+        started = time.perf_counter()
+
+        cached, generations = await CacheService._get_entry(key, prefix, tags)
+        _stats.observe_get(prefix, (time.perf_counter() - started) * 1000)
+        if cached is not None:
+            value, logical_expiry, delta = cached
+            if not _should_refresh_early(logical_expiry, delta):
+                return value
+            if key in _inflight:
+                # Someone is already refreshing; keep serving the current value
+                return value
+            _stats.incr(prefix, "early_refreshes")
+
+        inflight = _inflight.get(key)
+        if inflight is not None:
+            _stats.incr(prefix, "coalesced")
+            await asyncio.wait([inflight])
+            if not inflight.cancelled():
+                return inflight.result()
+            # The computing request was cancelled; compute here instead
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight[key] = future
+        try:
+            compute_started = time.perf_counter()
+            value = await compute()
+            delta = time.perf_counter() - compute_started
+            _stats.observe_compute(prefix, delta * 1000)
+            if value is not None:
+                # Tagged with the generations read before computing, so an
+                # invalidation racing the computation leaves the entry stale
+                await CacheService._set_entry(key, value, ttl, delta, prefix, generations)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            _inflight.pop(key, None)
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        """Per-prefix hit/miss/latency counters and local tier occupancy"""
+        return {
+            "local_tier": {
+                "enabled": _local_enabled(),
+                "entries": len(_local_cache),
+                "bytes": _local_cache.total_bytes,
+                "evictions": _local_cache.evictions,
+            },
+            "prefixes": _stats.snapshot(),
+        }
+
+    @staticmethod
+    def _store_local(key: str, value: Any, size: int, ttl_ms: int, delta: float = 0.0,
+                     generation: Optional[int] = None, tags: Optional[Dict[str, int]] = None) -> None:
+        if generation is not None and generation != _local_cache.generation:
+            return  # An invalidation arrived while reading from Redis
+        if ttl_ms == -1:
+            remaining = None  # Persistent key: only the local TTL applies
+        elif ttl_ms is None or ttl_ms <= 0:
+            return
+        else:
+            remaining = ttl_ms / 1000
+        local_ttl = settings.CACHE_LOCAL_TTL if remaining is None else min(settings.CACHE_LOCAL_TTL, remaining)
+        _local_cache.set(key, value, size, local_ttl, logical_ttl=remaining or math.inf, delta=delta, tags=tags)
+
+    @staticmethod
+    async def _get_entry(
+        key: str, prefix: str, tags: Tuple[str, ...] = ()
+    ) -> Tuple[Optional[Tuple[Any, float, float]], Dict[str, int]]:
+        """
+        (value, logical expiry, compute delta) of a current entry written by
+        get_or_set, or None, plus the current generations of ``tags``
+        """
+        generations: Dict[str, int] = dict.fromkeys(tags, 0)
+        try:
+            if _local_enabled():
+                entry = _local_cache.get(key)
+                if entry is not None and _local_entry_current(entry):
+                    _stats.incr(prefix, "local_hits")
+                    return (entry.value, entry.logical_expiry, entry.delta), dict(entry.tags or {})
+
+            if not redis_available():
+                _stats.incr(prefix, "misses")
+                return None, generations
+
+            client = await get_redis_client()
+            generation = _local_cache.generation
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.get(key).pttl(key)
+                if tags:
+                    pipe.mget([tag_key(tag) for tag in tags])
+                results = await pipe.execute()
+            raw, ttl_ms = results[0], results[1]
+            if tags:
+                generations = {tag: int(current or 0) for tag, current in zip(tags, results[2])}
+                _observe_tag_generations(generations)
+            if not raw:
+                _stats.incr(prefix, "misses")
+                return None, generations
+
+            envelope = json.loads(raw)
+            value, delta = envelope["v"], envelope.get("d", 0.0)
+            if tags and envelope.get("t") != generations:
+                _stats.incr(prefix, "stale")
+                _stats.incr(prefix, "misses")
+                return None, generations
+
+            _stats.incr(prefix, "redis_hits")
+            if _local_enabled():
+                CacheService._store_local(key, value, len(raw), ttl_ms, delta, generation, generations or None)
+            logical_expiry = time.monotonic() + ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else math.inf
+            return (value, logical_expiry, delta), generations
+        except Exception as e:
+            _stats.incr(prefix, "errors")
+            note_redis_error(e)
+            logger.warning(f"Cache read error for {key}: {e}")
+            return None, generations
+
+    @staticmethod
+    async def _set_entry(key: str, value: Any, ttl: int, delta: float, prefix: str,
+                         generations: Optional[Dict[str, int]] = None) -> None:
+        if not redis_available():
+            return
+        try:
+            envelope = {"v": value, "d": delta}
+            if generations:
+                envelope["t"] = generations
+            serialized = json.dumps(envelope)
+            client = await get_redis_client()
+            await client.setex(key, ttl, serialized)
+            _stats.incr(prefix, "sets")
+            _invalidate_local(keys=[key])
+            if _local_enabled():
+                _local_cache.set(key, value, len(serialized), min(settings.CACHE_LOCAL_TTL, ttl),
+                                 logical_ttl=ttl, delta=delta, tags=generations or None)
+            await _publish_invalidation(client, keys=[key])
+        except Exception as e:
+            _stats.incr(prefix, "errors")
+            note_redis_error(e)
+            logger.warning(f"Cache write error for {key}: {e}")
+
     @staticmethod
     def generate_cache_key(*args, prefix: str = "cognitest", **kwargs) -> str:
         """
@@ -146,42 +694,74 @@ class CacheService:
         return f"{prefix}:{key_string}"
 
 
-def cache_result(ttl: Optional[int] = None, key_prefix: str = "cache"):
+# In-flight computations for single-flight get_or_set (per process)
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def _should_refresh_early(logical_expiry: float, delta: float) -> bool:
+    """
+    XFetch: refresh with a probability that grows as expiry approaches and
+    with how expensive the value is to recompute.
+    """
+    beta = settings.CACHE_EARLY_REFRESH_BETA
+    if beta <= 0 or delta <= 0 or logical_expiry == math.inf:
+        return False
+    return time.monotonic() - delta * beta * math.log(random.random() or 1e-12) >= logical_expiry
+
+
+def _tag_resolver(
+    func: Callable, tags: Optional[Any]
+) -> Optional[Callable[[tuple, dict], List[str]]]:
+    """Turn cache_result ``tags`` into a function of the call arguments"""
+    if tags is None:
+        return None
+    if callable(tags):
+        return lambda args, kwargs: list(tags(*args, **kwargs))
+
+    templates = [tags] if isinstance(tags, str) else list(tags)
+    signature = inspect.signature(func)
+
+    def resolve(args: tuple, kwargs: dict) -> List[str]:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return [template.format(**bound.arguments) for template in templates]
+
+    return resolve
+
+
+def cache_result(ttl: Optional[int] = None, key_prefix: str = "cache", tags: Optional[Any] = None):
     """
     Decorator to cache function results.
 
+    ``tags`` are format strings over the function's arguments (or a callable
+    taking the same arguments) naming what the result depends on, so it can
+    be invalidated with invalidate_tags.
+
     Usage:
-        @cache_result(ttl=3600, key_prefix="user")
+        @cache_result(ttl=3600, key_prefix="user", tags=["user:{user_id}"])
         async def get_user(user_id: str):
             ...
     """
     def decorator(func):
+        prefix = f"{key_prefix}:{func.__name__}"
+        resolve_tags = _tag_resolver(func, tags)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key
             cache_key = CacheService.generate_cache_key(
                 *args,
-                prefix=f"{key_prefix}:{func.__name__}",
+                prefix=prefix,
                 **kwargs
             )
 
-            # Try to get from cache
-            cached_value = await CacheService.get(cache_key)
-            if cached_value is not None:
-                return cached_value
-
-            # Execute function
-            result = await func(*args, **kwargs)
-
-            # Cache result
-            if result is not None:
-                await CacheService.set(
-                    cache_key,
-                    result,
-                    ttl=ttl or settings.REDIS_CACHE_TTL
-                )
-
-            return result
+            return await CacheService.get_or_set(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl or settings.REDIS_CACHE_TTL,
+                stats_prefix=prefix,
+                tags=resolve_tags(args, kwargs) if resolve_tags else None,
+            )
 
         return wrapper
     return decorator
@@ -197,8 +777,31 @@ async def invalidate_cache_pattern(pattern: str):
     return await CacheService.delete_pattern(pattern)
 
 
+async def invalidate_tags(*tags: str) -> bool:
+    """
+    Invalidate all cache entries carrying any of ``tags``.
+
+    Usage:
+        await invalidate_tags(f"org:{org_id}")
+    """
+    return await CacheService.invalidate_tags(*tags)
+
+
+def org_tag(org_id: Any) -> str:
+    return f"org:{org_id}"
+
+
+def project_tag(project_id: Any) -> str:
+    return f"project:{project_id}"
+
+
+def user_tag(user_id: Any) -> str:
+    return f"user:{user_id}"
+
+
 async def invalidate_org_caches(org_id: str, user_id: str = None):
-    """Invalidate cache entries for an organization."""
-    await invalidate_cache_pattern(f"org:{org_id}:*")
+    """Invalidate cache entries for an organization (and the user's org list)."""
+    tags = [org_tag(org_id)]
     if user_id:
-        await invalidate_cache_pattern(f"orgs:user:{user_id}")
+        tags.append(user_tag(user_id))
+    await invalidate_tags(*tags)
@@ -78,6 +78,10 @@ celery_app.conf.update(
         #     "task": "app.tasks.security_tasks.process_scheduled_scans",
         #     "schedule": 3600.0,  # Every hour
         # },
+        "refresh-osv-mirror": {
+            "task": "app.tasks.security_tasks.refresh_osv_mirror",
+            "schedule": settings.OSV_MIRROR_REFRESH_HOURS * 3600.0,
+        },
     },
 )
 
@@ -1,14 +1,148 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Telemetry
+# ============================================================================
+
+class DatabaseMetrics:
+    """Pool checkout-wait and query latency histograms for one engine"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool_wait = LatencyHistogram(max_value_ms=600_000.0)
+        self.queries = LatencyHistogram(max_value_ms=600_000.0)
+        self.pool_timeouts = 0
+        self.slow_queries = 0
+
+    def snapshot(self, engine: Optional[AsyncEngine] = None) -> Dict[str, Any]:
+        result = {
+            "pool_wait": self.pool_wait.summary(prefix="wait_ms_"),
+            "pool_waits": self.pool_wait.total_count,
+            "pool_timeouts": self.pool_timeouts,
+            "queries": self.queries.total_count,
+            "query_latency": self.queries.summary(prefix="query_ms_"),
+            "slow_queries": self.slow_queries,
+            "slow_query_threshold_ms": settings.DB_SLOW_QUERY_MS,
+        }
+        if engine is not None:
+            pool = engine.sync_engine.pool
+            result["pool"] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+            }
+        return result
+
+    def reset(self) -> None:
+        self.pool_wait.reset()
+        self.queries.reset()
+        self.pool_timeouts = 0
+        self.slow_queries = 0
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool recording how long each checkout waits for a connection"""
+
+    metrics: DatabaseMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.pool_timeouts += 1
+            raise
+        finally:
+            self.metrics.pool_wait.record((time.perf_counter() - started) * 1000)
+
+
+def instrument_queries(sync_engine: Engine, metrics: DatabaseMetrics) -> None:
+    """Record statement latency and log statements slower than DB_SLOW_QUERY_MS"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.queries.record(elapsed_ms)
+        if elapsed_ms >= settings.DB_SLOW_QUERY_MS:
+            metrics.slow_queries += 1
+            logger.warning(f"Slow query on {metrics.name} ({elapsed_ms:.0f}ms): {' '.join(statement.split())[:500]}")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        # Keep the timing stack balanced when a statement fails
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+# ============================================================================
+# Engines
+# ============================================================================
+
+def _engine_url(url: str):
+    parsed = make_url(url)
+    if parsed.drivername == "postgresql+asyncpg":
+        # Size of the per-connection cache of server-side prepared statements
+        size = settings.DB_PREPARED_STATEMENT_CACHE_SIZE if settings.DB_PREPARED_STATEMENTS else 0
+        parsed = parsed.update_query_dict({"prepared_statement_cache_size": str(size)})
+    return parsed
+
+
+def _connect_args(url: str) -> Dict[str, Any]:
+    if make_url(url).drivername == "postgresql+asyncpg" and not settings.DB_PREPARED_STATEMENTS:
+        # Transaction-pooling proxies (e.g. PgBouncer) can't keep named statements
+        return {"statement_cache_size": 0}
+    return {}
+
+
+def create_engine_with_profile(url: str, name: str) -> AsyncEngine:
+    """Async engine using the DB_* pool profile with checkout-wait and query telemetry"""
+    metrics = DatabaseMetrics(name)
+    pool_class = type(f"InstrumentedAsyncQueuePool_{name}", (InstrumentedAsyncQueuePool,), {"metrics": metrics})
+    new_engine = create_async_engine(
+        _engine_url(url),
+        echo=settings.DB_ECHO,
+        future=True,
+        poolclass=pool_class,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        connect_args=_connect_args(url),
+    )
+    instrument_queries(new_engine.sync_engine, metrics)
+    return new_engine
+
+
+def engine_metrics(async_engine: AsyncEngine) -> DatabaseMetrics:
+    return async_engine.sync_engine.pool.metrics
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,
-    future=True,
-    pool_pre_ping=True,
-)
+engine = create_engine_with_profile(settings.DATABASE_URL, "primary")
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -19,6 +153,20 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# Optional read replica for read-only endpoints (falls back to the primary)
+read_engine = (
+    create_engine_with_profile(settings.DATABASE_READ_URL, "replica")
+    if settings.DATABASE_READ_URL else engine
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+) if read_engine is not engine else AsyncSessionLocal
+
 # Base class for models
 Base = declarative_base()
 
@@ -29,3 +177,23 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """
+    Session for read-only list/dashboard endpoints. Uses the read replica
+    when DATABASE_READ_URL is set, so results may lag the primary slightly.
+    """
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def database_stats() -> Dict[str, Any]:
+    """Pool and query telemetry for the primary (and replica) engines"""
+    stats = {"primary": engine_metrics(engine).snapshot(engine)}
+    if read_engine is not engine:
+        stats["replica"] = engine_metrics(read_engine).snapshot(read_engine)
+    return stats
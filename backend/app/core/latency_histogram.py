@@ -0,0 +1,254 @@
+"""
+Latency Histogram
+Fixed-memory, mergeable HDR-style histogram for load test latency aggregation
+"""
+from array import array
+from typing import Any, Dict, Iterable, Optional
+
+# Percentiles reported for every load test summary and timeline point
+DEFAULT_PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Log-linear bucketed histogram (HDR Histogram layout)
+
+    Values are recorded in milliseconds and stored as integer microseconds.
+    Values below ``sub_bucket_count`` microseconds get an exact bucket; above
+    that, every power-of-two range is split into ``sub_bucket_count / 2``
+    linear buckets, which keeps the relative error below
+    ``10 ** -significant_figures`` while memory stays constant regardless of
+    how many samples are recorded.
+
+    Recording is O(1) and percentile queries are O(buckets), independent of
+    the number of samples.
+    """
+
+    def __init__(self, max_value_ms: float = 3_600_000.0, significant_figures: int = 2):
+        if significant_figures < 1 or significant_figures > 4:
+            raise ValueError("significant_figures must be between 1 and 4")
+
+        self.max_value_ms = max_value_ms
+        self.significant_figures = significant_figures
+
+        # Smallest power of two that can represent 2 * 10^digits distinct values
+        largest_single_unit = 2 * 10 ** significant_figures
+        self._sub_bucket_bits = max(1, (largest_single_unit - 1).bit_length())
+        self._sub_bucket_count = 1 << self._sub_bucket_bits
+        self._sub_bucket_half = self._sub_bucket_count >> 1
+
+        self._max_value_us = max(1, int(max_value_ms * 1000))
+        self._bucket_count = self._index_for(self._max_value_us) + 1
+        self._counts = array("q", bytes(8 * self._bucket_count))
+
+        self.total_count = 0
+        self._sum_us = 0
+        self._min_us: Optional[int] = None
+        self._max_us = 0
+
+    # =========================================================================
+    # Bucket arithmetic
+    # =========================================================================
+
+    def _index_for(self, value_us: int) -> int:
+        if value_us < self._sub_bucket_count:
+            return value_us
+        shift = value_us.bit_length() - self._sub_bucket_bits
+        return (
+            self._sub_bucket_count
+            + (shift - 1) * self._sub_bucket_half
+            + ((value_us >> shift) - self._sub_bucket_half)
+        )
+
+    def _value_range_for(self, index: int):
+        """Return the inclusive (lowest, highest) microsecond value of a bucket"""
+        if index < self._sub_bucket_count:
+            return index, index
+        offset = index - self._sub_bucket_count
+        shift = offset // self._sub_bucket_half + 1
+        top = offset % self._sub_bucket_half + self._sub_bucket_half
+        return top << shift, ((top + 1) << shift) - 1
+
+    # =========================================================================
+    # Recording
+    # =========================================================================
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        """Record a latency sample (milliseconds). Values above max are clamped."""
+        value_us = int(value_ms * 1000)
+        if value_us < 0:
+            value_us = 0
+        elif value_us > self._max_value_us:
+            value_us = self._max_value_us
+
+        self._counts[self._index_for(value_us)] += count
+        self.total_count += count
+        self._sum_us += value_us * count
+        if self._min_us is None or value_us < self._min_us:
+            self._min_us = value_us
+        if value_us > self._max_us:
+            self._max_us = value_us
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add all samples of another histogram with the same layout into this one"""
+        if other._bucket_count != self._bucket_count or other._sub_bucket_bits != self._sub_bucket_bits:
+            raise ValueError("Cannot merge histograms with different layouts")
+        if other.total_count == 0:
+            return self
+
+        counts = self._counts
+        for index, value in enumerate(other._counts):
+            if value:
+                counts[index] += value
+
+        self.total_count += other.total_count
+        self._sum_us += other._sum_us
+        if other._min_us is not None and (self._min_us is None or other._min_us < self._min_us):
+            self._min_us = other._min_us
+        if other._max_us > self._max_us:
+            self._max_us = other._max_us
+        return self
+
+    def reset(self) -> None:
+        """Clear all samples (bucket storage is only reallocated when non-empty)"""
+        if self.total_count:
+            self._counts = array("q", bytes(8 * self._bucket_count))
+        self.total_count = 0
+        self._sum_us = 0
+        self._min_us = None
+        self._max_us = 0
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram(self.max_value_ms, self.significant_figures)
+        return clone.merge(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact, picklable/JSON-able form: only non-empty buckets are kept"""
+        counts = self._counts
+        return {
+            "max_value_ms": self.max_value_ms,
+            "significant_figures": self.significant_figures,
+            "total_count": self.total_count,
+            "sum_us": self._sum_us,
+            "min_us": self._min_us,
+            "max_us": self._max_us,
+            "buckets": [[index, counts[index]] for index in range(self._bucket_count) if counts[index]],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        hist = cls(data["max_value_ms"], data["significant_figures"])
+        for index, count in data["buckets"]:
+            hist._counts[index] = count
+        hist.total_count = data["total_count"]
+        hist._sum_us = data["sum_us"]
+        hist._min_us = data["min_us"]
+        hist._max_us = data["max_us"]
+        return hist
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    @property
+    def min(self) -> float:
+        return (self._min_us or 0) / 1000
+
+    @property
+    def max(self) -> float:
+        return self._max_us / 1000
+
+    @property
+    def mean(self) -> float:
+        if not self.total_count:
+            return 0.0
+        return self._sum_us / self.total_count / 1000
+
+    def percentile(self, percentile: float) -> float:
+        return self.percentiles((percentile,))[percentile]
+
+    def percentiles(self, percentiles: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[float, float]:
+        """
+        Resolve several percentiles in a single pass over the buckets.
+        Each value is the upper bound of the bucket holding that rank, clamped
+        to the observed min/max so small samples report exact extremes.
+        """
+        wanted = sorted(set(percentiles))
+        result = {p: 0.0 for p in wanted}
+        if not self.total_count:
+            return result
+
+        targets = [
+            (p, max(1, min(self.total_count, int(self.total_count * p / 100.0 + 0.5))))
+            for p in wanted
+        ]
+
+        position = 0
+        cumulative = 0
+        counts = self._counts
+        for index in range(self._bucket_count):
+            count = counts[index]
+            if not count:
+                continue
+            cumulative += count
+            while position < len(targets) and cumulative >= targets[position][1]:
+                highest = self._value_range_for(index)[1]
+                value_us = min(max(highest, self._min_us or 0), self._max_us)
+                result[targets[position][0]] = value_us / 1000
+                position += 1
+            if position == len(targets):
+                break
+
+        return result
+
+    def summary(self, prefix: str = "latency_") -> Dict[str, float]:
+        """Load test summary fields (latency_min/max/avg/p50/p90/p95/p99/p999)"""
+        values = self.percentiles(DEFAULT_PERCENTILES)
+        return {
+            f"{prefix}min": self.min,
+            f"{prefix}max": self.max,
+            f"{prefix}avg": self.mean,
+            f"{prefix}p50": values[50.0],
+            f"{prefix}p90": values[90.0],
+            f"{prefix}p95": values[95.0],
+            f"{prefix}p99": values[99.0],
+            f"{prefix}p999": values[99.9],
+        }
+
+
+class IntervalLatencyRecorder:
+    """
+    Per-interval + cumulative latency views for a running load test
+
+    Samples go into the current interval histogram only. ``take_interval``
+    folds the interval into the cumulative histogram and hands back the
+    finished interval, so the per-second reporter never copies raw samples.
+    """
+
+    def __init__(self, max_value_ms: float = 3_600_000.0, significant_figures: int = 2):
+        self.cumulative = LatencyHistogram(max_value_ms, significant_figures)
+        self._interval = LatencyHistogram(max_value_ms, significant_figures)
+        self._spare = LatencyHistogram(max_value_ms, significant_figures)
+
+    def record(self, value_ms: float) -> None:
+        self._interval.record(value_ms)
+
+    def absorb(self, histogram: LatencyHistogram) -> None:
+        """Merge samples recorded elsewhere (e.g. a worker process) into the open interval"""
+        self._interval.merge(histogram)
+
+    def take_interval(self) -> LatencyHistogram:
+        """
+        Close the current interval and return it.
+        The returned histogram stays valid until the next call.
+        """
+        finished = self._interval
+        self.cumulative.merge(finished)
+        self._spare.reset()
+        self._interval, self._spare = self._spare, finished
+        return finished
+
+    def total(self) -> LatencyHistogram:
+        """Cumulative histogram including the still-open interval"""
+        self.take_interval()
+        return self.cumulative
@@ -16,8 +16,8 @@ from app.models.user import User
 from app.api.v1.auth import get_current_user
 from app.core.permissions import (
     check_org_permission,
-    get_user_org_membership,
     get_org_subscription,
+    resolve_org_permissions,
     PermissionDenied,
     FeatureNotAvailable,
 )
@@ -98,9 +98,14 @@ def require_feature(feature: str):
                     detail="Missing required dependencies"
                 )
             
-            # Check feature access
-            subscription = await get_org_subscription(organisation_id, db)
-            if not subscription or feature not in (subscription.plan.features or []):
+            # Check feature access (plan features are part of the cached permission set)
+            if current_user:
+                resolved = await resolve_org_permissions(current_user.id, organisation_id, db)
+                available = resolved.has_feature(feature)
+            else:
+                subscription = await get_org_subscription(organisation_id, db)
+                available = bool(subscription) and feature in (subscription.plan.features or [])
+            if not available:
                 raise FeatureNotAvailable(
                     f"The '{feature}' feature requires a higher subscription plan"
                 )
@@ -148,11 +153,11 @@ def require_role(min_role: str):
                 return await func(*args, **kwargs)
             
             # Check role level
-            membership = await get_user_org_membership(current_user.id, organisation_id, db)
-            if not membership:
+            resolved = await resolve_org_permissions(current_user.id, organisation_id, db)
+            if not resolved.is_member:
                 raise PermissionDenied("You are not a member of this organization")
             
-            if membership.hierarchy_level < min_level:
+            if resolved.hierarchy_level < min_level:
                 raise PermissionDenied(f"This action requires at least '{min_role}' role")
             
             return await func(*args, **kwargs)
@@ -189,24 +194,23 @@ class PermissionMiddleware:
             return True
         
         # Get membership
-        membership = await get_user_org_membership(current_user.id, organisation_id, db)
-        if not membership:
+        resolved = await resolve_org_permissions(current_user.id, organisation_id, db)
+        if not resolved.is_member:
             raise PermissionDenied("You are not a member of this organization")
         
         # Check minimum role
         if self.min_role:
             min_level = ROLE_HIERARCHY.get(self.min_role, 0)
-            if membership.hierarchy_level < min_level:
+            if resolved.hierarchy_level < min_level:
                 raise PermissionDenied(f"This action requires at least '{self.min_role}' role")
         
         # Check permission
-        if self.permission and not membership.has_permission(self.permission):
+        if self.permission and not resolved.has_permission(self.permission):
             raise PermissionDenied(f"You don't have the '{self.permission}' permission")
         
         # Check feature
         if self.feature:
-            subscription = await get_org_subscription(organisation_id, db)
-            if not subscription or self.feature not in (subscription.plan.features or []):
+            if not resolved.has_feature(self.feature):
                 raise FeatureNotAvailable(
                     f"The '{self.feature}' feature requires a higher subscription plan"
                 )
@@ -3,15 +3,25 @@ Organization Permission Checking Utilities
 
 Provides middleware and utilities for checking user permissions
 based on their organization role and subscription plan.
+
+Resolved permissions are compiled per (user, organisation), cached under
+RBAC tag generations and memoized for the lifetime of the request's
+session. Changes to memberships, roles, subscriptions or plans bump the
+tags when the transaction commits.
 """
 
-from typing import Optional, List
+import asyncio
+import logging
+from itertools import chain
+from typing import Any, Dict, FrozenSet, Optional, List, Set
 from uuid import UUID
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import Session, selectinload
 
+from app.core.cache import CacheService, invalidate_tags
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
 from app.models.organisation import (
@@ -21,9 +31,15 @@ from app.models.organisation import (
     DEFAULT_ROLE_PERMISSIONS,
     ROLE_HIERARCHY,
 )
-from app.models.subscription import OrganizationSubscription
+from app.models.subscription import OrganizationSubscription, SubscriptionPlan
 from app.api.v1.auth import get_current_user
 
+logger = logging.getLogger(__name__)
+
+# Session.info keys for request memoization and pending invalidations
+_MEMO_KEY = "resolved_org_permissions"
+_PENDING_TAGS_KEY = "pending_rbac_tags"
+
 
 class PermissionDenied(HTTPException):
     """Custom exception for permission denied errors"""
@@ -68,13 +84,234 @@ async def get_org_subscription(
     return result.scalar_one_or_none()
 
 
+# ============================================================================
+# Compiled permission sets
+# ============================================================================
+
+class OrgPermissionSet:
+    """
+    A user's effective role, granted permissions and plan features in one
+    organisation. Duck-types the permission API of UserOrganisation
+    (role, effective_role_type, has_permission, hierarchy_level).
+    """
+
+    __slots__ = (
+        "user_id", "organisation_id", "membership_id", "role", "role_id",
+        "effective_role_type", "permissions", "features", "has_subscription", "is_superuser",
+    )
+
+    def __init__(
+        self,
+        user_id: UUID,
+        organisation_id: UUID,
+        membership_id: Optional[UUID] = None,
+        role: Optional[str] = None,
+        role_id: Optional[UUID] = None,
+        effective_role_type: Optional[str] = None,
+        permissions: FrozenSet[str] = frozenset(),
+        features: FrozenSet[str] = frozenset(),
+        has_subscription: bool = False,
+        is_superuser: bool = False,
+    ):
+        self.user_id = user_id
+        self.organisation_id = organisation_id
+        self.membership_id = membership_id
+        self.role = role
+        self.role_id = role_id
+        self.effective_role_type = effective_role_type or role
+        self.permissions = permissions
+        self.features = features
+        self.has_subscription = has_subscription
+        self.is_superuser = is_superuser
+
+    @property
+    def is_member(self) -> bool:
+        return self.membership_id is not None
+
+    @property
+    def hierarchy_level(self) -> int:
+        return ROLE_HIERARCHY.get(self.effective_role_type, 0)
+
+    def has_permission(self, permission: str) -> bool:
+        return self.is_superuser or permission in self.permissions
+
+    def has_feature(self, feature: str) -> bool:
+        return feature in self.features
+
+    @classmethod
+    def compile(
+        cls,
+        user_id: UUID,
+        organisation_id: UUID,
+        membership: Optional[UserOrganisation],
+        subscription: Optional[OrganizationSubscription],
+    ) -> "OrgPermissionSet":
+        features = frozenset(subscription.plan.features or []) if subscription and subscription.plan else frozenset()
+        if membership is None:
+            return cls(user_id, organisation_id, features=features, has_subscription=subscription is not None)
+
+        if membership.role_obj:
+            granted = membership.role_obj.permissions or {}
+        else:
+            granted = DEFAULT_ROLE_PERMISSIONS.get(membership.role, {})
+        return cls(
+            user_id,
+            organisation_id,
+            membership_id=membership.id,
+            role=membership.role,
+            role_id=membership.role_id,
+            effective_role_type=membership.effective_role_type,
+            permissions=frozenset(name for name, allowed in granted.items() if allowed),
+            features=features,
+            has_subscription=subscription is not None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "membership_id": str(self.membership_id) if self.membership_id else None,
+            "role": self.role,
+            "role_id": str(self.role_id) if self.role_id else None,
+            "effective_role_type": self.effective_role_type,
+            "permissions": sorted(self.permissions),
+            "features": sorted(self.features),
+            "has_subscription": self.has_subscription,
+        }
+
+    @classmethod
+    def from_dict(cls, user_id: UUID, organisation_id: UUID, data: Dict[str, Any]) -> "OrgPermissionSet":
+        return cls(
+            user_id,
+            organisation_id,
+            membership_id=UUID(data["membership_id"]) if data.get("membership_id") else None,
+            role=data.get("role"),
+            role_id=UUID(data["role_id"]) if data.get("role_id") else None,
+            effective_role_type=data.get("effective_role_type"),
+            permissions=frozenset(data.get("permissions") or ()),
+            features=frozenset(data.get("features") or ()),
+            has_subscription=data.get("has_subscription", False),
+        )
+
+
+def rbac_org_tag(organisation_id: Any) -> str:
+    """Roles and subscription of an organisation"""
+    return f"rbac:org:{organisation_id}"
+
+
+def rbac_member_tag(organisation_id: Any, user_id: Any) -> str:
+    """One user's membership in an organisation"""
+    return f"rbac:member:{organisation_id}:{user_id}"
+
+
+RBAC_PLANS_TAG = "rbac:plans"
+
+
+def _request_memo(db: AsyncSession) -> Optional[Dict]:
+    info = getattr(db, "info", None)
+    if not isinstance(info, dict):
+        return None
+    return info.setdefault(_MEMO_KEY, {})
+
+
+async def resolve_org_permissions(
+    user_id: UUID,
+    organisation_id: UUID,
+    db: AsyncSession
+) -> OrgPermissionSet:
+    """
+    Compiled permissions of a user in an organisation.
+    Served from the request memo, then the shared cache, then the database.
+    """
+    memo = _request_memo(db)
+    memo_key = (str(user_id), str(organisation_id))
+    if memo is not None and memo_key in memo:
+        return memo[memo_key]
+
+    async def compute() -> Dict[str, Any]:
+        membership = await get_user_org_membership(user_id, organisation_id, db)
+        subscription = await get_org_subscription(organisation_id, db)
+        return OrgPermissionSet.compile(user_id, organisation_id, membership, subscription).to_dict()
+
+    data = await CacheService.get_or_set(
+        f"perm:{organisation_id}:{user_id}",
+        compute,
+        ttl=settings.PERMISSION_CACHE_TTL,
+        stats_prefix="perm",
+        tags=[rbac_org_tag(organisation_id), rbac_member_tag(organisation_id, user_id), RBAC_PLANS_TAG],
+    )
+    resolved = OrgPermissionSet.from_dict(user_id, organisation_id, data)
+    if memo is not None:
+        memo[memo_key] = resolved
+    return resolved
+
+
+async def invalidate_permission_cache(organisation_id: UUID, user_id: Optional[UUID] = None) -> None:
+    """
+    Drop cached permissions of one member, or of the whole organisation.
+    Commits touching RBAC models do this automatically.
+    """
+    if user_id is not None:
+        await invalidate_tags(rbac_member_tag(organisation_id, user_id))
+    else:
+        await invalidate_tags(rbac_org_tag(organisation_id))
+
+
+# ============================================================================
+# Event-driven invalidation
+# ============================================================================
+
+# Keeps scheduled invalidations alive until they finish
+_invalidation_tasks: Set[asyncio.Task] = set()
+
+
+def _rbac_tags_for(obj: Any) -> List[str]:
+    if isinstance(obj, UserOrganisation):
+        return [rbac_member_tag(obj.organisation_id, obj.user_id)]
+    if isinstance(obj, (OrganizationRole, OrganizationSubscription)):
+        return [rbac_org_tag(obj.organisation_id)]
+    if isinstance(obj, Organisation):
+        return [rbac_org_tag(obj.id)]
+    if isinstance(obj, SubscriptionPlan):
+        return [RBAC_PLANS_TAG]
+    return []
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_rbac_changes(session: Session, flush_context) -> None:
+    tags = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        tags.update(_rbac_tags_for(obj))
+    if tags:
+        session.info.setdefault(_PENDING_TAGS_KEY, set()).update(tags)
+        # Later checks in this request must see the change
+        session.info.pop(_MEMO_KEY, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_rbac_changes(session: Session) -> None:
+    tags = session.info.pop(_PENDING_TAGS_KEY, None)
+    if not tags:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # Synchronous session (scripts); nothing is cached there
+    task = loop.create_task(invalidate_tags(*sorted(tags)))
+    _invalidation_tasks.add(task)
+    task.add_done_callback(_invalidation_tasks.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_rbac_changes(session: Session) -> None:
+    session.info.pop(_PENDING_TAGS_KEY, None)
+
+
 async def check_org_permission(
     user: User,
     organisation_id: UUID,
     permission: str,
     db: AsyncSession,
     require_feature: Optional[str] = None
-) -> UserOrganisation:
+) -> OrgPermissionSet:
     """
     Check if user has a specific permission in an organization.
     
@@ -86,43 +323,43 @@ async def check_org_permission(
         require_feature: Optional feature to check in subscription plan
         
     Returns:
-        UserOrganisation membership object if authorized
+        The user's resolved permissions in the organization if authorized
         
     Raises:
         PermissionDenied: If user doesn't have the permission
         FeatureNotAvailable: If feature not in subscription plan
     """
+    resolved = await resolve_org_permissions(user.id, organisation_id, db)
+
     # Superusers have all permissions
     if user.is_superuser:
-        membership = await get_user_org_membership(user.id, organisation_id, db)
-        if membership:
-            return membership
-        # Create a virtual membership for superuser
-        class VirtualMembership:
-            role = "owner"
-            role_obj = None
-            def has_permission(self, _): return True
-        return VirtualMembership()
-    
-    # Get user's membership
-    membership = await get_user_org_membership(user.id, organisation_id, db)
+        return OrgPermissionSet(
+            user.id,
+            organisation_id,
+            membership_id=resolved.membership_id,
+            role=resolved.role if resolved.is_member else "owner",
+            role_id=resolved.role_id,
+            effective_role_type=resolved.effective_role_type if resolved.is_member else "owner",
+            permissions=resolved.permissions,
+            features=resolved.features,
+            has_subscription=resolved.has_subscription,
+            is_superuser=True,
+        )
     
-    if not membership:
+    if not resolved.is_member:
         raise PermissionDenied("You are not a member of this organization")
     
     # Check permission
-    if not membership.has_permission(permission):
+    if not resolved.has_permission(permission):
         raise PermissionDenied(f"You don't have the '{permission}' permission")
     
     # Check feature if required
-    if require_feature:
-        subscription = await get_org_subscription(organisation_id, db)
-        if not subscription or require_feature not in (subscription.plan.features or []):
-            raise FeatureNotAvailable(
-                f"The '{require_feature}' feature requires a higher subscription plan"
-            )
+    if require_feature and not resolved.has_feature(require_feature):
+        raise FeatureNotAvailable(
+            f"The '{require_feature}' feature requires a higher subscription plan"
+        )
     
-    return membership
+    return resolved
 
 
 async def check_role_hierarchy(
@@ -141,11 +378,11 @@ async def check_role_hierarchy(
     if user.is_superuser:
         return True
     
-    membership = await get_user_org_membership(user.id, organisation_id, db)
-    if not membership:
+    resolved = await resolve_org_permissions(user.id, organisation_id, db)
+    if not resolved.is_member:
         return False
     
-    user_level = membership.hierarchy_level
+    user_level = resolved.hierarchy_level
     target_level = ROLE_HIERARCHY.get(target_role, 0)
     
     return user_level > target_level
@@ -168,7 +405,7 @@ def require_org_permission(permission: str, feature: Optional[str] = None):
         organisation_id: UUID,
         current_user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
-    ) -> UserOrganisation:
+    ) -> OrgPermissionSet:
         return await check_org_permission(
             current_user, organisation_id, permission, db, feature
         )
@@ -182,11 +419,13 @@ def require_org_member(organisation_id: UUID):
     async def dependency(
         current_user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
-    ) -> UserOrganisation:
-        membership = await get_user_org_membership(current_user.id, organisation_id, db)
-        if not membership and not current_user.is_superuser:
-            raise PermissionDenied("You are not a member of this organization")
-        return membership
+    ) -> Optional[OrgPermissionSet]:
+        resolved = await resolve_org_permissions(current_user.id, organisation_id, db)
+        if not resolved.is_member:
+            if not current_user.is_superuser:
+                raise PermissionDenied("You are not a member of this organization")
+            return None
+        return resolved
     return dependency
 
 
@@ -208,16 +447,16 @@ def require_role_level(min_role: str):
         organisation_id: UUID,
         current_user: User = Depends(get_current_user),
         db: AsyncSession = Depends(get_db)
-    ) -> UserOrganisation:
+    ) -> Optional[OrgPermissionSet]:
+        resolved = await resolve_org_permissions(current_user.id, organisation_id, db)
         if current_user.is_superuser:
-            return await get_user_org_membership(current_user.id, organisation_id, db)
+            return resolved if resolved.is_member else None
         
-        membership = await get_user_org_membership(current_user.id, organisation_id, db)
-        if not membership:
+        if not resolved.is_member:
             raise PermissionDenied("You are not a member of this organization")
         
-        if membership.hierarchy_level < min_level:
+        if resolved.hierarchy_level < min_level:
             raise PermissionDenied(f"This action requires at least '{min_role}' role")
         
-        return membership
+        return resolved
     return dependency
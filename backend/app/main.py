@@ -1,12 +1,16 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 from sqlalchemy import select
 
 from app.core.config import settings
-from app.core.cache import close_redis, get_redis_client
-from app.core.database import AsyncSessionLocal
+from app.core.cache import CacheService, close_redis, get_redis_client, start_cache_invalidation_listener
+from app.core.database import AsyncSessionLocal, database_stats
+from app.core.deps import get_current_superuser
+from app.services.embedding_cache import get_embedding_cache
+from app.services.qdrant_service import close_qdrant_service
+from app.services.runtime_event_sink import close_runtime_event_sink
 from app.models.role import Permission
 from app.api.v1 import api_router
 
@@ -100,6 +104,8 @@ async def lifespan(app: FastAPI):
         redis_client = await get_redis_client()
         await redis_client.ping()
         print("✅ Redis connected successfully")
+        if await start_cache_invalidation_listener():
+            print("✅ In-process cache tier enabled")
     except Exception as e:
         print(f"⚠️  Redis connection failed: {e}")
 
@@ -113,9 +119,13 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("👋 Shutting down Cognitest Backend...")
+    # Write RASP/IAST events still buffered in this worker
+    await close_runtime_event_sink()
     # Close Redis connection
     await close_redis()
     print("✅ Redis connection closed")
+    # Close vector store connections
+    await close_qdrant_service()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -220,3 +230,13 @@ async def health_check():
         "status": "healthy",
         "version": settings.VERSION,
     }
+
+@app.get("/health/cache", dependencies=[Depends(get_current_superuser)])
+async def cache_stats():
+    """Per-prefix cache hit/miss/latency counters for this worker"""
+    return {**CacheService.stats(), "embeddings": get_embedding_cache().stats()}
+
+@app.get("/health/database", dependencies=[Depends(get_current_superuser)])
+async def database_health():
+    """Connection pool occupancy, checkout-wait and query latency for this worker"""
+    return database_stats()
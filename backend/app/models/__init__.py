@@ -111,6 +111,7 @@ from app.models.security_scan import (
 from app.models.performance import (
     PerformanceTest,
     PerformanceMetrics,
+    PerformanceMetricSample,
     TestExecution,
     PerformanceAlert,
     PerformanceSchedule,
@@ -217,6 +218,7 @@ __all__ = [
     # Performance Testing Models
     "PerformanceTest",
     "PerformanceMetrics",
+    "PerformanceMetricSample",
     "TestExecution",
     "PerformanceAlert",
     "PerformanceSchedule",
@@ -2,7 +2,7 @@
 Organisation Memory Model for storing all user inputs (text + images) at organization level
 This enables AI to learn from all inputs across projects within an organization
 """
-from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Integer, Float
+from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Integer, Float, Index, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -11,6 +11,10 @@ import enum
 
 from app.core.database import Base
 
+# Text search configuration for searchable_content. Rendered as a literal (not a
+# bind parameter) so queries match the expression index below.
+FTS_CONFIG = literal_column("'english'")
+
 
 class MemoryInputType(str, enum.Enum):
     """Type of memory input"""
@@ -92,10 +96,24 @@ class OrganisationMemory(Base):
     user = relationship("User", foreign_keys=[created_by])
     images = relationship("OrganisationMemoryImage", back_populates="memory", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyword side of hybrid memory retrieval
+        Index(
+            "ix_organisation_memory_searchable_tsv",
+            func.to_tsvector(FTS_CONFIG, searchable_content),
+            postgresql_using="gin",
+        ),
+    )
+
     def __repr__(self):
         return f"<OrganisationMemory {self.id} ({self.input_type})>"
 
 
+def searchable_tsvector():
+    """to_tsvector expression over searchable_content, as indexed"""
+    return func.to_tsvector(FTS_CONFIG, OrganisationMemory.searchable_content)
+
+
 class OrganisationMemoryImage(Base):
     """
     Model for storing image files associated with organization memory
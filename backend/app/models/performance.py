@@ -2,7 +2,7 @@
 Enterprise Performance Testing Module Models
 Comprehensive load testing, stress testing, and web performance analytics
 """
-from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Enum as SQLEnum, Boolean, Integer, Float, Index
+from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Enum as SQLEnum, Boolean, Integer, BigInteger, Float, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -147,6 +147,7 @@ class PerformanceTest(Base):
     think_time = Column(Float, default=0) # Delay between requests in seconds
     load_profile = Column(SQLEnum(LoadProfile, values_callable=lambda x: [e.value for e in x]), nullable=True)
     stages = Column(JSON, nullable=True)  # Custom stages: [{duration, target}]
+    scenarios = Column(JSON, nullable=True)  # Scripted iterations: [{name, weight, steps: [...]}]
     
     # Thresholds for Pass/Fail
     thresholds = Column(JSON, default=dict)  # {p95: 500, error_rate: 0.01}
@@ -181,6 +182,7 @@ class PerformanceTest(Base):
     organisation = relationship("Organisation")
     triggered_by_user = relationship("User", foreign_keys=[triggered_by])
     metrics = relationship("PerformanceMetrics", back_populates="test", cascade="all, delete-orphan", uselist=False)
+    metric_samples = relationship("PerformanceMetricSample", cascade="all, delete-orphan", passive_deletes=True)
     executions = relationship("TestExecution", back_populates="test", cascade="all, delete-orphan")
     alerts = relationship("PerformanceAlert", back_populates="test", cascade="all, delete-orphan")
 
@@ -249,10 +251,13 @@ class PerformanceMetrics(Base):
     latency_p99 = Column(Float, nullable=True)
     
     # Throughput
-    data_received_bytes = Column(Integer, nullable=True)
-    data_sent_bytes = Column(Integer, nullable=True)
+    data_received_bytes = Column(BigInteger, nullable=True)
+    data_sent_bytes = Column(BigInteger, nullable=True)
     throughput_bytes_per_second = Column(Float, nullable=True)
     
+    # Request phase breakdown (ms): {dns|connect|ttfb|body: {avg, p50, p95, p99}}
+    timing_breakdown = Column(JSON, nullable=True)
+    
     # Resource Metrics (server side)
     cpu_usage = Column(Float, nullable=True) # Percentage
     memory_usage = Column(Float, nullable=True) # Percentage
@@ -268,10 +273,18 @@ class PerformanceMetrics(Base):
     max_virtual_users = Column(Integer, nullable=True)
     virtual_users_timeline = Column(JSON, default=list)  # [{timestamp, vus}]
     
+    # Open-model (arrival-rate) executors: iterations skipped because no VU was free
+    dropped_iterations = Column(Integer, nullable=True)
+    dropped_iterations_timeline = Column(JSON, default=list)  # [{timestamp, value}]
+    
+    # Scripted scenarios: {"scenario/step": {requests, errors, error_rate, avg, p50, p95, p99}}
+    step_metrics = Column(JSON, nullable=True)
+    
     # Time Series Data
     latency_timeline = Column(JSON, default=list)   # [{timestamp, p50, p95, p99}]
     rps_timeline = Column(JSON, default=list)       # [{timestamp, rps}]
     errors_timeline = Column(JSON, default=list)    # [{timestamp, count}]
+    network_timeline = Column(JSON, default=list)   # [{timestamp, bytes_sent, bytes_received, dns, connect, ttfb, body}]
     
     # ======= WebPageTest Specific =======
     waterfall_url = Column(String(2000), nullable=True)
@@ -294,6 +307,31 @@ class PerformanceMetrics(Base):
     test = relationship("PerformanceTest", back_populates="metrics")
 
 
+class PerformanceMetricSample(Base):
+    """
+    Per-second load test sample
+    Written in batches by the load test metrics sink while a test is running
+    """
+    __tablename__ = "performance_metric_samples"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    test_id = Column(UUID(as_uuid=True), ForeignKey("performance_tests.id", ondelete="CASCADE"), nullable=False)
+
+    second = Column(Integer, nullable=False)  # Seconds since the test started
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+    requests = Column(Integer, default=0)
+    errors = Column(Integer, default=0)  # Cumulative, as in the timeline
+    virtual_users = Column(Integer, nullable=True)
+    requests_per_second = Column(Float, nullable=True)
+    latency_avg = Column(Float, nullable=True)
+    latency_p95 = Column(Float, nullable=True)
+    point = Column(JSON, nullable=True)  # Full timeline entry (percentiles, bytes, timing phases)
+
+    __table_args__ = (
+        Index('ix_performance_metric_samples_test_id_second', 'test_id', 'second'),
+    )
+
+
 class TestExecution(Base):
     """
     Test Execution - Historical record of individual test runs
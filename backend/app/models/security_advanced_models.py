@@ -2,7 +2,7 @@
 Advanced Security Module Models
 SAST, SCA, IAST, RASP, SBOM, Policy Engine, CI/CD, and Reporting
 """
-from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Enum as SQLEnum, Boolean, Integer, Float, Index, LargeBinary
+from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Enum as SQLEnum, Boolean, Integer, Float, Index, LargeBinary, Sequence
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -154,6 +154,14 @@ class SASTScan(Base):
     lines_scanned = Column(Integer, default=0)
     duration_ms = Column(Integer, nullable=True)
     
+    # Incremental scanning: only files whose content (or engine rules) changed are rescanned
+    incremental = Column(Boolean, default=True)
+    files_changed = Column(Integer, default=0)
+    files_reused = Column(Integer, default=0)
+    files_deleted = Column(Integer, default=0)
+    # Per-engine {duration_ms, success, files_scanned, findings, new_findings}
+    engine_timings = Column(JSON, default=dict)
+    
     error_message = Column(Text, nullable=True)
     
     started_at = Column(DateTime(timezone=True), nullable=True)
@@ -229,6 +237,32 @@ class SASTFinding(Base):
         Index('ix_sast_findings_severity', 'severity'),
         Index('ix_sast_findings_status', 'status'),
         Index('ix_sast_findings_fingerprint', 'fingerprint'),
+        # Re-scans upsert by fingerprint instead of duplicating findings
+        Index('uq_sast_findings_scan_fingerprint', 'scan_id', 'fingerprint', unique=True),
+    )
+
+
+# Numbers for SASTFinding.human_id (SAST-F-00001...); drawn in ranges by bulk persistence
+SAST_FINDING_HUMAN_ID_SEQ = Sequence("sast_finding_human_id_seq", metadata=Base.metadata)
+
+
+class SASTFileState(Base):
+    """Per-project, per-engine scan state of one file: content hash and the findings it produced"""
+    __tablename__ = "sast_file_states"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    engine = Column(String(50), nullable=False)
+    file_path = Column(String(2000), nullable=False)  # Relative to the scanned tree
+
+    content_hash = Column(String(64), nullable=False)  # sha256 of the file
+    rules_hash = Column(String(64), nullable=False)  # Engine rules the findings were produced with
+    findings = Column(JSON, default=list)  # Serialized CodeFinding dicts
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index('uq_sast_file_states_project_engine_path', 'project_id', 'engine', 'file_path', unique=True),
     )
 
 
@@ -321,6 +355,7 @@ class SCAFinding(Base):
     
     # References
     references = Column(JSON, default=list)
+    fingerprint = Column(String(64), nullable=True)  # For deduplication
     
     # Status
     status = Column(SQLEnum(FindingStatus, values_callable=lambda x: [e.value for e in x]), default=FindingStatus.OPEN)
@@ -334,6 +369,7 @@ class SCAFinding(Base):
         Index('ix_sca_findings_scan_id', 'scan_id'),
         Index('ix_sca_findings_severity', 'severity'),
         Index('ix_sca_findings_package', 'package_name'),
+        Index('uq_sca_findings_scan_fingerprint', 'scan_id', 'fingerprint', unique=True),
     )
 
 
@@ -422,6 +458,7 @@ class IASTFinding(Base):
     
     # Correlation
     test_case_id = Column(UUID(as_uuid=True), nullable=True)  # Link to test case if available
+    occurrences = Column(Integer, nullable=False, default=1, server_default="1")  # Identical findings merged into this row
     
     status = Column(SQLEnum(FindingStatus, values_callable=lambda x: [e.value for e in x]), default=FindingStatus.OPEN)
     detected_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -508,7 +545,10 @@ class RASPEvent(Base):
     # Context
     description = Column(Text, nullable=True)
     
+    # Identical events (same source, request and payload) within one flush are stored once
+    occurrences = Column(Integer, nullable=False, default=1, server_default="1")
     occurred_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_occurred_at = Column(DateTime(timezone=True), nullable=True)
     
     __table_args__ = (
         Index('ix_rasp_events_project_id', 'project_id'),
@@ -517,6 +557,22 @@ class RASPEvent(Base):
     )
 
 
+class RASPEventRollup(Base):
+    """Per-minute RASP event counts, summed across workers, that event statistics read from"""
+    __tablename__ = "rasp_event_rollups"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    minute = Column(DateTime(timezone=True), nullable=False)  # Start of the minute (UTC)
+    attack_type = Column(SQLEnum(AttackType, values_callable=lambda x: [e.value for e in x]), nullable=False)
+    was_blocked = Column(Boolean, nullable=False)
+    event_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('uq_rasp_event_rollups_bucket', 'project_id', 'minute', 'attack_type', 'was_blocked', unique=True),
+    )
+
+
 # ============================================================================
 # SBOM Models
 # ============================================================================
@@ -2,7 +2,7 @@
 Enterprise Security Testing Module Models
 Comprehensive security scanning, VAPT, and compliance governance
 """
-from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Enum as SQLEnum, Boolean, Integer, Float, Index
+from sqlalchemy import Column, String, DateTime, JSON, Text, ForeignKey, Enum as SQLEnum, Boolean, Integer, Float, Index, Sequence
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -166,6 +166,7 @@ class SecurityScan(Base):
     
     # Performance Metrics
     duration_ms = Column(Integer, nullable=True)
+    check_timings = Column(JSON, nullable=True)  # Per-check {runs, failures, total_ms, avg_ms, max_ms}
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     
@@ -334,6 +335,10 @@ class Vulnerability(Base):
         return f"<Vulnerability {self.title} - {self.severity}>"
 
 
+# Numbers for Vulnerability.human_id (VULN-00001...); drawn in ranges as scans write findings
+VULNERABILITY_HUMAN_ID_SEQ = Sequence("vulnerability_human_id_seq", metadata=Base.metadata)
+
+
 class ComplianceCheck(Base):
     """
     Compliance Check - Mapping vulnerabilities to compliance frameworks
@@ -146,6 +146,9 @@ class PerformanceTestCreate(BaseModel):
     think_time: Optional[float] = Field(default=0, ge=0)
     load_profile: Optional[LoadProfile] = LoadProfile.RAMP_UP
     stages: Optional[List[Dict[str, Any]]] = None  # [{duration: 30, target: 50}]
+    # [{name, weight, think_time, variables, steps: [{method, url, headers, body, extract}]
+    #   | {api_request_id}] | collection_id}]
+    scenarios: Optional[List[Dict[str, Any]]] = None
     
     @field_validator('stages', mode='before')
     @classmethod
@@ -195,6 +198,8 @@ class PerformanceTestUpdate(BaseModel):
     ramp_down_seconds: Optional[int] = Field(None, ge=0, le=300)
     load_profile: Optional[LoadProfile] = None
     stages: Optional[List[Dict[str, Any]]] = None
+    think_time: Optional[float] = Field(None, ge=0)
+    scenarios: Optional[List[Dict[str, Any]]] = None
     
     @field_validator('stages', mode='before')
     @classmethod
@@ -258,6 +263,8 @@ class PerformanceTestResponse(BaseModel):
     ramp_down_seconds: int
     load_profile: Optional[LoadProfile]
     stages: Optional[List[Dict[str, Any]]]
+    think_time: Optional[float] = None
+    scenarios: Optional[List[Dict[str, Any]]] = None
     
     # Thresholds
     thresholds: Dict[str, float]
@@ -361,6 +368,7 @@ class PerformanceMetricsResponse(BaseModel):
     data_received_bytes: Optional[int]
     data_sent_bytes: Optional[int]
     throughput_bytes_per_second: Optional[float]
+    timing_breakdown: Optional[Dict[str, Dict[str, float]]] = None
     
     # Errors
     error_count: int
@@ -369,9 +377,15 @@ class PerformanceMetricsResponse(BaseModel):
     
     # VU
     max_virtual_users: Optional[int]
+    dropped_iterations: Optional[int] = None
+    
+    # Scripted scenarios
+    step_metrics: Optional[Dict[str, Dict[str, float]]] = None
     
     # Time Series (for charts)
     virtual_users_timeline: List[Dict[str, Any]]
+    dropped_iterations_timeline: Optional[List[Dict[str, Any]]] = None
+    network_timeline: Optional[List[Dict[str, Any]]] = None
     latency_timeline: List[Dict[str, Any]]
     rps_timeline: List[Dict[str, Any]]
     errors_timeline: List[Dict[str, Any]]
@@ -68,6 +68,7 @@ class SecurityScanResponse(BaseModel):
     
     # Performance
     duration_ms: Optional[int]
+    check_timings: Optional[Dict[str, Any]] = None
     started_at: Optional[datetime]
     completed_at: Optional[datetime]
     
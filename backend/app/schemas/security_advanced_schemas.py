@@ -70,6 +70,8 @@ class SASTScanCreate(BaseModel):
     languages: Optional[List[str]] = None
     ruleset: str = "default"
     exclude_patterns: Optional[List[str]] = None
+    # Rescan only files changed since the project's last scan; False forces a full rescan
+    incremental: bool = True
 
 
 class SASTScanResponse(BaseModel):
@@ -84,6 +86,11 @@ class SASTScanResponse(BaseModel):
     medium_count: int = 0
     low_count: int = 0
     files_scanned: int = 0
+    incremental: Optional[bool] = None
+    files_changed: Optional[int] = None
+    files_reused: Optional[int] = None
+    files_deleted: Optional[int] = None
+    engine_timings: Optional[Dict[str, Any]] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     created_at: datetime
@@ -197,6 +204,7 @@ class IASTFindingResponse(BaseModel):
     title: str
     description: Optional[str] = None
     remediation: Optional[str] = None
+    occurrences: int = 1
     detected_at: datetime
     
     model_config = ConfigDict(from_attributes=True)
@@ -240,7 +248,9 @@ class RASPEventResponse(BaseModel):
     http_method: Optional[str] = None
     request_path: Optional[str] = None
     attack_payload: Optional[str] = None
+    occurrences: int = 1
     occurred_at: datetime
+    last_occurred_at: Optional[datetime] = None
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -5,6 +5,7 @@ from langchain.output_parsers import PydanticOutputParser, StructuredOutputParse
 from langchain.schema import HumanMessage, SystemMessage, AIMessage
 
 from app.core.config import settings
+from app.services.embedding_cache import get_embedding_cache
 from app.services.gemini_service import GeminiService
 
 
@@ -194,6 +195,13 @@ class AIService:
 
         return parsed
 
+    @property
+    def embedding_model_id(self) -> str:
+        """Provider and model producing embeddings (part of the embedding cache key)"""
+        if self.provider == "gemini":
+            return f"gemini:{settings.GEMINI_EMBEDDING_MODEL}"
+        return f"openai:{self.embedding_model}"
+
     async def create_embedding(self, text: str) -> List[float]:
         """
         Create embedding vector for text.
@@ -205,36 +213,38 @@ class AIService:
         Returns:
             Embedding vector as list of floats
         """
-        # Use Gemini if configured
-        if self.provider == "gemini":
-            if self._gemini_service is None:
-                self._gemini_service = GeminiService()
-            return await self._gemini_service.create_embedding(text)
-
-        # Use OpenAI (default)
-        embeddings = self.get_embeddings()
-        vector = await embeddings.aembed_query(text)
-        return vector
+        return (await self.create_embeddings_batch([text]))[0]
 
     async def create_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
         """
         Create embedding vectors for multiple texts.
         Automatically uses configured AI provider.
 
+        Texts embedded before (by any worker) are served from the embedding
+        cache; only the rest reach the provider.
+
         Args:
             texts: List of input texts
 
         Returns:
             List of embedding vectors
         """
+        if not settings.EMBEDDING_CACHE_ENABLED:
+            return await self._embed_texts(texts)
+        return await get_embedding_cache().embed(self.embedding_model_id, texts, self._embed_texts)
+
+    async def _embed_texts(self, texts: List[str]) -> List[List[float]]:
         # Use Gemini if configured
         if self.provider == "gemini":
             if self._gemini_service is None:
                 self._gemini_service = GeminiService()
+            # The batch call runs the blocking SDK in a thread, also for a single text
             return await self._gemini_service.create_embeddings_batch(texts)
 
         # Use OpenAI (default)
         embeddings = self.get_embeddings()
+        if len(texts) == 1:
+            return [await embeddings.aembed_query(texts[0])]
         vectors = await embeddings.aembed_documents(texts)
         return vectors
 
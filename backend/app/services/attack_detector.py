@@ -0,0 +1,120 @@
+"""
+Attack Detector
+Precompiled attack pattern detection shared by the RASP and IAST engines
+"""
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from app.services.pattern_matcher import MultiPatternMatcher, PatternRule
+
+logger = logging.getLogger(__name__)
+
+# Ordered (category, rules) pairs; earlier categories and rules win in first_match()
+RuleSet = Sequence[Tuple[Hashable, Sequence[PatternRule]]]
+
+# Characters shared by consecutive windows of a long input: a match up to this
+# long is never split between two windows
+WINDOW_OVERLAP_CHARS = 1024
+
+
+class AttackDetector:
+    """
+    One compiled detector per rule set. Every inspected input gets a single
+    literal prefilter pass and one combined regex search; individual rules only
+    run on inputs that hit, so benign traffic never pays per-rule costs.
+    Inputs longer than ``max_input_chars`` are inspected in overlapping
+    windows of that length, which bounds the cost of each regex search while
+    still covering every character (padding can't push a payload out of view).
+    """
+
+    def __init__(self, categories: RuleSet, max_input_chars: int = 0):
+        rules: List[PatternRule] = []
+        self._categories: List[Hashable] = []
+        for category, category_rules in categories:
+            for rule in category_rules:
+                try:
+                    re.compile(rule.pattern)
+                except re.error as e:
+                    logger.warning(f"Skipping invalid detection rule {rule.id}: {e}")
+                    continue
+                rules.append(rule)
+                self._categories.append(category)
+        self.matcher = MultiPatternMatcher(rules, flags=re.IGNORECASE)
+        self.max_input_chars = max_input_chars
+
+    def _search_window(self, text: str):
+        # Lowercased literals stand in for IGNORECASE only on ASCII (e.g. "ſ" matches "s" in the regex)
+        return self.matcher.search(text, prefilter=text.isascii())
+
+    def _search(self, text: str):
+        size = self.max_input_chars
+        if size <= 0 or len(text) <= size:
+            return self._search_window(text)
+        # First match of each rule over all windows, in rule order
+        overlap = min(WINDOW_OVERLAP_CHARS, size // 2)
+        found = {}
+        for start in range(0, len(text) - overlap, size - overlap):
+            for index, match in self._search_window(text[start:start + size]):
+                found.setdefault(index, match)
+        return sorted(found.items(), key=lambda item: item[0])
+
+    def first_match(self, text: str) -> Optional[Tuple[Hashable, str]]:
+        """(category, matched text) of the first rule in rule-set order that matches"""
+        for index, match in self._search(text):
+            return self._categories[index], match.group(0)
+        return None
+
+    def matches(self, text: str) -> Dict[Hashable, str]:
+        """Category -> matched text of its first matching rule, in rule-set order"""
+        found: Dict[Hashable, str] = {}
+        for index, match in self._search(text):
+            found.setdefault(self._categories[index], match.group(0))
+        return found
+
+
+class DetectorCache:
+    """
+    Compiled detectors keyed by a rule-set version (anything hashable that
+    changes whenever the rules do, e.g. a config's toggles and custom patterns).
+    Projects sharing a configuration share one detector; least recently used
+    versions are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max(1, max_entries)
+        self._detectors: "OrderedDict[Hashable, AttackDetector]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version: Hashable, build: Callable[[], AttackDetector]) -> AttackDetector:
+        with self._lock:
+            detector = self._detectors.get(version)
+            if detector is not None:
+                self._detectors.move_to_end(version)
+                return detector
+        # Compile outside the lock; a concurrent build of the same version is harmless
+        detector = build()
+        with self._lock:
+            self._detectors[version] = detector
+            self._detectors.move_to_end(version)
+            while len(self._detectors) > self.max_entries:
+                self._detectors.popitem(last=False)
+        return detector
+
+    def __len__(self) -> int:
+        return len(self._detectors)
+
+
+_detector_cache: Optional[DetectorCache] = None
+
+
+def get_detector_cache() -> DetectorCache:
+    """Process-wide detector cache"""
+    global _detector_cache
+    if _detector_cache is None:
+        from app.core.config import settings
+
+        _detector_cache = DetectorCache(settings.RUNTIME_DETECTOR_CACHE_SIZE)
+    return _detector_cache
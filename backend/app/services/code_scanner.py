@@ -0,0 +1,159 @@
+"""
+Code Pattern Scanner
+Runs a MultiPatternMatcher over every file of a source tree, inline or
+spread across worker processes with a bounded number of batches in flight
+"""
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from app.services.pattern_matcher import MultiPatternMatcher, PatternRule
+
+logger = logging.getLogger(__name__)
+
+# NOTE: this module is imported by spawned worker processes, so it must not
+# import models, settings or anything else that opens DB/Redis connections.
+
+SNIPPET_MAX_CHARS = 200
+DEFAULT_BATCH_FILES = 256
+# Batches queued per worker; bounds memory for arbitrarily large trees
+BATCHES_IN_FLIGHT_PER_WORKER = 2
+
+# (path relative to the scan root, line number, rule index, stripped line)
+PatternMatch = Tuple[str, int, int, str]
+
+
+@dataclass
+class TreeScanResult:
+    """Matches and counters for one scan_tree call"""
+    matches: List[PatternMatch] = field(default_factory=list)
+    files_scanned: int = 0
+    lines_scanned: int = 0
+    bytes_scanned: int = 0
+    errors: int = 0
+    workers: int = 1
+    duration_seconds: float = 0.0
+
+    def merge(self, other: "TreeScanResult") -> None:
+        self.matches.extend(other.matches)
+        self.files_scanned += other.files_scanned
+        self.lines_scanned += other.lines_scanned
+        self.bytes_scanned += other.bytes_scanned
+        self.errors += other.errors
+
+
+def resolve_scan_workers(configured: int) -> int:
+    """0 means one worker process per CPU core"""
+    return max(1, configured if configured > 0 else (os.cpu_count() or 1))
+
+
+def scan_file(matcher: MultiPatternMatcher, root: str, filepath: str, result: TreeScanResult) -> None:
+    """Scan one file, adding its matches and counters to ``result``"""
+    try:
+        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+            content = f.read()
+    except OSError as e:
+        logger.warning(f"Error scanning {filepath}: {e}")
+        result.errors += 1
+        return
+
+    relpath = os.path.relpath(filepath, root)
+    result.files_scanned += 1
+    result.lines_scanned += content.count("\n") + 1
+    result.bytes_scanned += len(content)
+    for rule_index, line_number, line in matcher.scan(content):
+        result.matches.append((relpath, line_number, rule_index, line.strip()[:SNIPPET_MAX_CHARS]))
+
+
+# ============================================================================
+# Worker process side
+# ============================================================================
+
+_worker_matcher: Optional[MultiPatternMatcher] = None
+
+
+def _init_worker(rules: Sequence[PatternRule]) -> None:
+    global _worker_matcher
+    _worker_matcher = MultiPatternMatcher(rules)
+
+
+def _scan_batch(root: str, filepaths: List[str]) -> TreeScanResult:
+    result = TreeScanResult()
+    for filepath in filepaths:
+        scan_file(_worker_matcher, root, filepath, result)
+    return result
+
+
+# ============================================================================
+# Coordinator
+# ============================================================================
+
+def _batches(paths: Iterator[str], size: int) -> Iterator[List[str]]:
+    while True:
+        batch = list(islice(paths, size))
+        if not batch:
+            return
+        yield batch
+
+
+def scan_tree(
+    root: str,
+    rules: Sequence[PatternRule],
+    filepaths: Iterable[str],
+    workers: int = 1,
+    batch_files: int = DEFAULT_BATCH_FILES,
+) -> TreeScanResult:
+    """
+    Match ``rules`` against every file in ``filepaths`` (absolute paths under
+    ``root``; a lazy walker is fine, it is consumed as batches free up).
+
+    With more than one worker, files are scanned in a spawn-context process
+    pool. Trees that fit in one round of batches are scanned inline, since
+    starting the pool would cost more than it saves.
+
+    Returns:
+        TreeScanResult with matches sorted by (path, line, rule index)
+    """
+    started = time.perf_counter()
+    batch_files = max(1, batch_files)
+    paths = iter(filepaths)
+    result = TreeScanResult(workers=1)
+
+    head = list(islice(paths, batch_files * workers)) if workers > 1 else []
+    if workers <= 1 or len(head) < batch_files * workers:
+        matcher = MultiPatternMatcher(rules)
+        for filepath in head or paths:
+            scan_file(matcher, root, filepath, result)
+    else:
+        result.workers = workers
+        max_in_flight = workers * BATCHES_IN_FLIGHT_PER_WORKER
+        batches = _batches(_chain(head, paths), batch_files)
+        pending: Set[Future] = set()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(list(rules),),
+        ) as pool:
+            for batch in batches:
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result.merge(future.result())
+                pending.add(pool.submit(_scan_batch, root, batch))
+            for future in pending:
+                result.merge(future.result())
+
+    result.matches.sort()
+    result.duration_seconds = time.perf_counter() - started
+    return result
+
+
+def _chain(head: List[str], rest: Iterator[str]) -> Iterator[str]:
+    yield from head
+    yield from rest
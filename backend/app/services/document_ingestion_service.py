@@ -2,7 +2,8 @@
 Document Ingestion Service for AI Self-Learning
 Handles all types of user input: documents, files, text descriptions, structured data
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
+import asyncio
 import logging
 import mimetypes
 from datetime import datetime
@@ -10,6 +11,9 @@ import uuid
 import json
 from pathlib import Path
 
+from app.core.config import settings
+from app.services.text_chunker import StreamingChunker
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,7 +59,7 @@ class DocumentIngestionService:
             doc_id = str(uuid.uuid4())
 
             # Chunk the text for better learning
-            chunks = await self._chunk_text(text, chunk_size=500, overlap=50)
+            chunks = self._chunk_text(text)
 
             result = {
                 "document_id": doc_id,
@@ -105,11 +109,11 @@ class DocumentIngestionService:
             file_extension = path.suffix.lower()
             file_name = path.name
 
-            # Extract content based on file type
-            content = await self._extract_file_content(file_path, file_extension)
-
-            # Chunk the content
-            chunks = await self._chunk_text(content, chunk_size=500, overlap=50)
+            # Extract and chunk page by page / paragraph by paragraph, off the event loop
+            chunker = StreamingChunker()
+            chunks = await asyncio.to_thread(
+                lambda: list(chunker.chunks(self._iter_file_content(file_path, file_extension)))
+            )
 
             result = {
                 "document_id": doc_id,
@@ -117,7 +121,7 @@ class DocumentIngestionService:
                 "file_type": file_extension,
                 "source": "file_upload",
                 "total_chunks": len(chunks),
-                "content_length": len(content),
+                "content_length": chunker.characters,
                 "chunks": chunks,
                 "metadata": {
                     **(metadata or {}),
@@ -159,7 +163,7 @@ class DocumentIngestionService:
             text_representation = self._dict_to_text(data)
 
             # Chunk the content
-            chunks = await self._chunk_text(text_representation, chunk_size=500, overlap=50)
+            chunks = self._chunk_text(text_representation)
 
             result = {
                 "document_id": doc_id,
@@ -190,163 +194,143 @@ class DocumentIngestionService:
         """
         Ingest multiple inputs at once (batch processing)
 
+        Up to INGESTION_CONCURRENCY inputs are extracted and chunked at a time,
+        which bounds how many documents are held in memory at once.
+
         Args:
             inputs: List of input dictionaries
                    Each should have 'type' and 'content' or 'path'
             project_id: Project context
 
         Returns:
-            List of ingestion results
+            List of ingestion results, in input order
         """
-        results = []
-
-        for input_item in inputs:
-            try:
-                input_type = input_item.get("type", "text")
-                metadata = input_item.get("metadata", {})
-
-                if input_type == "text":
-                    result = await self.ingest_text_input(
-                        text=input_item["content"],
-                        input_type=input_item.get("input_type", "description"),
-                        metadata=metadata,
-                        project_id=project_id,
-                    )
-                elif input_type == "file":
-                    result = await self.ingest_file(
-                        file_path=input_item["path"],
-                        project_id=project_id,
-                        metadata=metadata,
-                    )
-                elif input_type == "data":
-                    result = await self.ingest_structured_data(
-                        data=input_item["content"],
-                        data_type=input_item.get("data_type", "metadata"),
-                        project_id=project_id,
-                    )
-                else:
-                    raise ValueError(f"Unknown input type: {input_type}")
-
-                results.append(result)
-
-            except Exception as e:
-                logger.error(f"Error ingesting batch item: {e}")
-                results.append({"error": str(e)})
-
-        return results
-
-    async def _chunk_text(
-        self,
-        text: str,
-        chunk_size: int = 500,
-        overlap: int = 50,
-    ) -> List[Dict[str, Any]]:
+        semaphore = asyncio.Semaphore(max(1, settings.INGESTION_CONCURRENCY))
+
+        async def ingest_one(input_item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    input_type = input_item.get("type", "text")
+                    metadata = input_item.get("metadata", {})
+
+                    if input_type == "text":
+                        return await self.ingest_text_input(
+                            text=input_item["content"],
+                            input_type=input_item.get("input_type", "description"),
+                            metadata=metadata,
+                            project_id=project_id,
+                        )
+                    elif input_type == "file":
+                        return await self.ingest_file(
+                            file_path=input_item["path"],
+                            project_id=project_id,
+                            metadata=metadata,
+                        )
+                    elif input_type == "data":
+                        return await self.ingest_structured_data(
+                            data=input_item["content"],
+                            data_type=input_item.get("data_type", "metadata"),
+                            project_id=project_id,
+                        )
+                    else:
+                        raise ValueError(f"Unknown input type: {input_type}")
+
+                except Exception as e:
+                    logger.error(f"Error ingesting batch item: {e}")
+                    return {"error": str(e)}
+
+        return list(await asyncio.gather(*(ingest_one(input_item) for input_item in inputs)))
+
+    def _chunk_text(self, text: str) -> List[Dict[str, Any]]:
         """
-        Split text into overlapping chunks for better learning
+        Split text into token-sized, sentence-aligned chunks with overlap
 
         Args:
             text: Text to chunk
-            chunk_size: Size of each chunk in characters
-            overlap: Number of overlapping characters between chunks
 
         Returns:
             List of chunks with metadata
         """
-        chunks = []
-        start = 0
-
-        while start < len(text):
-            end = min(start + chunk_size, len(text))
-            chunk = text[start:end]
-
-            chunks.append({
-                "text": chunk.strip(),
-                "start": start,
-                "end": end,
-                "length": len(chunk),
-            })
+        return list(StreamingChunker().chunks([text]))
 
-            start = end - overlap
-
-        return chunks
-
-    async def _extract_file_content(
+    def _iter_file_content(
         self,
         file_path: str,
         file_extension: str,
-    ) -> str:
+    ) -> Iterator[str]:
         """
-        Extract content from various file types
+        Extract content from various file types, lazily (line by line, page by
+        page, paragraph by paragraph where the format allows)
 
         Args:
             file_path: Path to file
             file_extension: File extension
 
-        Returns:
-            Extracted text content
+        Yields:
+            Pieces of extracted text content
         """
         try:
             # Text files
             if file_extension in ['.txt', '.md', '.rst']:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                    yield from f
 
             # JSON files
             elif file_extension == '.json':
                 with open(file_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    return self._dict_to_text(data)
+                yield self._dict_to_text(data)
 
             # CSV files
             elif file_extension == '.csv':
                 import csv
-                content = []
                 with open(file_path, 'r', encoding='utf-8') as f:
                     reader = csv.DictReader(f)
                     for row in reader:
-                        content.append(json.dumps(row))
-                return '\n'.join(content)
+                        yield json.dumps(row) + '\n'
 
             # YAML files
             elif file_extension in ['.yaml', '.yml']:
                 try:
                     import yaml
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        data = yaml.safe_load(f)
-                        return self._dict_to_text(data)
                 except ImportError:
-                    # Fallback to reading as text
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        return f.read()
+                    yaml = None
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    if yaml is None:
+                        # Fallback to reading as text
+                        yield from f
+                    else:
+                        yield self._dict_to_text(yaml.safe_load(f))
 
             # PDF files
             elif file_extension == '.pdf':
                 try:
                     import PyPDF2
-                    content = []
-                    with open(file_path, 'rb') as f:
-                        reader = PyPDF2.PdfReader(f)
-                        for page in reader.pages:
-                            content.append(page.extract_text())
-                    return '\n'.join(content)
                 except ImportError:
                     logger.warning("PyPDF2 not installed, returning filename as fallback")
-                    return f"PDF: {Path(file_path).name}"
+                    yield f"PDF: {Path(file_path).name}"
+                    return
+                with open(file_path, 'rb') as f:
+                    reader = PyPDF2.PdfReader(f)
+                    for page in reader.pages:
+                        yield (page.extract_text() or '') + '\n'
 
             # DOCX files
             elif file_extension == '.docx':
                 try:
                     from docx import Document
-                    doc = Document(file_path)
-                    return '\n'.join([para.text for para in doc.paragraphs])
                 except ImportError:
                     logger.warning("python-docx not installed, returning filename as fallback")
-                    return f"DOCX: {Path(file_path).name}"
+                    yield f"DOCX: {Path(file_path).name}"
+                    return
+                doc = Document(file_path)
+                for para in doc.paragraphs:
+                    yield para.text + '\n\n'
 
             # Default: return filename
             else:
                 logger.warning(f"Unsupported file type: {file_extension}")
-                return f"File: {Path(file_path).name}"
+                yield f"File: {Path(file_path).name}"
 
         except Exception as e:
             logger.error(f"Error extracting file content: {e}")
@@ -7,6 +7,7 @@ import logging
 from datetime import datetime
 import uuid
 
+from app.services.embedding_pipeline import EmbeddingPipeline, ProgressCallback, log_progress
 from app.services.qdrant_service import get_qdrant_service
 from app.services.ai_service import get_ai_service
 
@@ -35,15 +36,21 @@ class DocumentKnowledgeService:
         document_id: str,
         chunks: List[Dict[str, Any]],
         document_metadata: Dict[str, Any],
+        on_progress: Optional[ProgressCallback] = None,
     ) -> List[str]:
         """
         Store document chunks in Qdrant for semantic search
 
+        Chunks are embedded in batches with bounded concurrency and upserted
+        in pages while later batches are still being embedded. Chunks that
+        still fail after retries are skipped.
+
         Args:
             project_id: Project ID
             document_id: Document ID
             chunks: List of text chunks
             document_metadata: Document metadata
+            on_progress: Optional callback(embedded, stored, failed, total)
 
         Returns:
             List of stored point IDs
@@ -53,40 +60,46 @@ class DocumentKnowledgeService:
 
             # Create collection for project documents
             collection_name = f"project_{project_id}_documents"
-            await self.qdrant_service.ensure_collection_exists(collection_name)
-
-            stored_point_ids = []
-
-            # Store each chunk
-            for chunk_idx, chunk in enumerate(chunks):
-                try:
-                    # Create embedding for chunk
-                    embedding = await self.ai_service.create_embedding(chunk["text"])
-
-                    # Create point ID
-                    point_id = f"{document_id}_chunk_{chunk_idx}"
-
-                    # Store in Qdrant
-                    stored_id = await self.qdrant_service.store_vector(
-                        collection_name=collection_name,
-                        point_id=point_id,
-                        vector=embedding,
-                        payload={
+            collection_ready = False
+
+            async def upsert(indexes: List[int], vectors: List[List[float]]) -> None:
+                nonlocal collection_ready
+                if not collection_ready:
+                    # Size the collection from the embedder actually in use
+                    await self.qdrant_service.ensure_collection_exists(collection_name, vector_size=len(vectors[0]))
+                    collection_ready = True
+                await self.qdrant_service.store_vectors(
+                    collection_name=collection_name,
+                    point_ids=[f"{document_id}_chunk_{i}" for i in indexes],
+                    vectors=vectors,
+                    payloads=[
+                        {
                             "document_id": str(document_id),
-                            "chunk_index": chunk_idx,
-                            "text": chunk["text"],
-                            "chunk_length": chunk.get("length", 0),
+                            "chunk_index": i,
+                            "text": chunks[i]["text"],
+                            "chunk_length": chunks[i].get("length", 0),
                             **document_metadata,
-                        },
-                    )
-
-                    stored_point_ids.append(stored_id)
+                        }
+                        for i in indexes
+                    ],
+                )
+
+            pipeline = EmbeddingPipeline(self.ai_service.create_embeddings_batch)
+            stats = await pipeline.run(
+                [chunk["text"] for chunk in chunks],
+                upsert,
+                on_progress=on_progress or log_progress(f"Embedding document {document_id}"),
+            )
 
-                except Exception as e:
-                    logger.error(f"Error storing chunk {chunk_idx}: {e}")
-                    continue
+            failed = set(stats.failed_indexes)
+            stored_point_ids = [
+                f"{document_id}_chunk_{chunk_idx}" for chunk_idx in range(len(chunks)) if chunk_idx not in failed
+            ]
 
-            logger.info(f"Stored {len(stored_point_ids)} chunks for document {document_id}")
+            logger.info(
+                f"Stored {len(stored_point_ids)} chunks for document {document_id} "
+                f"({stats.chunks_per_second:.1f} chunks/s, {stats.failed} failed, {stats.retries} retries)"
+            )
             return stored_point_ids
 
         except Exception as e:
@@ -129,17 +142,7 @@ class DocumentKnowledgeService:
             )
 
             # Format results
-            results = []
-            for match in matches:
-                payload = match.get("payload", {})
-                results.append({
-                    "document_id": payload.get("document_id"),
-                    "chunk_index": payload.get("chunk_index"),
-                    "text": payload.get("text"),
-                    "similarity_score": match.get("score"),
-                    "source": payload.get("source"),
-                    "document_type": payload.get("document_type"),
-                })
+            results = [self._format_context(match) for match in matches]
 
             logger.debug(f"Retrieved {len(matches)} document chunks for project {project_id}")
             return results
@@ -148,6 +151,58 @@ class DocumentKnowledgeService:
             logger.error(f"Error retrieving document context: {e}")
             return []
 
+    @staticmethod
+    def _format_context(match: Dict[str, Any]) -> Dict[str, Any]:
+        payload = match.get("payload") or {}
+        return {
+            "document_id": payload.get("document_id"),
+            "chunk_index": payload.get("chunk_index"),
+            "text": payload.get("text"),
+            "similarity_score": match.get("score"),
+            "source": payload.get("source"),
+            "document_type": payload.get("document_type"),
+        }
+
+    async def retrieve_context_for_queries(
+        self,
+        project_id: str,
+        queries: List[str],
+        limit: int = 5,
+        score_threshold: float = 0.7,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant documents for several queries at once
+        (one embedding batch and one batch search)
+
+        Args:
+            project_id: Project ID
+            queries: Search queries
+            limit: Max results per query
+            score_threshold: Minimum similarity
+
+        Returns:
+            One list of relevant document chunks per query, in order
+        """
+        if not queries:
+            return []
+        try:
+            await self._ensure_services()
+
+            collection_name = f"project_{project_id}_documents"
+            query_embeddings = await self.ai_service.create_embeddings_batch(queries)
+            batches = await self.qdrant_service.search_vectors_batch(
+                collection_name=collection_name,
+                query_vectors=query_embeddings,
+                limit=limit,
+                score_threshold=score_threshold,
+            )
+
+            return [[self._format_context(match) for match in matches] for matches in batches]
+
+        except Exception as e:
+            logger.error(f"Error retrieving document context for {len(queries)} queries: {e}")
+            return [[] for _ in queries]
+
     async def get_project_documents_summary(
         self,
         project_id: str,
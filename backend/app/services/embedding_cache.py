@@ -0,0 +1,188 @@
+"""
+Embedding Cache
+Content-addressed embedding vectors (hash of model + text -> float32 vector) in an in-process LRU backed by Redis
+"""
+import array
+import base64
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.core.cache import get_redis_client, note_redis_error, redis_available
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_KEY_PREFIX = "emb:"
+
+EmbedTexts = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+def embedding_key(model: str, text: str) -> str:
+    digest = hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+    return f"{EMBEDDING_KEY_PREFIX}{digest}"
+
+
+def pack_vector(vector: Sequence[float]) -> str:
+    """float32 little-endian bytes, base64 (about a third of the JSON size)"""
+    values = array.array("f", vector)
+    if values.itemsize != 4:  # pragma: no cover - every supported platform has 4-byte floats
+        raise RuntimeError("float32 array support required")
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def unpack_vector(packed: str) -> array.array:
+    values = array.array("f")
+    values.frombytes(base64.b64decode(packed))
+    return values
+
+
+class EmbeddingCache:
+    """
+    Two tiers: an LRU of float32 arrays in this process, then Redis
+    (``emb:<sha256>`` -> packed vector, shared by all workers). Vectors are
+    immutable for a given model and text, so entries are never invalidated,
+    only evicted (LRU) or expired (``ttl``).
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[int] = None, use_redis: bool = True):
+        self.max_entries = settings.EMBEDDING_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl = settings.EMBEDDING_CACHE_TTL if ttl is None else ttl
+        self.use_redis = use_redis
+        self._local: "OrderedDict[str, array.array]" = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.embedded = 0
+        self.errors = 0
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    def _remember(self, key: str, vector: array.array) -> None:
+        if self.max_entries <= 0:
+            return
+        self._local[key] = vector
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors for ``texts`` (None where missing)"""
+        keys = [embedding_key(model, text) for text in texts]
+        found: List[Optional[array.array]] = [None] * len(keys)
+        missing: Dict[str, List[int]] = {}
+
+        for i, key in enumerate(keys):
+            vector = self._local.get(key)
+            if vector is not None:
+                self._local.move_to_end(key)
+                found[i] = vector
+                self.local_hits += 1
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing and self.use_redis and redis_available():
+            try:
+                client = await get_redis_client()
+                values = await client.mget(list(missing))
+                for key, packed in zip(list(missing), values):
+                    if packed is None:
+                        continue
+                    vector = unpack_vector(packed)
+                    self._remember(key, vector)
+                    for i in missing.pop(key):
+                        found[i] = vector
+                        self.redis_hits += 1
+            except Exception as e:
+                self.errors += 1
+                note_redis_error(e)
+                logger.warning(f"Embedding cache read failed: {e}")
+
+        self.misses += sum(len(positions) for positions in missing.values())
+        return [list(vector) if vector is not None else None for vector in found]
+
+    async def set_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        packed: Dict[str, str] = {}
+        for text, vector in zip(texts, vectors):
+            key = embedding_key(model, text)
+            self._remember(key, array.array("f", vector))
+            packed[key] = pack_vector(vector)
+
+        if not packed or not self.use_redis or not redis_available():
+            return
+        try:
+            client = await get_redis_client()
+            pipe = client.pipeline(transaction=False)
+            for key, value in packed.items():
+                pipe.set(key, value, ex=self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            self.errors += 1
+            note_redis_error(e)
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    async def embed(self, model: str, texts: Sequence[str], embed_texts: EmbedTexts) -> List[List[float]]:
+        """
+        Vectors for ``texts``, calling ``embed_texts`` once for the distinct
+        texts that aren't cached yet
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = await self.get_many(model, texts)
+
+        pending: Dict[str, List[int]] = {}
+        for i, (text, vector) in enumerate(zip(texts, vectors)):
+            if vector is None:
+                pending.setdefault(text, []).append(i)
+
+        if pending:
+            new_texts = list(pending)
+            new_vectors = await embed_texts(new_texts)
+            if len(new_vectors) != len(new_texts):
+                raise ValueError(f"Embedder returned {len(new_vectors)} vectors for {len(new_texts)} texts")
+            self.embedded += len(new_texts)
+            await self.set_many(model, new_texts, new_vectors)
+            for text, vector in zip(new_texts, new_vectors):
+                for i in pending[text]:
+                    vectors[i] = list(vector)
+
+        return vectors
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._local),
+            "max_entries": self.max_entries,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "embedded": self.embedded,
+            "errors": self.errors,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "local_hit_ratio": self.local_hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self) -> None:
+        self._local.clear()
+        self.local_hits = self.redis_hits = self.misses = self.embedded = self.errors = 0
+
+
+# Singleton instance
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """
+    Get the process-wide embedding cache.
+
+    Returns:
+        EmbeddingCache instance
+    """
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache()
+    return _embedding_cache
@@ -0,0 +1,195 @@
+"""
+Embedding Pipeline
+Batched, bounded-concurrency embedding with retries and rate-limit backoff, feeding paged vector upserts
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EmbedBatch = Callable[[List[str]], Awaitable[List[List[float]]]]
+# (embedded, stored, failed, total)
+ProgressCallback = Callable[[int, int, int, int], Any]
+
+# Substrings of provider errors that mean "slow down" rather than "broken request"
+_RATE_LIMIT_MARKERS = ("429", "rate limit", "rate_limit", "ratelimit", "quota", "resource exhausted",
+                       "resourceexhausted", "too many requests")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if status == 429:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in _RATE_LIMIT_MARKERS)
+
+
+@dataclass
+class EmbeddingStats:
+    total: int = 0
+    embedded: int = 0
+    stored: int = 0
+    failed: int = 0
+    batches: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    upserts: int = 0
+    elapsed: float = 0.0
+    failed_indexes: List[int] = field(default_factory=list)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.stored / self.elapsed if self.elapsed else 0.0
+
+
+class EmbeddingPipeline:
+    """
+    Embeds texts in batches of ``batch_size`` with at most ``concurrency``
+    requests in flight, and hands finished vectors to ``upsert`` in pages of
+    ``upsert_batch_size`` while later batches are still being embedded.
+
+    Failed batches are retried with exponential backoff and jitter. Rate-limit
+    errors pause every worker (not just the one that hit it) before retrying.
+    Texts whose batch (or upsert page) still fails are reported in
+    ``failed_indexes`` and skipped; everything else is stored.
+    """
+
+    def __init__(
+        self,
+        embed_batch: EmbedBatch,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        upsert_batch_size: Optional[int] = None,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.embed_batch = embed_batch
+        self.batch_size = max(1, batch_size or settings.EMBEDDING_BATCH_SIZE)
+        self.concurrency = max(1, concurrency or settings.EMBEDDING_CONCURRENCY)
+        self.max_retries = settings.EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+        self.upsert_batch_size = max(1, upsert_batch_size or settings.VECTOR_UPSERT_BATCH_SIZE)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._cooldown_until = 0.0
+
+    async def run(
+        self,
+        texts: Sequence[str],
+        upsert: Callable[[List[int], List[List[float]]], Awaitable[None]],
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> EmbeddingStats:
+        """
+        Embed ``texts`` and pass (indexes, vectors) pages to ``upsert``.
+        Indexes refer to positions in ``texts``.
+        """
+        stats = EmbeddingStats(total=len(texts))
+        started = time.perf_counter()
+        if not texts:
+            return stats
+
+        batches = [list(range(start, min(start + self.batch_size, len(texts))))
+                   for start in range(0, len(texts), self.batch_size)]
+        pending = iter(batches)
+        # Bounded so embedding can't run arbitrarily far ahead of storage
+        ready: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        def report():
+            if on_progress is not None:
+                on_progress(stats.embedded, stats.stored, stats.failed, stats.total)
+
+        async def embed_worker():
+            for indexes in pending:
+                vectors = await self._embed_with_retries([texts[i] for i in indexes], stats)
+                stats.batches += 1
+                if vectors is None:
+                    stats.failed += len(indexes)
+                    stats.failed_indexes.extend(indexes)
+                else:
+                    stats.embedded += len(indexes)
+                    await ready.put((indexes, vectors))
+                report()
+
+        async def upsert_worker():
+            page_indexes: List[int] = []
+            page_vectors: List[List[float]] = []
+            while True:
+                item = await ready.get()
+                if item is not None:
+                    page_indexes.extend(item[0])
+                    page_vectors.extend(item[1])
+                while len(page_indexes) >= self.upsert_batch_size or (item is None and page_indexes):
+                    size = self.upsert_batch_size
+                    indexes, vectors = page_indexes[:size], page_vectors[:size]
+                    del page_indexes[:size], page_vectors[:size]
+                    try:
+                        await upsert(indexes, vectors)
+                        stats.upserts += 1
+                        stats.stored += len(indexes)
+                    except Exception as e:
+                        logger.error(f"Vector upsert of {len(indexes)} points failed: {e}")
+                        stats.failed += len(indexes)
+                        stats.failed_indexes.extend(indexes)
+                    report()
+                if item is None:
+                    return
+
+        upserter = asyncio.create_task(upsert_worker())
+        try:
+            await asyncio.gather(*(embed_worker() for _ in range(min(self.concurrency, len(batches)))))
+            await ready.put(None)
+            await upserter
+        finally:
+            if not upserter.done():
+                upserter.cancel()
+                await asyncio.gather(upserter, return_exceptions=True)
+
+        stats.elapsed = time.perf_counter() - started
+        stats.failed_indexes.sort()
+        return stats
+
+    async def _embed_with_retries(self, batch: List[str], stats: EmbeddingStats) -> Optional[List[List[float]]]:
+        attempt = 0
+        while True:
+            delay = self._cooldown_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                vectors = await self.embed_batch(batch)
+                if len(vectors) != len(batch):
+                    raise ValueError(f"Embedder returned {len(vectors)} vectors for {len(batch)} texts")
+                return vectors
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    logger.error(f"Embedding batch of {len(batch)} failed after {attempt + 1} attempts: {e}")
+                    return None
+                backoff = min(self.max_backoff, self.base_backoff * (2 ** attempt))
+                backoff *= 0.5 + random.random()
+                if is_rate_limit_error(e):
+                    stats.rate_limited += 1
+                    # Everyone waits, otherwise the other workers keep tripping the limit
+                    self._cooldown_until = max(self._cooldown_until, time.monotonic() + backoff)
+                stats.retries += 1
+                attempt += 1
+                logger.warning(f"Embedding batch failed (attempt {attempt}), retrying in {backoff:.1f}s: {e}")
+                await asyncio.sleep(backoff)
+
+
+def log_progress(label: str, every: int = 1) -> ProgressCallback:
+    """Progress callback logging embedded/stored counts at most once per ``every`` seconds"""
+    last = [0.0]
+
+    def callback(embedded: int, stored: int, failed: int, total: int) -> None:
+        now = time.monotonic()
+        if now - last[0] >= every or stored + failed == total:
+            last[0] = now
+            logger.info(f"{label}: embedded {embedded}/{total}, stored {stored}, failed {failed}")
+
+    return callback
+
@@ -0,0 +1,132 @@
+"""
+Finding Persistence
+Bulk upsert of scan findings keyed by (scan_id, fingerprint), in pages with one commit per page,
+and triage carried over from a project's earlier scans
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence as SequenceType
+
+from sqlalchemy import Sequence, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.security_advanced_models import FindingStatus
+
+logger = logging.getLogger(__name__)
+
+FINDING_CONFLICT_COLUMNS = ("scan_id", "fingerprint")
+
+# Statuses that record a decision about a finding, so a re-scan keeps them (fixed or open ones start over)
+CARRIED_STATUSES = frozenset({FindingStatus.CONFIRMED, FindingStatus.FALSE_POSITIVE, FindingStatus.ACCEPTED_RISK})
+
+# Fingerprints per lookup query (well under Postgres' bind parameter limit)
+FINGERPRINT_CHUNK_SIZE = 5000
+
+
+async def allocate_sequence_range(db: AsyncSession, sequence: Sequence, count: int) -> List[int]:
+    """
+    Draw ``count`` values from a Postgres sequence in one round trip.
+    Sequence values are never handed out twice, even across concurrent scans.
+    """
+    if count <= 0:
+        return []
+    result = await db.execute(select(sequence.next_value()).select_from(func.generate_series(1, count)))
+    return [int(value) for value in result.scalars().all()]
+
+
+def dedupe_by_fingerprint(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Last row wins; ON CONFLICT DO UPDATE can't touch the same row twice in one statement"""
+    unique: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        unique[row["fingerprint"]] = row
+    return list(unique.values())
+
+
+async def carry_forward_triage(
+    db: AsyncSession,
+    model: Any,
+    scan_model: Any,
+    scan: Any,
+    rows: List[Dict[str, Any]],
+    columns: SequenceType[str],
+) -> int:
+    """
+    Copy triage onto a new scan's finding rows. For each fingerprint, the
+    project's most recent finding from another scan is looked up; if its
+    status is in CARRIED_STATUSES, its ``columns`` replace the row's values.
+    Rows are updated in place and must already contain every column in
+    ``columns`` (one executemany shape).
+
+    Returns:
+        Number of rows that inherited triage
+    """
+    by_fingerprint = {row["fingerprint"]: row for row in rows}
+    fingerprints = list(by_fingerprint)
+    carried = 0
+    for start in range(0, len(fingerprints), FINGERPRINT_CHUNK_SIZE):
+        stmt = (
+            select(model.fingerprint, *(getattr(model, column) for column in columns))
+            .join(scan_model, model.scan_id == scan_model.id)
+            .where(
+                scan_model.project_id == scan.project_id,
+                model.scan_id != scan.id,
+                model.fingerprint.in_(fingerprints[start:start + FINGERPRINT_CHUNK_SIZE]),
+            )
+            .distinct(model.fingerprint)
+            .order_by(model.fingerprint, model.created_at.desc())
+        )
+        for fingerprint, *values in (await db.execute(stmt)).all():
+            previous = dict(zip(columns, values))
+            if previous["status"] in CARRIED_STATUSES:
+                by_fingerprint[fingerprint].update(previous)
+                carried += 1
+
+    if carried:
+        logger.debug(f"Carried triage of {carried} {model.__tablename__} rows forward from earlier scans")
+    return carried
+
+
+async def bulk_upsert_findings(
+    db: AsyncSession,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    update_columns: SequenceType[str],
+    page_size: Optional[int] = None,
+) -> int:
+    """
+    Insert finding rows in pages (one multi-row statement and one commit per
+    page). A row whose (scan_id, fingerprint) already exists updates only
+    ``update_columns``, so saving the same finding again within a scan
+    (another engine, a retried batch) keeps its triage state (status,
+    suppression, AI notes, human_id). A new scan inserts new rows; use
+    carry_forward_triage first to keep decisions from earlier scans.
+
+    Args:
+        db: Database session
+        model: Finding model (needs a unique (scan_id, fingerprint) index)
+        rows: Column values per finding; each needs scan_id and fingerprint
+        update_columns: Columns refreshed when the finding already exists
+        page_size: Rows per statement/commit (default FINDINGS_BATCH_SIZE)
+
+    Returns:
+        Number of rows written
+    """
+    page_size = max(1, page_size or settings.FINDINGS_BATCH_SIZE)
+    rows = dedupe_by_fingerprint(rows)
+    if not rows:
+        return 0
+
+    insert_stmt = pg_insert(model)
+    set_ = {column: insert_stmt.excluded[column] for column in update_columns}
+    if "updated_at" in model.__table__.columns:
+        set_["updated_at"] = func.now()
+    stmt = insert_stmt.on_conflict_do_update(index_elements=list(FINDING_CONFLICT_COLUMNS), set_=set_)
+
+    for start in range(0, len(rows), page_size):
+        page = rows[start:start + page_size]
+        await db.execute(stmt, page)
+        await db.commit()
+
+    logger.debug(f"Upserted {len(rows)} {model.__tablename__} rows in pages of {page_size}")
+    return len(rows)
@@ -2,6 +2,7 @@
 Google Gemini AI Service for test plan generation.
 Uses Google's Gemini API for AI-powered test generation.
 """
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 import google.generativeai as genai
@@ -11,6 +12,9 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Maximum texts per batchEmbedContents request
+GEMINI_EMBED_BATCH_LIMIT = 100
+
 
 class GeminiService(SharedGeminiService):
     """
@@ -64,16 +68,30 @@ class GeminiService(SharedGeminiService):
         """
         Create embedding vectors for multiple texts.
 
+        Sends up to GEMINI_EMBED_BATCH_LIMIT texts per request, off the event
+        loop (the SDK call is blocking).
+
         Args:
             texts: List of input texts
 
         Returns:
             List of embedding vectors
         """
-        embeddings = []
-        for text in texts:
-            embedding = await self.create_embedding(text)
-            embeddings.append(embedding)
+        self._check_api_key()
+        embeddings: List[List[float]] = []
+        for start in range(0, len(texts), GEMINI_EMBED_BATCH_LIMIT):
+            batch = texts[start:start + GEMINI_EMBED_BATCH_LIMIT]
+            try:
+                result = await asyncio.to_thread(
+                    genai.embed_content,
+                    model=self.embedding_model,
+                    content=batch,
+                    task_type="retrieval_document",
+                )
+            except Exception as e:
+                logger.error(f"Gemini batch embedding failed: {e}")
+                raise
+            embeddings.extend(result["embedding"])
         return embeddings
 
 
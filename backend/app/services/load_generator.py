@@ -0,0 +1,854 @@
+"""
+Local Load Generator
+Virtual-user engine behind local load tests, runnable in-process or split
+across worker processes that report per-interval histograms to a coordinator
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue as queue_module
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.latency_histogram import LatencyHistogram, IntervalLatencyRecorder
+from app.services.load_scenarios import CompiledStep, ScenarioMix, extract_path
+
+logger = logging.getLogger(__name__)
+
+# NOTE: this module is imported by spawned worker processes, so it must not
+# import models, settings or anything else that opens DB/Redis connections.
+
+REQUEST_TIMEOUT_SECONDS = 30
+WORKER_REPORT_INTERVAL_SECONDS = 0.5
+
+# Executors (k6 naming). Closed model: VUs loop back-to-back. Open model:
+# iterations start at a scheduled rate regardless of how slow responses are.
+EXECUTOR_RAMPING_VUS = "ramping-vus"
+EXECUTOR_CONSTANT_ARRIVAL_RATE = "constant-arrival-rate"
+EXECUTOR_RAMPING_ARRIVAL_RATE = "ramping-arrival-rate"
+SCHEDULER_TICK_SECONDS = 0.05
+
+# Per-request timing phases (ms). "connect" covers TCP plus, for https, the TLS
+# handshake: aiohttp creates both in one step and exposes no separate TLS hook.
+TIMING_PHASES = ("dns", "connect", "ttfb", "body")
+
+
+def target_vus_at(stages: List[Dict[str, Any]], elapsed: float) -> int:
+    """Calculate target VUs at a given elapsed time based on stages"""
+    accumulated = 0
+    prev_target = 0
+    for stage in stages:
+        stage_end = accumulated + stage["duration"]
+        if elapsed < stage_end:
+            time_in_stage = elapsed - accumulated
+            if stage["duration"] > 0:
+                progress = time_in_stage / stage["duration"]
+                return int(prev_target + (stage["target"] - prev_target) * progress)
+            return stage["target"]
+        accumulated = stage_end
+        prev_target = stage["target"]
+    return 0
+
+
+def resolve_executor(stages: List[Dict[str, Any]]) -> str:
+    """
+    Pick the executor for a stage list.
+
+    Stages with a ``rate`` key (iterations/second) select the open model:
+    ``[{"duration": 60, "rate": 200}]`` is a constant arrival rate, while
+    several stages ramp linearly from the previous stage's rate (the first
+    stage ramps from its optional ``start_rate``). Plain ``target`` stages keep
+    the closed VU loop.
+    """
+    rate_stages = [stage for stage in stages if "rate" in stage]
+    if not rate_stages:
+        return EXECUTOR_RAMPING_VUS
+    if len(rate_stages) != len(stages):
+        raise ValueError("Arrival-rate stages cannot be mixed with VU target stages")
+
+    first = rate_stages[0]
+    start_rate = first.get("start_rate", first["rate"])
+    if all(stage["rate"] == start_rate for stage in rate_stages):
+        return EXECUTOR_CONSTANT_ARRIVAL_RATE
+    return EXECUTOR_RAMPING_ARRIVAL_RATE
+
+
+def arrival_rate_at(stages: List[Dict[str, Any]], elapsed: float) -> float:
+    """Scheduled iterations/second at a given elapsed time for arrival-rate stages"""
+    accumulated = 0
+    prev_rate = stages[0].get("start_rate", stages[0]["rate"]) if stages else 0
+    for stage in stages:
+        stage_end = accumulated + stage["duration"]
+        if elapsed < stage_end:
+            if stage["duration"] > 0:
+                progress = (elapsed - accumulated) / stage["duration"]
+                return prev_rate + (stage["rate"] - prev_rate) * progress
+            return stage["rate"]
+        accumulated = stage_end
+        prev_rate = stage["rate"]
+    return 0.0
+
+
+def resolve_worker_count(configured: int, max_vus: int) -> int:
+    """
+    Number of generator processes to use for a test.
+    0 means one per CPU core; never more workers than VUs.
+    """
+    workers = configured if configured > 0 else (os.cpu_count() or 1)
+    return max(1, min(workers, max_vus))
+
+
+@dataclass
+class LoadGeneratorConfig:
+    """Picklable description of a local load test, shared with worker processes"""
+    target_url: str
+    method: str = "GET"
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[str] = None
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+    duration_seconds: float = 60
+    max_vus: int = 1
+    request_timeout: float = REQUEST_TIMEOUT_SECONDS
+    executor: str = EXECUTOR_RAMPING_VUS
+    # Scripted multi-step iterations (see load_scenarios); empty = single target request
+    scenarios: List[Dict[str, Any]] = field(default_factory=list)
+    think_time: float = 0.0
+
+
+class RequestTiming:
+    """Per-request timestamps and byte counts filled in by aiohttp trace hooks"""
+    __slots__ = (
+        "dns_start", "dns", "connect_start", "connect",
+        "sent_at", "ttfb", "body", "bytes_sent", "bytes_received",
+    )
+
+    def __init__(self):
+        self.dns_start = 0.0
+        self.dns = 0.0
+        self.connect_start = 0.0
+        self.connect = 0.0
+        self.sent_at = 0.0
+        self.ttfb = 0.0
+        self.body = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+
+@dataclass
+class StepSample:
+    """Per-step counters and latency histogram for one reporting interval"""
+    requests: int
+    errors: int
+    latencies: LatencyHistogram
+
+
+@dataclass
+class IntervalSample:
+    """Counters and latency histograms for one reporting interval"""
+    requests: int
+    errors: int
+    latencies: LatencyHistogram
+    dropped_iterations: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    phases: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    iterations: int = 0
+    failed_iterations: int = 0
+    steps: Dict[str, StepSample] = field(default_factory=dict)
+
+
+class StepStats:
+    """Running totals for one scenario step"""
+    __slots__ = ("requests", "errors", "latencies", "_interval_requests", "_interval_errors")
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latencies = IntervalLatencyRecorder()
+        self._interval_requests = 0
+        self._interval_errors = 0
+
+    def record(self, latency_ms: float, is_error: bool) -> None:
+        self.requests += 1
+        self._interval_requests += 1
+        if is_error:
+            self.errors += 1
+            self._interval_errors += 1
+        self.latencies.record(latency_ms)
+
+    def absorb(self, sample: StepSample) -> None:
+        self.requests += sample.requests
+        self._interval_requests += sample.requests
+        self.errors += sample.errors
+        self._interval_errors += sample.errors
+        self.latencies.absorb(sample.latencies)
+
+    def take_interval(self) -> StepSample:
+        sample = StepSample(self._interval_requests, self._interval_errors, self.latencies.take_interval())
+        self._interval_requests = 0
+        self._interval_errors = 0
+        return sample
+
+
+class LoadStats:
+    """
+    Running totals for a load test.
+    Fed either by local VUs (``record``) or by worker snapshots (``absorb``).
+    """
+
+    def __init__(self):
+        self.total_requests = 0
+        self.errors = 0
+        self.dropped_iterations = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latencies = IntervalLatencyRecorder()
+        self.phases = {phase: IntervalLatencyRecorder() for phase in TIMING_PHASES}
+        self.iterations = 0
+        self.failed_iterations = 0
+        self.steps: Dict[str, StepStats] = {}
+        self._interval_requests = 0
+        self._interval_errors = 0
+        self._interval_dropped = 0
+        self._interval_bytes_sent = 0
+        self._interval_bytes_received = 0
+        self._interval_iterations = 0
+        self._interval_failed_iterations = 0
+
+    def register_steps(self, step_keys: Iterable[str]) -> None:
+        for key in step_keys:
+            if key not in self.steps:
+                self.steps[key] = StepStats()
+
+    def record(
+        self,
+        latency_ms: float,
+        is_error: bool,
+        timing: Optional[RequestTiming] = None,
+        step: Optional[StepStats] = None,
+    ) -> None:
+        self.total_requests += 1
+        self._interval_requests += 1
+        if is_error:
+            self.errors += 1
+            self._interval_errors += 1
+        self.latencies.record(latency_ms)
+        if step is not None:
+            step.record(latency_ms, is_error)
+
+        if timing is not None:
+            self.bytes_sent += timing.bytes_sent
+            self._interval_bytes_sent += timing.bytes_sent
+            self.bytes_received += timing.bytes_received
+            self._interval_bytes_received += timing.bytes_received
+            # Reused keep-alive connections record 0 for dns/connect, as k6 does
+            phases = self.phases
+            phases["dns"].record(timing.dns)
+            phases["connect"].record(timing.connect)
+            phases["ttfb"].record(timing.ttfb)
+            phases["body"].record(timing.body)
+
+    def record_iteration(self, failed: bool) -> None:
+        """A scenario iteration finished (failed = a step errored or an extraction missed)"""
+        self.iterations += 1
+        self._interval_iterations += 1
+        if failed:
+            self.failed_iterations += 1
+            self._interval_failed_iterations += 1
+
+    def record_dropped(self) -> None:
+        """An arrival-rate iteration was due but no pre-allocated VU was free"""
+        self.dropped_iterations += 1
+        self._interval_dropped += 1
+
+    def absorb(self, sample: IntervalSample) -> None:
+        """Merge an interval recorded elsewhere (a worker process) into this one"""
+        self.total_requests += sample.requests
+        self._interval_requests += sample.requests
+        self.errors += sample.errors
+        self._interval_errors += sample.errors
+        self.dropped_iterations += sample.dropped_iterations
+        self._interval_dropped += sample.dropped_iterations
+        self.bytes_sent += sample.bytes_sent
+        self._interval_bytes_sent += sample.bytes_sent
+        self.bytes_received += sample.bytes_received
+        self._interval_bytes_received += sample.bytes_received
+        self.latencies.absorb(sample.latencies)
+        for phase, histogram in sample.phases.items():
+            self.phases[phase].absorb(histogram)
+        self.iterations += sample.iterations
+        self._interval_iterations += sample.iterations
+        self.failed_iterations += sample.failed_iterations
+        self._interval_failed_iterations += sample.failed_iterations
+        for key, step_sample in sample.steps.items():
+            step = self.steps.get(key)
+            if step is None:
+                step = self.steps[key] = StepStats()
+            step.absorb(step_sample)
+
+    def take_interval(self) -> IntervalSample:
+        sample = IntervalSample(
+            requests=self._interval_requests,
+            errors=self._interval_errors,
+            latencies=self.latencies.take_interval(),
+            dropped_iterations=self._interval_dropped,
+            bytes_sent=self._interval_bytes_sent,
+            bytes_received=self._interval_bytes_received,
+            phases={phase: recorder.take_interval() for phase, recorder in self.phases.items()},
+            iterations=self._interval_iterations,
+            failed_iterations=self._interval_failed_iterations,
+            steps={key: step.take_interval() for key, step in self.steps.items()},
+        )
+        self._interval_iterations = 0
+        self._interval_failed_iterations = 0
+        self._interval_requests = 0
+        self._interval_errors = 0
+        self._interval_dropped = 0
+        self._interval_bytes_sent = 0
+        self._interval_bytes_received = 0
+        return sample
+
+    def timing_breakdown(self) -> Dict[str, Dict[str, float]]:
+        """
+        Cumulative avg/p50/p95/p99 per timing phase (ms).
+        Folds in the open interval, so call it once the run has finished.
+        """
+        breakdown = {}
+        for phase, recorder in self.phases.items():
+            histogram = recorder.total()
+            values = histogram.percentiles((50.0, 95.0, 99.0))
+            breakdown[phase] = {
+                "avg": histogram.mean,
+                "p50": values[50.0],
+                "p95": values[95.0],
+                "p99": values[99.0],
+            }
+        return breakdown
+
+    def step_metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Cumulative per-step requests/errors/latency for scenario runs.
+        Like ``timing_breakdown``, call it once the run has finished.
+        """
+        metrics = {}
+        for key, step in self.steps.items():
+            histogram = step.latencies.total()
+            values = histogram.percentiles((50.0, 95.0, 99.0))
+            metrics[key] = {
+                "requests": step.requests,
+                "errors": step.errors,
+                "error_rate": (step.errors / step.requests * 100) if step.requests else 0,
+                "avg": histogram.mean,
+                "p50": values[50.0],
+                "p95": values[95.0],
+                "p99": values[99.0],
+            }
+        return metrics
+
+
+# ============================================================================
+# aiohttp trace hooks
+# ============================================================================
+
+async def _on_dns_start(session, context, params):
+    timing = context.trace_request_ctx
+    if timing is not None:
+        timing.dns_start = time.perf_counter()
+
+
+async def _on_dns_end(session, context, params):
+    timing = context.trace_request_ctx
+    if timing is not None:
+        timing.dns = (time.perf_counter() - timing.dns_start) * 1000
+
+
+async def _on_connection_start(session, context, params):
+    timing = context.trace_request_ctx
+    if timing is not None:
+        timing.connect_start = time.perf_counter()
+
+
+async def _on_connection_end(session, context, params):
+    timing = context.trace_request_ctx
+    if timing is not None:
+        # Connection creation includes DNS resolution; report it separately
+        timing.connect = max(0.0, (time.perf_counter() - timing.connect_start) * 1000 - timing.dns)
+
+
+async def _on_headers_sent(session, context, params):
+    timing = context.trace_request_ctx
+    if timing is not None:
+        timing.sent_at = time.perf_counter()
+        url = params.url
+        # Request line + headers + blank line, as written on the wire
+        size = len(params.method) + len(url.raw_path_qs) + 13
+        for name, value in params.headers.items():
+            size += len(name) + len(value) + 4
+        timing.bytes_sent += size
+
+
+async def _on_chunk_sent(session, context, params):
+    timing = context.trace_request_ctx
+    if timing is not None:
+        timing.bytes_sent += len(params.chunk)
+
+
+async def _on_request_end(session, context, params):
+    timing = context.trace_request_ctx
+    if timing is not None and timing.sent_at:
+        timing.ttfb = (time.perf_counter() - timing.sent_at) * 1000
+
+
+def _build_trace_config():
+    import aiohttp
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+    trace_config.on_connection_create_start.append(_on_connection_start)
+    trace_config.on_connection_create_end.append(_on_connection_end)
+    trace_config.on_request_headers_sent.append(_on_headers_sent)
+    trace_config.on_request_chunk_sent.append(_on_chunk_sent)
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
+
+
+def _response_header_bytes(response) -> int:
+    # Status line + raw headers + blank line
+    size = 15 + len(response.reason or "")
+    for name, value in response.raw_headers:
+        size += len(name) + len(value) + 4
+    return size
+
+
+# ============================================================================
+# In-process runners
+# ============================================================================
+
+class _SessionRunner:
+    """Shared aiohttp session handling and request execution for local runners"""
+
+    def __init__(self, config: LoadGeneratorConfig, start_time: float):
+        self.config = config
+        self.start_time = start_time
+        self.end_time = start_time + config.duration_seconds
+        self.stats = LoadStats()
+        self._stop_event = asyncio.Event()
+        self._session = None
+        self._tasks: List[asyncio.Task] = []
+        self._mix: Optional[ScenarioMix] = None
+        if config.scenarios:
+            self._mix = ScenarioMix(config.scenarios, config.think_time)
+            self.stats.register_steps(self._mix.step_keys)
+
+    def _open_session(self):
+        import aiohttp
+
+        # Create connector with high connection limits for true concurrency
+        connector = aiohttp.TCPConnector(
+            limit=0,  # No limit on connections
+            limit_per_host=0,  # No limit per host
+            ttl_dns_cache=300,
+            force_close=False,  # Keep connections alive
+            enable_cleanup_closed=True
+        )
+        self._session = aiohttp.ClientSession(connector=connector, trace_configs=[_build_trace_config()])
+        self._timeout = aiohttp.ClientTimeout(total=self.config.request_timeout)
+
+    def take_interval(self) -> IntervalSample:
+        return self.stats.take_interval()
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+
+        if self._tasks:
+            # Give VUs time to finish current requests, then cancel the rest
+            _, pending = await asyncio.wait(self._tasks, timeout=1)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _run_iteration(self, started_at: float) -> None:
+        """
+        One VU iteration: a single target request, or a full scenario.
+        Latency is measured from ``started_at``, which for the open model is
+        the scheduled start time rather than when a VU actually picked it up.
+        """
+        if self._mix is None:
+            config = self.config
+            await self._send_request(
+                config.method or "GET", config.target_url, config.headers or {}, config.body, started_at
+            )
+            return
+
+        scenario = self._mix.pick()
+        # Only scenarios that extract values need a private variable scope
+        variables = dict(scenario.variables) if scenario.extracts else scenario.variables
+        failed = False
+        for step in scenario.steps:
+            is_error, document = await self._send_request(
+                step.method,
+                step.url.render(variables),
+                step.render_headers(variables),
+                step.body.render(variables) if step.body is not None else None,
+                started_at,
+                step,
+            )
+            if is_error:
+                failed = True
+                break
+            for variable, path in step.extract:
+                value = extract_path(document, path)
+                if value is None:
+                    failed = True
+                    break
+                variables[variable] = value
+            if failed:
+                break
+            if step.think_time:
+                await asyncio.sleep(step.think_time)
+            started_at = time.time()
+
+        self.stats.record_iteration(failed)
+        if scenario.think_time:
+            await asyncio.sleep(scenario.think_time)
+
+    async def _send_request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str],
+        started_at: float,
+        step: Optional[CompiledStep] = None,
+    ):
+        """
+        Make one request and record it with its timing breakdown and bytes.
+        Returns ``(is_error, document)``; the response is only JSON-decoded
+        when the step extracts variables from it.
+        """
+        timeout_ms = self.config.request_timeout * 1000
+        timing = RequestTiming()
+        document = None
+        try:
+            async with self._session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                data=body,
+                timeout=self._timeout,
+                trace_request_ctx=timing
+            ) as response:
+                headers_at = time.perf_counter()
+                payload = await response.read()  # Consume response body
+                timing.body = (time.perf_counter() - headers_at) * 1000
+                timing.bytes_received = _response_header_bytes(response) + len(payload)
+                latency_ms = (time.time() - started_at) * 1000
+                status = response.status
+                is_error = step.is_failure(status) if step is not None else status >= 400
+        except asyncio.TimeoutError:
+            latency_ms = max(timeout_ms, (time.time() - started_at) * 1000)
+            is_error = True
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            latency_ms = (time.time() - started_at) * 1000
+            is_error = True
+
+        if step is None:
+            self.stats.record(latency_ms, is_error, timing)
+            return is_error, None
+
+        self.stats.record(latency_ms, is_error, timing, self.stats.steps[step.key])
+        if not is_error and step.extract:
+            try:
+                document = json.loads(payload)
+            except ValueError:
+                document = None
+        return is_error, document
+
+
+class LocalLoadRunner(_SessionRunner):
+    """
+    Runs persistent concurrent virtual users on the current event loop.
+    Each VU continuously makes requests and self-regulates against the stages.
+    """
+
+    def __init__(
+        self,
+        config: LoadGeneratorConfig,
+        start_time: float,
+        vu_ids: Optional[Iterable[int]] = None,
+    ):
+        super().__init__(config, start_time)
+        self.vu_ids = list(vu_ids) if vu_ids is not None else list(range(config.max_vus))
+
+    async def start(self) -> None:
+        self._open_session()
+        self._tasks = [
+            asyncio.create_task(self._virtual_user_loop(vu_id))
+            for vu_id in self.vu_ids
+        ]
+
+    async def _virtual_user_loop(self, vu_id: int) -> None:
+        stages = self.config.stages
+
+        while not self._stop_event.is_set() and time.time() < self.end_time:
+            # Check if this VU should be active based on current target
+            elapsed = time.time() - self.start_time
+            if vu_id >= target_vus_at(stages, elapsed):
+                # This VU should be dormant, wait a bit and check again
+                await asyncio.sleep(0.1)
+                continue
+
+            await self._run_iteration(time.time())
+
+            # Small yield to prevent CPU hogging, but NO artificial delay
+            await asyncio.sleep(0)
+
+
+class ArrivalRateRunner(_SessionRunner):
+    """
+    Open-model executor (constant/ramping arrival rate).
+
+    A scheduler hands out iterations at the rate given by the stages to a
+    bounded pool of pre-allocated VUs. If every VU is busy when an iteration
+    is due, the iteration is dropped and counted instead of queued, and
+    latency is measured from the scheduled start, so slow responses cannot
+    hide behind a falling request rate (coordinated omission).
+    """
+
+    def __init__(self, config: LoadGeneratorConfig, start_time: float, pool_size: Optional[int] = None):
+        super().__init__(config, start_time)
+        self.pool_size = max(1, pool_size if pool_size is not None else config.max_vus)
+        self._due: Optional[asyncio.Queue] = None
+        self._idle = 0
+
+    async def start(self) -> None:
+        self._open_session()
+        self._due = asyncio.Queue()
+        self._idle = self.pool_size
+        self._tasks = [
+            asyncio.create_task(self._virtual_user_loop())
+            for _ in range(self.pool_size)
+        ]
+        self._tasks.append(asyncio.create_task(self._schedule_iterations()))
+
+    async def _schedule_iterations(self) -> None:
+        stages = self.config.stages
+        next_start = self.start_time
+        credit = 0.0
+
+        while not self._stop_event.is_set() and next_start < self.end_time:
+            delay = next_start - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Behind schedule: keep the intended times but let VUs run
+                await asyncio.sleep(0)
+
+            rate = arrival_rate_at(stages, next_start - self.start_time)
+            if rate * SCHEDULER_TICK_SECONDS >= 1:
+                self._dispatch(next_start)
+                next_start += 1.0 / rate
+                continue
+
+            # Low rates (including ramps starting at 0) accumulate fractional
+            # iterations per tick so the schedule never skips past a ramp
+            credit += rate * SCHEDULER_TICK_SECONDS
+            if credit >= 1:
+                credit -= 1
+                self._dispatch(next_start)
+            next_start += SCHEDULER_TICK_SECONDS
+
+    def _dispatch(self, scheduled_at: float) -> None:
+        if self._idle > 0:
+            self._idle -= 1
+            self._due.put_nowait(scheduled_at)
+        else:
+            self.stats.record_dropped()
+
+    async def _virtual_user_loop(self) -> None:
+        while not self._stop_event.is_set():
+            scheduled_at = await self._due.get()
+            try:
+                await self._run_iteration(scheduled_at)
+            finally:
+                self._idle += 1
+
+
+def create_runner(
+    config: LoadGeneratorConfig,
+    start_time: float,
+    worker_index: int = 0,
+    worker_count: int = 1,
+):
+    """Build the in-process runner for a config (or for one worker's share of it)"""
+    if config.executor == EXECUTOR_RAMPING_VUS:
+        # VU ids are interleaved so every stage target is spread evenly over workers
+        return LocalLoadRunner(
+            config,
+            start_time,
+            vu_ids=range(worker_index, config.max_vus, worker_count),
+        )
+
+    # Open model: every worker drives an equal slice of the rate with an equal
+    # slice of the VU pool
+    share = 1.0 / worker_count
+    scaled_stages = [
+        {
+            **stage,
+            "rate": stage["rate"] * share,
+            **({"start_rate": stage["start_rate"] * share} if "start_rate" in stage else {}),
+        }
+        for stage in config.stages
+    ]
+    pool_size = len(range(worker_index, config.max_vus, worker_count))
+    worker_config = replace(config, stages=scaled_stages)
+    return ArrivalRateRunner(worker_config, start_time, pool_size=pool_size)
+
+
+# ============================================================================
+# Multi-process runner
+# ============================================================================
+
+def _worker_main(config, start_time, worker_index, worker_count, results, stop_event):
+    """Entry point of a generator process: run its share of VUs on a private loop"""
+    try:
+        asyncio.run(_worker_loop(config, start_time, worker_index, worker_count, results, stop_event))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _worker_loop(config, start_time, worker_index, worker_count, results, stop_event):
+    runner = create_runner(config, start_time, worker_index, worker_count)
+    await runner.start()
+    try:
+        while time.time() < runner.end_time and not stop_event.is_set():
+            await asyncio.sleep(WORKER_REPORT_INTERVAL_SECONDS)
+            results.put(_encode_sample(worker_index, runner.take_interval()))
+    finally:
+        await runner.stop()
+        results.put(_encode_sample(worker_index, runner.take_interval(), final=True))
+
+
+def _encode_sample(worker_index: int, sample: IntervalSample, final: bool = False) -> Dict[str, Any]:
+    return {
+        "worker": worker_index,
+        "final": final,
+        "requests": sample.requests,
+        "errors": sample.errors,
+        "dropped_iterations": sample.dropped_iterations,
+        "bytes_sent": sample.bytes_sent,
+        "bytes_received": sample.bytes_received,
+        "latencies": sample.latencies.to_dict(),
+        "phases": {phase: hist.to_dict() for phase, hist in sample.phases.items()},
+        "iterations": sample.iterations,
+        "failed_iterations": sample.failed_iterations,
+        "steps": {
+            key: [step.requests, step.errors, step.latencies.to_dict()]
+            for key, step in sample.steps.items()
+            if step.requests
+        },
+    }
+
+
+def _decode_sample(message: Dict[str, Any]) -> IntervalSample:
+    return IntervalSample(
+        requests=message["requests"],
+        errors=message["errors"],
+        latencies=LatencyHistogram.from_dict(message["latencies"]),
+        dropped_iterations=message["dropped_iterations"],
+        bytes_sent=message["bytes_sent"],
+        bytes_received=message["bytes_received"],
+        phases={phase: LatencyHistogram.from_dict(data) for phase, data in message["phases"].items()},
+        iterations=message["iterations"],
+        failed_iterations=message["failed_iterations"],
+        steps={
+            key: StepSample(requests, errors, LatencyHistogram.from_dict(data))
+            for key, (requests, errors, data) in message["steps"].items()
+        },
+    )
+
+
+class DistributedLoadRunner:
+    """
+    Coordinator for a multi-process load test.
+
+    Each worker process owns its own event loop and aiohttp connector and
+    streams interval snapshots (counters + sparse histogram) through a queue.
+    ``take_interval`` merges everything received so far, so the reporting loop
+    in the service treats it exactly like an in-process runner.
+    """
+
+    def __init__(self, config: LoadGeneratorConfig, start_time: float, workers: int):
+        self.config = config
+        self.start_time = start_time
+        self.end_time = start_time + config.duration_seconds
+        self.workers = max(1, workers)
+        self.stats = LoadStats()
+        if config.scenarios:
+            # Fail fast on bad scenario definitions instead of inside every worker
+            self.stats.register_steps(ScenarioMix(config.scenarios, config.think_time).step_keys)
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._stop_event = self._ctx.Event()
+        self._processes = []
+        self._finished = set()
+
+    async def start(self) -> None:
+        for index in range(self.workers):
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(self.config, self.start_time, index, self.workers, self._results, self._stop_event),
+                name=f"load-generator-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        logger.info(f"Started {self.workers} load generator worker processes")
+
+    def take_interval(self) -> IntervalSample:
+        self._drain()
+        return self.stats.take_interval()
+
+    async def stop(self) -> None:
+        self._stop_event.set()
+        loop = asyncio.get_running_loop()
+
+        # Wait for every worker's final snapshot (bounded), then reap processes
+        deadline = time.time() + self.config.request_timeout + 5
+        while len(self._finished) < len(self._processes) and time.time() < deadline:
+            self._drain()
+            if not any(p.is_alive() for p in self._processes):
+                self._drain()
+                break
+            await asyncio.sleep(0.1)
+
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, 1)
+            if process.is_alive():
+                logger.warning(f"Load generator {process.name} did not exit, terminating")
+                process.terminate()
+
+        missing = len(self._processes) - len(self._finished)
+        if missing:
+            logger.warning(f"{missing} load generator worker(s) exited without a final report")
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                message = self._results.get_nowait()
+            except queue_module.Empty:
+                return
+            self.stats.absorb(_decode_sample(message))
+            if message["final"]:
+                self._finished.add(message["worker"])
@@ -0,0 +1,256 @@
+"""
+Load Test Metrics Sink
+Write-behind persistence of per-second load test samples and live progress over Redis pub/sub
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.performance import PerformanceMetricSample, PerformanceTest, TestStatus
+
+logger = logging.getLogger(__name__)
+
+# Live snapshot outlives the run briefly so late subscribers still see the end state
+LIVE_SNAPSHOT_TTL_SECONDS = 300
+# Upper bound on buffered samples while the database is unreachable (1 hour at 1/s)
+MAX_BUFFERED_SAMPLES = 3600
+# Per-listener backlog of live messages; slow listeners lose the oldest
+LISTENER_QUEUE_SIZE = 32
+
+
+def progress_channel(test_id: UUID) -> str:
+    return f"performance:test:{test_id}:progress"
+
+
+def live_snapshot_key(test_id: UUID) -> str:
+    return f"performance:test:{test_id}:live"
+
+
+async def publish_test_progress(test_id: UUID, message: Dict[str, Any]) -> bool:
+    """Publish a progress message and keep it as the latest live snapshot"""
+    try:
+        client = await get_redis_client()
+        payload = json.dumps(message, default=str)
+        pipe = client.pipeline(transaction=False)
+        pipe.publish(progress_channel(test_id), payload)
+        pipe.setex(live_snapshot_key(test_id), LIVE_SNAPSHOT_TTL_SECONDS, payload)
+        await pipe.execute()
+        return True
+    except Exception as e:
+        logger.debug(f"Failed to publish progress for test {test_id}: {e}")
+        return False
+
+
+async def get_live_snapshot(test_id: UUID) -> Optional[Dict[str, Any]]:
+    """Latest published progress message, if the test ran recently"""
+    try:
+        client = await get_redis_client()
+        payload = await client.get(live_snapshot_key(test_id))
+        return json.loads(payload) if payload else None
+    except Exception as e:
+        logger.debug(f"Failed to read live snapshot for test {test_id}: {e}")
+        return None
+
+
+class ProgressBroadcaster:
+    """
+    Fans live progress out to local listeners (e.g. SSE streams).
+    Each API process holds a single Redis pattern subscription instead of
+    one pub/sub connection per connected client.
+    """
+
+    def __init__(self):
+        self._listeners: Dict[str, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def subscribe(self, test_id: UUID) -> Optional[asyncio.Queue]:
+        """Queue receiving progress messages for a test, or None if Redis is unavailable"""
+        if self._task is None or self._task.done():
+            try:
+                client = await get_redis_client()
+                pubsub = client.pubsub()
+                await pubsub.psubscribe(progress_channel("*"))
+            except Exception as e:
+                logger.warning(f"Live progress subscription failed: {e}")
+                return None
+            self._task = asyncio.create_task(self._listen(pubsub))
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=LISTENER_QUEUE_SIZE)
+        self._listeners.setdefault(str(test_id), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, test_id: UUID, queue: asyncio.Queue) -> None:
+        queues = self._listeners.get(str(test_id))
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._listeners[str(test_id)]
+
+    async def _listen(self, pubsub) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                # performance:test:<id>:progress
+                queues = self._listeners.get(message["channel"].split(":")[2])
+                if not queues:
+                    continue
+                data = json.loads(message["data"])
+                for queue in list(queues):
+                    if queue.full():
+                        queue.get_nowait()
+                    queue.put_nowait(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Live progress listener stopped: {e}")
+        finally:
+            await pubsub.aclose()
+
+
+progress_broadcaster = ProgressBroadcaster()
+
+
+class LoadMetricsSink:
+    """
+    Buffers per-second samples of a running load test.
+
+    ``add`` only touches memory, so the reporting loop never waits on I/O.
+    A background task publishes the latest sample to Redis as soon as it
+    arrives (coalescing if publishing falls behind) and bulk-inserts the
+    buffered samples on its own session every ``flush_interval`` seconds,
+    together with the progress update and ``on_flush`` (partial results) in
+    one transaction.
+    ``close`` stages whatever is left on the caller's session so it commits
+    atomically with the final results.
+    """
+
+    def __init__(
+        self,
+        test_id: UUID,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        flush_interval: Optional[float] = None,
+        max_buffered: int = MAX_BUFFERED_SAMPLES,
+        on_flush: Optional[Callable[[AsyncSession], Awaitable[None]]] = None,
+    ):
+        self.test_id = test_id
+        self.on_flush = on_flush
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval if flush_interval is not None else settings.LOAD_TEST_METRICS_FLUSH_SECONDS
+        self._buffer: deque = deque(maxlen=max_buffered)
+        self._latest: Optional[Dict[str, Any]] = None
+        self._progress = 0
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+        self._publish_enabled = True
+        self.samples_written = 0
+        self.flushes = 0
+
+    def add(self, second: int, point: Dict[str, Any], summary: Dict[str, Any], progress: int) -> None:
+        """Queue one per-second timeline point plus the running totals for live progress"""
+        self._buffer.append({
+            "test_id": self.test_id,
+            "second": second,
+            "recorded_at": datetime.utcnow(),
+            "requests": point.get("requests", 0),
+            "errors": point.get("errors", 0),
+            "virtual_users": point.get("vus"),
+            "requests_per_second": point.get("rps"),
+            "latency_avg": point.get("avg_response_time"),
+            "latency_p95": point.get("p95"),
+            "point": point,
+        })
+        self._progress = progress
+        self._latest = {
+            "id": str(self.test_id),
+            "status": TestStatus.RUNNING.value,
+            "progress": progress,
+            "summary": dict(summary),
+            "point": point,
+        }
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self, session: AsyncSession) -> None:
+        """
+        Stop the background task and stage the remaining samples on ``session``.
+        The caller commits them together with the final metrics.
+        """
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        rows = self._take_rows()
+        if rows:
+            await session.execute(insert(PerformanceMetricSample), rows)
+            self.samples_written += len(rows)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_flush = loop.time() + self.flush_interval
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_flush - loop.time()))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            await self._publish_latest()
+            if loop.time() >= next_flush and not self._closing:
+                await self._flush()
+                next_flush = loop.time() + self.flush_interval
+
+        # Final snapshot; the final DB write happens in close()
+        await self._publish_latest()
+
+    async def _publish_latest(self) -> None:
+        message, self._latest = self._latest, None
+        if message is None or not self._publish_enabled:
+            return
+        if not await publish_test_progress(self.test_id, message):
+            # Don't retry Redis every second for the rest of the run
+            logger.warning(f"Live progress disabled for test {self.test_id}: Redis unavailable")
+            self._publish_enabled = False
+
+    def _take_rows(self):
+        rows = list(self._buffer)
+        self._buffer.clear()
+        return rows
+
+    async def _flush(self) -> None:
+        rows = self._take_rows()
+        if not rows:
+            return
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(PerformanceMetricSample), rows)
+                await session.execute(
+                    update(PerformanceTest)
+                    .where(PerformanceTest.id == self.test_id)
+                    .values(progress_percentage=self._progress)
+                )
+                if self.on_flush is not None:
+                    await self.on_flush(session)
+                await session.commit()
+            self.samples_written += len(rows)
+            self.flushes += 1
+        except Exception as e:
+            logger.warning(f"Failed to flush {len(rows)} load test samples for test {self.test_id}: {e}")
+            # Put them back ahead of newer samples; the bounded buffer drops the oldest on overflow
+            pending = rows + self._take_rows()
+            self._buffer.extend(pending)
@@ -0,0 +1,282 @@
+"""
+Load Test Scenarios
+Compiles scripted multi-step load scenarios (with variable extraction,
+think time and weighted mix) into allocation-light form for the load generator
+"""
+import base64
+import bisect
+import json
+import random
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# NOTE: imported by load generator worker processes - keep free of models/settings.
+
+_VARIABLE_PATTERN = re.compile(r"\{\{\s*([\w.\-]+)\s*\}\}")
+_PATH_TOKEN = re.compile(r"([^.\[\]]+)|\[(\d+)\]")
+
+
+class ScenarioError(ValueError):
+    """Raised when a scenario definition cannot be compiled"""
+
+
+# ============================================================================
+# Templates and extraction paths
+# ============================================================================
+
+class Template:
+    """
+    ``{{variable}}`` string template, split once at compile time.
+    Rendering a template without variables returns the original string.
+    """
+    __slots__ = ("source", "parts", "is_static")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts: List[Tuple[bool, str]] = []
+        position = 0
+        for match in _VARIABLE_PATTERN.finditer(source):
+            if match.start() > position:
+                parts.append((False, source[position:match.start()]))
+            parts.append((True, match.group(1)))
+            position = match.end()
+        if position < len(source):
+            parts.append((False, source[position:]))
+        self.parts = tuple(parts)
+        self.is_static = not any(is_var for is_var, _ in parts)
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        if self.is_static:
+            return self.source
+        return "".join(
+            str(variables.get(value, "")) if is_var else value
+            for is_var, value in self.parts
+        )
+
+
+class BasicAuthTemplate:
+    """``Authorization: Basic`` header value built from templated credentials"""
+    __slots__ = ("username", "password", "source", "is_static")
+
+    def __init__(self, username: str, password: str):
+        self.username = Template(username)
+        self.password = Template(password)
+        self.is_static = self.username.is_static and self.password.is_static
+        self.source = self._encode(username, password) if self.is_static else None
+
+    @staticmethod
+    def _encode(username: str, password: str) -> str:
+        return "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        if self.is_static:
+            return self.source
+        return self._encode(self.username.render(variables), self.password.render(variables))
+
+
+def compile_path(path: str) -> Tuple[Union[str, int], ...]:
+    """
+    Compile a JSON extraction path such as ``$.data.items[0].id`` or
+    ``data.items.0.id`` into a tuple of keys/indexes.
+    """
+    path = path.strip()
+    if path.startswith("$"):
+        path = path[1:]
+    keys: List[Union[str, int]] = []
+    for key, index in _PATH_TOKEN.findall(path):
+        if index:
+            keys.append(int(index))
+        elif key.isdigit():
+            keys.append(int(key))
+        else:
+            keys.append(key)
+    if not keys:
+        raise ScenarioError(f"Empty extraction path: {path!r}")
+    return tuple(keys)
+
+
+def extract_path(document: Any, keys: Tuple[Union[str, int], ...]) -> Any:
+    value = document
+    for key in keys:
+        if isinstance(key, int):
+            if not isinstance(value, list) or key >= len(value):
+                return None
+        elif not isinstance(value, dict):
+            return None
+        value = value[key] if isinstance(value, list) else value.get(key)
+        if value is None:
+            return None
+    return value
+
+
+# ============================================================================
+# API testing collection requests -> steps
+# ============================================================================
+
+def _enabled_pairs(pairs: Optional[List[Dict[str, Any]]]) -> Dict[str, str]:
+    return {
+        pair["key"]: pair.get("value", "")
+        for pair in (pairs or [])
+        if pair.get("key") and pair.get("enabled", True)
+    }
+
+
+def environment_variables(environment: Any) -> Dict[str, Any]:
+    """Collection environment as a flat variable dict (plain dict or key/value pair list)"""
+    if isinstance(environment, list):
+        return _enabled_pairs(environment)
+    return dict(environment or {})
+
+
+def api_request_to_step(api_request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert an API testing request (``APIRequest`` row as dict) into a
+    scenario step, applying enabled params/headers, body and auth the same
+    way the API testing client does.
+    """
+    headers = _enabled_pairs(api_request.get("headers"))
+    params = _enabled_pairs(api_request.get("params"))
+
+    basic_auth = None
+    auth = api_request.get("auth") or {}
+    auth_type = auth.get("type")
+    if auth_type == "bearer" and auth.get("token"):
+        headers["Authorization"] = f"Bearer {auth['token']}"
+    elif auth_type == "basic" and auth.get("username"):
+        basic_auth = {"username": auth["username"], "password": auth.get("password", "")}
+    elif auth_type == "api-key" and auth.get("apiKey"):
+        headers[auth.get("apiKeyHeader") or "X-API-Key"] = auth["apiKey"]
+
+    body_spec = api_request.get("body") or {}
+    body_type = body_spec.get("type", "none")
+    body: Optional[str] = None
+    if body_type in ("json", "raw"):
+        body = body_spec.get("rawContent") or body_spec.get("content") or None
+        if body_type == "json" or body_spec.get("rawType") == "json":
+            headers.setdefault("Content-Type", "application/json")
+    elif body_type == "x-www-form-urlencoded":
+        fields = _enabled_pairs(body_spec.get("urlencodedData"))
+        body = "&".join(f"{k}={v}" for k, v in fields.items())
+        headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+
+    url = api_request.get("url") or ""
+    if params and "?" not in url:
+        url += "?" + "&".join(f"{k}={v}" for k, v in params.items())
+
+    return {
+        "name": api_request.get("name") or url,
+        "method": api_request.get("method") or "GET",
+        "url": url,
+        "headers": headers,
+        "body": body,
+        "basic_auth": basic_auth,
+    }
+
+
+# ============================================================================
+# Compiled scenarios
+# ============================================================================
+
+class CompiledStep:
+    """One request of a scenario with pre-split templates and extraction paths"""
+    __slots__ = (
+        "key", "method", "url", "headers", "static_headers", "body",
+        "extract", "think_time", "expect_status",
+    )
+
+    def __init__(self, scenario_name: str, index: int, step: Dict[str, Any]):
+        if not step.get("url"):
+            raise ScenarioError(f"Scenario '{scenario_name}' step {index + 1} has no url")
+
+        name = step.get("name") or f"step_{index + 1}"
+        self.key = f"{scenario_name}/{name}"
+        self.method = (step.get("method") or "GET").upper()
+        self.url = Template(step["url"])
+        headers = dict(step.get("headers") or {})
+        basic_auth = step.get("basic_auth")
+        if basic_auth:
+            # Credentials may reference variables, so encoding happens at render time
+            headers["Authorization"] = BasicAuthTemplate(
+                basic_auth.get("username", ""), basic_auth.get("password", "")
+            )
+        self.headers = tuple(
+            (key, value if isinstance(value, BasicAuthTemplate) else Template(str(value)))
+            for key, value in headers.items()
+        )
+        # Headers without variables are built once and shared by every iteration
+        self.static_headers = (
+            {key: value.source for key, value in self.headers}
+            if all(value.is_static for _, value in self.headers) else None
+        )
+
+        body = step.get("body")
+        if step.get("json") is not None:
+            body = json.dumps(step["json"])
+        self.body = Template(body) if isinstance(body, str) and body else None
+
+        self.extract = tuple(
+            (variable, compile_path(path)) for variable, path in (step.get("extract") or {}).items()
+        )
+        self.think_time = float(step.get("think_time") or 0)
+        expect = step.get("expect_status")
+        self.expect_status = frozenset(expect if isinstance(expect, list) else [expect]) if expect else None
+
+    def render_headers(self, variables: Dict[str, Any]) -> Dict[str, str]:
+        if self.static_headers is not None:
+            return self.static_headers
+        return {key: value.render(variables) for key, value in self.headers}
+
+    def is_failure(self, status: int) -> bool:
+        if self.expect_status is not None:
+            return status not in self.expect_status
+        return status >= 400
+
+
+class CompiledScenario:
+    __slots__ = ("name", "weight", "steps", "variables", "think_time", "extracts")
+
+    def __init__(self, index: int, scenario: Dict[str, Any], default_think_time: float):
+        self.name = scenario.get("name") or f"scenario_{index + 1}"
+        self.weight = float(scenario.get("weight", 1))
+        if self.weight <= 0:
+            raise ScenarioError(f"Scenario '{self.name}' must have a positive weight")
+        steps = scenario.get("steps") or []
+        if not steps:
+            raise ScenarioError(f"Scenario '{self.name}' has no steps")
+        self.steps = tuple(CompiledStep(self.name, i, step) for i, step in enumerate(steps))
+        if len({step.key for step in self.steps}) != len(self.steps):
+            raise ScenarioError(f"Scenario '{self.name}' has duplicate step names")
+        self.variables = dict(scenario.get("variables") or {})
+        self.think_time = float(scenario.get("think_time", default_think_time) or 0)
+        self.extracts = any(step.extract for step in self.steps)
+
+
+class ScenarioMix:
+    """Weighted scenario picker over compiled scenarios"""
+
+    def __init__(self, scenarios: List[Dict[str, Any]], default_think_time: float = 0.0):
+        if not scenarios:
+            raise ScenarioError("At least one scenario is required")
+        self.scenarios = tuple(
+            CompiledScenario(i, scenario, default_think_time) for i, scenario in enumerate(scenarios)
+        )
+        names = [scenario.name for scenario in self.scenarios]
+        if len(set(names)) != len(names):
+            raise ScenarioError("Scenario names must be unique")
+
+        total = 0.0
+        cumulative = []
+        for scenario in self.scenarios:
+            total += scenario.weight
+            cumulative.append(total)
+        self._cumulative = cumulative
+        self._total = total
+
+    @property
+    def step_keys(self) -> List[str]:
+        return [step.key for scenario in self.scenarios for step in scenario.steps]
+
+    def pick(self, rng: random.Random = random) -> CompiledScenario:
+        if len(self.scenarios) == 1:
+            return self.scenarios[0]
+        return self.scenarios[bisect.bisect_right(self._cumulative, rng.random() * self._total)]
@@ -4,7 +4,6 @@ Interactive Application Security Testing with runtime instrumentation
 """
 import asyncio
 import secrets
-import re
 import json
 from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
@@ -15,9 +14,13 @@ import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config import settings
 from app.models.security_advanced_models import (
     IASTSession, IASTFinding, FindingSeverity, FindingStatus
 )
+from app.services.attack_detector import AttackDetector, get_detector_cache
+from app.services.pattern_matcher import PatternRule
+from app.services.runtime_event_sink import get_runtime_event_sink
 
 logger = logging.getLogger(__name__)
 
@@ -26,54 +29,116 @@ logger = logging.getLogger(__name__)
 # Attack Patterns for Runtime Detection
 # ============================================================================
 
+# Literals are prefilters: every match of the pattern contains one of them, case-insensitively.
 SQL_INJECTION_PATTERNS = [
-    r"(?i)(\b(select|insert|update|delete|drop|union|exec|execute)\b.*\b(from|into|where|set)\b)",
-    r"(?i)(--|#|/\*|\*/|;)",
-    r"(?i)(\bor\b\s+\d+\s*=\s*\d+)",
-    r"(?i)(\band\b\s+\d+\s*=\s*\d+)",
-    r"(?i)(\'|\")(\s*)(or|and)(\s*)(\1)",
-    r"(?i)(sleep\s*\(|benchmark\s*\(|waitfor\s+delay)",
+    PatternRule("iast.sqli.keywords", r"(\b(select|insert|update|delete|drop|union|exec|execute)\b.*\b(from|into|where|set)\b)",
+                ("select", "insert", "update", "delete", "drop", "union", "exec")),
+    PatternRule("iast.sqli.comment", r"(--|#|/\*|\*/|;)", ("--", "#", "/*", "*/", ";")),
+    PatternRule("iast.sqli.or-tautology", r"(\bor\b\s+\d+\s*=\s*\d+)", ("=",)),
+    PatternRule("iast.sqli.and-tautology", r"(\band\b\s+\d+\s*=\s*\d+)", ("=",)),
+    # Quote, or/and, same quote again (spelled out instead of a backreference so it can join the combined pattern)
+    PatternRule("iast.sqli.quoted-logic", r"('\s*(or|and)\s*'|\"\s*(or|and)\s*\")", ("'", '"')),
+    PatternRule("iast.sqli.time-based", r"(sleep\s*\(|benchmark\s*\(|waitfor\s+delay)", ("sleep", "benchmark", "waitfor")),
 ]
 
 XSS_PATTERNS = [
-    r"<script[^>]*>.*?</script>",
-    r"javascript:",
-    r"on(error|load|click|mouse|key|focus|blur|change|submit)\s*=",
-    r"<img[^>]+onerror\s*=",
-    r"<svg[^>]+onload\s*=",
-    r"<iframe[^>]*>",
-    r"document\.(cookie|location|write)",
-    r"(eval|alert|confirm|prompt)\s*\(",
+    PatternRule("iast.xss.script", r"<script[^>]*>.*?</script>", ("<script",)),
+    PatternRule("iast.xss.js-uri", r"javascript:", ("javascript:",)),
+    PatternRule("iast.xss.handler", r"on(error|load|click|mouse|key|focus|blur|change|submit)\s*=",
+                ("onerror", "onload", "onclick", "onmouse", "onkey", "onfocus", "onblur", "onchange", "onsubmit")),
+    PatternRule("iast.xss.img-onerror", r"<img[^>]+onerror\s*=", ("onerror",)),
+    PatternRule("iast.xss.svg-onload", r"<svg[^>]+onload\s*=", ("onload",)),
+    PatternRule("iast.xss.iframe", r"<iframe[^>]*>", ("<iframe",)),
+    PatternRule("iast.xss.dom", r"document\.(cookie|location|write)", ("document.",)),
+    PatternRule("iast.xss.dialog", r"(eval|alert|confirm|prompt)\s*\(", ("eval", "alert", "confirm", "prompt")),
 ]
 
 PATH_TRAVERSAL_PATTERNS = [
-    r"\.\.\/",
-    r"\.\.\\",
-    r"%2e%2e%2f",
-    r"%2e%2e/",
-    r"..%2f",
-    r"%2e%2e%5c",
-    r"\.\.%5c",
+    PatternRule("iast.path.dotdot", r"\.\.\/", ("../",)),
+    PatternRule("iast.path.dotdot-win", r"\.\.\\", ("..\\",)),
+    PatternRule("iast.path.encoded", r"%2e%2e%2f", ("%2e%2e%2f",)),
+    PatternRule("iast.path.encoded-dots", r"%2e%2e/", ("%2e%2e/",)),
+    PatternRule("iast.path.encoded-slash", r"..%2f", ("%2f",)),
+    PatternRule("iast.path.encoded-win", r"%2e%2e%5c", ("%2e%2e%5c",)),
+    PatternRule("iast.path.encoded-backslash", r"\.\.%5c", ("..%5c",)),
 ]
 
 COMMAND_INJECTION_PATTERNS = [
-    r"[;&|`$]",
-    r"\$\([^)]+\)",
-    r"`[^`]+`",
-    r"\|\s*\w+",
-    r";\s*(ls|cat|rm|wget|curl|nc|bash|sh|python|perl|ruby)",
+    PatternRule("iast.cmd.metachar", r"[;&|`$]", (";", "&", "|", "`", "$")),
+    PatternRule("iast.cmd.subshell", r"\$\([^)]+\)", ("$(",)),
+    PatternRule("iast.cmd.backticks", r"`[^`]+`", ("`",)),
+    PatternRule("iast.cmd.pipe", r"\|\s*\w+", ("|",)),
+    PatternRule("iast.cmd.chained", r";\s*(ls|cat|rm|wget|curl|nc|bash|sh|python|perl|ruby)", (";",)),
 ]
 
 SSRF_PATTERNS = [
-    r"(localhost|127\.0\.0\.1|0\.0\.0\.0|::1)",
-    r"(10\.\d{1,3}\.\d{1,3}\.\d{1,3})",
-    r"(172\.(1[6-9]|2\d|3[01])\.\d{1,3}\.\d{1,3})",
-    r"(192\.168\.\d{1,3}\.\d{1,3})",
-    r"file://",
-    r"gopher://",
-    r"dict://",
+    PatternRule("iast.ssrf.loopback", r"(localhost|127\.0\.0\.1|0\.0\.0\.0|::1)", ("localhost", "127.0.0.1", "0.0.0.0", "::1")),
+    PatternRule("iast.ssrf.private-10", r"(10\.\d{1,3}\.\d{1,3}\.\d{1,3})", ("10.",)),
+    PatternRule("iast.ssrf.private-172", r"(172\.(1[6-9]|2\d|3[01])\.\d{1,3}\.\d{1,3})", ("172.",)),
+    PatternRule("iast.ssrf.private-192", r"(192\.168\.\d{1,3}\.\d{1,3})", ("192.168.",)),
+    PatternRule("iast.ssrf.file", r"file://", ("file://",)),
+    PatternRule("iast.ssrf.gopher", r"gopher://", ("gopher://",)),
+    PatternRule("iast.ssrf.dict", r"dict://", ("dict://",)),
 ]
 
+# (category, session config flag, rules, finding template), in reporting order
+DETECTION_CATEGORIES = [
+    ("sql_injection", "detect_sql_injection", SQL_INJECTION_PATTERNS, {
+        "vulnerability_type": "SQL Injection",
+        "severity": FindingSeverity.CRITICAL,
+        "title": "SQL Injection detected in {location}",
+        "description": "Potentially malicious SQL pattern detected: {match}",
+        "remediation": "Use parameterized queries or prepared statements",
+    }),
+    ("xss", "detect_xss", XSS_PATTERNS, {
+        "vulnerability_type": "Cross-Site Scripting (XSS)",
+        "severity": FindingSeverity.HIGH,
+        "title": "XSS detected - input reflected in response",
+        "description": "Potentially malicious script pattern: {match}",
+        "remediation": "Encode output and implement Content-Security-Policy",
+    }),
+    ("path_traversal", "detect_path_traversal", PATH_TRAVERSAL_PATTERNS, {
+        "vulnerability_type": "Path Traversal",
+        "severity": FindingSeverity.HIGH,
+        "title": "Path traversal attempt in {location}",
+        "description": "Directory traversal sequence detected",
+        "remediation": "Validate and sanitize file paths, use allowlists",
+    }),
+    ("command_injection", "detect_command_injection", COMMAND_INJECTION_PATTERNS, {
+        "vulnerability_type": "Command Injection",
+        "severity": FindingSeverity.CRITICAL,
+        "title": "Command injection pattern in {location}",
+        "description": "Shell command characters or patterns detected",
+        "remediation": "Avoid shell commands, use safe APIs, validate input",
+    }),
+    ("ssrf", "detect_ssrf", SSRF_PATTERNS, {
+        "vulnerability_type": "Server-Side Request Forgery (SSRF)",
+        "severity": FindingSeverity.HIGH,
+        "title": "SSRF pattern detected in {location}",
+        "description": "Internal IP or dangerous protocol detected",
+        "remediation": "Validate URLs, use allowlists, block internal IPs",
+    }),
+]
+
+FINDING_TEMPLATES = {category: template for category, _, _, template in DETECTION_CATEGORIES}
+
+
+def iast_rules_version(config: Dict[str, Any]) -> Tuple:
+    """Everything that determines a session's compiled detector"""
+    return (
+        "iast",
+        tuple(bool(config.get(flag, True)) for _, flag, _, _ in DETECTION_CATEGORIES),
+        settings.RUNTIME_DETECTION_MAX_INPUT_CHARS,
+    )
+
+
+def build_iast_detector(config: Dict[str, Any]) -> AttackDetector:
+    """Categories the session config enables (all by default)"""
+    return AttackDetector(
+        [(category, rules) for category, flag, rules, _ in DETECTION_CATEGORIES if config.get(flag, True)],
+        max_input_chars=settings.RUNTIME_DETECTION_MAX_INPUT_CHARS,
+    )
+
 
 # ============================================================================
 # Data Classes
@@ -111,13 +176,7 @@ class NativeIASTService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.active_sessions: Dict[str, Dict] = {}  # session_token -> session_data
-        
-        # Compile regex patterns
-        self.sql_patterns = [re.compile(p, re.IGNORECASE) for p in SQL_INJECTION_PATTERNS]
-        self.xss_patterns = [re.compile(p, re.IGNORECASE) for p in XSS_PATTERNS]
-        self.path_patterns = [re.compile(p, re.IGNORECASE) for p in PATH_TRAVERSAL_PATTERNS]
-        self.cmd_patterns = [re.compile(p, re.IGNORECASE) for p in COMMAND_INJECTION_PATTERNS]
-        self.ssrf_patterns = [re.compile(p, re.IGNORECASE) for p in SSRF_PATTERNS]
+        self.event_sink = get_runtime_event_sink()
 
     # ========================================================================
     # Session Management
@@ -253,86 +312,20 @@ class NativeIASTService:
             for value in values:
                 all_inputs.append((f"query:{key}", value))
         
-        # Check each input
+        # Check each input: one combined scan covers every enabled category
+        config = session_data.get("config") or {}
+        detector = get_detector_cache().get(iast_rules_version(config), lambda: build_iast_detector(config))
         for input_location, input_value in all_inputs:
-            # SQL Injection
-            sqli = self._detect_sql_injection(input_value)
-            if sqli:
-                findings.append(RuntimeFinding(
-                    vulnerability_type="SQL Injection",
-                    severity=FindingSeverity.CRITICAL,
-                    http_method=method,
-                    request_url=url,
-                    request_headers=headers,
-                    request_body=body,
-                    response_status=response_status,
-                    tainted_input=input_value[:500],
-                    sink_location=input_location,
-                    title=f"SQL Injection detected in {input_location}",
-                    description=f"Potentially malicious SQL pattern detected: {sqli[:100]}",
-                    remediation="Use parameterized queries or prepared statements"
-                ))
-            
-            # XSS
-            xss = self._detect_xss(input_value, response_body)
-            if xss:
-                findings.append(RuntimeFinding(
-                    vulnerability_type="Cross-Site Scripting (XSS)",
-                    severity=FindingSeverity.HIGH,
-                    http_method=method,
-                    request_url=url,
-                    request_headers=headers,
-                    request_body=body,
-                    response_status=response_status,
-                    tainted_input=input_value[:500],
-                    sink_location=input_location,
-                    title=f"XSS detected - input reflected in response",
-                    description=f"Potentially malicious script pattern: {xss[:100]}",
-                    remediation="Encode output and implement Content-Security-Policy"
-                ))
-            
-            # Path Traversal
-            path_trav = self._detect_path_traversal(input_value)
-            if path_trav:
-                findings.append(RuntimeFinding(
-                    vulnerability_type="Path Traversal",
-                    severity=FindingSeverity.HIGH,
-                    http_method=method,
-                    request_url=url,
-                    request_headers=headers,
-                    request_body=body,
-                    response_status=response_status,
-                    tainted_input=input_value[:500],
-                    sink_location=input_location,
-                    title=f"Path traversal attempt in {input_location}",
-                    description="Directory traversal sequence detected",
-                    remediation="Validate and sanitize file paths, use allowlists"
-                ))
-            
-            # Command Injection
-            cmd_inj = self._detect_command_injection(input_value)
-            if cmd_inj:
-                findings.append(RuntimeFinding(
-                    vulnerability_type="Command Injection",
-                    severity=FindingSeverity.CRITICAL,
-                    http_method=method,
-                    request_url=url,
-                    request_headers=headers,
-                    request_body=body,
-                    response_status=response_status,
-                    tainted_input=input_value[:500],
-                    sink_location=input_location,
-                    title=f"Command injection pattern in {input_location}",
-                    description="Shell command characters or patterns detected",
-                    remediation="Avoid shell commands, use safe APIs, validate input"
-                ))
-            
-            # SSRF
-            ssrf = self._detect_ssrf(input_value)
-            if ssrf:
+            if not input_value:
+                continue
+            for category, matched in detector.matches(input_value).items():
+                # XSS only counts when the input is reflected (or there is no response to check)
+                if category == "xss" and response_body and input_value not in response_body:
+                    continue
+                template = FINDING_TEMPLATES[category]
                 findings.append(RuntimeFinding(
-                    vulnerability_type="Server-Side Request Forgery (SSRF)",
-                    severity=FindingSeverity.HIGH,
+                    vulnerability_type=template["vulnerability_type"],
+                    severity=template["severity"],
                     http_method=method,
                     request_url=url,
                     request_headers=headers,
@@ -340,9 +333,9 @@ class NativeIASTService:
                     response_status=response_status,
                     tainted_input=input_value[:500],
                     sink_location=input_location,
-                    title=f"SSRF pattern detected in {input_location}",
-                    description="Internal IP or dangerous protocol detected",
-                    remediation="Validate URLs, use allowlists, block internal IPs"
+                    title=template["title"].format(location=input_location),
+                    description=template["description"].format(match=matched[:100]),
+                    remediation=template["remediation"]
                 ))
         
         # Save findings to database
@@ -352,69 +345,6 @@ class NativeIASTService:
         
         return findings
 
-    # ========================================================================
-    # Detection Methods
-    # ========================================================================
-
-    def _detect_sql_injection(self, input_value: str) -> Optional[str]:
-        """Detect SQL injection patterns"""
-        if not input_value:
-            return None
-        
-        for pattern in self.sql_patterns:
-            match = pattern.search(input_value)
-            if match:
-                return match.group(0)
-        return None
-
-    def _detect_xss(self, input_value: str, response_body: str = None) -> Optional[str]:
-        """Detect XSS patterns"""
-        if not input_value:
-            return None
-        
-        for pattern in self.xss_patterns:
-            match = pattern.search(input_value)
-            if match:
-                # If we have response body, check if input is reflected
-                if response_body and input_value in response_body:
-                    return match.group(0)
-                elif not response_body:
-                    return match.group(0)
-        return None
-
-    def _detect_path_traversal(self, input_value: str) -> Optional[str]:
-        """Detect path traversal patterns"""
-        if not input_value:
-            return None
-        
-        for pattern in self.path_patterns:
-            match = pattern.search(input_value)
-            if match:
-                return match.group(0)
-        return None
-
-    def _detect_command_injection(self, input_value: str) -> Optional[str]:
-        """Detect command injection patterns"""
-        if not input_value:
-            return None
-        
-        for pattern in self.cmd_patterns:
-            match = pattern.search(input_value)
-            if match:
-                return match.group(0)
-        return None
-
-    def _detect_ssrf(self, input_value: str) -> Optional[str]:
-        """Detect SSRF patterns"""
-        if not input_value:
-            return None
-        
-        for pattern in self.ssrf_patterns:
-            match = pattern.search(input_value)
-            if match:
-                return match.group(0)
-        return None
-
     # ========================================================================
     # Helper Methods
     # ========================================================================
@@ -428,32 +358,26 @@ class NativeIASTService:
         count = result.scalar() or 0
         return f"IAST-{count + 1:05d}"
 
-    async def _save_finding(self, session_id: UUID, finding: RuntimeFinding) -> IASTFinding:
-        """Save runtime finding to database"""
-        
-        db_finding = IASTFinding(
-            session_id=session_id,
-            vulnerability_type=finding.vulnerability_type,
-            severity=finding.severity,
-            http_method=finding.http_method,
-            request_url=finding.request_url,
-            request_headers=finding.request_headers,
-            request_body=finding.request_body[:10000] if finding.request_body else None,
-            response_status=finding.response_status,
-            tainted_input=finding.tainted_input,
-            sink_location=finding.sink_location,
-            data_flow=finding.data_flow,
-            title=finding.title,
-            description=finding.description,
-            remediation=finding.remediation,
-            stack_trace=finding.stack_trace,
-            status=FindingStatus.OPEN
-        )
-        
-        self.db.add(db_finding)
-        await self.db.commit()
-        
-        return db_finding
+    async def _save_finding(self, session_id: UUID, finding: RuntimeFinding) -> bool:
+        """Queue runtime finding for the background writer; False if it was shed under overload"""
+        return self.event_sink.record_iast_finding({
+            "session_id": session_id,
+            "vulnerability_type": finding.vulnerability_type,
+            "severity": finding.severity,
+            "http_method": finding.http_method,
+            "request_url": finding.request_url,
+            "request_headers": finding.request_headers,
+            "request_body": finding.request_body[:10000] if finding.request_body else None,
+            "response_status": finding.response_status,
+            "tainted_input": finding.tainted_input,
+            "sink_location": finding.sink_location,
+            "data_flow": finding.data_flow,
+            "title": finding.title,
+            "description": finding.description,
+            "remediation": finding.remediation,
+            "stack_trace": finding.stack_trace,
+            "status": FindingStatus.OPEN,
+        })
 
     async def get_session_findings(
         self,
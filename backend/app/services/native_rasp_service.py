@@ -2,51 +2,90 @@
 Native RASP Service
 Runtime Application Self-Protection with attack detection and blocking
 """
-import re
-import time
 from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 from datetime import datetime, timedelta
-from collections import defaultdict
 from dataclasses import dataclass
 import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
 
+from app.core.config import settings
 from app.models.security_advanced_models import (
-    RASPConfig, RASPEvent, AttackType, FindingSeverity
+    RASPConfig, RASPEvent, RASPEventRollup, AttackType, FindingSeverity
 )
+from app.services.attack_detector import AttackDetector, get_detector_cache
+from app.services.pattern_matcher import PatternRule
+from app.services.rasp_rate_limiter import get_rate_limit_store
+from app.services.runtime_event_sink import get_runtime_event_sink
 
 logger = logging.getLogger(__name__)
 
 
-# Attack patterns
+# Attack patterns, checked in this order (first match wins). Literals are prefilters:
+# every match of the pattern contains one of them, case-insensitively.
 ATTACK_PATTERNS = {
     AttackType.SQL_INJECTION: [
-        re.compile(r"(?i)(\b(select|insert|update|delete|drop|union)\b.*\b(from|into|where)\b)"),
-        re.compile(r"(?i)(--|#|/\*)"),
-        re.compile(r"(?i)(\bor\b\s+\d+\s*=\s*\d+)"),
+        PatternRule("rasp.sqli.keywords", r"(\b(select|insert|update|delete|drop|union)\b.*\b(from|into|where)\b)",
+                    ("select", "insert", "update", "delete", "drop", "union")),
+        PatternRule("rasp.sqli.comment", r"(--|#|/\*)", ("--", "#", "/*")),
+        PatternRule("rasp.sqli.tautology", r"(\bor\b\s+\d+\s*=\s*\d+)", ("=",)),
     ],
     AttackType.XSS: [
-        re.compile(r"<script[^>]*>", re.IGNORECASE),
-        re.compile(r"javascript:", re.IGNORECASE),
-        re.compile(r"on(error|load|click)\s*=", re.IGNORECASE),
+        PatternRule("rasp.xss.script", r"<script[^>]*>", ("<script",)),
+        PatternRule("rasp.xss.js-uri", r"javascript:", ("javascript:",)),
+        PatternRule("rasp.xss.handler", r"on(error|load|click)\s*=", ("onerror", "onload", "onclick")),
     ],
     AttackType.COMMAND_INJECTION: [
-        re.compile(r"[;&|`$]"),
-        re.compile(r";\s*(ls|cat|rm|wget|curl|bash)", re.IGNORECASE),
+        PatternRule("rasp.cmd.metachar", r"[;&|`$]", (";", "&", "|", "`", "$")),
+        PatternRule("rasp.cmd.chained", r";\s*(ls|cat|rm|wget|curl|bash)", (";",)),
     ],
     AttackType.PATH_TRAVERSAL: [
-        re.compile(r"\.\.\/"),
-        re.compile(r"\.\.\\"),
+        PatternRule("rasp.path.dotdot", r"\.\.\/", ("../",)),
+        PatternRule("rasp.path.dotdot-win", r"\.\.\\", ("..\\",)),
     ],
     AttackType.SSRF: [
-        re.compile(r"(localhost|127\.0\.0\.1|0\.0\.0\.0)", re.IGNORECASE),
-        re.compile(r"(file|gopher)://", re.IGNORECASE),
+        PatternRule("rasp.ssrf.loopback", r"(localhost|127\.0\.0\.1|0\.0\.0\.0)", ("localhost", "127.0.0.1", "0.0.0.0")),
+        PatternRule("rasp.ssrf.scheme", r"(file|gopher)://", ("file://", "gopher://")),
     ],
 }
 
+CONFIG_CHECKS = [
+    (AttackType.SQL_INJECTION, "block_sql_injection"),
+    (AttackType.XSS, "block_xss"),
+    (AttackType.COMMAND_INJECTION, "block_command_injection"),
+    (AttackType.PATH_TRAVERSAL, "block_path_traversal"),
+    (AttackType.SSRF, "block_ssrf"),
+]
+
+
+def rasp_rules_version(config: RASPConfig) -> Tuple:
+    """Everything that determines a config's compiled detector"""
+    return (
+        "rasp",
+        tuple(bool(getattr(config, attribute)) for _, attribute in CONFIG_CHECKS),
+        tuple(config.custom_block_patterns or ()),
+        settings.RUNTIME_DETECTION_MAX_INPUT_CHARS,
+    )
+
+
+def build_rasp_detector(config: RASPConfig) -> AttackDetector:
+    """Enabled built-in categories in check order, then the config's custom block patterns"""
+    categories = [
+        (attack_type, ATTACK_PATTERNS[attack_type])
+        for attack_type, attribute in CONFIG_CHECKS
+        if getattr(config, attribute)
+    ]
+    custom = [
+        PatternRule(f"rasp.custom.{i}", pattern)
+        for i, pattern in enumerate(config.custom_block_patterns or ())
+        if isinstance(pattern, str) and pattern
+    ]
+    if custom:
+        categories.append((AttackType.OTHER, custom))
+    return AttackDetector(categories, max_input_chars=settings.RUNTIME_DETECTION_MAX_INPUT_CHARS)
+
 
 @dataclass
 class RASPAnalysisResult:
@@ -64,7 +103,8 @@ class NativeRASPService:
     def __init__(self, db: AsyncSession = None):
         self.db = db
         self.configs: Dict[UUID, RASPConfig] = {}
-        self.rate_limits: Dict[str, Dict] = defaultdict(lambda: {"count": 0, "start": time.time()})
+        self.rate_limiter = get_rate_limit_store()
+        self.event_sink = get_runtime_event_sink()
 
     async def create_config(self, project_id: UUID, organisation_id: UUID, name: str, **settings) -> RASPConfig:
         """Create RASP configuration"""
@@ -110,49 +150,35 @@ class NativeRASPService:
             all_inputs.extend(headers.values())
         combined = " ".join(str(i) for i in all_inputs)
 
-        checks = [
-            (AttackType.SQL_INJECTION, config.block_sql_injection),
-            (AttackType.XSS, config.block_xss),
-            (AttackType.COMMAND_INJECTION, config.block_command_injection),
-            (AttackType.PATH_TRAVERSAL, config.block_path_traversal),
-            (AttackType.SSRF, config.block_ssrf),
-        ]
-
-        for attack_type, should_check in checks:
-            if should_check:
-                for pattern in ATTACK_PATTERNS.get(attack_type, []):
-                    match = pattern.search(combined)
-                    if match:
-                        severity = FindingSeverity.CRITICAL if attack_type in [AttackType.SQL_INJECTION, AttackType.COMMAND_INJECTION] else FindingSeverity.HIGH
-                        return RASPAnalysisResult(
-                            is_attack=True, should_block=True, attack_type=attack_type,
-                            severity=severity, matched_pattern=match.group(0)[:200]
-                        )
+        detector = get_detector_cache().get(rasp_rules_version(config), lambda: build_rasp_detector(config))
+        hit = detector.first_match(combined)
+        if hit:
+            attack_type, matched = hit
+            severity = FindingSeverity.CRITICAL if attack_type in [AttackType.SQL_INJECTION, AttackType.COMMAND_INJECTION] else FindingSeverity.HIGH
+            return RASPAnalysisResult(
+                is_attack=True, should_block=True, attack_type=attack_type,
+                severity=severity, matched_pattern=matched[:200]
+            )
         return RASPAnalysisResult(is_attack=False, should_block=False)
 
-    def check_rate_limit(self, config: RASPConfig, source_ip: str) -> Tuple[bool, Optional[str]]:
+    async def check_rate_limit(self, config: RASPConfig, source_ip: str) -> Tuple[bool, Optional[str]]:
         if not config.enable_rate_limiting:
             return False, None
-        now = time.time()
-        limit = self.rate_limits[source_ip]
-        if now - limit["start"] > config.rate_limit_window:
-            limit["count"], limit["start"] = 1, now
-            return False, None
-        limit["count"] += 1
-        if limit["count"] > config.rate_limit_requests:
+        allowed = await self.rate_limiter.allow(
+            f"{config.id}:{source_ip}", config.rate_limit_requests, config.rate_limit_window
+        )
+        if not allowed:
             return True, "Rate limit exceeded"
         return False, None
 
     async def log_event(self, project_id: UUID, config_id: UUID, analysis: RASPAnalysisResult,
-                       source_ip: str, method: str, path: str, headers: Dict = None) -> RASPEvent:
-        event = RASPEvent(
-            project_id=project_id, config_id=config_id, attack_type=analysis.attack_type,
-            severity=analysis.severity, was_blocked=analysis.should_block, source_ip=source_ip,
-            http_method=method, request_path=path, attack_payload=analysis.matched_pattern
-        )
-        self.db.add(event)
-        await self.db.commit()
-        return event
+                       source_ip: str, method: str, path: str, headers: Dict = None) -> bool:
+        """Queue an event for the background writer; False if it was shed under overload"""
+        return self.event_sink.record_rasp_event({
+            "project_id": project_id, "config_id": config_id, "attack_type": analysis.attack_type,
+            "severity": analysis.severity, "was_blocked": analysis.should_block, "source_ip": source_ip,
+            "http_method": method, "request_path": path, "attack_payload": analysis.matched_pattern,
+        })
 
     async def get_events(self, project_id: UUID, since: datetime = None, limit: int = 100) -> List[RASPEvent]:
         query = select(RASPEvent).where(RASPEvent.project_id == project_id)
@@ -163,7 +189,19 @@ class NativeRASPService:
         return result.scalars().all()
 
     async def get_event_stats(self, project_id: UUID, hours: int = 24) -> Dict[str, Any]:
-        since = datetime.utcnow() - timedelta(hours=hours)
-        events = await self.get_events(project_id, since=since, limit=10000)
-        stats = {"total": len(events), "blocked": sum(1 for e in events if e.was_blocked)}
+        """Event counts from the per-minute rollups (events still buffered in a worker are not yet included)"""
+        since = (datetime.utcnow() - timedelta(hours=hours)).replace(second=0, microsecond=0)
+        result = await self.db.execute(
+            select(RASPEventRollup.attack_type, RASPEventRollup.was_blocked, func.sum(RASPEventRollup.event_count))
+            .where(RASPEventRollup.project_id == project_id, RASPEventRollup.minute >= since)
+            .group_by(RASPEventRollup.attack_type, RASPEventRollup.was_blocked)
+        )
+        stats = {"total": 0, "blocked": 0, "by_attack_type": {}}
+        for attack_type, was_blocked, count in result.all():
+            count = int(count or 0)
+            stats["total"] += count
+            if was_blocked:
+                stats["blocked"] += count
+            key = attack_type.value if isinstance(attack_type, AttackType) else str(attack_type)
+            stats["by_attack_type"][key] = stats["by_attack_type"].get(key, 0) + count
         return stats
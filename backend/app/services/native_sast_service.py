@@ -10,23 +10,41 @@ import shutil
 import os
 import re
 import hashlib
-from typing import List, Dict, Any, Optional, Tuple
+import time
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 from uuid import UUID
 from datetime import datetime
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 import logging
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config import settings
 from app.models.security_advanced_models import (
-    SASTScan, SASTFinding, SASTEngine, FindingSeverity, FindingStatus
+    SASTScan, SASTFinding, SASTEngine, FindingSeverity, FindingStatus, SAST_FINDING_HUMAN_ID_SEQ
 )
+from app.services.code_scanner import resolve_scan_workers, scan_tree
+from app.services.finding_persistence import allocate_sequence_range, bulk_upsert_findings, carry_forward_triage
 from app.services.gemini_service import GeminiService
+from app.services.pattern_matcher import PatternRule
+from app.services.sast_file_state import (
+    build_manifest, close_findings_for_deleted_files, delete_file_states, diff_file_states,
+    load_cached_findings, load_file_states, relative_path, rules_hash, save_file_states,
+)
 
 logger = logging.getLogger(__name__)
 
+# Detection details refreshed when a re-scan finds an existing finding
+SAST_FINDING_UPDATE_COLUMNS = (
+    "rule_name", "engine", "severity", "confidence", "end_line", "start_column", "end_column",
+    "code_snippet", "title", "description", "remediation", "cwe_id", "owasp_id", "references",
+)
+
+# Triage a re-scan inherits from the project's previous finding with the same fingerprint
+SAST_FINDING_TRIAGE_COLUMNS = ("status", "suppression_reason")
+
 
 # ============================================================================
 # Data Classes
@@ -66,6 +84,43 @@ class CodeFinding:
     references: List[str] = field(default_factory=list)
 
 
+@dataclass
+class EngineOutcome:
+    """One engine's part of an incremental scan"""
+    engine: str
+    findings: List[CodeFinding] = field(default_factory=list)
+    scoped: Set[str] = field(default_factory=set)  # Files the engine looks at
+    changed: List[str] = field(default_factory=list)  # Files it (re)scanned
+    deleted: List[str] = field(default_factory=list)
+    lines_scanned: int = 0
+    success: bool = True
+    duration_ms: int = 0
+
+
+def resolve_engine_concurrency(configured: int, engines: int) -> int:
+    """Engines allowed to run at once: 0 means one per CPU core; never more than there are engines"""
+    limit = configured if configured > 0 else (os.cpu_count() or 1)
+    return max(1, min(limit, engines))
+
+
+# Changed-file counts above this run the engine over the whole tree instead
+# of passing every file on its command line
+INCREMENTAL_MAX_TARGETS = 2000
+
+# Files each engine looks at (None = every file)
+ENGINE_FILE_EXTENSIONS = {
+    "semgrep": None,
+    "bandit": (".py",),
+    "eslint": (".js", ".jsx", ".ts", ".tsx"),
+}
+
+# Directory names never descended into when listing a scan's files
+DEFAULT_EXCLUDE_DIRS = frozenset({
+    'node_modules', 'venv', '.venv', '__pycache__', '.git',
+    'dist', 'build', '.next', 'coverage', '.pytest_cache',
+})
+
+
 # ============================================================================
 # Semgrep Rules
 # ============================================================================
@@ -175,9 +230,10 @@ class NativeSASTService:
         languages: List[str] = None,
         ruleset: str = "default",
         exclude_patterns: List[str] = None,
-        created_by: UUID = None
+        created_by: UUID = None,
+        incremental: bool = True
     ) -> SASTScan:
-        """Create a new SAST scan record"""
+        """Create a new SAST scan record (incremental=False forces a full rescan)"""
         
         # Generate human ID
         human_id = await self._generate_human_id()
@@ -192,6 +248,7 @@ class NativeSASTService:
             languages=languages or [],
             ruleset=ruleset,
             exclude_patterns=exclude_patterns or [],
+            incremental=incremental,
             status="pending",
             created_by=created_by
         )
@@ -219,61 +276,82 @@ class NativeSASTService:
         scan.started_at = datetime.utcnow()
         await self.db.commit()
         
-        all_findings: List[CodeFinding] = []
-        total_files = 0
-        total_lines = 0
-        
+        engine_timings: Dict[str, Dict[str, Any]] = {}
         try:
             path = scan.local_path or scan.repo_url
             
-            # Run each engine
-            if "semgrep" in scan.engines and self.is_semgrep_available():
-                semgrep_result = await self.run_semgrep(
-                    path, 
-                    scan.ruleset, 
-                    scan.exclude_patterns
-                )
-                all_findings.extend(semgrep_result.findings)
-                total_files += semgrep_result.files_scanned
-                total_lines += semgrep_result.lines_scanned
-            
-            if "bandit" in scan.engines and self.is_bandit_available():
-                # Only run Bandit for Python
-                if not scan.languages or "python" in [l.lower() for l in scan.languages]:
-                    bandit_result = await self.run_bandit(path, scan.exclude_patterns)
-                    all_findings.extend(bandit_result.findings)
+            # Hash the tree once; each engine only rescans files whose hash
+            # (or the engine's rules) changed since its last scan of the project
+            manifest = await asyncio.to_thread(
+                build_manifest, path, self._iter_scan_files(path, scan.exclude_patterns)
+            )
             
-            if "eslint" in scan.engines and self.is_eslint_available():
-                # Only run ESLint for JavaScript/TypeScript
-                js_langs = ["javascript", "typescript", "js", "ts"]
-                if not scan.languages or any(l.lower() in js_langs for l in scan.languages):
-                    eslint_result = await self.run_eslint_security(path, scan.exclude_patterns)
-                    all_findings.extend(eslint_result.findings)
+            engines = self._scan_engines(scan)
+            budget = asyncio.Semaphore(resolve_engine_concurrency(settings.SAST_ENGINE_CONCURRENCY, len(engines)))
+            # The session can't be shared by concurrent awaits; engines take turns on it
+            db_lock = asyncio.Lock()
+            seen_fingerprints: Set[str] = set()
+            severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0, "info": 0}
             
-            if "custom" in scan.engines:
-                custom_result = await self.run_custom_rules(path, scan.exclude_patterns)
-                all_findings.extend(custom_result.findings)
+            async def run_engine(engine: str) -> EngineOutcome:
+                started = time.perf_counter()
+                try:
+                    async with budget:
+                        outcome = await self._run_engine_incremental(scan, engine, path, manifest, db_lock)
+                    
+                    # Stream this engine's findings into the scan, skipping ones another engine already saved
+                    new_findings = []
+                    for finding in outcome.findings:
+                        fingerprint = self._generate_fingerprint(finding)
+                        if fingerprint not in seen_fingerprints:
+                            seen_fingerprints.add(fingerprint)
+                            new_findings.append(finding)
+                    async with db_lock:
+                        await self._save_findings(scan, new_findings)
+                except Exception as e:
+                    engine_timings[engine] = {
+                        "duration_ms": int((time.perf_counter() - started) * 1000),
+                        "success": False,
+                        "error": str(e),
+                    }
+                    raise
+                
+                for finding in new_findings:
+                    sev = finding.severity.value if isinstance(finding.severity, FindingSeverity) else finding.severity
+                    if sev in severity_counts:
+                        severity_counts[sev] += 1
+                engine_timings[engine] = {
+                    "duration_ms": outcome.duration_ms,
+                    "success": outcome.success,
+                    "files_scanned": len(outcome.changed),
+                    "findings": len(outcome.findings),
+                    "new_findings": len(new_findings),
+                }
+                return outcome
             
-            # Deduplicate findings
-            all_findings = self._deduplicate_findings(all_findings)
+            results = await asyncio.gather(*(run_engine(engine) for engine in engines), return_exceptions=True)
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors:
+                raise errors[0]
+            outcomes: List[EngineOutcome] = results
             
-            # Save findings to database
-            for finding_data in all_findings:
-                await self._save_finding(scan, finding_data)
+            scoped_files: Set[str] = set().union(*(o.scoped for o in outcomes))
+            changed_files: Set[str] = set().union(*(o.changed for o in outcomes))
+            deleted_files: Set[str] = set().union(*(o.deleted for o in outcomes))
+            if deleted_files:
+                closed = await close_findings_for_deleted_files(self.db, scan.project_id, sorted(deleted_files))
+                logger.info(f"Closed {closed} findings in {len(deleted_files)} deleted files")
             
             # Update scan stats
             scan.status = "completed"
             scan.completed_at = datetime.utcnow()
-            scan.total_findings = len(all_findings)
-            scan.files_scanned = total_files
-            scan.lines_scanned = total_lines
-            
-            # Count by severity
-            severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0, "info": 0}
-            for f in all_findings:
-                sev = f.severity.value if isinstance(f.severity, FindingSeverity) else f.severity
-                if sev in severity_counts:
-                    severity_counts[sev] += 1
+            scan.total_findings = len(seen_fingerprints)
+            scan.files_scanned = len(changed_files)
+            scan.lines_scanned = max((o.lines_scanned for o in outcomes), default=0)
+            scan.files_changed = len(changed_files)
+            scan.files_reused = len(scoped_files - changed_files)
+            scan.files_deleted = len(deleted_files)
+            scan.engine_timings = {engine: engine_timings[engine] for engine in engines}
             
             scan.critical_count = severity_counts["critical"]
             scan.high_count = severity_counts["high"]
@@ -291,11 +369,143 @@ class NativeSASTService:
             scan.status = "failed"
             scan.error_message = str(e)
             scan.completed_at = datetime.utcnow()
+            # Engines that finished (or failed) before the scan gave up
+            scan.engine_timings = engine_timings
             await self.db.commit()
             raise
         
         return scan
 
+    # ========================================================================
+    # Incremental Scanning
+    # ========================================================================
+
+    def _scan_engines(self, scan: SASTScan) -> List[str]:
+        """Engines to run for a scan: requested, installed, and relevant to its languages"""
+        engines = []
+        languages = [l.lower() for l in scan.languages or []]
+        if "semgrep" in scan.engines and self.is_semgrep_available():
+            engines.append("semgrep")
+        # Only run Bandit for Python
+        if "bandit" in scan.engines and self.is_bandit_available():
+            if not languages or "python" in languages:
+                engines.append("bandit")
+        # Only run ESLint for JavaScript/TypeScript
+        if "eslint" in scan.engines and self.is_eslint_available():
+            js_langs = ["javascript", "typescript", "js", "ts"]
+            if not languages or any(l in js_langs for l in languages):
+                engines.append("eslint")
+        if "custom" in scan.engines:
+            engines.append("custom")
+        return engines
+
+    def _engine_accepts(self, engine: str, file_path: str) -> bool:
+        """Whether an engine looks at a file at all"""
+        if engine == "custom":
+            return self._is_code_file(os.path.basename(file_path))
+        extensions = ENGINE_FILE_EXTENSIONS.get(engine)
+        return extensions is None or file_path.endswith(extensions)
+
+    def _engine_rules_hash(self, engine: str, ruleset: str) -> str:
+        """Identity of the rules an engine runs; cached findings are reused only while it is unchanged"""
+        if engine == "semgrep":
+            return rules_hash(engine, SEMGREP_RULESETS.get(ruleset, SEMGREP_RULESETS["default"]))
+        if engine == "eslint":
+            return rules_hash(engine, ESLINT_SECURITY_CONFIG)
+        if engine == "custom":
+            return rules_hash(engine, self.SECURITY_PATTERNS)
+        return rules_hash(engine)
+
+    async def _run_engine(
+        self, engine: str, scan: SASTScan, path: str, targets: Optional[List[str]]
+    ) -> SASTResult:
+        if engine == "semgrep":
+            return await self.run_semgrep(path, scan.ruleset, scan.exclude_patterns, targets)
+        if engine == "bandit":
+            return await self.run_bandit(path, scan.exclude_patterns, targets)
+        if engine == "eslint":
+            return await self.run_eslint_security(path, scan.exclude_patterns, targets)
+        return await self.run_custom_rules(path, scan.exclude_patterns, targets)
+
+    async def _run_engine_incremental(
+        self,
+        scan: SASTScan,
+        engine: str,
+        path: str,
+        manifest: Dict[str, str],
+        db_lock: Optional[asyncio.Lock] = None
+    ) -> EngineOutcome:
+        """
+        Run one engine on the files that changed since its last scan of this
+        project and carry forward its stored findings for the rest.
+        Full rescans (scan.incremental off) treat every file as changed.
+        Database work holds db_lock so engines can run concurrently.
+        """
+        started = time.perf_counter()
+        db_lock = db_lock or asyncio.Lock()
+        in_scope = {p: h for p, h in manifest.items() if self._engine_accepts(engine, p)}
+        current_rules = self._engine_rules_hash(engine, scan.ruleset)
+        async with db_lock:
+            states = await load_file_states(self.db, scan.project_id, engine)
+        delta = diff_file_states(in_scope, states, current_rules, reuse=scan.incremental is not False)
+        outcome = EngineOutcome(engine=engine, scoped=set(in_scope), changed=delta.changed, deleted=delta.deleted)
+
+        fresh: Dict[str, List[CodeFinding]] = {}
+        if delta.changed:
+            targets = None
+            if len(delta.changed) < len(in_scope) and len(delta.changed) <= INCREMENTAL_MAX_TARGETS:
+                targets = [os.path.join(path, p) for p in delta.changed]
+            result = await self._run_engine(engine, scan, path, targets)
+            outcome.success = result.success
+            if result.success:
+                outcome.lines_scanned = result.lines_scanned
+                for finding in result.findings:
+                    finding.file_path = relative_path(path, finding.file_path)
+                    if finding.file_path in in_scope:
+                        fresh.setdefault(finding.file_path, []).append(finding)
+                async with db_lock:
+                    await save_file_states(self.db, scan.project_id, engine, [
+                        {
+                            "file_path": p,
+                            "content_hash": in_scope[p],
+                            "rules_hash": current_rules,
+                            "findings": [self._finding_to_state(f) for f in fresh.get(p, [])],
+                        }
+                        for p in delta.changed
+                    ])
+            else:
+                # Keep the stored states so the next scan retries these files
+                logger.warning(f"{engine} failed on {len(delta.changed)} changed files: {result.error}")
+        async with db_lock:
+            if delta.deleted:
+                await delete_file_states(self.db, scan.project_id, engine, delta.deleted)
+            cached = await load_cached_findings(self.db, scan.project_id, engine, delta.unchanged)
+
+        outcome.findings = [f for p in delta.changed for f in fresh.get(p, [])] + [
+            self._finding_from_state(data) for p in delta.unchanged for data in cached.get(p, [])
+        ]
+        outcome.duration_ms = int((time.perf_counter() - started) * 1000)
+        logger.info(
+            f"{engine}: {len(delta.changed)} files scanned, {len(delta.unchanged)} reused, "
+            f"{len(delta.deleted)} deleted in {outcome.duration_ms}ms"
+        )
+        return outcome
+
+    @staticmethod
+    def _finding_to_state(finding: CodeFinding) -> Dict[str, Any]:
+        data = asdict(finding)
+        data["engine"] = SASTEngine(finding.engine).value
+        data["severity"] = FindingSeverity(finding.severity).value
+        return data
+
+    @staticmethod
+    def _finding_from_state(data: Dict[str, Any]) -> CodeFinding:
+        return CodeFinding(**{
+            **data,
+            "engine": SASTEngine(data["engine"]),
+            "severity": FindingSeverity(data["severity"]),
+        })
+
     # ========================================================================
     # Semgrep Scanner
     # ========================================================================
@@ -304,9 +514,10 @@ class NativeSASTService:
         self,
         path: str,
         ruleset: str = "default",
-        exclude_patterns: List[str] = None
+        exclude_patterns: List[str] = None,
+        targets: Optional[List[str]] = None
     ) -> SASTResult:
-        """Run Semgrep scan on the specified path"""
+        """Run Semgrep scan on the specified path (or only the given files under it)"""
         
         if not self.is_semgrep_available():
             return SASTResult(
@@ -332,7 +543,7 @@ class NativeSASTService:
             # Default exclusions
             cmd.extend(["--exclude", "node_modules", "--exclude", "venv", "--exclude", ".git"])
             
-            cmd.append(path)
+            cmd.extend(targets or [path])
             
             # Run semgrep
             result = await asyncio.get_event_loop().run_in_executor(
@@ -409,9 +620,10 @@ class NativeSASTService:
     async def run_bandit(
         self,
         path: str,
-        exclude_patterns: List[str] = None
+        exclude_patterns: List[str] = None,
+        targets: Optional[List[str]] = None
     ) -> SASTResult:
-        """Run Bandit scan on Python code"""
+        """Run Bandit scan on Python code (or only the given files)"""
         
         if not self.is_bandit_available():
             return SASTResult(
@@ -431,7 +643,7 @@ class NativeSASTService:
             # Default exclusions
             cmd.extend(["-x", ".venv,venv,tests,test"])
             
-            cmd.append(path)
+            cmd.extend(targets or [path])
             
             # Run bandit
             result = await asyncio.get_event_loop().run_in_executor(
@@ -501,9 +713,10 @@ class NativeSASTService:
     async def run_eslint_security(
         self,
         path: str,
-        exclude_patterns: List[str] = None
+        exclude_patterns: List[str] = None,
+        targets: Optional[List[str]] = None
     ) -> SASTResult:
-        """Run ESLint with security plugins on JavaScript/TypeScript code"""
+        """Run ESLint with security plugins on JavaScript/TypeScript code (or only the given files)"""
         
         if not self.is_eslint_available():
             return SASTResult(
@@ -533,7 +746,7 @@ class NativeSASTService:
                         cmd.extend(["--ignore-pattern", pattern])
                 
                 cmd.extend(["--ignore-pattern", "node_modules/**"])
-                cmd.append(path)
+                cmd.extend(targets or [path])
                 
                 result = await asyncio.get_event_loop().run_in_executor(
                     None,
@@ -594,13 +807,15 @@ class NativeSASTService:
     # Custom Pattern Scanner
     # ========================================================================
 
-    # Security patterns to detect
+    # Security patterns to detect. "literals" prefilter the regex: every match
+    # contains at least one of them (case-insensitive), see PatternRule.
     SECURITY_PATTERNS = [
         # SQL Injection
         {
             "id": "custom.sql-injection",
             "name": "Potential SQL Injection",
             "pattern": r'(execute|query|cursor\.execute)\s*\(\s*["\'].*%s.*["\']|f["\'].*SELECT.*{',
+            "literals": ["%s", "select"],
             "severity": FindingSeverity.CRITICAL,
             "cwe": "CWE-89",
             "description": "SQL query appears to use string formatting which may be vulnerable to SQL injection",
@@ -610,6 +825,7 @@ class NativeSASTService:
             "id": "custom.command-injection",
             "name": "Potential Command Injection",
             "pattern": r'(os\.system|subprocess\.call|subprocess\.run|subprocess\.Popen)\s*\([^)]*\+|shell=True',
+            "literals": ["os.system", "subprocess", "shell=true"],
             "severity": FindingSeverity.CRITICAL,
             "cwe": "CWE-78",
             "description": "Command execution with user-controlled input may lead to command injection",
@@ -619,6 +835,7 @@ class NativeSASTService:
             "id": "custom.hardcoded-secret",
             "name": "Hardcoded Secret",
             "pattern": r'(password|secret|api_key|apikey|access_token|auth_token)\s*=\s*["\'][^"\']{8,}["\']',
+            "literals": ["password", "secret", "api_key", "apikey", "access_token", "auth_token"],
             "severity": FindingSeverity.HIGH,
             "cwe": "CWE-798",
             "description": "Hardcoded credential or secret detected",
@@ -628,6 +845,7 @@ class NativeSASTService:
             "id": "custom.insecure-random",
             "name": "Insecure Random Number Generator",
             "pattern": r'random\.(random|randint|choice|shuffle)\s*\(',
+            "literals": ["random."],
             "severity": FindingSeverity.MEDIUM,
             "cwe": "CWE-330",
             "description": "Use of predictable random number generator for security-sensitive operation",
@@ -637,6 +855,7 @@ class NativeSASTService:
             "id": "custom.eval-usage",
             "name": "Use of eval()",
             "pattern": r'\beval\s*\(',
+            "literals": ["eval"],
             "severity": FindingSeverity.HIGH,
             "cwe": "CWE-95",
             "description": "Use of eval() can lead to code injection vulnerabilities",
@@ -646,6 +865,7 @@ class NativeSASTService:
             "id": "custom.pickle-usage",
             "name": "Unsafe Pickle Deserialization",
             "pattern": r'pickle\.(load|loads)\s*\(',
+            "literals": ["pickle."],
             "severity": FindingSeverity.HIGH,
             "cwe": "CWE-502",
             "description": "Pickle deserialization of untrusted data can lead to code execution",
@@ -655,6 +875,7 @@ class NativeSASTService:
             "id": "custom.weak-crypto",
             "name": "Weak Cryptographic Algorithm",
             "pattern": r'(md5|sha1)\s*\(|hashlib\.(md5|sha1)\s*\(',
+            "literals": ["md5", "sha1"],
             "severity": FindingSeverity.MEDIUM,
             "cwe": "CWE-327",
             "description": "Use of weak cryptographic algorithm (MD5 or SHA1)",
@@ -664,6 +885,7 @@ class NativeSASTService:
             "id": "custom.ssrf",
             "name": "Potential SSRF",
             "pattern": r'(requests\.(get|post|put|delete)|urllib\.request\.urlopen|http\.client)\s*\([^)]*\+',
+            "literals": ["requests.", "urllib.request.urlopen", "http.client"],
             "severity": FindingSeverity.HIGH,
             "cwe": "CWE-918",
             "description": "HTTP request with potentially user-controlled URL",
@@ -673,84 +895,100 @@ class NativeSASTService:
             "id": "custom.debug-enabled",
             "name": "Debug Mode Enabled",
             "pattern": r'DEBUG\s*=\s*True|app\.run\([^)]*debug\s*=\s*True',
+            "literals": ["debug"],
             "severity": FindingSeverity.MEDIUM,
             "cwe": "CWE-489",
             "description": "Debug mode should be disabled in production",
         },
     ]
 
+    CUSTOM_RULES = [
+        PatternRule(p["id"], p["pattern"], tuple(p.get("literals", ()))) for p in SECURITY_PATTERNS
+    ]
+
     async def run_custom_rules(
         self,
         path: str,
-        exclude_patterns: List[str] = None
+        exclude_patterns: List[str] = None,
+        targets: Optional[List[str]] = None
     ) -> SASTResult:
-        """Run custom regex-based security patterns"""
-        
-        findings = []
-        files_scanned = 0
-        
+        """
+        Run custom regex-based security patterns over path (or only the given files).
+        All rules are matched in one pass per file (see MultiPatternMatcher),
+        with files spread over SAST_SCAN_WORKERS processes.
+        """
         try:
-            # Walk the directory
-            for root, dirs, files in os.walk(path):
-                # Exclude patterns
-                dirs[:] = [d for d in dirs if not self._should_exclude(d, exclude_patterns)]
-                
-                for filename in files:
-                    # Only scan code files
-                    if not self._is_code_file(filename):
-                        continue
-                    
-                    filepath = os.path.join(root, filename)
-                    
-                    if self._should_exclude(filepath, exclude_patterns):
-                        continue
-                    
-                    try:
-                        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            lines = content.split('\n')
-                            files_scanned += 1
-                            
-                            for pattern_def in self.SECURITY_PATTERNS:
-                                pattern = re.compile(pattern_def["pattern"], re.IGNORECASE)
-                                
-                                for line_num, line in enumerate(lines, 1):
-                                    if pattern.search(line):
-                                        finding = CodeFinding(
-                                            rule_id=pattern_def["id"],
-                                            rule_name=pattern_def["name"],
-                                            engine=SASTEngine.CUSTOM,
-                                            severity=pattern_def["severity"],
-                                            confidence="medium",
-                                            file_path=os.path.relpath(filepath, path),
-                                            start_line=line_num,
-                                            end_line=line_num,
-                                            start_column=None,
-                                            end_column=None,
-                                            code_snippet=line.strip()[:200],
-                                            title=pattern_def["name"],
-                                            description=pattern_def["description"],
-                                            remediation=None,
-                                            cwe_id=pattern_def.get("cwe"),
-                                            owasp_id=None,
-                                            references=[]
-                                        )
-                                        findings.append(finding)
-                    except Exception as e:
-                        logger.warning(f"Error scanning {filepath}: {e}")
-                        continue
-            
-            return SASTResult(
-                success=True,
-                findings=findings,
-                files_scanned=files_scanned,
-                engine="custom"
+            result = await asyncio.to_thread(
+                scan_tree,
+                path,
+                self.CUSTOM_RULES,
+                targets if targets is not None else self._iter_code_files(path, exclude_patterns),
+                resolve_scan_workers(settings.SAST_SCAN_WORKERS),
+                settings.SAST_SCAN_BATCH_FILES,
             )
-            
         except Exception as e:
             logger.error(f"Custom pattern scan failed: {e}")
             return SASTResult(success=False, error=str(e), engine="custom")
 
+        findings = []
+        for file_path, line_num, rule_index, snippet in result.matches:
+            pattern_def = self.SECURITY_PATTERNS[rule_index]
+            findings.append(CodeFinding(
+                rule_id=pattern_def["id"],
+                rule_name=pattern_def["name"],
+                engine=SASTEngine.CUSTOM,
+                severity=pattern_def["severity"],
+                confidence="medium",
+                file_path=file_path,
+                start_line=line_num,
+                end_line=line_num,
+                start_column=None,
+                end_column=None,
+                code_snippet=snippet,
+                title=pattern_def["name"],
+                description=pattern_def["description"],
+                remediation=None,
+                cwe_id=pattern_def.get("cwe"),
+                owasp_id=None,
+                references=[]
+            ))
+
+        logger.info(
+            f"Custom rules scanned {result.files_scanned} files ({result.lines_scanned} lines) "
+            f"in {result.duration_seconds:.2f}s with {result.workers} worker(s): {len(findings)} findings"
+        )
+        return SASTResult(
+            success=True,
+            findings=findings,
+            files_scanned=result.files_scanned,
+            lines_scanned=result.lines_scanned,
+            duration_ms=int(result.duration_seconds * 1000),
+            engine="custom"
+        )
+
+    def _iter_scan_files(self, path: str, exclude_patterns: List[str] = None) -> Iterator[str]:
+        """
+        Lazily yield every file under path, skipping DEFAULT_EXCLUDE_DIRS by
+        directory name and anything whose path relative to path matches
+        exclude_patterns
+        """
+        for root, dirs, files in os.walk(path):
+            rel_root = os.path.relpath(root, path)
+            dirs[:] = [
+                d for d in dirs
+                if d not in DEFAULT_EXCLUDE_DIRS
+                and not self._should_exclude(os.path.normpath(os.path.join(rel_root, d)), exclude_patterns)
+            ]
+            for filename in files:
+                if not self._should_exclude(os.path.normpath(os.path.join(rel_root, filename)), exclude_patterns):
+                    yield os.path.join(root, filename)
+
+    def _iter_code_files(self, path: str, exclude_patterns: List[str] = None) -> Iterator[str]:
+        """Lazily yield the code files under path that aren't excluded"""
+        for filepath in self._iter_scan_files(path, exclude_patterns):
+            if self._is_code_file(os.path.basename(filepath)):
+                yield filepath
+
     def _is_code_file(self, filename: str) -> bool:
         """Check if file is a code file to scan"""
         code_extensions = {
@@ -760,23 +998,9 @@ class NativeSASTService:
         }
         return any(filename.endswith(ext) for ext in code_extensions)
 
-    def _should_exclude(self, path: str, patterns: List[str] = None) -> bool:
-        """Check if path should be excluded"""
-        default_excludes = [
-            'node_modules', 'venv', '.venv', '__pycache__', '.git',
-            'dist', 'build', '.next', 'coverage', '.pytest_cache'
-        ]
-        
-        for exclude in default_excludes:
-            if exclude in path:
-                return True
-        
-        if patterns:
-            for pattern in patterns:
-                if re.match(pattern, path):
-                    return True
-        
-        return False
+    def _should_exclude(self, rel_path: str, patterns: List[str] = None) -> bool:
+        """Check if a path relative to the scan root matches one of the scan's exclude patterns"""
+        return any(re.match(pattern, rel_path) for pattern in patterns or ())
 
     # ========================================================================
     # AI-Powered Fix Suggestions
@@ -847,65 +1071,50 @@ FIXED CODE:
         count = result.scalar() or 0
         return f"SAST-{count + 1:05d}"
 
-    async def _save_finding(self, scan: SASTScan, finding: CodeFinding) -> SASTFinding:
-        """Save a finding to the database"""
-        
-        # Generate fingerprint for deduplication
-        fingerprint = self._generate_fingerprint(finding)
-        
-        # Generate human ID
-        result = await self.db.execute(
-            select(SASTFinding).where(SASTFinding.scan_id == scan.id)
-        )
-        existing = result.scalars().all()
-        
-        db_finding = SASTFinding(
-            scan_id=scan.id,
-            human_id=f"SAST-F-{len(existing) + 1:05d}",
-            rule_id=finding.rule_id,
-            rule_name=finding.rule_name,
-            engine=finding.engine,
-            severity=finding.severity,
-            confidence=finding.confidence,
-            file_path=finding.file_path,
-            start_line=finding.start_line,
-            end_line=finding.end_line,
-            start_column=finding.start_column,
-            end_column=finding.end_column,
-            code_snippet=finding.code_snippet,
-            fingerprint=fingerprint,
-            title=finding.title,
-            description=finding.description,
-            remediation=finding.remediation,
-            cwe_id=finding.cwe_id,
-            owasp_id=finding.owasp_id,
-            references=finding.references,
-            status=FindingStatus.OPEN
-        )
-        
-        self.db.add(db_finding)
-        await self.db.commit()
-        
-        return db_finding
+    async def _save_findings(self, scan: SASTScan, findings: List[CodeFinding]) -> int:
+        """
+        Bulk-save findings, updating ones this scan already stored (matched by
+        fingerprint) and keeping triage decisions from the project's earlier scans
+        """
+        if not findings:
+            return 0
+
+        numbers = await allocate_sequence_range(self.db, SAST_FINDING_HUMAN_ID_SEQ, len(findings))
+        rows = [
+            {
+                "scan_id": scan.id,
+                "human_id": f"SAST-F-{number:05d}",
+                "rule_id": finding.rule_id,
+                "rule_name": finding.rule_name,
+                "engine": finding.engine,
+                "severity": finding.severity,
+                "confidence": finding.confidence,
+                "file_path": finding.file_path,
+                "start_line": finding.start_line,
+                "end_line": finding.end_line,
+                "start_column": finding.start_column,
+                "end_column": finding.end_column,
+                "code_snippet": finding.code_snippet,
+                "fingerprint": self._generate_fingerprint(finding),
+                "title": finding.title,
+                "description": finding.description,
+                "remediation": finding.remediation,
+                "cwe_id": finding.cwe_id,
+                "owasp_id": finding.owasp_id,
+                "references": finding.references,
+                "status": FindingStatus.OPEN,
+                "suppression_reason": None,
+            }
+            for finding, number in zip(findings, numbers)
+        ]
+        await carry_forward_triage(self.db, SASTFinding, SASTScan, scan, rows, SAST_FINDING_TRIAGE_COLUMNS)
+        return await bulk_upsert_findings(self.db, SASTFinding, rows, SAST_FINDING_UPDATE_COLUMNS)
 
     def _generate_fingerprint(self, finding: CodeFinding) -> str:
         """Generate unique fingerprint for finding deduplication"""
         content = f"{finding.rule_id}:{finding.file_path}:{finding.start_line}:{finding.code_snippet or ''}"
         return hashlib.sha256(content.encode()).hexdigest()[:32]
 
-    def _deduplicate_findings(self, findings: List[CodeFinding]) -> List[CodeFinding]:
-        """Remove duplicate findings based on fingerprint"""
-        seen = set()
-        unique = []
-        
-        for finding in findings:
-            fp = self._generate_fingerprint(finding)
-            if fp not in seen:
-                seen.add(fp)
-                unique.append(finding)
-        
-        return unique
-
     def _extract_cwe(self, metadata: dict) -> Optional[str]:
         """Extract CWE ID from metadata"""
         cwe = metadata.get("cwe")
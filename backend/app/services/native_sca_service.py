@@ -8,6 +8,7 @@ import json
 import os
 import re
 import aiohttp
+import hashlib
 from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
@@ -21,9 +22,30 @@ from sqlalchemy import select
 from app.models.security_advanced_models import (
     SCAScan, SCAFinding, SCAEngine, FindingSeverity, FindingStatus, LicenseRisk
 )
+from app.core.config import settings
+from app.services.finding_persistence import bulk_upsert_findings, carry_forward_triage
+from app.services.osv_mirror import (
+    affected_entries, compact_advisory, get_osv_mirror, match_affected, normalize_package, osv_ecosystem,
+)
 
 logger = logging.getLogger(__name__)
 
+# OSV querybatch accepts at most 1000 queries per request
+OSV_API_BATCH_SIZE = 1000
+# Concurrent advisory downloads when falling back to the OSV API
+OSV_API_CONCURRENCY = 16
+# Follow-up querybatch pages per batch (OSV paginates queries with many advisories)
+OSV_API_MAX_PAGES = 50
+
+# Advisory details refreshed when a re-scan finds an existing finding
+SCA_FINDING_UPDATE_COLUMNS = (
+    "manifest_file", "severity", "cvss_score", "cvss_vector", "title", "description",
+    "fixed_version", "is_direct", "license_risk", "references",
+)
+
+# Triage a re-scan inherits from the project's previous finding with the same fingerprint
+SCA_FINDING_TRIAGE_COLUMNS = ("status",)
+
 
 # ============================================================================
 # Data Classes
@@ -104,7 +126,8 @@ class NativeSCAService:
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.osv_api_url = "https://api.osv.dev/v1/query"
+        self.osv_batch_url = "https://api.osv.dev/v1/querybatch"
+        self.osv_vulns_url = "https://api.osv.dev/v1/vulns"
         self._pip_audit_available = None
         self._npm_available = None
         self._safety_available = None
@@ -136,7 +159,7 @@ class NativeSCAService:
 
     def get_available_engines(self) -> List[str]:
         """Get list of available scanning engines"""
-        engines = ["osv"]  # OSV API always available
+        engines = ["osv"]  # Local OSV mirror, or the OSV API when none is built
         if self.is_pip_audit_available():
             engines.append("pip_audit")
         if self.is_npm_available():
@@ -205,6 +228,7 @@ class NativeSCAService:
         
         all_findings: List[DependencyVuln] = []
         license_issues: List[LicenseIssue] = []
+        osv_dependencies: List[Dict[str, str]] = []
         total_deps = 0
         
         try:
@@ -225,25 +249,24 @@ class NativeSCAService:
                         total_deps += npm_result.total_dependencies
                     
                     elif manifest_type in ["requirements.txt", "Pipfile", "pyproject.toml"]:
-                        # Fall back to OSV API
-                        osv_result = await self.run_osv_scan(manifest_path, "pypi")
-                        all_findings.extend(osv_result.findings)
+                        # Fall back to OSV; looked up together with every other manifest below
+                        osv_dependencies.extend(await self._osv_dependencies(manifest_path, "pypi"))
                     
                     elif manifest_type in ["package.json", "package-lock.json"]:
-                        osv_result = await self.run_osv_scan(manifest_path, "npm")
-                        all_findings.extend(osv_result.findings)
+                        osv_dependencies.extend(await self._osv_dependencies(manifest_path, "npm"))
                 
                 # Check licenses
                 if scan.check_licenses:
                     licenses = await self._scan_licenses(manifest_path, manifest_type)
                     license_issues.extend(licenses)
             
-            # Save findings
-            for finding in all_findings:
-                await self._save_vuln_finding(scan, finding)
+            if osv_dependencies:
+                osv_result = await self.run_osv_batch(osv_dependencies)
+                all_findings.extend(osv_result.findings)
+                total_deps += osv_result.total_dependencies
             
-            for issue in license_issues:
-                await self._save_license_finding(scan, issue)
+            # Save findings
+            await self._save_findings(scan, all_findings, license_issues)
             
             # Update scan stats
             scan.status = "completed"
@@ -445,28 +468,43 @@ class NativeSCAService:
             return SCAResult(success=False, error=str(e), engine="npm_audit")
 
     # ========================================================================
-    # OSV API Scanner
+    # OSV Scanner
     # ========================================================================
 
     async def run_osv_scan(self, manifest_path: str, ecosystem: str) -> SCAResult:
-        """Query OSV database for vulnerabilities"""
-        
+        """Look up a manifest's dependencies in the OSV database"""
+        return await self.run_osv_batch(await self._osv_dependencies(manifest_path, ecosystem))
+
+    async def run_osv_batch(self, dependencies: List[Dict[str, str]]) -> SCAResult:
+        """
+        Look up many dependencies (name, version, ecosystem, manifest_file) at
+        once: in the local OSV mirror when one has been built, otherwise with
+        the OSV querybatch API (unless OSV_API_FALLBACK is off)
+        """
         try:
-            # Parse dependencies from manifest
-            dependencies = await self._parse_manifest(manifest_path, ecosystem)
-            
-            findings = []
-            
-            async with aiohttp.ClientSession() as session:
-                for dep in dependencies:
-                    vulns = await self._query_osv(session, dep["name"], dep["version"], ecosystem)
-                    findings.extend(vulns)
+            queries = [(dep["ecosystem"], dep["name"], dep.get("version", "")) for dep in dependencies]
+            mirror = get_osv_mirror()
+            if mirror is not None:
+                matches = await asyncio.to_thread(mirror.lookup_batch, queries)
+            elif settings.OSV_API_FALLBACK:
+                matches = await self._query_osv_api_batch(queries)
+            else:
+                return SCAResult(
+                    success=False,
+                    error="No local OSV mirror at OSV_MIRROR_PATH and OSV_API_FALLBACK is disabled",
+                    engine="osv"
+                )
             
+            findings = [
+                self._osv_finding(dep, advisory, fixed_version)
+                for dep, found in zip(dependencies, matches)
+                for advisory, fixed_version in found
+            ]
             return SCAResult(
                 success=True,
                 findings=findings,
                 total_dependencies=len(dependencies),
-                vulnerable_dependencies=len(set(f.package_name for f in findings)),
+                vulnerable_dependencies=len(set((f.ecosystem, f.package_name) for f in findings)),
                 engine="osv"
             )
             
@@ -474,79 +512,113 @@ class NativeSCAService:
             logger.error(f"OSV scan failed: {e}")
             return SCAResult(success=False, error=str(e), engine="osv")
 
-    async def _query_osv(
-        self,
-        session: aiohttp.ClientSession,
-        package: str,
-        version: str,
-        ecosystem: str
-    ) -> List[DependencyVuln]:
-        """Query OSV API for a specific package"""
-        
-        findings = []
-        
-        try:
-            payload = {
-                "package": {
-                    "name": package,
-                    "ecosystem": ecosystem.capitalize()  # PyPI, npm, etc.
-                },
-                "version": version
-            }
+    async def _query_osv_api_batch(
+        self, queries: List[Tuple[str, str, str]]
+    ) -> List[List[Tuple[Dict[str, Any], Optional[str]]]]:
+        """
+        Online fallback: querybatch for matching advisory IDs (up to
+        OSV_API_BATCH_SIZE dependencies per request, following each query's
+        next_page_token), then each distinct advisory fetched once. An
+        advisory that can't be fetched is still reported, by ID only.
+        """
+        ids_per_query: List[List[str]] = []
+        timeout = aiohttp.ClientTimeout(total=120)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            for start in range(0, len(queries), OSV_API_BATCH_SIZE):
+                batch = queries[start:start + OSV_API_BATCH_SIZE]
+                batch_ids: List[List[str]] = [[] for _ in batch]
+                page_tokens: Dict[int, str] = {}
+                pending = list(range(len(batch)))
+                for _ in range(OSV_API_MAX_PAGES):
+                    payload = {"queries": [self._osv_api_query(*batch[i], page_tokens.get(i)) for i in pending]}
+                    async with session.post(self.osv_batch_url, json=payload) as response:
+                        response.raise_for_status()
+                        data = await response.json()
+                    next_pending = []
+                    for i, result in zip(pending, data.get("results", [])):
+                        batch_ids[i].extend(vuln["id"] for vuln in result.get("vulns", []))
+                        if result.get("next_page_token"):
+                            page_tokens[i] = result["next_page_token"]
+                            next_pending.append(i)
+                    pending = next_pending
+                    if not pending:
+                        break
+                else:
+                    logger.warning(f"OSV results truncated for {len(pending)} dependencies after {OSV_API_MAX_PAGES} pages")
+                ids_per_query.extend(batch_ids)
             
-            async with session.post(self.osv_api_url, json=payload) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    for vuln in data.get("vulns", []):
-                        # Get severity from CVSS or severity field
-                        severity = FindingSeverity.MEDIUM
-                        cvss_score = None
-                        
-                        for severity_data in vuln.get("severity", []):
-                            if severity_data.get("type") == "CVSS_V3":
-                                cvss_score = severity_data.get("score")
-                                severity = self._map_cvss_severity(cvss_score)
-                                break
-                        
-                        # Get fixed version
-                        fixed_version = None
-                        for affected in vuln.get("affected", []):
-                            for range_data in affected.get("ranges", []):
-                                for event in range_data.get("events", []):
-                                    if "fixed" in event:
-                                        fixed_version = event["fixed"]
-                                        break
-                        
-                        # Get CVE ID
-                        cve_id = None
-                        for alias in vuln.get("aliases", []):
-                            if alias.startswith("CVE-"):
-                                cve_id = alias
-                                break
-                        
-                        finding = DependencyVuln(
-                            package_name=package,
-                            package_version=version,
-                            ecosystem=ecosystem,
-                            manifest_file=None,
-                            cve_id=cve_id,
-                            ghsa_id=vuln.get("id"),
-                            severity=severity,
-                            cvss_score=cvss_score,
-                            cvss_vector=None,
-                            title=vuln.get("summary", vuln.get("id", "Vulnerability")),
-                            description=vuln.get("details"),
-                            fixed_version=fixed_version,
-                            is_direct=True,
-                            references=[ref.get("url") for ref in vuln.get("references", []) if ref.get("url")]
+            semaphore = asyncio.Semaphore(OSV_API_CONCURRENCY)
+            
+            async def fetch(vuln_id: str) -> Dict[str, Any]:
+                async with semaphore:
+                    async with session.get(f"{self.osv_vulns_url}/{vuln_id}") as response:
+                        response.raise_for_status()
+                        return await response.json()
+            
+            unique_ids = sorted(set(vuln_id for ids in ids_per_query for vuln_id in ids))
+            fetched = await asyncio.gather(*(fetch(vuln_id) for vuln_id in unique_ids), return_exceptions=True)
+            records = {}
+            for vuln_id, record in zip(unique_ids, fetched):
+                if isinstance(record, Exception):
+                    logger.warning(f"Failed to fetch OSV advisory {vuln_id}: {record}")
+                    record = {"id": vuln_id}
+                records[vuln_id] = record
+        
+        matches = []
+        for (ecosystem, name, version), ids in zip(queries, ids_per_query):
+            ecosystem = osv_ecosystem(ecosystem)
+            package = normalize_package(ecosystem, name)
+            found = []
+            for vuln_id in ids:
+                record = records[vuln_id]
+                fixed_version = None
+                for _, entry_package, affected in affected_entries(record, [ecosystem]):
+                    if entry_package == package:
+                        hit, fixed_version = match_affected(
+                            affected.get("ranges", []), affected.get("versions", []), ecosystem, version
                         )
-                        findings.append(finding)
-                        
-        except Exception as e:
-            logger.warning(f"OSV query failed for {package}@{version}: {e}")
-        
-        return findings
+                        if hit:
+                            break
+                found.append((compact_advisory(record), fixed_version))
+            matches.append(found)
+        return matches
+
+    @staticmethod
+    def _osv_api_query(ecosystem: str, name: str, version: str, page_token: Optional[str] = None) -> Dict[str, Any]:
+        """One querybatch entry"""
+        query: Dict[str, Any] = {"package": {"name": name, "ecosystem": osv_ecosystem(ecosystem)}}
+        if version:
+            query["version"] = version
+        if page_token:
+            query["page_token"] = page_token
+        return query
+
+    def _osv_finding(
+        self, dep: Dict[str, str], advisory: Dict[str, Any], fixed_version: Optional[str]
+    ) -> DependencyVuln:
+        """DependencyVuln from a compact OSV advisory (see osv_mirror.compact_advisory)"""
+        aliases = advisory.get("aliases") or []
+        cve_id = next((alias for alias in [advisory.get("id"), *aliases] if alias and alias.startswith("CVE-")), None)
+        # GHSA records carry a database severity; CVSS vectors aren't scored here
+        severity = (
+            self._map_npm_severity(advisory["severity"]) if advisory.get("severity") else FindingSeverity.MEDIUM
+        )
+        return DependencyVuln(
+            package_name=dep["name"],
+            package_version=dep.get("version", ""),
+            ecosystem=dep["ecosystem"],
+            manifest_file=dep.get("manifest_file"),
+            cve_id=cve_id,
+            ghsa_id=advisory.get("id"),
+            severity=severity,
+            cvss_score=None,
+            cvss_vector=advisory.get("cvss_vector"),
+            title=advisory.get("summary") or advisory.get("id") or "Vulnerability",
+            description=advisory.get("details"),
+            fixed_version=fixed_version,
+            is_direct=True,
+            references=advisory.get("references") or []
+        )
 
     # ========================================================================
     # License Scanning
@@ -718,6 +790,11 @@ class NativeSCAService:
         
         return manifests
 
+    async def _osv_dependencies(self, manifest_path: str, ecosystem: str) -> List[Dict[str, str]]:
+        """A manifest's dependencies as OSV lookup entries"""
+        dependencies = await self._parse_manifest(manifest_path, ecosystem)
+        return [{**dep, "ecosystem": ecosystem, "manifest_file": manifest_path} for dep in dependencies]
+
     async def _parse_manifest(self, manifest_path: str, ecosystem: str) -> List[Dict[str, str]]:
         """Parse dependencies from manifest file"""
         
@@ -764,56 +841,83 @@ class NativeSCAService:
         count = result.scalar() or 0
         return f"SCA-{count + 1:05d}"
 
-    async def _save_vuln_finding(self, scan: SCAScan, finding: DependencyVuln) -> SCAFinding:
-        """Save vulnerability finding to database"""
-        
-        db_finding = SCAFinding(
-            scan_id=scan.id,
-            package_name=finding.package_name,
-            package_version=finding.package_version,
-            package_ecosystem=finding.ecosystem,
-            manifest_file=finding.manifest_file,
-            is_vulnerability=True,
-            cve_id=finding.cve_id,
-            ghsa_id=finding.ghsa_id,
-            severity=finding.severity,
-            cvss_score=finding.cvss_score,
-            cvss_vector=finding.cvss_vector,
-            title=finding.title,
-            description=finding.description,
-            fixed_version=finding.fixed_version,
-            is_direct=finding.is_direct,
-            references=finding.references,
-            status=FindingStatus.OPEN
-        )
-        
-        self.db.add(db_finding)
-        await self.db.commit()
-        
-        return db_finding
-
-    async def _save_license_finding(self, scan: SCAScan, issue: LicenseIssue) -> SCAFinding:
-        """Save license issue to database"""
-        
-        db_finding = SCAFinding(
-            scan_id=scan.id,
-            package_name=issue.package_name,
-            package_version=issue.package_version,
-            package_ecosystem=issue.ecosystem,
-            is_vulnerability=False,
-            is_license_issue=True,
-            severity=FindingSeverity.MEDIUM if issue.license_risk == LicenseRisk.MEDIUM else FindingSeverity.HIGH,
-            license_name=issue.license_name,
-            license_risk=issue.license_risk,
-            title=f"License Compliance: {issue.license_name}",
-            description=issue.reason,
-            status=FindingStatus.OPEN
-        )
-        
-        self.db.add(db_finding)
-        await self.db.commit()
-        
-        return db_finding
+    async def _save_findings(
+        self,
+        scan: SCAScan,
+        findings: List[DependencyVuln],
+        license_issues: List[LicenseIssue],
+    ) -> int:
+        """
+        Bulk-save vulnerability and license findings, updating ones this scan
+        already stored and keeping triage decisions from the project's earlier scans
+        """
+        rows = [self._vuln_finding_row(scan, finding) for finding in findings]
+        rows.extend(self._license_finding_row(scan, issue) for issue in license_issues)
+        await carry_forward_triage(self.db, SCAFinding, SCAScan, scan, rows, SCA_FINDING_TRIAGE_COLUMNS)
+        return await bulk_upsert_findings(self.db, SCAFinding, rows, SCA_FINDING_UPDATE_COLUMNS)
+
+    def _vuln_finding_row(self, scan: SCAScan, finding: DependencyVuln) -> Dict[str, Any]:
+        """Column values for a vulnerability finding"""
+        advisory = finding.cve_id or finding.ghsa_id or finding.title
+        return {
+            "scan_id": scan.id,
+            "package_name": finding.package_name,
+            "package_version": finding.package_version,
+            "package_ecosystem": finding.ecosystem,
+            "manifest_file": finding.manifest_file,
+            "is_vulnerability": True,
+            "is_license_issue": False,
+            "cve_id": finding.cve_id,
+            "ghsa_id": finding.ghsa_id,
+            "severity": finding.severity,
+            "cvss_score": finding.cvss_score,
+            "cvss_vector": finding.cvss_vector,
+            "title": finding.title,
+            "description": finding.description,
+            "fixed_version": finding.fixed_version,
+            "is_direct": finding.is_direct,
+            "license_name": None,
+            "license_risk": None,
+            "references": finding.references,
+            "fingerprint": self._generate_fingerprint(
+                "vuln", finding.ecosystem, finding.package_name, finding.package_version,
+                finding.manifest_file or "", advisory,
+            ),
+            "status": FindingStatus.OPEN,
+        }
+
+    def _license_finding_row(self, scan: SCAScan, issue: LicenseIssue) -> Dict[str, Any]:
+        """Column values for a license issue"""
+        return {
+            "scan_id": scan.id,
+            "package_name": issue.package_name,
+            "package_version": issue.package_version,
+            "package_ecosystem": issue.ecosystem,
+            "manifest_file": None,
+            "is_vulnerability": False,
+            "is_license_issue": True,
+            "cve_id": None,
+            "ghsa_id": None,
+            "severity": FindingSeverity.MEDIUM if issue.license_risk == LicenseRisk.MEDIUM else FindingSeverity.HIGH,
+            "cvss_score": None,
+            "cvss_vector": None,
+            "title": f"License Compliance: {issue.license_name}",
+            "description": issue.reason,
+            "fixed_version": None,
+            "is_direct": True,
+            "license_name": issue.license_name,
+            "license_risk": issue.license_risk,
+            "references": [],
+            "fingerprint": self._generate_fingerprint(
+                "license", issue.ecosystem, issue.package_name, issue.package_version, issue.license_name,
+            ),
+            "status": FindingStatus.OPEN,
+        }
+
+    @staticmethod
+    def _generate_fingerprint(*parts: str) -> str:
+        """Generate unique fingerprint for finding deduplication"""
+        return hashlib.sha256(":".join(parts).encode()).hexdigest()[:32]
 
     def _map_cvss_severity(self, cvss_score) -> FindingSeverity:
         """Map CVSS score to severity level"""
@@ -10,22 +10,52 @@ import os
 from pathlib import Path
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func, desc
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from sqlalchemy import select, and_, func, desc, case, false, or_
+from qdrant_client import models
 
 from app.models.organisation_memory import (
+    FTS_CONFIG,
     OrganisationMemory,
     OrganisationMemoryImage,
     MemoryUsageLog,
     MemoryInputType,
     MemorySource,
+    searchable_tsvector,
 )
+from app.services.ai_service import get_ai_service
+from app.services.qdrant_service import get_qdrant_service
 from app.services.vision_ai_service import get_vision_ai_service
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Reciprocal rank fusion constant (Cormack et al.); damps the weight of top ranks
+RRF_K = 60
+# Candidates taken from each store per requested result
+CANDIDATES_PER_RESULT = 4
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = RRF_K) -> Dict[str, float]:
+    """
+    Fuse ranked ID lists: score(id) = sum over lists of 1 / (k + rank), rank from 1
+
+    Args:
+        rankings: Ranked lists of IDs, best first
+        k: Fusion constant
+
+    Returns:
+        Fused score per ID
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+def memory_collection_name(organisation_id: Any) -> str:
+    return f"org_{organisation_id}_memory"
+
 
 class OrganisationMemoryService:
     """
@@ -41,10 +71,6 @@ class OrganisationMemoryService:
             db: Database session
         """
         self.db = db
-        self.qdrant_client = QdrantClient(
-            url=settings.QDRANT_URL,
-            api_key=settings.QDRANT_API_KEY if hasattr(settings, 'QDRANT_API_KEY') else None,
-        )
 
     async def store_memory(
         self,
@@ -171,7 +197,9 @@ class OrganisationMemoryService:
             await self.db.refresh(memory)
 
             # Store in vector DB for semantic search
-            await self._store_in_vector_db(memory)
+            if await self._store_in_vector_db(memory):
+                await self.db.commit()
+                await self.db.refresh(memory)
 
             logger.info(f"Stored memory {memory_id} for organisation {organisation_id}")
 
@@ -202,6 +230,11 @@ class OrganisationMemoryService:
         """
         Get relevant memories based on query
 
+        Hybrid retrieval: a vector search over the organisation's memory
+        collection (project filter applied inside the search) and a Postgres
+        full-text match on searchable_content, fused by reciprocal rank. Each
+        store is queried once.
+
         Args:
             organisation_id: Organisation ID
             query: Search query
@@ -209,18 +242,32 @@ class OrganisationMemoryService:
             limit: Max results
 
         Returns:
-            List of relevant memories with scores
+            List of relevant memories with scores, best first
         """
         try:
-            # Search in vector DB
-            collection_name = f"org_{organisation_id}_memory"
-
-            # Get query embedding (you'd use your embedding service)
-            # For now, we'll do a simple database search
-            query_stmt = select(OrganisationMemory).where(
+            if not query or not query.strip():
+                return await self._most_referenced_memories(organisation_id, project_id, limit)
+
+            candidates = max(limit * CANDIDATES_PER_RESULT, limit)
+            vector_matches = await self._vector_candidates(organisation_id, query, project_id, candidates)
+            vector_ids = [match_id for match_id, _ in vector_matches]
+            vector_scores = dict(vector_matches)
+
+            ts_query = func.websearch_to_tsquery(FTS_CONFIG, query)
+            keyword_match = searchable_tsvector().op("@@")(ts_query)
+            keyword_score = case((keyword_match, func.ts_rank_cd(searchable_tsvector(), ts_query)), else_=0.0)
+            vector_hit = OrganisationMemory.id.in_([uuid.UUID(match_id) for match_id in vector_ids]) if vector_ids else false()
+
+            # Vector hits first (so none are cut off), then the best keyword matches
+            query_stmt = select(
+                OrganisationMemory,
+                keyword_match.label("keyword_match"),
+                keyword_score.label("keyword_score"),
+            ).where(
                 and_(
                     OrganisationMemory.organisation_id == organisation_id,
                     OrganisationMemory.is_active == 1,
+                    or_(keyword_match, vector_hit),
                 )
             )
 
@@ -229,37 +276,118 @@ class OrganisationMemoryService:
                     OrganisationMemory.project_id == project_id
                 )
 
-            # Order by most recent and most referenced
             query_stmt = query_stmt.order_by(
-                desc(OrganisationMemory.times_referenced),
-                desc(OrganisationMemory.created_at)
-            ).limit(limit)
+                desc(vector_hit),
+                desc("keyword_score"),
+            ).limit(candidates + len(vector_ids))
 
             result = await self.db.execute(query_stmt)
-            memories = result.scalars().all()
+            rows = result.all()
+
+            memories = {str(row[0].id): row[0] for row in rows}
+            keyword_scores = {str(row[0].id): float(row.keyword_score or 0.0) for row in rows if row.keyword_match}
+            keyword_ranking = sorted(keyword_scores, key=keyword_scores.get, reverse=True)[:candidates]
+            # Vector hits without a live row (deleted or deactivated) are dropped here
+            vector_ranking = [match_id for match_id in vector_ids if match_id in memories]
+
+            fused = reciprocal_rank_fusion([vector_ranking, keyword_ranking])
+            ranked = sorted(
+                fused,
+                key=lambda memory_id: (fused[memory_id], memories[memory_id].times_referenced or 0),
+                reverse=True,
+            )[:limit]
 
             return [
                 {
-                    "memory_id": str(mem.id),
-                    "description": mem.user_description,
-                    "searchable_content": mem.searchable_content,
-                    "has_images": mem.has_images == 1,
-                    "image_count": mem.total_images,
-                    "features": mem.extracted_features,
-                    "ui_elements": mem.ui_elements,
-                    "workflows": mem.workflows,
-                    "tags": mem.tags,
-                    "times_referenced": mem.times_referenced,
-                    "created_at": mem.created_at.isoformat(),
-                    "similarity_score": 0.8,  # Placeholder
+                    **self._format_memory(memories[memory_id], vector_scores.get(memory_id, 0.0)),
+                    "keyword_score": keyword_scores.get(memory_id, 0.0),
+                    "relevance_score": fused[memory_id],
                 }
-                for mem in memories
+                for memory_id in ranked
             ]
 
         except Exception as e:
             logger.error(f"Error retrieving memories: {e}")
             return []
 
+    async def _vector_candidates(
+        self,
+        organisation_id: uuid.UUID,
+        query: str,
+        project_id: Optional[uuid.UUID],
+        limit: int,
+    ) -> List[tuple]:
+        """(memory_id, similarity) pairs from Qdrant, best first; empty if unavailable"""
+        try:
+            query_vector = await get_ai_service().create_embedding(query)
+            qdrant_service = await get_qdrant_service()
+        except Exception as e:
+            logger.warning(f"Vector memory search unavailable, using keyword search only: {e}")
+            return []
+
+        query_filter = None
+        if project_id:
+            query_filter = models.Filter(
+                must=[models.FieldCondition(key="project_id", match=models.MatchValue(value=str(project_id)))]
+            )
+
+        matches = await qdrant_service.search_vectors(
+            collection_name=memory_collection_name(organisation_id),
+            query_vector=query_vector,
+            limit=limit,
+            score_threshold=settings.MEMORY_VECTOR_SCORE_THRESHOLD,
+            query_filter=query_filter,
+        )
+        return [
+            (match["payload"]["memory_id"], match["score"])
+            for match in matches
+            if (match.get("payload") or {}).get("memory_id")
+        ]
+
+    async def _most_referenced_memories(
+        self,
+        organisation_id: uuid.UUID,
+        project_id: Optional[uuid.UUID],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Without a query: most referenced, then most recent memories"""
+        query_stmt = select(OrganisationMemory).where(
+            and_(
+                OrganisationMemory.organisation_id == organisation_id,
+                OrganisationMemory.is_active == 1,
+            )
+        )
+
+        if project_id:
+            query_stmt = query_stmt.where(
+                OrganisationMemory.project_id == project_id
+            )
+
+        query_stmt = query_stmt.order_by(
+            desc(OrganisationMemory.times_referenced),
+            desc(OrganisationMemory.created_at)
+        ).limit(limit)
+
+        result = await self.db.execute(query_stmt)
+        return [self._format_memory(mem, 0.0) for mem in result.scalars().all()]
+
+    @staticmethod
+    def _format_memory(mem: OrganisationMemory, similarity_score: float) -> Dict[str, Any]:
+        return {
+            "memory_id": str(mem.id),
+            "description": mem.user_description,
+            "searchable_content": mem.searchable_content,
+            "has_images": mem.has_images == 1,
+            "image_count": mem.total_images,
+            "features": mem.extracted_features,
+            "ui_elements": mem.ui_elements,
+            "workflows": mem.workflows,
+            "tags": mem.tags,
+            "times_referenced": mem.times_referenced,
+            "created_at": mem.created_at.isoformat() if mem.created_at else None,
+            "similarity_score": similarity_score,
+        }
+
     async def get_ai_suggestions(
         self,
         organisation_id: uuid.UUID,
@@ -436,52 +564,51 @@ class OrganisationMemoryService:
 
         return str(file_path)
 
-    async def _store_in_vector_db(self, memory: OrganisationMemory):
+    async def _store_in_vector_db(self, memory: OrganisationMemory) -> bool:
         """
         Store memory in vector database for semantic search
 
         Args:
             memory: Memory object
+
+        Returns:
+            True if the memory was stored (its vector DB fields are then set)
         """
         try:
-            collection_name = f"org_{memory.organisation_id}_memory"
-
-            # Ensure collection exists
-            try:
-                self.qdrant_client.get_collection(collection_name)
-            except:
-                self.qdrant_client.create_collection(
-                    collection_name=collection_name,
-                    vectors_config=VectorParams(size=1536, distance=Distance.COSINE),
-                )
+            collection_name = memory_collection_name(memory.organisation_id)
 
             # Get embedding for searchable content
-            # (You'd use your embedding service here)
-            # For now, we'll skip the actual vector storage
-            # embedding = await get_embedding(memory.searchable_content)
-
-            # Store point
-            # point = PointStruct(
-            #     id=str(memory.id),
-            #     vector=embedding,
-            #     payload={
-            #         "memory_id": str(memory.id),
-            #         "organisation_id": str(memory.organisation_id),
-            #         "description": memory.user_description,
-            #         "has_images": memory.has_images,
-            #         "created_at": memory.created_at.isoformat(),
-            #     }
-            # )
-            # self.qdrant_client.upsert(collection_name=collection_name, points=[point])
+            embedding = await get_ai_service().create_embedding(memory.searchable_content)
+
+            qdrant_service = await get_qdrant_service()
+            await qdrant_service.ensure_collection_exists(
+                collection_name,
+                vector_size=len(embedding),
+                payload_indexes=("project_id",),
+            )
+            await qdrant_service.store_vector(
+                collection_name=collection_name,
+                point_id=str(memory.id),
+                vector=embedding,
+                payload={
+                    "memory_id": str(memory.id),
+                    "organisation_id": str(memory.organisation_id),
+                    "project_id": str(memory.project_id) if memory.project_id else None,
+                    "has_images": memory.has_images,
+                    "created_at": memory.created_at.isoformat() if memory.created_at else None,
+                },
+            )
 
             # Update memory with vector DB info
             memory.qdrant_collection = collection_name
             memory.qdrant_point_id = str(memory.id)
 
             logger.info(f"Stored memory {memory.id} in vector DB")
+            return True
 
         except Exception as e:
             logger.error(f"Error storing in vector DB: {e}")
+            return False
 
     def _generate_test_scenarios(
         self,
@@ -0,0 +1,453 @@
+"""
+OSV Mirror
+Local vulnerability index built from OSV data dumps, with batched package
+lookups and OSV version-range matching, so SCA scans work offline
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import zipfile
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Internal ecosystem names (as used by the SCA service) -> OSV ecosystem names
+OSV_ECOSYSTEMS = {
+    "pypi": "PyPI",
+    "npm": "npm",
+    "go": "Go",
+    "maven": "Maven",
+    "rubygems": "RubyGems",
+    "cargo": "crates.io",
+}
+
+# Names per "package IN (...)" lookup statement
+LOOKUP_CHUNK_SIZE = 500
+# Advisories per insert batch while building the index
+BUILD_BATCH_SIZE = 5000
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+# Parsed versions kept per parser; range bounds repeat across advisories
+VERSION_CACHE_SIZE = 1 << 16
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE advisories (id TEXT PRIMARY KEY, modified TEXT, data BLOB);
+CREATE TABLE affected (
+    ecosystem TEXT NOT NULL,
+    package TEXT NOT NULL,
+    advisory_id TEXT NOT NULL,
+    ranges TEXT,
+    versions TEXT
+);
+"""
+# Created after the bulk load; building it once is much faster than maintaining it per insert
+INDEXES = "CREATE INDEX ix_affected_package ON affected (ecosystem, package);"
+
+
+def osv_ecosystem(ecosystem: str) -> str:
+    """OSV name for an ecosystem ("pypi" -> "PyPI"); unknown names pass through"""
+    return OSV_ECOSYSTEMS.get(ecosystem.lower(), ecosystem)
+
+
+def normalize_package(ecosystem: str, name: str) -> str:
+    """Index key for a package name (PEP 503 normalization for PyPI, lowercase for npm)"""
+    if ecosystem == "PyPI":
+        return re.sub(r"[-_.]+", "-", name).lower()
+    if ecosystem == "npm":
+        return name.lower()
+    return name
+
+
+# ============================================================================
+# Version matching
+# ============================================================================
+
+_SEMVER = re.compile(r"^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$")
+
+try:
+    from packaging.version import InvalidVersion, Version
+except ImportError:  # pragma: no cover - packaging ships with pip/setuptools
+    Version = None
+
+
+def _identifier_key(part: str) -> Tuple[int, Any]:
+    return (0, int(part)) if part.isdigit() else (1, part)
+
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def _semver_key(version: str) -> Optional[Tuple]:
+    match = _SEMVER.match(version.strip())
+    if not match:
+        return None
+    major, minor, patch, prerelease = match.groups()
+    release = (int(major), int(minor or 0), int(patch or 0))
+    if prerelease is None:
+        return release + (1, ())
+    # Pre-releases sort before the release they precede
+    return release + (0, tuple(_identifier_key(p) for p in prerelease.split(".")))
+
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def _generic_key(version: str) -> Optional[Tuple]:
+    parts = re.findall(r"\d+|[A-Za-z]+", version)
+    return tuple(_identifier_key(p) for p in parts) if parts else None
+
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def _pep440_key(version: str) -> Optional[Any]:
+    if Version is None:
+        return _generic_key(version)
+    try:
+        return Version(version)
+    except InvalidVersion:
+        return None
+
+
+def version_parser(ecosystem: str) -> Callable[[str], Optional[Any]]:
+    """Comparable sort key for versions of an OSV ecosystem (None = unparseable)"""
+    if ecosystem == "PyPI":
+        return _pep440_key
+    if ecosystem in ("npm", "Go", "crates.io"):
+        return _semver_key
+    return _generic_key
+
+
+def _event_points(events: List[Dict[str, str]], parse: Callable) -> List[Tuple[Tuple, str, str]]:
+    """(sort key, kind, raw version) per event; introduced "0" sorts before everything"""
+    points = []
+    for event in events:
+        for kind in ("introduced", "fixed", "last_affected", "limit"):
+            if kind not in event:
+                continue
+            raw = event[kind]
+            if kind == "introduced" and raw == "0":
+                points.append(((0,), kind, raw))
+                continue
+            key = parse(raw)
+            if key is not None:
+                points.append(((1, key), kind, raw))
+    points.sort(key=lambda point: point[0])
+    return points
+
+
+def match_affected(
+    ranges: List[Dict[str, Any]], versions: List[str], ecosystem: str, version: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Whether ``version`` is affected according to an OSV "affected" entry, and
+    the first fixed version after it. An empty version matches every entry
+    (same as an OSV query without a version).
+    """
+    parse = version_parser(ecosystem)
+    if not version:
+        fixed = next((e["fixed"] for r in ranges for e in r.get("events", []) if "fixed" in e), None)
+        return True, fixed
+    listed = version in versions
+    key = parse(version)
+    if key is None:
+        return listed, None
+    wrapped = (1, key)
+    next_fixed = None
+    for range_data in ranges:
+        if range_data.get("type") == "GIT":
+            continue  # commit ranges can't be evaluated against a version
+        affected = False
+        fixed = None
+        for point, kind, raw in _event_points(range_data.get("events", []), parse):
+            if kind == "introduced":
+                if wrapped >= point:
+                    affected = True
+            elif kind in ("fixed", "limit"):
+                if wrapped >= point:
+                    affected = False
+                elif fixed is None and kind == "fixed":
+                    fixed = raw
+            elif kind == "last_affected" and wrapped > point:
+                affected = False
+        if affected:
+            return True, fixed
+        next_fixed = next_fixed or fixed
+    # Explicitly listed versions are affected even when no range covers them
+    return listed, next_fixed if listed else None
+
+
+# ============================================================================
+# Advisories
+# ============================================================================
+
+def compact_advisory(vuln: Dict[str, Any]) -> Dict[str, Any]:
+    """The subset of an OSV record SCA findings are built from"""
+    cvss_vector = None
+    for severity in vuln.get("severity", []):
+        if severity.get("type", "").startswith("CVSS_V3"):
+            cvss_vector = severity.get("score")
+            break
+    return {
+        "id": vuln.get("id"),
+        "summary": vuln.get("summary"),
+        "details": vuln.get("details"),
+        "aliases": vuln.get("aliases", []),
+        "cvss_vector": cvss_vector,
+        "severity": (vuln.get("database_specific") or {}).get("severity"),
+        "references": [ref.get("url") for ref in vuln.get("references", []) if ref.get("url")],
+    }
+
+
+def affected_entries(vuln: Dict[str, Any], ecosystems: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str, Dict]]:
+    """(OSV ecosystem, normalized package, affected entry) for each package an advisory affects"""
+    wanted = set(ecosystems) if ecosystems is not None else None
+    for affected in vuln.get("affected", []):
+        package = affected.get("package") or {}
+        ecosystem = package.get("ecosystem", "")
+        name = package.get("name")
+        if not name or (wanted is not None and ecosystem not in wanted):
+            continue
+        yield ecosystem, normalize_package(ecosystem, name), affected
+
+
+# ============================================================================
+# Building the index
+# ============================================================================
+
+def iter_dump_records(zip_path: str) -> Iterator[Dict[str, Any]]:
+    """OSV records in an ecosystem dump (all.zip holds one JSON file per advisory)"""
+    with zipfile.ZipFile(zip_path) as archive:
+        for member in archive.infolist():
+            if not member.filename.endswith(".json"):
+                continue
+            try:
+                yield json.loads(archive.read(member))
+            except ValueError:
+                logger.warning(f"Skipping unreadable OSV record {member.filename} in {zip_path}")
+
+
+def build_index(path: str, dumps: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Build the index at ``path`` from (OSV ecosystem, all.zip path) pairs.
+    The new index is written next to the old one and swapped in atomically,
+    so lookups never see a half-built file.
+    """
+    started = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".osv-mirror-", suffix=".tmp", dir=directory)
+    os.close(fd)
+
+    advisories = packages = 0
+    try:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + SCHEMA)
+            advisory_rows: List[Tuple] = []
+            affected_rows: List[Tuple] = []
+            seen = set()
+
+            def flush():
+                conn.executemany("INSERT OR REPLACE INTO advisories VALUES (?, ?, ?)", advisory_rows)
+                conn.executemany("INSERT INTO affected VALUES (?, ?, ?, ?, ?)", affected_rows)
+                advisory_rows.clear()
+                affected_rows.clear()
+
+            for ecosystem, zip_path in dumps:
+                for vuln in iter_dump_records(zip_path):
+                    if vuln.get("withdrawn") or not vuln.get("id"):
+                        continue
+                    entries = list(affected_entries(vuln, [ecosystem]))
+                    if not entries:
+                        continue
+                    if vuln["id"] not in seen:
+                        seen.add(vuln["id"])
+                        data = zlib.compress(json.dumps(compact_advisory(vuln), separators=(",", ":")).encode())
+                        advisory_rows.append((vuln["id"], vuln.get("modified"), data))
+                    for eco, package, affected in entries:
+                        affected_rows.append((
+                            eco, package, vuln["id"],
+                            json.dumps(affected.get("ranges", []), separators=(",", ":")),
+                            json.dumps(affected.get("versions", []), separators=(",", ":")),
+                        ))
+                    if len(advisory_rows) >= BUILD_BATCH_SIZE:
+                        flush()
+            flush()
+            conn.executescript(INDEXES)
+
+            advisories = conn.execute("SELECT COUNT(*) FROM advisories").fetchone()[0]
+            packages = conn.execute("SELECT COUNT(DISTINCT ecosystem || ':' || package) FROM affected").fetchone()[0]
+            meta = {
+                "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "ecosystems": json.dumps([ecosystem for ecosystem, _ in dumps]),
+                "advisories": str(advisories),
+                "packages": str(packages),
+            }
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+            conn.commit()
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    stats = {
+        "path": path,
+        "ecosystems": [ecosystem for ecosystem, _ in dumps],
+        "advisories": advisories,
+        "packages": packages,
+        "size_bytes": os.path.getsize(path),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"Built OSV mirror: {stats}")
+    return stats
+
+
+async def download_dump(session: aiohttp.ClientSession, ecosystem: str, dest_dir: str) -> str:
+    """Stream <OSV_DUMP_BASE_URL>/<ecosystem>/all.zip to dest_dir"""
+    url = f"{settings.OSV_DUMP_BASE_URL.rstrip('/')}/{ecosystem}/all.zip"
+    dest = os.path.join(dest_dir, f"{ecosystem}.zip")
+    async with session.get(url) as response:
+        response.raise_for_status()
+        with open(dest, "wb") as f:
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_BYTES):
+                f.write(chunk)
+    return dest
+
+
+def local_dump_path(source_dir: str, ecosystem: str) -> str:
+    """<source_dir>/<ecosystem>/all.zip (bucket layout) or <source_dir>/<ecosystem>.zip"""
+    nested = os.path.join(source_dir, ecosystem, "all.zip")
+    return nested if os.path.exists(nested) else os.path.join(source_dir, f"{ecosystem}.zip")
+
+
+async def refresh_mirror(
+    path: Optional[str] = None,
+    ecosystems: Optional[Sequence[str]] = None,
+    source_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Rebuild the local mirror from OSV dumps.
+
+    Args:
+        path: Index file (default OSV_MIRROR_PATH)
+        ecosystems: OSV ecosystem names (default OSV_MIRROR_ECOSYSTEMS)
+        source_dir: Already-downloaded dumps (for air-gapped installs); downloads when None
+
+    Returns:
+        Build stats
+    """
+    path = path or settings.OSV_MIRROR_PATH
+    ecosystems = list(ecosystems or [e.strip() for e in settings.OSV_MIRROR_ECOSYSTEMS.split(",") if e.strip()])
+
+    if source_dir:
+        dumps = [(ecosystem, local_dump_path(source_dir, ecosystem)) for ecosystem in ecosystems]
+        return await asyncio.to_thread(build_index, path, dumps)
+
+    with tempfile.TemporaryDirectory(prefix="osv-dumps-") as download_dir:
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=120)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            zips = await asyncio.gather(*(download_dump(session, e, download_dir) for e in ecosystems))
+        return await asyncio.to_thread(build_index, path, list(zip(ecosystems, zips)))
+
+
+# ============================================================================
+# Lookups
+# ============================================================================
+
+class OSVMirror:
+    """Read-only access to a built mirror; safe to use from worker threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    def metadata(self) -> Dict[str, str]:
+        conn = self._connect()
+        try:
+            return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            conn.close()
+
+    def lookup_batch(self, queries: Sequence[Tuple[str, str, str]]) -> List[List[Tuple[Dict[str, Any], Optional[str]]]]:
+        """
+        Match many (ecosystem, package, version) queries at once.
+
+        Each distinct package is read once, in chunked IN (...) statements,
+        and each advisory's details are decompressed once however many
+        queries it matches.
+
+        Returns:
+            Per query, a list of (advisory, fixed version) pairs
+        """
+        keys = [(osv_ecosystem(eco), name, version) for eco, name, version in queries]
+        wanted: Dict[str, set] = {}
+        for ecosystem, name, _ in keys:
+            wanted.setdefault(ecosystem, set()).add(normalize_package(ecosystem, name))
+
+        conn = self._connect()
+        try:
+            entries: Dict[Tuple[str, str], List[Tuple[str, List, List]]] = {}
+            for ecosystem, names in wanted.items():
+                names = sorted(names)
+                for start in range(0, len(names), LOOKUP_CHUNK_SIZE):
+                    chunk = names[start:start + LOOKUP_CHUNK_SIZE]
+                    rows = conn.execute(
+                        "SELECT package, advisory_id, ranges, versions FROM affected "
+                        f"WHERE ecosystem = ? AND package IN ({','.join('?' * len(chunk))})",
+                        [ecosystem, *chunk],
+                    )
+                    for package, advisory_id, ranges, versions in rows:
+                        entries.setdefault((ecosystem, package), []).append(
+                            (advisory_id, json.loads(ranges or "[]"), json.loads(versions or "[]"))
+                        )
+
+            matches: List[List[Tuple[str, Optional[str]]]] = []
+            advisory_ids = set()
+            for ecosystem, name, version in keys:
+                found = []
+                seen = set()
+                for advisory_id, ranges, versions in entries.get((ecosystem, normalize_package(ecosystem, name)), []):
+                    if advisory_id in seen:
+                        continue
+                    affected, fixed = match_affected(ranges, versions, ecosystem, version)
+                    if affected:
+                        seen.add(advisory_id)
+                        found.append((advisory_id, fixed))
+                advisory_ids.update(seen)
+                matches.append(found)
+
+            advisories = self._load_advisories(conn, sorted(advisory_ids))
+        finally:
+            conn.close()
+
+        return [[(advisories[advisory_id], fixed) for advisory_id, fixed in found] for found in matches]
+
+    @staticmethod
+    def _load_advisories(conn: sqlite3.Connection, advisory_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        advisories = {}
+        for start in range(0, len(advisory_ids), LOOKUP_CHUNK_SIZE):
+            chunk = advisory_ids[start:start + LOOKUP_CHUNK_SIZE]
+            rows = conn.execute(
+                f"SELECT id, data FROM advisories WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for advisory_id, data in rows:
+                advisories[advisory_id] = json.loads(zlib.decompress(data))
+        return advisories
+
+
+def get_osv_mirror() -> Optional[OSVMirror]:
+    """The local mirror, or None until one has been built"""
+    path = settings.OSV_MIRROR_PATH
+    return OSVMirror(path) if path and os.path.exists(path) else None
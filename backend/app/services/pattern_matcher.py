@@ -0,0 +1,156 @@
+"""
+Multi-Pattern Matcher
+Many regex rules matched in a single pass per text, with literal prefilters
+"""
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Match, Optional, Pattern, Sequence, Tuple
+
+# NOTE: imported by spawned scanner worker processes; keep it dependency-free.
+
+# Combined patterns kept per matcher (one per distinct set of prefiltered rules)
+COMBINED_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """
+    A rule for MultiPatternMatcher.
+
+    ``literals`` is an optional prefilter: every match of ``pattern`` must
+    contain at least one of them (compared case-insensitively when the
+    matcher ignores case). Texts and lines containing none are never run
+    through the rule's regex. Leave it empty when no such literal exists.
+    """
+    id: str
+    pattern: str
+    literals: Tuple[str, ...] = ()
+
+
+class MultiPatternMatcher:
+    """
+    Matches a fixed set of rules line by line, giving the same results as
+    running every rule's regex on every line but in one pass.
+
+    Rules whose literals don't occur in the text are dropped up front. The
+    remaining rules are joined into one alternation that is searched over the
+    whole text; only lines where it hits are checked rule by rule to report
+    every rule that matches there. Rules should not use backreferences or
+    inline global flags (they fall back to per-rule scanning if the combined
+    pattern doesn't compile).
+    """
+
+    def __init__(self, rules: Sequence[PatternRule], flags: int = re.IGNORECASE):
+        self.rules: List[PatternRule] = list(rules)
+        self.flags = flags
+        self._fold = bool(flags & re.IGNORECASE)
+        self._compiled: List[Pattern] = [re.compile(rule.pattern, flags) for rule in self.rules]
+        self._literals: List[Tuple[str, ...]] = [
+            tuple(literal.lower() if self._fold else literal for literal in rule.literals) for rule in self.rules
+        ]
+        # Each distinct literal is looked up once per text, however many rules share it
+        self._unfiltered = frozenset(i for i, literals in enumerate(self._literals) if not literals)
+        self._literal_rules: Dict[str, List[int]] = {}
+        for i, literals in enumerate(self._literals):
+            for literal in literals:
+                self._literal_rules.setdefault(literal, []).append(i)
+        # LRU; matchers are shared across threads (RASP/IAST detectors run in the threadpool)
+        self._combined: "OrderedDict[Tuple[Tuple[int, ...], bool], Optional[Pattern]]" = OrderedDict()
+        self._combined_lock = threading.Lock()
+
+    def _combined_pattern(self, indexes: Tuple[int, ...], multiline: bool = True) -> Optional[Pattern]:
+        key = (indexes, multiline)
+        with self._combined_lock:
+            if key in self._combined:
+                self._combined.move_to_end(key)
+                return self._combined[key]
+        # Compile outside the lock; a concurrent compile of the same key is harmless
+        try:
+            pattern = re.compile(
+                "|".join(f"(?:{self.rules[i].pattern})" for i in indexes),
+                self.flags | (re.MULTILINE if multiline else 0),
+            )
+        except re.error:
+            pattern = None
+        with self._combined_lock:
+            self._combined[key] = pattern
+            while len(self._combined) > COMBINED_CACHE_SIZE:
+                self._combined.popitem(last=False)
+        return pattern
+
+    def _has_literal(self, index: int, folded: str) -> bool:
+        literals = self._literals[index]
+        return not literals or any(literal in folded for literal in literals)
+
+    def candidate_rules(self, text: str) -> Tuple[int, ...]:
+        """Indexes of rules whose prefilter passes for ``text``"""
+        folded = text.lower() if self._fold else text
+        hits = set(self._unfiltered)
+        for literal, indexes in self._literal_rules.items():
+            if literal in folded:
+                hits.update(indexes)
+        return tuple(sorted(hits))
+
+    def scan(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield (rule index, 1-based line number, line) for every line a rule
+        matches, in line order (and rule order within a line)
+        """
+        active = self.candidate_rules(text)
+        if not active:
+            return
+        combined = self._combined_pattern(active)
+        if combined is None:
+            yield from self._scan_lines(text, active)
+            return
+
+        position = 0
+        line_number = 1
+        counted_to = 0
+        length = len(text)
+        while position <= length:
+            match = combined.search(text, position)
+            if match is None:
+                return
+            line_start = text.rfind("\n", 0, match.start()) + 1
+            line_end = text.find("\n", match.start())
+            if line_end < 0:
+                line_end = length
+            line_number += text.count("\n", counted_to, line_start)
+            counted_to = line_start
+
+            line = text[line_start:line_end]
+            folded = line.lower() if self._fold else line
+            for i in active:
+                if self._has_literal(i, folded) and self._compiled[i].search(line):
+                    yield i, line_number, line
+            # A hit spanning lines is only a hint; keep looking from the next line
+            position = line_end + 1
+
+    def search(self, text: str, prefilter: bool = True) -> Iterator[Tuple[int, Match]]:
+        """
+        Yield (rule index, first match) for every rule matching anywhere in
+        ``text`` (not line by line), in rule order. A single combined search
+        rules out texts no rule matches before any rule runs on its own.
+        With prefilter=False every rule is a candidate, for texts where
+        lowercasing is not a faithful stand-in for the regex's case folding.
+        """
+        active = self.candidate_rules(text) if prefilter else tuple(range(len(self.rules)))
+        if not active:
+            return
+        combined = self._combined_pattern(active, multiline=False)
+        if combined is not None and combined.search(text) is None:
+            return
+        for i in active:
+            match = self._compiled[i].search(text)
+            if match:
+                yield i, match
+
+    def _scan_lines(self, text: str, active: Tuple[int, ...]) -> Iterator[Tuple[int, int, str]]:
+        for line_number, line in enumerate(text.split("\n"), 1):
+            folded = line.lower() if self._fold else line
+            for i in active:
+                if self._has_literal(i, folded) and self._compiled[i].search(line):
+                    yield i, line_number, line
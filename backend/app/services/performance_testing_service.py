@@ -17,11 +17,21 @@ from app.models.performance import (
     AlertSeverity, DeviceType, ConnectionType, LoadProfile,
     PerformanceSchedule
 )
+from app.models.api_collection import ApiCollection
+from app.models.api_request import APIRequest
 from app.services.pagespeed_service import PageSpeedInsightsService, get_pagespeed_service
 from app.services.local_lighthouse_service import LocalLighthouseService, get_local_lighthouse_service
 from app.services.loader_service import LoaderIOService, get_loader_service, LoadTestType
 from app.services.webpagetest_service import WebPageTestService, WebPageTestConfig
 from app.services.performance_ai_analyzer import PerformanceAIAnalyzer, get_performance_ai_analyzer
+from app.services.load_generator import (
+    LoadGeneratorConfig, DistributedLoadRunner, EXECUTOR_RAMPING_VUS,
+    create_runner, resolve_executor, resolve_worker_count,
+    target_vus_at, arrival_rate_at
+)
+from app.services.load_scenarios import api_request_to_step, environment_variables
+from app.services.load_metrics_sink import LoadMetricsSink, publish_test_progress
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -106,6 +116,8 @@ class PerformanceTestingService:
             ramp_down_seconds=kwargs.get("ramp_down_seconds", 10),
             load_profile=kwargs.get("load_profile", LoadProfile.RAMP_UP),
             stages=kwargs.get("stages"),
+            think_time=kwargs.get("think_time", 0),
+            scenarios=kwargs.get("scenarios"),
             
             # Thresholds
             thresholds=kwargs.get("thresholds", {}),
@@ -282,11 +294,17 @@ class PerformanceTestingService:
                 failed_test.completed_at = datetime.utcnow()
                 failed_test.progress_percentage = 100
                 await self.db.commit()
+                await publish_test_progress(test_id, {
+                    "id": str(test_id), "status": TestStatus.FAILED.value, "progress": 100, "error": str(e)
+                })
                 return failed_test
             raise e
         
         await self.db.commit()
         await self.db.refresh(test)
+        await publish_test_progress(test_id, {
+            "id": str(test_id), "status": TestStatus.COMPLETED.value, "progress": 100
+        })
         
         # Create execution record
         await self._create_execution_record(test)
@@ -339,7 +357,8 @@ class PerformanceTestingService:
     
     async def _execute_load_test(self, test: PerformanceTest):
         """Execute load/stress/spike/endurance test"""
-        if self.loader_service:
+        # Loader.io only drives a single URL; scripted scenarios always run locally
+        if self.loader_service and not test.scenarios:
             logger.info(f"Running CLOUD load test for {test.target_url}")
             test.provider = TestProvider.LOADER_IO
             test.progress_percentage = 20
@@ -385,11 +404,13 @@ class PerformanceTestingService:
         """
         Execute a TRUE K6-like load test with persistent concurrent virtual users.
         Each VU continuously makes requests throughout the test duration.
+        Stages with a ``rate`` switch to the open model (constant/ramping
+        arrival rate) with test.virtual_users as the pre-allocated VU pool.
+        VUs run in-process or, when LOAD_TEST_WORKERS allows, across worker
+        processes whose per-interval histograms are merged here.
         """
         import time
-        import aiohttp
         from collections import deque
-        import threading
         
         logger.info(f"Running TRUE CONCURRENT load test for {test.target_url} (Type: {test.test_type}, VUs: {test.virtual_users})")
         
@@ -397,19 +418,12 @@ class PerformanceTestingService:
         test.progress_percentage = 0
         await self.db.commit()
         
-        # Shared state for all VUs (thread-safe with asyncio)
-        total_requests = 0
-        errors = 0
-        latencies = []
         timeline = deque(maxlen=300)  # Keep last 5 minutes of per-second data
-        lock = asyncio.Lock()
         
         # Test timing
         total_duration = test.duration_seconds or 60
         ramp_up = test.ramp_up_seconds or 0
         max_vus = test.virtual_users or 100
-        start_time = time.time()
-        end_time = start_time + total_duration
         
         # Define stages based on test type
         stages = test.stages or []
@@ -452,75 +466,43 @@ class PerformanceTestingService:
             await self.db.commit()
             await self.db.refresh(test)
         
-        def get_target_vus_at_time(elapsed: float) -> int:
-            """Calculate target VUs at a given elapsed time based on stages"""
-            accumulated = 0
-            prev_target = 0
-            for stage in stages:
-                stage_end = accumulated + stage["duration"]
-                if elapsed < stage_end:
-                    time_in_stage = elapsed - accumulated
-                    if stage["duration"] > 0:
-                        progress = time_in_stage / stage["duration"]
-                        return int(prev_target + (stage["target"] - prev_target) * progress)
-                    return stage["target"]
-                accumulated = stage_end
-                prev_target = stage["target"]
-            return 0
-        
-        async def virtual_user_loop(vu_id: int, session: aiohttp.ClientSession, stop_event: asyncio.Event):
-            """
-            Each VU runs this loop continuously - making request after request.
-            This is how K6 works - each VU is a persistent worker.
-            """
-            nonlocal total_requests, errors, latencies
-            
-            while not stop_event.is_set() and time.time() < end_time:
-                # Check if this VU should be active based on current target
-                elapsed = time.time() - start_time
-                target_vus = get_target_vus_at_time(elapsed)
-                
-                if vu_id >= target_vus:
-                    # This VU should be dormant, wait a bit and check again
-                    await asyncio.sleep(0.1)
-                    continue
-                
-                # Make a real HTTP request
-                req_start = time.time()
-                try:
-                    async with session.request(
-                        method=test.target_method or "GET",
-                        url=test.target_url,
-                        headers=test.target_headers or {},
-                        timeout=aiohttp.ClientTimeout(total=30)
-                    ) as response:
-                        await response.read()  # Consume response body
-                        latency_ms = (time.time() - req_start) * 1000
-                        
-                        async with lock:
-                            total_requests += 1
-                            latencies.append(latency_ms)
-                            if response.status >= 400:
-                                errors += 1
-                                
-                except asyncio.TimeoutError:
-                    async with lock:
-                        total_requests += 1
-                        errors += 1
-                        latencies.append(30000)  # Timeout = 30s
-                except Exception as e:
-                    async with lock:
-                        total_requests += 1
-                        errors += 1
-                        latencies.append((time.time() - req_start) * 1000)
-                
-                # Small yield to prevent CPU hogging, but NO artificial delay
-                await asyncio.sleep(0)
+        executor = resolve_executor(stages)
+        scenarios = await self._resolve_load_scenarios(test)
+        
+        config = LoadGeneratorConfig(
+            target_url=test.target_url,
+            method=test.target_method or "GET",
+            headers=test.target_headers or {},
+            body=test.target_body,
+            stages=stages,
+            duration_seconds=total_duration,
+            max_vus=max_vus,
+            executor=executor,
+            scenarios=scenarios,
+            think_time=test.think_time or 0,
+        )
+        worker_count = resolve_worker_count(settings.LOAD_TEST_WORKERS, max_vus)
+        
+        start_time = time.time()
+        end_time = start_time + total_duration
+        if worker_count > 1:
+            runner = DistributedLoadRunner(config, start_time, worker_count)
+        else:
+            runner = create_runner(config, start_time)
+        stats = runner.stats
+        live_summary: Dict[str, Any] = {}
+        
+        async def store_partial_metrics(session: AsyncSession):
+            # Runs inside the sink's batched flush so the polled test detail keeps a recent timeline
+            if live_summary:
+                await self._store_load_test_metrics(
+                    test, {**live_summary, "timeline": list(timeline)}, db=session, commit=False
+                )
+        
+        sink = LoadMetricsSink(test.id, on_flush=store_partial_metrics)
         
         async def metrics_reporter():
-            """Periodically collect and store metrics"""
-            nonlocal total_requests, errors, latencies
-            last_requests = 0
+            """Collect per-second metrics into the write-behind sink"""
             last_time = time.time()
             
             while time.time() < end_time:
@@ -528,102 +510,84 @@ class PerformanceTestingService:
                 
                 now = time.time()
                 elapsed = now - start_time
-                current_vus = get_target_vus_at_time(elapsed)
+                if executor == EXECUTOR_RAMPING_VUS:
+                    current_vus = target_vus_at(stages, elapsed)
+                    target_rate = None
+                else:
+                    current_vus = max_vus
+                    target_rate = arrival_rate_at(stages, elapsed)
                 
-                async with lock:
-                    current_requests = total_requests
-                    current_errors = errors
-                    current_latencies = latencies.copy() if latencies else [0]
+                interval = runner.take_interval()
                 
                 # Calculate RPS for this interval
-                interval_requests = current_requests - last_requests
                 interval_time = now - last_time
-                rps = interval_requests / interval_time if interval_time > 0 else 0
+                rps = interval.requests / interval_time if interval_time > 0 else 0
                 
-                # Calculate avg latency for recent requests
-                recent_latencies = current_latencies[-100:] if current_latencies else [0]
-                avg_latency = sum(recent_latencies) / len(recent_latencies)
+                # Interval percentiles come straight from the histogram buckets
+                interval_percentiles = interval.latencies.percentiles((50.0, 95.0, 99.0))
+                phases = interval.phases
                 
                 # Update timeline
                 timestamp_str = datetime.utcnow().strftime("%H:%M:%S")
-                timeline.append({
+                point = {
                     "timestamp": timestamp_str,
-                    "requests": interval_requests,
-                    "avg_response_time": avg_latency,
-                    "errors": current_errors - (last_requests - current_requests + interval_requests) if len(timeline) > 0 else current_errors,
+                    "requests": interval.requests,
+                    "avg_response_time": interval.latencies.mean,
+                    "p50": interval_percentiles[50.0],
+                    "p95": interval_percentiles[95.0],
+                    "p99": interval_percentiles[99.0],
+                    "errors": stats.errors,
                     "vus": current_vus,
-                    "rps": rps
-                })
+                    "rps": rps,
+                    "target_rate": target_rate,
+                    "dropped_iterations": interval.dropped_iterations,
+                    "bytes_sent": interval.bytes_sent,
+                    "bytes_received": interval.bytes_received,
+                    "dns": phases["dns"].mean,
+                    "connect": phases["connect"].mean,
+                    "ttfb": phases["ttfb"].mean,
+                    "body": phases["body"].mean
+                }
+                timeline.append(point)
                 
-                last_requests = current_requests
                 last_time = now
                 
-                # Update progress in database
+                # Live progress goes out via Redis; samples are written in batches
                 progress = min(int((elapsed / total_duration) * 100), 99)
-                test.progress_percentage = progress
-                
-                sorted_latencies = sorted(current_latencies) if current_latencies else [0]
-                count = len(sorted_latencies)
-                
-                partial_result = {
-                    "total_requests_made": current_requests,
-                    "requests_per_second": current_requests / max(elapsed, 1),
-                    "latency_min": sorted_latencies[0],
-                    "latency_max": sorted_latencies[-1],
-                    "latency_avg": sum(sorted_latencies) / count,
-                    "latency_p50": sorted_latencies[int(count * 0.5)],
-                    "latency_p95": sorted_latencies[int(count * 0.95)] if count > 20 else sorted_latencies[-1],
-                    "error_count": current_errors,
-                    "timeline": list(timeline)
-                }
-                
-                try:
-                    await self._store_load_test_metrics(test, partial_result)
-                    await self.db.commit()
-                except Exception as e:
-                    logger.warning(f"Failed to update metrics: {e}")
-        
-        # Create connector with high connection limits for true concurrency
-        connector = aiohttp.TCPConnector(
-            limit=0,  # No limit on connections
-            limit_per_host=0,  # No limit per host
-            ttl_dns_cache=300,
-            force_close=False,  # Keep connections alive
-            enable_cleanup_closed=True
-        )
+                live_summary.update({
+                    "total_requests_made": stats.total_requests,
+                    "requests_per_second": stats.total_requests / max(elapsed, 1),
+                    **stats.latencies.cumulative.summary(),
+                    "error_count": stats.errors,
+                    "dropped_iterations": stats.dropped_iterations,
+                    "data_sent_bytes": stats.bytes_sent,
+                    "data_received_bytes": stats.bytes_received,
+                    "throughput_bytes_per_second": stats.bytes_received / max(elapsed, 1)
+                })
+                sink.add(int(elapsed), point, live_summary, progress)
         
-        stop_event = asyncio.Event()
+        # Start all VU workers - they will self-regulate based on stages
+        await runner.start()
+        await sink.start()
         
-        async with aiohttp.ClientSession(connector=connector) as session:
-            # Start all VU workers - they will self-regulate based on stages
-            vu_tasks = [
-                asyncio.create_task(virtual_user_loop(i, session, stop_event))
-                for i in range(max_vus)
-            ]
-            
-            # Start metrics reporter
-            reporter_task = asyncio.create_task(metrics_reporter())
-            
-            # Wait for test duration
-            try:
-                await asyncio.sleep(total_duration)
-            finally:
-                stop_event.set()
-                
-                # Give VUs time to finish current requests
-                await asyncio.sleep(1)
-                
-                # Cancel remaining tasks
-                for task in vu_tasks:
-                    task.cancel()
-                reporter_task.cancel()
-                
-                # Wait for cancellation
-                await asyncio.gather(*vu_tasks, reporter_task, return_exceptions=True)
+        # Start metrics reporter
+        reporter_task = asyncio.create_task(metrics_reporter())
+        
+        # Wait for test duration
+        try:
+            await asyncio.sleep(max(0, end_time - time.time()))
+        finally:
+            reporter_task.cancel()
+            await asyncio.gather(reporter_task, return_exceptions=True)
+            await runner.stop()
+            # Remaining samples are staged on self.db and commit with the final metrics
+            await sink.close(self.db)
         
         # Final calculations
-        final_latencies = sorted(latencies) if latencies else [0]
-        count = len(final_latencies)
+        total_requests = stats.total_requests
+        errors = stats.errors
+        final_latencies = stats.latencies.total()
+        timing_breakdown = stats.timing_breakdown()
         duration = max(time.time() - start_time, 1)
         
         logger.info(f"Load test completed: {total_requests} requests, {errors} errors, {total_requests/duration:.2f} RPS")
@@ -631,27 +595,101 @@ class PerformanceTestingService:
         result = {
             "total_requests_made": total_requests,
             "requests_per_second": total_requests / duration,
-            "latency_min": final_latencies[0],
-            "latency_max": final_latencies[-1],
-            "latency_avg": sum(final_latencies) / count,
-            "latency_p50": final_latencies[int(count * 0.5)],
-            "latency_p95": final_latencies[int(count * 0.95)] if count > 20 else final_latencies[-1],
-            "latency_p99": final_latencies[int(count * 0.99)] if count > 100 else final_latencies[-1],
-            "data_received_bytes": total_requests * 5000,  # Estimate ~5KB per response
-            "throughput_bytes_per_second": (total_requests * 5000) / duration,
+            **final_latencies.summary(),
+            "data_sent_bytes": stats.bytes_sent,
+            "data_received_bytes": stats.bytes_received,
+            "throughput_bytes_per_second": stats.bytes_received / duration,
+            "time_to_first_byte": timing_breakdown["ttfb"]["avg"],
+            "timing_breakdown": timing_breakdown,
             "error_count": errors,
             "error_rate": (errors / total_requests * 100) if total_requests > 0 else 0,
+            "dropped_iterations": stats.dropped_iterations,
+            "step_metrics": stats.step_metrics() if scenarios else None,
             "timeline": list(timeline),
             "raw_response": {
                 "local_execution": True, 
                 "execution_mode": "k6_compatible_concurrent_vus",
+                "executor": executor,
                 "stages_executed": len(stages),
-                "max_vus": max_vus
+                "max_vus": max_vus,
+                "worker_processes": worker_count,
+                "latency_p999": final_latencies.percentile(99.9),
+                "scenarios": [s.get("name") for s in scenarios],
+                "iterations": stats.iterations,
+                "failed_iterations": stats.failed_iterations
             }
         }
         
         test.progress_percentage = 100
         await self._store_load_test_metrics(test, result)
+        logger.info(f"Stored {sink.samples_written} load test samples in {sink.flushes + 1} writes")
+    
+    async def _resolve_load_scenarios(self, test: PerformanceTest) -> List[Dict[str, Any]]:
+        """
+        Expand scenario references to API testing definitions into plain steps.
+        A scenario may list ``steps`` (inline or ``{"api_request_id": ...}``,
+        whose other keys such as ``extract`` override the stored request) or
+        point at a whole ``collection_id``, whose environment seeds variables.
+        """
+        resolved = []
+        for scenario in test.scenarios or []:
+            scenario = dict(scenario)
+            variables = {}
+            
+            if scenario.get("collection_id"):
+                collection_result = await self.db.execute(
+                    select(ApiCollection).where(ApiCollection.id == UUID(str(scenario["collection_id"])))
+                )
+                collection = collection_result.scalar_one_or_none()
+                if not collection:
+                    raise ValueError(f"API collection {scenario['collection_id']} not found")
+                requests_result = await self.db.execute(
+                    select(APIRequest)
+                    .where(APIRequest.collection_id == collection.id)
+                    .order_by(APIRequest.order)
+                )
+                scenario.setdefault("name", collection.name)
+                scenario.setdefault("steps", [
+                    {"api_request_id": str(api_request.id)} for api_request in requests_result.scalars().all()
+                ])
+                variables = environment_variables(collection.environment)
+            
+            request_ids = {
+                UUID(str(step["api_request_id"]))
+                for step in scenario.get("steps") or []
+                if step.get("api_request_id")
+            }
+            api_requests = {}
+            if request_ids:
+                requests_result = await self.db.execute(
+                    select(APIRequest).where(APIRequest.id.in_(request_ids))
+                )
+                api_requests = {str(r.id): r for r in requests_result.scalars().all()}
+            
+            steps = []
+            for step in scenario.get("steps") or []:
+                request_id = step.get("api_request_id")
+                if request_id:
+                    api_request = api_requests.get(str(request_id))
+                    if not api_request:
+                        raise ValueError(f"API request {request_id} not found")
+                    base_step = api_request_to_step({
+                        "name": api_request.name,
+                        "method": api_request.method,
+                        "url": api_request.url,
+                        "params": api_request.params,
+                        "headers": api_request.headers,
+                        "body": api_request.body,
+                        "auth": api_request.auth,
+                    })
+                    step = {**base_step, **{k: v for k, v in step.items() if k != "api_request_id"}}
+                steps.append(step)
+            
+            scenario["steps"] = steps
+            scenario["variables"] = {**variables, **(scenario.get("variables") or {})}
+            scenario.pop("collection_id", None)
+            resolved.append(scenario)
+        return resolved
 
 
     async def _execute_api_test(self, test: PerformanceTest):
@@ -757,19 +795,30 @@ class PerformanceTestingService:
         
         await self.db.commit()
     
-    async def _store_load_test_metrics(self, test: PerformanceTest, result: Dict[str, Any]):
-        """Store or update load test metrics in database"""
+    async def _store_load_test_metrics(
+        self,
+        test: PerformanceTest,
+        result: Dict[str, Any],
+        db: Optional[AsyncSession] = None,
+        commit: bool = True
+    ):
+        """
+        Store or update load test metrics in database.
+        ``db``/``commit`` let the metrics sink write partial results on its
+        own session as part of a batched flush.
+        """
+        db = db or self.db
         timeline = result.get("timeline", [])
         
         # Check for existing metrics
-        existing_metrics_result = await self.db.execute(
+        existing_metrics_result = await db.execute(
             select(PerformanceMetrics).where(PerformanceMetrics.test_id == test.id)
         )
         metrics = existing_metrics_result.scalar_one_or_none()
         
         if not metrics:
             metrics = PerformanceMetrics(test_id=test.id)
-            self.db.add(metrics)
+            db.add(metrics)
             
         # Request metrics
         metrics.total_requests_made = result.get("total_requests_made")
@@ -780,12 +829,15 @@ class PerformanceTestingService:
         metrics.latency_max = result.get("latency_max")
         metrics.latency_avg = result.get("latency_avg")
         metrics.latency_p50 = result.get("latency_p50")
+        metrics.latency_p90 = result.get("latency_p90")
         metrics.latency_p95 = result.get("latency_p95")
         metrics.latency_p99 = result.get("latency_p99")
         
         # Throughput
         if result.get("data_received_bytes"):
             metrics.data_received_bytes = result.get("data_received_bytes")
+        if result.get("data_sent_bytes"):
+            metrics.data_sent_bytes = result.get("data_sent_bytes")
         if result.get("throughput_bytes_per_second"):
             metrics.throughput_bytes_per_second = result.get("throughput_bytes_per_second")
         
@@ -796,9 +848,28 @@ class PerformanceTestingService:
         # Max VUs
         metrics.max_virtual_users = test.virtual_users
         
+        # Request phase breakdown (dns/connect/ttfb/body) from the local engine
+        if result.get("timing_breakdown"):
+            metrics.timing_breakdown = result.get("timing_breakdown")
+            metrics.time_to_first_byte = result.get("time_to_first_byte")
+        
+        # Iterations dropped by arrival-rate executors (always 0 for the VU loop)
+        if result.get("dropped_iterations") is not None:
+            metrics.dropped_iterations = result.get("dropped_iterations")
+        
+        # Per-step results of scripted scenarios
+        if result.get("step_metrics"):
+            metrics.step_metrics = result.get("step_metrics")
+        
         # Timeline data for charts
         metrics.latency_timeline = [
-            {"timestamp": p.get("timestamp"), "value": p.get("avg_response_time")}
+            {
+                "timestamp": p.get("timestamp"),
+                "value": p.get("avg_response_time"),
+                "p50": p.get("p50"),
+                "p95": p.get("p95"),
+                "p99": p.get("p99"),
+            }
             for p in timeline
         ]
         metrics.rps_timeline = [
@@ -813,12 +884,29 @@ class PerformanceTestingService:
             {"timestamp": p.get("timestamp"), "value": p.get("vus", test.virtual_users)}
             for p in timeline
         ]
+        metrics.dropped_iterations_timeline = [
+            {"timestamp": p.get("timestamp"), "value": p.get("dropped_iterations", 0)}
+            for p in timeline
+        ]
+        metrics.network_timeline = [
+            {
+                "timestamp": p.get("timestamp"),
+                "bytes_sent": p.get("bytes_sent"),
+                "bytes_received": p.get("bytes_received"),
+                "dns": p.get("dns"),
+                "connect": p.get("connect"),
+                "ttfb": p.get("ttfb"),
+                "body": p.get("body"),
+            }
+            for p in timeline
+        ]
         
         # Raw data
         if result.get("raw_response"):
             metrics.raw_response = result.get("raw_response")
         
-        await self.db.commit()
+        if commit:
+            await db.commit()
     
     async def _check_thresholds(self, test: PerformanceTest):
         """Check if test results meet defined thresholds"""
@@ -1,9 +1,11 @@
 """
 Qdrant Vector Database Service for Knowledge Storage and Retrieval
 """
-from typing import Optional, List, Dict, Any
-from qdrant_client import QdrantClient, models
+from typing import Optional, List, Dict, Any, Sequence, Set
+from qdrant_client import AsyncQdrantClient, models
+from qdrant_client.http.exceptions import UnexpectedResponse
 from qdrant_client.models import Distance, VectorParams, PointStruct
+import asyncio
 import logging
 import uuid
 from datetime import datetime
@@ -12,32 +14,67 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# QDRANT_URL value selecting the in-process store (tests, local development)
+IN_MEMORY_LOCATION = ":memory:"
+
+
+def point_id_to_int(point_id: str) -> int:
+    """
+    Qdrant point ID for an application ID. UUIDs map directly; other
+    strings (e.g. "<document>_chunk_<n>") go through a deterministic UUIDv5.
+    """
+    try:
+        value = uuid.UUID(point_id)
+    except ValueError:
+        value = uuid.uuid5(uuid.NAMESPACE_URL, point_id)
+    return int(value.int) % (2 ** 63)
+
+
+def create_qdrant_client() -> AsyncQdrantClient:
+    """Async client for the configured Qdrant (one HTTP connection pool per process)"""
+    if settings.QDRANT_URL == IN_MEMORY_LOCATION:
+        return AsyncQdrantClient(location=IN_MEMORY_LOCATION)
+    if settings.QDRANT_API_KEY:
+        return AsyncQdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+    return AsyncQdrantClient(url=settings.QDRANT_URL)
+
+
+def _format_match(result) -> Dict[str, Any]:
+    return {
+        "id": str(result.id),
+        "score": result.score,
+        "payload": result.payload,
+    }
+
 
 class QdrantService:
     """
     Service for interacting with Qdrant vector database.
     Handles collection management, vector storage, and semantic search.
+
+    All calls go through the native async client, so they never block the
+    event loop. Collections known to exist are remembered per process.
     """
 
-    def __init__(self):
+    def __init__(self, client: Optional[AsyncQdrantClient] = None):
         """Initialize Qdrant client connection."""
         try:
-            if settings.QDRANT_API_KEY:
-                self.client = QdrantClient(
-                    url=settings.QDRANT_URL,
-                    api_key=settings.QDRANT_API_KEY
-                )
-            else:
-                self.client = QdrantClient(url=settings.QDRANT_URL)
+            self.client = client or create_qdrant_client()
             logger.info(f"Connected to Qdrant at {settings.QDRANT_URL}")
         except Exception as e:
             logger.error(f"Failed to connect to Qdrant: {e}")
             raise
+        self._known_collections: Set[str] = set()
+        self._collection_locks: Dict[str, asyncio.Lock] = {}
+
+    async def close(self) -> None:
+        await self.client.close()
 
     async def ensure_collection_exists(
         self,
         collection_name: str,
         vector_size: int = 1536,  # OpenAI text-embedding-3-small size
+        payload_indexes: Sequence[str] = (),
     ) -> bool:
         """
         Ensure a collection exists in Qdrant. Creates it if it doesn't.
@@ -45,26 +82,55 @@ class QdrantService:
         Args:
             collection_name: Name of the collection
             vector_size: Size of vectors (default for OpenAI embeddings)
+            payload_indexes: Keyword payload fields to index when creating it (used in filters)
 
         Returns:
             True if collection exists or was created successfully
         """
-        try:
-            collections = self.client.get_collections()
-            if collection_name in [col.name for col in collections.collections]:
-                logger.debug(f"Collection '{collection_name}' already exists")
+        if collection_name in self._known_collections:
+            return True
+
+        lock = self._collection_locks.setdefault(collection_name, asyncio.Lock())
+        async with lock:
+            if collection_name in self._known_collections:
                 return True
+            try:
+                if await self._collection_exists(collection_name):
+                    logger.debug(f"Collection '{collection_name}' already exists")
+                else:
+                    try:
+                        await self.client.create_collection(
+                            collection_name=collection_name,
+                            vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+                        )
+                        for field_name in payload_indexes:
+                            await self.client.create_payload_index(
+                                collection_name=collection_name,
+                                field_name=field_name,
+                                field_schema=models.PayloadSchemaType.KEYWORD,
+                            )
+                        logger.info(f"Created collection '{collection_name}'")
+                    except (UnexpectedResponse, ValueError) as e:
+                        # Another worker created it first
+                        if not await self._collection_exists(collection_name):
+                            raise e
+                self._known_collections.add(collection_name)
+                return True
+            except Exception as e:
+                logger.error(f"Error ensuring collection exists: {e}")
+                raise
 
-            # Create collection
-            self.client.create_collection(
-                collection_name=collection_name,
-                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
-            )
-            logger.info(f"Created collection '{collection_name}'")
+    async def _collection_exists(self, collection_name: str) -> bool:
+        try:
+            await self.client.get_collection(collection_name)
             return True
-        except Exception as e:
-            logger.error(f"Error ensuring collection exists: {e}")
+        except UnexpectedResponse as e:
+            if e.status_code == 404:
+                return False
             raise
+        except ValueError:
+            # Local (in-memory) mode reports a missing collection as ValueError
+            return False
 
     async def store_vector(
         self,
@@ -96,7 +162,7 @@ class QdrantService:
             payload["stored_at"] = datetime.utcnow().isoformat()
 
             # Convert UUID string to integer for Qdrant point ID
-            point_id_int = int(uuid.UUID(point_id).int) % (2 ** 63)
+            point_id_int = point_id_to_int(point_id)
 
             point = PointStruct(
                 id=point_id_int,
@@ -104,7 +170,7 @@ class QdrantService:
                 payload=payload,
             )
 
-            self.client.upsert(
+            await self.client.upsert(
                 collection_name=collection_name,
                 points=[point],
             )
@@ -116,12 +182,52 @@ class QdrantService:
             logger.error(f"Error storing vector: {e}")
             raise
 
+    async def store_vectors(
+        self,
+        collection_name: str,
+        point_ids: List[str],
+        vectors: List[List[float]],
+        payloads: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Store many vector points with one upsert per page.
+
+        Args:
+            collection_name: Name of the collection
+            point_ids: IDs of the points
+            vectors: Vector embeddings, aligned with point_ids
+            payloads: Metadata per point, aligned with point_ids
+            batch_size: Points per upsert request (default VECTOR_UPSERT_BATCH_SIZE)
+
+        Returns:
+            The point IDs
+        """
+        batch_size = batch_size or settings.VECTOR_UPSERT_BATCH_SIZE
+        stored_at = datetime.utcnow().isoformat()
+        points = [
+            PointStruct(id=point_id_to_int(point_id), vector=vector, payload={**payload, "stored_at": stored_at})
+            for point_id, vector, payload in zip(point_ids, vectors, payloads)
+        ]
+        try:
+            for start in range(0, len(points), batch_size):
+                await self.client.upsert(
+                    collection_name=collection_name,
+                    points=points[start:start + batch_size],
+                )
+            logger.debug(f"Stored {len(points)} vectors in '{collection_name}'")
+            return list(point_ids)
+        except Exception as e:
+            logger.error(f"Error storing vectors: {e}")
+            raise
+
     async def search_vectors(
         self,
         collection_name: str,
         query_vector: List[float],
         limit: int = 5,
         score_threshold: float = 0.7,
+        query_filter: Optional[models.Filter] = None,
     ) -> List[Dict[str, Any]]:
         """
         Search for similar vectors in a collection.
@@ -131,27 +237,22 @@ class QdrantService:
             query_vector: Query embedding vector
             limit: Maximum number of results
             score_threshold: Minimum similarity score (0-1)
+            query_filter: Optional payload filter applied inside the search
 
         Returns:
             List of matching points with metadata
         """
         try:
-            results = self.client.search(
+            results = await self.client.search(
                 collection_name=collection_name,
                 query_vector=query_vector,
+                query_filter=query_filter,
                 limit=limit,
                 score_threshold=score_threshold,
             )
 
             # Format results
-            matches = []
-            for result in results:
-                match = {
-                    "id": str(result.id),
-                    "score": result.score,
-                    "payload": result.payload,
-                }
-                matches.append(match)
+            matches = [_format_match(result) for result in results]
 
             logger.debug(f"Found {len(matches)} matches in '{collection_name}'")
             return matches
@@ -160,6 +261,46 @@ class QdrantService:
             logger.error(f"Error searching vectors: {e}")
             return []
 
+    async def search_vectors_batch(
+        self,
+        collection_name: str,
+        query_vectors: List[List[float]],
+        limit: int = 5,
+        score_threshold: float = 0.7,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several query vectors in one request.
+
+        Args:
+            collection_name: Name of the collection
+            query_vectors: Query embedding vectors
+            limit: Maximum number of results per query
+            score_threshold: Minimum similarity score (0-1)
+
+        Returns:
+            One list of matching points per query vector, in order
+        """
+        if not query_vectors:
+            return []
+        try:
+            results = await self.client.search_batch(
+                collection_name=collection_name,
+                requests=[
+                    models.SearchRequest(
+                        vector=vector,
+                        limit=limit,
+                        score_threshold=score_threshold,
+                        with_payload=True,
+                    )
+                    for vector in query_vectors
+                ],
+            )
+            return [[_format_match(result) for result in batch] for batch in results]
+
+        except Exception as e:
+            logger.error(f"Error batch searching vectors: {e}")
+            return [[] for _ in query_vectors]
+
     async def delete_point(
         self,
         collection_name: str,
@@ -176,9 +317,9 @@ class QdrantService:
             True if successful
         """
         try:
-            point_id_int = int(uuid.UUID(point_id).int) % (2 ** 63)
+            point_id_int = point_id_to_int(point_id)
 
-            self.client.delete(
+            await self.client.delete(
                 collection_name=collection_name,
                 points_selector=models.PointIdsList(
                     points=[point_id_int],
@@ -202,8 +343,9 @@ class QdrantService:
         Returns:
             True if successful
         """
+        self._known_collections.discard(collection_name)
         try:
-            self.client.delete_collection(collection_name=collection_name)
+            await self.client.delete_collection(collection_name=collection_name)
             logger.info(f"Deleted collection '{collection_name}'")
             return True
 
@@ -222,7 +364,7 @@ class QdrantService:
             Collection statistics
         """
         try:
-            collection_info = self.client.get_collection(collection_name)
+            collection_info = await self.client.get_collection(collection_name)
             return {
                 "points_count": collection_info.points_count,
                 "vectors_count": collection_info.vectors_count,
@@ -248,3 +390,11 @@ async def get_qdrant_service() -> QdrantService:
     if _qdrant_service is None:
         _qdrant_service = QdrantService()
     return _qdrant_service
+
+
+async def close_qdrant_service() -> None:
+    """Close the shared client's connections (call on shutdown)"""
+    global _qdrant_service
+    if _qdrant_service is not None:
+        await _qdrant_service.close()
+        _qdrant_service = None
@@ -0,0 +1,149 @@
+"""
+RASP Rate Limiter
+Sliding-window request limits per source, kept in process (bounded LRU) or shared by all workers in Redis
+"""
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.cache import get_redis_client, note_redis_error, redis_available
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "rasp:rl:"
+
+# Sliding-window counter: the current fixed window's count plus the previous
+# window's count weighted by how much of it still overlaps the sliding window.
+# Three numbers per key whatever the rate, and the same arithmetic as
+# LocalRateLimitStore. Redis's clock is used so every worker agrees on windows.
+# KEYS[1] = counter hash, ARGV[1] = limit, ARGV[2] = window (ms). Returns 1 if allowed.
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local start = now - (now % window)
+local state = redis.call('HMGET', KEYS[1], 'start', 'current', 'previous')
+local last = tonumber(state[1])
+local current = tonumber(state[2]) or 0
+local previous = tonumber(state[3]) or 0
+if last ~= start then
+    if last == start - window then previous = current else previous = 0 end
+    current = 0
+end
+if previous * (window - (now - start)) / window + current >= limit then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'start', start, 'current', current + 1, 'previous', previous)
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return 1
+"""
+
+
+class RateLimitStore(ABC):
+    """Counts requests per key; ``allow`` records one and says whether it is within the limit"""
+
+    @abstractmethod
+    async def allow(self, key: str, limit: int, window: float) -> bool:
+        pass
+
+
+class _Window:
+    __slots__ = ("start", "current", "previous")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.current = 0
+        self.previous = 0
+
+
+class LocalRateLimitStore(RateLimitStore):
+    """
+    Sliding-window counters for this process only, at most ``max_keys`` of
+    them. The least recently seen key is dropped first, so a flood of
+    one-off source IPs costs bounded memory and evicts only other idle IPs;
+    an evicted key simply starts counting again.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max(1, max_keys)
+        self.evictions = 0
+        self._windows: "OrderedDict[str, _Window]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def consume(self, key: str, limit: int, window: float, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        start = now - (now % window)
+        state = self._windows.get(key)
+        if state is None:
+            state = self._windows[key] = _Window(start)
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._windows.move_to_end(key)
+            if state.start != start:
+                state.previous = state.current if state.start == start - window else 0
+                state.current = 0
+                state.start = start
+
+        if state.previous * (window - (now - start)) / window + state.current >= limit:
+            return False
+        state.current += 1
+        return True
+
+    async def allow(self, key: str, limit: int, window: float) -> bool:
+        return self.consume(key, limit, window)
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Sliding-window counters shared by every worker, updated atomically by a
+    Lua script (one round trip per request). While Redis is unreachable the
+    ``fallback`` store keeps limits per process rather than letting all
+    traffic through.
+    """
+
+    def __init__(self, fallback: LocalRateLimitStore):
+        self.fallback = fallback
+        self.errors = 0
+        self._script = None
+
+    async def allow(self, key: str, limit: int, window: float) -> bool:
+        if redis_available():
+            try:
+                client = await get_redis_client()
+                if self._script is None:
+                    self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+                allowed = await self._script(
+                    keys=[f"{RATE_LIMIT_KEY_PREFIX}{key}"],
+                    args=[limit, max(1, int(window * 1000))],
+                    client=client,
+                )
+                return bool(int(allowed))
+            except Exception as e:
+                self.errors += 1
+                note_redis_error(e)
+                logger.warning(f"RASP rate limit check fell back to local counters: {e}")
+        return self.fallback.consume(key, limit, window)
+
+
+# Singleton instance
+_rate_limit_store: Optional[RateLimitStore] = None
+
+
+def get_rate_limit_store() -> RateLimitStore:
+    """Process-wide rate limit store for RASP, per RASP_RATE_LIMIT_BACKEND"""
+    global _rate_limit_store
+    if _rate_limit_store is None:
+        local = LocalRateLimitStore(settings.RASP_RATE_LIMIT_MAX_KEYS)
+        if settings.RASP_RATE_LIMIT_BACKEND.lower() == "redis":
+            _rate_limit_store = RedisRateLimitStore(fallback=local)
+        else:
+            _rate_limit_store = local
+    return _rate_limit_store
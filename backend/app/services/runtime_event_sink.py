@@ -0,0 +1,343 @@
+"""
+Runtime Event Sink
+Write-behind persistence of RASP events and IAST findings, with repeats merged and per-minute RASP rollups
+"""
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import Enum, String, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, DataError, DisconnectionError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.security_advanced_models import IASTFinding, RASPEvent, RASPEventRollup
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_POLICIES = ("sample", "drop")
+
+# Columns that make two events (or findings) the same one seen again
+RASP_EVENT_IDENTITY = (
+    "project_id", "config_id", "attack_type", "was_blocked", "source_ip", "http_method", "request_path",
+    "attack_payload",
+)
+IAST_FINDING_IDENTITY = ("session_id", "vulnerability_type", "http_method", "request_url", "sink_location", "tainted_input")
+
+ROLLUP_CONFLICT_COLUMNS = ("project_id", "minute", "attack_type", "was_blocked")
+
+Pending = "OrderedDict[Tuple, Dict[str, Any]]"
+
+
+def _string_limits(model) -> Dict[str, int]:
+    """Bounded string columns of a model and their lengths"""
+    return {
+        column.name: column.type.length
+        for column in model.__table__.columns
+        if isinstance(column.type, String) and not isinstance(column.type, Enum) and column.type.length
+    }
+
+
+RASP_EVENT_LIMITS = _string_limits(RASPEvent)
+IAST_FINDING_LIMITS = _string_limits(IASTFinding)
+
+
+def _truncate(row: Dict[str, Any], limits: Dict[str, int]) -> Dict[str, Any]:
+    """Cut attacker-controlled strings to their column length so one long value can't fail a whole batch"""
+    oversized = {
+        name: row[name][:limit] for name, limit in limits.items()
+        if isinstance(row.get(name), str) and len(row[name]) > limit
+    }
+    return dict(row, **oversized) if oversized else row
+
+
+def _is_transient(error: Exception) -> bool:
+    """Errors where the database was unreachable rather than refusing the rows; only these are retried"""
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated or isinstance(error, (OperationalError, InterfaceError))
+    return isinstance(error, (OSError, PoolTimeoutError, DisconnectionError))
+
+
+class RuntimeEventSink:
+    """
+    Buffers RASP events and IAST findings so the request path never waits on
+    the database.
+
+    ``record_*`` only touches memory: an event identical to one already
+    pending bumps that row's ``occurrences`` instead of adding a row, and
+    every RASP event is counted in its per-minute rollup. A background task
+    bulk-inserts the pending rows and upserts the rollups in one transaction
+    every ``flush_interval`` seconds, or as soon as ``batch_size`` distinct
+    rows are waiting.
+
+    A batch that fails because the database is unreachable is put back and
+    retried on the next flush. One the database rejects (a constraint or data
+    error) is retried row by row, each in its own savepoint, and the rows
+    that still fail are logged and dropped so they can't block later events.
+
+    At most ``max_pending`` distinct rows are held. Past that, new ones are
+    dropped; with the "sample" policy only ``sample_rate`` of new ones are
+    kept once the buffer is half full. Rollups are counted before shedding,
+    so event statistics stay exact under overload.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        overload_policy: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval if flush_interval is not None else settings.RUNTIME_EVENT_FLUSH_SECONDS
+        self.batch_size = max(1, batch_size or settings.RUNTIME_EVENT_BATCH_SIZE)
+        self.max_pending = max(1, max_pending or settings.RUNTIME_EVENT_MAX_PENDING)
+        self.overload_policy = (overload_policy or settings.RUNTIME_EVENT_OVERLOAD_POLICY).lower()
+        if self.overload_policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy {self.overload_policy!r}, expected one of {OVERLOAD_POLICIES}")
+        self.sample_rate = settings.RUNTIME_EVENT_SAMPLE_RATE if sample_rate is None else sample_rate
+
+        self._events: Pending = OrderedDict()
+        self._findings: Pending = OrderedDict()
+        self._rollups: Dict[Tuple, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.queued = 0
+        self.merged = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.rejected = 0
+        self._shed_since_flush = 0
+
+    @property
+    def pending(self) -> int:
+        """Distinct rows waiting to be written"""
+        return len(self._events) + len(self._findings)
+
+    # ========================================================================
+    # Request path
+    # ========================================================================
+
+    def record_rasp_event(self, row: Dict[str, Any]) -> bool:
+        """Queue a RASP event (RASPEvent column values); False if it was shed"""
+        now = datetime.utcnow()
+        row = _truncate(row, RASP_EVENT_LIMITS)
+        bucket = (row["project_id"], now.replace(second=0, microsecond=0), row["attack_type"], row.get("was_blocked", True))
+        self._rollups[bucket] = self._rollups.get(bucket, 0) + 1
+        return self._queue(self._events, RASP_EVENT_IDENTITY, row, now, "occurred_at", "last_occurred_at")
+
+    def record_iast_finding(self, row: Dict[str, Any]) -> bool:
+        """Queue an IAST finding (IASTFinding column values); False if it was shed"""
+        row = _truncate(row, IAST_FINDING_LIMITS)
+        return self._queue(self._findings, IAST_FINDING_IDENTITY, row, datetime.utcnow(), "detected_at", None)
+
+    def _queue(self, pending: Pending, identity: Sequence[str], row: Dict[str, Any], now: datetime,
+               first_seen: str, last_seen: Optional[str]) -> bool:
+        self._ensure_running()
+        key = tuple(row.get(column) for column in identity)
+        existing = pending.get(key)
+        if existing is not None:
+            existing["occurrences"] += 1
+            if last_seen:
+                existing[last_seen] = now
+            self.merged += 1
+            return True
+
+        if not self._admit():
+            self._shed_since_flush += 1
+            return False
+        row = dict(row, occurrences=1)
+        row[first_seen] = now
+        if last_seen:
+            row[last_seen] = now
+        pending[key] = row
+        self.queued += 1
+        if self.pending >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def _admit(self) -> bool:
+        pending = self.pending
+        if pending >= self.max_pending:
+            self.dropped += 1
+            return False
+        if self.overload_policy == "sample" and pending >= self.max_pending // 2 and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return False
+        return True
+
+    # ========================================================================
+    # Background writer
+    # ========================================================================
+
+    def _ensure_running(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop (sync caller); rows wait for the next flush()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def close(self) -> None:
+        """Stop the background task and write whatever is still pending"""
+        self._closing = True
+        task, self._task = self._task, None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self._wakeup.set()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+
+    def _take(self) -> Tuple[Pending, Pending, Dict[Tuple, int]]:
+        taken = (self._events, self._findings, self._rollups)
+        self._events, self._findings, self._rollups = OrderedDict(), OrderedDict(), {}
+        return taken
+
+    async def flush(self) -> int:
+        """Write everything pending in one transaction; returns the number of event and finding rows written"""
+        events, findings, rollups = self._take()
+        if self._shed_since_flush:
+            logger.warning(
+                f"Runtime event sink shed {self._shed_since_flush} events under load "
+                f"({self.overload_policy} policy, {self.max_pending} pending max)"
+            )
+            self._shed_since_flush = 0
+        if not (events or findings or rollups):
+            return 0
+
+        total = len(events) + len(findings)
+        try:
+            try:
+                await self._write(events, findings, rollups, row_by_row=False)
+                rejected = 0
+            except (DataError, IntegrityError) as e:
+                logger.warning(f"Database rejected a runtime event batch, retrying row by row: {e.orig}")
+                rejected = await self._write(events, findings, rollups, row_by_row=True)
+        except Exception as e:
+            self.errors += 1
+            if _is_transient(e):
+                logger.warning(f"Failed to write {len(events)} RASP events and {len(findings)} IAST findings: {e}")
+                self._restore(events, findings, rollups)
+            else:
+                logger.error(f"Dropping {len(events)} RASP events and {len(findings)} IAST findings: {e}")
+                self.dropped += total
+            return 0
+
+        self.written += total - rejected
+        self.flushes += 1
+        return total - rejected
+
+    async def _write(self, events: Pending, findings: Pending, rollups: Dict[Tuple, int], row_by_row: bool) -> int:
+        """
+        One transaction for the whole batch. Row by row, each row gets a
+        savepoint and rejected ones are skipped; returns how many event and
+        finding rows were skipped.
+        """
+        batches = (
+            (insert(RASPEvent), list(events.values()), True),
+            (insert(IASTFinding), list(findings.values()), True),
+            (self._rollup_statement(), [
+                dict(zip(ROLLUP_CONFLICT_COLUMNS, bucket), event_count=count) for bucket, count in rollups.items()
+            ], False),
+        )
+        rejected = 0
+        async with self.session_factory() as session:
+            for statement, rows, counted in batches:
+                if not row_by_row:
+                    for start in range(0, len(rows), self.batch_size):
+                        await session.execute(statement, rows[start:start + self.batch_size])
+                    continue
+                for row in rows:
+                    try:
+                        async with session.begin_nested():
+                            await session.execute(statement, [row])
+                    except (DataError, IntegrityError) as e:
+                        self.rejected += 1
+                        if counted:
+                            rejected += 1
+                        logger.warning(f"Dropping {statement.table.name} row rejected by the database: {e.orig}")
+            await session.commit()
+        return rejected
+
+    @staticmethod
+    def _rollup_statement():
+        stmt = pg_insert(RASPEventRollup)
+        return stmt.on_conflict_do_update(
+            index_elements=list(ROLLUP_CONFLICT_COLUMNS),
+            set_={"event_count": RASPEventRollup.event_count + stmt.excluded.event_count},
+        )
+
+    def _restore(self, events: Pending, findings: Pending, rollups: Dict[Tuple, int]) -> None:
+        """Put an unwritten batch back ahead of newer rows; past max_pending the oldest events go first"""
+        for failed, attribute, last_seen in ((events, "_events", "last_occurred_at"), (findings, "_findings", None)):
+            newer = getattr(self, attribute)
+            for key, row in newer.items():
+                earlier = failed.get(key)
+                if earlier is None:
+                    failed[key] = row
+                    continue
+                earlier["occurrences"] += row["occurrences"]
+                if last_seen:
+                    earlier[last_seen] = row[last_seen]
+            setattr(self, attribute, failed)
+        while self.pending > self.max_pending:
+            oldest = self._events if self._events else self._findings
+            oldest.popitem(last=False)
+            self.dropped += 1
+        for bucket, count in rollups.items():
+            self._rollups[bucket] = self._rollups.get(bucket, 0) + count
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "queued": self.queued,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "written": self.written,
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "rejected": self.rejected,
+        }
+
+
+# Singleton instance
+_runtime_event_sink: Optional[RuntimeEventSink] = None
+
+
+def get_runtime_event_sink() -> RuntimeEventSink:
+    """Process-wide sink shared by the RASP and IAST services"""
+    global _runtime_event_sink
+    if _runtime_event_sink is None:
+        _runtime_event_sink = RuntimeEventSink()
+    return _runtime_event_sink
+
+
+async def close_runtime_event_sink() -> None:
+    """Flush pending events on shutdown"""
+    if _runtime_event_sink is not None:
+        await _runtime_event_sink.close()
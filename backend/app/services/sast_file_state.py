@@ -0,0 +1,189 @@
+"""
+SAST File State
+Content-hash manifests and per-engine cached findings behind incremental SAST scans
+"""
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.security_advanced_models import FindingStatus, SASTFileState, SASTFinding, SASTScan
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every cached file state (e.g. when the serialized finding format changes)
+STATE_VERSION = 1
+# Paths per IN (...) statement when loading or deleting states and closing findings
+PATH_CHUNK_SIZE = 1000
+# Bytes read per hash update, so large files aren't loaded into memory at once
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def hash_file(filepath: str) -> str:
+    """sha256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(root: str, filepaths: Iterable[str]) -> Dict[str, str]:
+    """Map each file (relative to root) to its content hash; unreadable files are skipped"""
+    manifest: Dict[str, str] = {}
+    for filepath in filepaths:
+        try:
+            manifest[os.path.relpath(filepath, root)] = hash_file(filepath)
+        except OSError as e:
+            logger.warning(f"Could not hash {filepath}: {e}")
+    return manifest
+
+
+def rules_hash(*parts: Any) -> str:
+    """Stable hash of whatever determines an engine's findings for a given file"""
+    payload = json.dumps([STATE_VERSION, *parts], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def relative_path(root: str, file_path: str) -> str:
+    """Engine-reported path relative to the scanned tree (engines echo back absolute or root-prefixed paths)"""
+    normalized = os.path.normpath(file_path)
+    root = os.path.normpath(root)
+    if os.path.isabs(normalized) or normalized == root or normalized.startswith(root + os.sep):
+        return os.path.relpath(normalized, root)
+    return normalized
+
+
+@dataclass
+class FileDelta:
+    """How a manifest differs from an engine's stored file states"""
+    changed: List[str] = field(default_factory=list)  # New, edited, or produced under different rules
+    unchanged: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)  # Stored but no longer in the tree
+
+
+def diff_file_states(
+    manifest: Dict[str, str],
+    states: Dict[str, Tuple[str, str]],
+    current_rules_hash: str,
+    reuse: bool = True,
+) -> FileDelta:
+    """
+    Compare a manifest with stored (content_hash, rules_hash) pairs.
+    With reuse=False every file counts as changed (full rescan).
+    """
+    delta = FileDelta()
+    for path in sorted(manifest):
+        if reuse and states.get(path) == (manifest[path], current_rules_hash):
+            delta.unchanged.append(path)
+        else:
+            delta.changed.append(path)
+    delta.deleted = sorted(path for path in states if path not in manifest)
+    return delta
+
+
+def _chunks(paths: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(paths), PATH_CHUNK_SIZE):
+        yield paths[start:start + PATH_CHUNK_SIZE]
+
+
+# ============================================================================
+# Persistence
+# ============================================================================
+
+async def load_file_states(db: AsyncSession, project_id: UUID, engine: str) -> Dict[str, Tuple[str, str]]:
+    """file_path -> (content_hash, rules_hash) for one project and engine"""
+    result = await db.execute(
+        select(SASTFileState.file_path, SASTFileState.content_hash, SASTFileState.rules_hash).where(
+            SASTFileState.project_id == project_id,
+            SASTFileState.engine == engine,
+        )
+    )
+    return {row.file_path: (row.content_hash, row.rules_hash) for row in result.all()}
+
+
+async def load_cached_findings(
+    db: AsyncSession, project_id: UUID, engine: str, paths: Iterable[str]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Stored findings of ``paths``; only files that had findings are read back"""
+    cached: Dict[str, List[Dict[str, Any]]] = {}
+    for chunk in _chunks(sorted(set(paths))):
+        result = await db.execute(
+            select(SASTFileState.file_path, SASTFileState.findings).where(
+                SASTFileState.project_id == project_id,
+                SASTFileState.engine == engine,
+                SASTFileState.file_path.in_(chunk),
+                func.json_array_length(SASTFileState.findings) > 0,
+            )
+        )
+        cached.update({row.file_path: row.findings for row in result.all()})
+    return cached
+
+
+async def save_file_states(
+    db: AsyncSession, project_id: UUID, engine: str, rows: List[Dict[str, Any]]
+) -> None:
+    """
+    Upsert file states in pages of FINDINGS_BATCH_SIZE.
+    Each row needs file_path, content_hash, rules_hash and findings.
+    """
+    if not rows:
+        return
+    insert_stmt = pg_insert(SASTFileState)
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=["project_id", "engine", "file_path"],
+        set_={
+            "content_hash": insert_stmt.excluded.content_hash,
+            "rules_hash": insert_stmt.excluded.rules_hash,
+            "findings": insert_stmt.excluded.findings,
+            "updated_at": func.now(),
+        },
+    )
+    page_size = max(1, settings.FINDINGS_BATCH_SIZE)
+    for start in range(0, len(rows), page_size):
+        page = [{**row, "project_id": project_id, "engine": engine} for row in rows[start:start + page_size]]
+        await db.execute(stmt, page)
+        await db.commit()
+
+
+async def delete_file_states(db: AsyncSession, project_id: UUID, engine: str, paths: List[str]) -> None:
+    """Forget files that no longer exist in the tree"""
+    for chunk in _chunks(paths):
+        await db.execute(
+            delete(SASTFileState).where(
+                SASTFileState.project_id == project_id,
+                SASTFileState.engine == engine,
+                SASTFileState.file_path.in_(chunk),
+            )
+        )
+    if paths:
+        await db.commit()
+
+
+async def close_findings_for_deleted_files(db: AsyncSession, project_id: UUID, paths: List[str]) -> int:
+    """Mark the project's open findings in deleted files as fixed"""
+    closed = 0
+    project_scans = select(SASTScan.id).where(SASTScan.project_id == project_id)
+    for chunk in _chunks(paths):
+        result = await db.execute(
+            update(SASTFinding)
+            .where(
+                SASTFinding.scan_id.in_(project_scans),
+                SASTFinding.file_path.in_(chunk),
+                SASTFinding.status.in_([FindingStatus.OPEN, FindingStatus.CONFIRMED]),
+            )
+            .values(status=FindingStatus.FIXED)
+            .execution_options(synchronize_session=False)
+        )
+        closed += result.rowcount or 0
+    if paths:
+        await db.commit()
+    return closed
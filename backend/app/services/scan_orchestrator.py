@@ -0,0 +1,132 @@
+"""
+Scan Orchestrator
+Fans scan checks out as concurrent jobs under per-scan and per-organisation limits
+"""
+import asyncio
+import logging
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-organisation semaphores, per event loop (Celery tasks each run their own loop)
+_organisation_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def organisation_semaphore(organisation_id: Hashable, limit: int) -> asyncio.Semaphore:
+    """
+    Semaphore shared by every scan of an organisation running in this process.
+    The limit of the first scan to ask wins until the process restarts.
+    """
+    limits = _organisation_limits.setdefault(asyncio.get_running_loop(), {})
+    if organisation_id not in limits:
+        limits[organisation_id] = asyncio.Semaphore(max(1, limit))
+    return limits[organisation_id]
+
+
+@dataclass
+class CheckJob:
+    """One check against one target"""
+    key: Any  # Caller's handle for the target
+    check: str
+    run: Callable[[], Awaitable[Any]]  # Returns plain data; must not touch the scan's DB session
+
+
+@dataclass
+class CheckResult:
+    """A finished CheckJob"""
+    key: Any
+    check: str
+    duration_ms: float
+    error: Optional[BaseException] = None
+    value: Any = None  # What run() returned
+
+
+@dataclass
+class CheckTelemetry:
+    """Aggregated durations of one check across all targets of a scan"""
+    runs: int = 0
+    failures: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def record(self, result: CheckResult) -> None:
+        self.runs += 1
+        self.failures += result.error is not None
+        self.total_ms += result.duration_ms
+        self.max_ms = max(self.max_ms, result.duration_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "total_ms": round(self.total_ms, 1),
+            "avg_ms": round(self.total_ms / self.runs, 1) if self.runs else 0.0,
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class ScanOrchestrator:
+    """
+    Runs CheckJobs concurrently and yields their results as they finish.
+    At most ``scan_concurrency`` jobs of this scan, and ``organisation_concurrency``
+    jobs of all the organisation's scans, run at once. Jobs must not touch the
+    scan's DB session or ORM objects: they return their results, and the caller
+    applies them from the loop consuming run().
+    """
+
+    def __init__(
+        self,
+        scan_concurrency: int,
+        organisation_id: Optional[Hashable] = None,
+        organisation_concurrency: int = 0,
+    ):
+        self.scan_concurrency = max(1, scan_concurrency)
+        self.organisation_id = organisation_id
+        self.organisation_concurrency = organisation_concurrency
+        self.telemetry: Dict[str, CheckTelemetry] = {}
+
+    async def _run_job(
+        self, job: CheckJob, scan_limit: asyncio.Semaphore, organisation_limit: Optional[asyncio.Semaphore]
+    ) -> CheckResult:
+        # Scan slot first: a scan's backlog must not park in the organisation's slots
+        async with scan_limit:
+            if organisation_limit is not None:
+                await organisation_limit.acquire()
+            try:
+                started = time.perf_counter()
+                error = value = None
+                try:
+                    value = await job.run()
+                except Exception as e:
+                    logger.warning(f"Check {job.check} failed: {e}")
+                    error = e
+                return CheckResult(job.key, job.check, (time.perf_counter() - started) * 1000, error, value)
+            finally:
+                if organisation_limit is not None:
+                    organisation_limit.release()
+
+    async def run(self, jobs: List[CheckJob]) -> AsyncIterator[CheckResult]:
+        """Yield each job's result in completion order; pending jobs are cancelled if the caller stops early"""
+        scan_limit = asyncio.Semaphore(self.scan_concurrency)
+        organisation_limit = None
+        if self.organisation_id is not None and self.organisation_concurrency > 0:
+            organisation_limit = organisation_semaphore(self.organisation_id, self.organisation_concurrency)
+
+        tasks = [asyncio.ensure_future(self._run_job(job, scan_limit, organisation_limit)) for job in jobs]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                self.telemetry.setdefault(result.check, CheckTelemetry()).record(result)
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def timings(self) -> Dict[str, Dict[str, Any]]:
+        """Per-check telemetry for the scan record"""
+        return {check: telemetry.as_dict() for check, telemetry in self.telemetry.items()}
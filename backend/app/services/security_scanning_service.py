@@ -3,12 +3,14 @@ Enterprise Security Scanning Service
 Core execution engine for security testing, vulnerability detection, and compliance
 """
 import asyncio
+import functools
 import hashlib
 import ssl
-import socket
 import json
 import re
-from typing import Dict, Any, List, Optional, Tuple
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from uuid import UUID
 import urllib.parse
@@ -19,10 +21,14 @@ from sqlalchemy import select, func, and_, or_, Integer
 from app.models.security_scan import (
     SecurityScan, ScanTarget, Vulnerability, ComplianceCheck, ScanSchedule, SecurityAsset,
     ScanType, ScanStatus, SeverityLevel, VulnerabilityCategory,
-    ComplianceFramework, ComplianceStatus, TargetType
+    ComplianceFramework, ComplianceStatus, TargetType, VULNERABILITY_HUMAN_ID_SEQ
 )
 from app.models.project import Project
+from app.core.config import settings
+from app.services.finding_persistence import allocate_sequence_range
 from app.services.gemini_service import GeminiService
+from app.services.network_probe import NetworkProber
+from app.services.scan_orchestrator import CheckJob, ScanOrchestrator
 
 
 async def _generate_security_human_id(db: "AsyncSession", prefix: str, model, field: str) -> str:
@@ -126,6 +132,64 @@ SECURITY_HEADERS = {
 # Common ports to scan
 COMMON_PORTS = [21, 22, 23, 25, 53, 80, 110, 111, 135, 139, 143, 443, 445, 993, 995, 1723, 3306, 3389, 5900, 8080, 8443]
 
+# Ports probed per scan depth (deep scans also sweep 1..SECURITY_DEEP_SCAN_PORTS)
+SCAN_DEPTH_PORTS = {
+    # Quick: Only common web and secure ports
+    "quick": [21, 22, 80, 443, 3306, 5432, 8080, 8443],
+    # Standard: Common services
+    "standard": [21, 22, 23, 25, 80, 110, 143, 443, 3306, 3389, 5432, 8080, 8443],
+    # Deep: Extended common ports
+    "deep": [
+        21, 22, 23, 25, 53, 80, 110, 143, 443, 445, 993, 995,
+        3306, 3389, 5432, 5900, 6379, 8080, 8443, 27017, 3000, 5000, 8000, 9000, 9200
+    ],
+}
+
+DANGEROUS_PORTS = {
+    21: "FTP", 23: "Telnet", 3389: "RDP",
+    3306: "MySQL", 5432: "PostgreSQL", 27017: "MongoDB",
+    6379: "Redis", 9200: "Elasticsearch"
+}
+
+# Subdomain candidates, most common first (deep scans take the first SECURITY_SUBDOMAIN_WORDLIST_SIZE)
+SUBDOMAIN_WORDLIST = [
+    "www", "mail", "ftp", "admin", "api", "dev", "staging",
+    "test", "beta", "app", "portal", "vpn", "remote", "cdn",
+    "assets", "static", "media", "blog", "shop", "store",
+    "mobile", "m", "dashboard", "secure", "login", "support",
+    "smtp", "pop", "imap", "webmail", "ns1", "ns2", "dns", "mx",
+    "git", "gitlab", "jenkins", "ci", "jira", "confluence", "wiki", "docs",
+    "status", "monitor", "grafana", "kibana", "elastic", "prometheus", "metrics", "logs",
+    "auth", "sso", "id", "accounts", "account", "my", "user", "users",
+    "internal", "intranet", "corp", "office", "extranet", "partner", "partners",
+    "uat", "qa", "sandbox", "demo", "preprod", "stage", "prod", "old", "new", "legacy",
+    "v1", "v2", "api2", "gateway", "proxy", "edge", "lb", "origin",
+    "files", "download", "downloads", "upload", "uploads", "images", "img", "video",
+    "db", "mysql", "postgres", "redis", "mongo", "backup", "backups",
+    "crm", "erp", "hr", "billing", "payments", "pay", "checkout", "cart",
+    "help", "community", "forum", "events", "news",
+]
+
+SUBDOMAIN_DEPTH_WORDLIST = {
+    # Quick: Only most common subdomains
+    "quick": ["www", "mail", "api", "admin"],
+    # Standard: Common subdomains
+    "standard": SUBDOMAIN_WORDLIST[:20],
+}
+
+
+@dataclass
+class CheckOutcome:
+    """
+    What one URL check found for one target. Checks run concurrently and never
+    touch the ORM objects; the scan loop applies outcomes to the target.
+    """
+    target_fields: Dict[str, Any] = field(default_factory=dict)  # ScanTarget attributes to set
+    vulnerabilities: List[Dict[str, Any]] = field(default_factory=list)  # _create_vulnerability arguments
+
+    def report(self, **vulnerability: Any) -> None:
+        self.vulnerabilities.append(vulnerability)
+
 
 # ============================================================================
 # Service Class
@@ -139,6 +203,10 @@ class SecurityScanningService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.ai_service = GeminiService()
+        # Shared by every check of a scan so the global/per-host probe limits hold across them
+        self.prober = NetworkProber.from_settings()
+        # Vulnerabilities queued by concurrently running checks (None outside a URL scan)
+        self._pending_vulnerabilities: Optional[List[Vulnerability]] = None
     
     # ========================================================================
     # Scan Management
@@ -247,61 +315,84 @@ class SecurityScanningService:
     # ========================================================================
     
     async def run_url_security_scan(self, scan: SecurityScan) -> SecurityScan:
-        """Execute URL security scan"""
+        """
+        Execute URL security scan.
+        Every (target, check) pair runs as its own job under the scan and organisation
+        concurrency limits; findings, target states and progress are written in batches.
+        """
         try:
             # Update status to running
             scan.status = ScanStatus.RUNNING
             scan.started_at = datetime.utcnow()
-            await self.db.commit()
             
             # Get targets
             targets_result = await self.db.execute(
                 select(ScanTarget).where(ScanTarget.scan_id == scan.id)
             )
             targets = targets_result.scalars().all()
+            for target in targets:
+                target.status = ScanStatus.RUNNING
+            await self.db.commit()
+            
+            # Jobs get plain copies of what they read; the session stays with this loop
+            checks = self._url_checks(scan)
+            config = dict(scan.config)
+            jobs = [
+                CheckJob(key=target, check=name, run=functools.partial(check, config, target.target_value))
+                for target in targets
+                for name, check in checks
+            ]
+            remaining = {target.id: len(checks) for target in targets}
+            if not checks:
+                for target in targets:
+                    self._finish_target(target)
+            orchestrator = ScanOrchestrator(
+                scan_concurrency=settings.SECURITY_SCAN_CONCURRENCY,
+                organisation_id=scan.organisation_id,
+                organisation_concurrency=settings.SECURITY_SCAN_ORG_CONCURRENCY,
+            )
             
             total_targets = len(targets)
-            for idx, target in enumerate(targets):
-                # Update target status
-                target.status = ScanStatus.RUNNING
-                await self.db.commit()
-                
-                try:
-                    # Run checks based on configuration
-                    if scan.config.get("check_ssl", True):
-                        await self._check_ssl_certificate(scan, target)
-                    
-                    if scan.config.get("check_headers", True):
-                        await self._check_security_headers(scan, target)
-                    
-                    if scan.config.get("check_ports", True):
-                        await self._check_open_ports(scan, target)
-                    
-                    if scan.config.get("check_subdomains", True):
-                        await self._discover_subdomains(scan, target)
-                    
-                    # Active Scanning (requires explicit enable)
-                    if scan.config.get("enable_active_scanning", False):
-                        await self._run_active_scan(scan, target)
+            finished_targets = 0
+            last_flush = time.monotonic()
+            self._pending_vulnerabilities = []
+            try:
+                async for result in orchestrator.run(jobs):
+                    target = result.key
+                    if result.error is not None:
+                        target.status = ScanStatus.FAILED
+                        await self._create_vulnerability(
+                            scan=scan,
+                            target=target,
+                            title=f"Scan Error: {str(result.error)}",
+                            description=f"Failed to complete {result.check} check: {str(result.error)}",
+                            category=VulnerabilityCategory.OTHER,
+                            severity=SeverityLevel.INFO
+                        )
+                    else:
+                        await self._apply_check_outcome(scan, target, result.value)
                     
-                    # Mark target complete
-                    target.status = ScanStatus.COMPLETED
-                    target.scanned_at = datetime.utcnow()
+                    remaining[target.id] -= 1
+                    if remaining[target.id] == 0:
+                        self._finish_target(target)
+                        finished_targets += 1
                     
-                except Exception as e:
-                    target.status = ScanStatus.FAILED
-                    await self._create_vulnerability(
-                        scan=scan,
-                        target=target,
-                        title=f"Scan Error: {str(e)}",
-                        description=f"Failed to complete scan: {str(e)}",
-                        category=VulnerabilityCategory.OTHER,
-                        severity=SeverityLevel.INFO
-                    )
+                    # Batched writes: by findings volume or elapsed time, never per status change
+                    if (
+                        len(self._pending_vulnerabilities) >= settings.FINDINGS_BATCH_SIZE
+                        or time.monotonic() - last_flush >= settings.SECURITY_SCAN_FLUSH_SECONDS
+                    ):
+                        scan.progress_percentage = int((finished_targets / total_targets) * 100)
+                        await self._flush_pending_vulnerabilities()
+                        await self.db.commit()
+                        last_flush = time.monotonic()
                 
-                # Update progress
-                scan.progress_percentage = int(((idx + 1) / total_targets) * 100)
-                await self.db.commit()
+                await self._flush_pending_vulnerabilities()
+            finally:
+                self._pending_vulnerabilities = None
+            
+            scan.progress_percentage = 100
+            scan.check_timings = orchestrator.timings()
             
             # Calculate final results
             await self._calculate_scan_results(scan)
@@ -318,10 +409,44 @@ class SecurityScanningService:
         await self.db.refresh(scan)
         return scan
     
-    async def _check_ssl_certificate(self, scan: SecurityScan, target: ScanTarget):
+    def _url_checks(self, scan: SecurityScan) -> List[Tuple[str, Callable[[Dict[str, Any], str], Awaitable[CheckOutcome]]]]:
+        """Checks enabled by the scan configuration, as (telemetry name, method(config, target value))"""
+        checks = []
+        # Run checks based on configuration
+        if scan.config.get("check_ssl", True):
+            checks.append(("ssl", self._check_ssl_certificate))
+        if scan.config.get("check_headers", True):
+            checks.append(("headers", self._check_security_headers))
+        if scan.config.get("check_ports", True):
+            checks.append(("ports", self._check_open_ports))
+        if scan.config.get("check_subdomains", True):
+            checks.append(("subdomains", self._discover_subdomains))
+        # Active Scanning (requires explicit enable)
+        if scan.config.get("enable_active_scanning", False):
+            checks.append(("active", self._run_active_scan))
+        return checks
+    
+    async def _apply_check_outcome(self, scan: SecurityScan, target: ScanTarget, outcome: Optional[CheckOutcome]):
+        """Write a finished check's results to its target and queue its findings"""
+        if outcome is None:
+            return
+        for name, value in outcome.target_fields.items():
+            setattr(target, name, value)
+        for vulnerability in outcome.vulnerabilities:
+            await self._create_vulnerability(scan=scan, target=target, **vulnerability)
+    
+    @staticmethod
+    def _finish_target(target: ScanTarget):
+        """Mark a target whose checks have all run; a failed check keeps it FAILED"""
+        if target.status != ScanStatus.FAILED:
+            target.status = ScanStatus.COMPLETED
+        target.scanned_at = datetime.utcnow()
+    
+    async def _check_ssl_certificate(self, config: Dict[str, Any], target_value: str) -> CheckOutcome:
         """Check SSL/TLS certificate"""
+        outcome = CheckOutcome()
         try:
-            url = target.target_value
+            url = target_value
             parsed = urllib.parse.urlparse(url if url.startswith("http") else f"https://{url}")
             hostname = parsed.hostname or url
             port = parsed.port or 443
@@ -330,68 +455,63 @@ class SecurityScanningService:
             context = ssl.create_default_context()
             
             try:
-                with socket.create_connection((hostname, port), timeout=10) as sock:
-                    with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                        cert = ssock.getpeercert()
-                        
-                        # Parse certificate
-                        not_after = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
-                        not_before = datetime.strptime(cert['notBefore'], '%b %d %H:%M:%S %Y %Z')
-                        days_until_expiry = (not_after - datetime.utcnow()).days
-                        
-                        # Store certificate info
-                        target.ssl_certificate = {
-                            "issuer": dict(x[0] for x in cert.get('issuer', [])),
-                            "subject": dict(x[0] for x in cert.get('subject', [])),
-                            "serial_number": cert.get('serialNumber', ''),
-                            "valid_from": not_before.isoformat(),
-                            "valid_until": not_after.isoformat(),
-                            "days_until_expiry": days_until_expiry,
-                            "version": cert.get('version', 0),
-                        }
-                        target.ssl_expires_at = not_after
-                        
-                        # Determine grade
-                        if days_until_expiry < 0:
-                            target.ssl_grade = "F"
-                            await self._create_vulnerability(
-                                scan=scan, target=target,
-                                title="Expired SSL Certificate",
-                                description=f"SSL certificate expired {-days_until_expiry} days ago",
-                                category=VulnerabilityCategory.SSL_TLS,
-                                severity=SeverityLevel.CRITICAL,
-                                cvss_score=9.1
-                            )
-                        elif days_until_expiry < 7:
-                            target.ssl_grade = "D"
-                            await self._create_vulnerability(
-                                scan=scan, target=target,
-                                title="SSL Certificate Expiring Soon",
-                                description=f"SSL certificate expires in {days_until_expiry} days",
-                                category=VulnerabilityCategory.SSL_TLS,
-                                severity=SeverityLevel.HIGH,
-                                cvss_score=7.5
-                            )
-                        elif days_until_expiry < 30:
-                            target.ssl_grade = "C"
-                            await self._create_vulnerability(
-                                scan=scan, target=target,
-                                title="SSL Certificate Expiring Soon",
-                                description=f"SSL certificate expires in {days_until_expiry} days",
-                                category=VulnerabilityCategory.SSL_TLS,
-                                severity=SeverityLevel.MEDIUM,
-                                cvss_score=5.3
-                            )
-                        elif days_until_expiry < 90:
-                            target.ssl_grade = "B"
-                        else:
-                            target.ssl_grade = "A"
-                            
+                handshake = await self.prober.tls_handshake(hostname, port, context)
+                cert = handshake.peercert
+                
+                # Parse certificate
+                not_after = datetime.strptime(cert['notAfter'], '%b %d %H:%M:%S %Y %Z')
+                not_before = datetime.strptime(cert['notBefore'], '%b %d %H:%M:%S %Y %Z')
+                days_until_expiry = (not_after - datetime.utcnow()).days
+                
+                # Store certificate info
+                outcome.target_fields["ssl_certificate"] = {
+                    "issuer": dict(x[0] for x in cert.get('issuer', [])),
+                    "subject": dict(x[0] for x in cert.get('subject', [])),
+                    "serial_number": cert.get('serialNumber', ''),
+                    "valid_from": not_before.isoformat(),
+                    "valid_until": not_after.isoformat(),
+                    "days_until_expiry": days_until_expiry,
+                    "version": cert.get('version', 0),
+                }
+                outcome.target_fields["ssl_expires_at"] = not_after
+                
+                # Determine grade
+                if days_until_expiry < 0:
+                    outcome.target_fields["ssl_grade"] = "F"
+                    outcome.report(
+                        title="Expired SSL Certificate",
+                        description=f"SSL certificate expired {-days_until_expiry} days ago",
+                        category=VulnerabilityCategory.SSL_TLS,
+                        severity=SeverityLevel.CRITICAL,
+                        cvss_score=9.1
+                    )
+                elif days_until_expiry < 7:
+                    outcome.target_fields["ssl_grade"] = "D"
+                    outcome.report(
+                        title="SSL Certificate Expiring Soon",
+                        description=f"SSL certificate expires in {days_until_expiry} days",
+                        category=VulnerabilityCategory.SSL_TLS,
+                        severity=SeverityLevel.HIGH,
+                        cvss_score=7.5
+                    )
+                elif days_until_expiry < 30:
+                    outcome.target_fields["ssl_grade"] = "C"
+                    outcome.report(
+                        title="SSL Certificate Expiring Soon",
+                        description=f"SSL certificate expires in {days_until_expiry} days",
+                        category=VulnerabilityCategory.SSL_TLS,
+                        severity=SeverityLevel.MEDIUM,
+                        cvss_score=5.3
+                    )
+                elif days_until_expiry < 90:
+                    outcome.target_fields["ssl_grade"] = "B"
+                else:
+                    outcome.target_fields["ssl_grade"] = "A"
+                    
             except ssl.SSLCertVerificationError as e:
-                target.ssl_grade = "F"
-                target.ssl_certificate = {"error": str(e)}
-                await self._create_vulnerability(
-                    scan=scan, target=target,
+                outcome.target_fields["ssl_grade"] = "F"
+                outcome.target_fields["ssl_certificate"] = {"error": str(e)}
+                outcome.report(
                     title="SSL Certificate Verification Failed",
                     description=f"Certificate verification error: {str(e)}",
                     category=VulnerabilityCategory.SSL_TLS,
@@ -403,7 +523,7 @@ class SecurityScanningService:
             from app.services.tls_analyzer import TLSAnalyzer
             
             try:
-                tls_analyzer = TLSAnalyzer()
+                tls_analyzer = TLSAnalyzer(prober=self.prober)
                 tls_results = await tls_analyzer.analyze_tls(hostname, port)
                 
                 # Create vulnerabilities for TLS weaknesses
@@ -415,8 +535,7 @@ class SecurityScanningService:
                         "low": SeverityLevel.LOW
                     }
                     
-                    await self._create_vulnerability(
-                        scan=scan, target=target,
+                    outcome.report(
                         title=f"TLS Weakness: {vuln['type'].replace('_', ' ').title()}",
                         description=vuln["description"],
                         category=VulnerabilityCategory.SSL_TLS,
@@ -428,17 +547,20 @@ class SecurityScanningService:
                 print(f"TLS analysis failed: {e}")
                 
         except Exception as e:
-            target.ssl_certificate = {"error": str(e)}
-            target.ssl_grade = "F"
+            outcome.target_fields["ssl_certificate"] = {"error": str(e)}
+            outcome.target_fields["ssl_grade"] = "F"
+        
+        return outcome
     
-    async def _check_security_headers(self, scan: SecurityScan, target: ScanTarget):
+    async def _check_security_headers(self, config: Dict[str, Any], target_value: str) -> CheckOutcome:
         """Check HTTP security headers and detect CVEs"""
         import aiohttp
         import os
         from app.services.cve_scanner import CVEScannerService
         
+        outcome = CheckOutcome()        
         try:
-            url = target.target_value
+            url = target_value
             if not url.startswith("http"):
                 url = f"https://{url}"
             
@@ -446,19 +568,19 @@ class SecurityScanningService:
                 async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
                     headers = {k.lower(): v for k, v in response.headers.items()}
                     
-                    target.http_headers = {
+                    http_headers = {
                         "present": list(headers.keys()),
                         "missing": [],
                         "issues": []
                     }
+                    outcome.target_fields["http_headers"] = http_headers
                     
                     # Check for missing security headers
                     for header_key, header_info in SECURITY_HEADERS.items():
                         if header_key not in headers:
-                            target.http_headers["missing"].append(header_info["name"])
+                            http_headers["missing"].append(header_info["name"])
                             
-                            await self._create_vulnerability(
-                                scan=scan, target=target,
+                            outcome.report(
                                 title=f"Missing Security Header: {header_info['name']}",
                                 description=header_info["description"],
                                 category=VulnerabilityCategory.HTTP_HEADERS,
@@ -479,8 +601,7 @@ class SecurityScanningService:
                         cves = await cve_scanner.search_cves(software, version)
                         
                         for cve in cves:
-                            await self._create_vulnerability(
-                                scan=scan, target=target,
+                            outcome.report(
                                 title=f"Known Vulnerability: {cve['cve_id']}",
                                 description=f"{software}/{version}: {cve['description']}",
                                 category=VulnerabilityCategory.VULNERABILITY_DISCLOSURE,
@@ -491,78 +612,64 @@ class SecurityScanningService:
                             )
                     
         except Exception as e:
-            target.http_headers = {"error": str(e)}
+            outcome.target_fields["http_headers"] = {"error": str(e)}
+        
+        return outcome
     
-    async def _check_open_ports(self, scan: SecurityScan, target: ScanTarget):
+    async def _check_open_ports(self, config: Dict[str, Any], target_value: str) -> CheckOutcome:
         """Scan for open ports based on scan depth"""
+        outcome = CheckOutcome()
         try:
-            url = target.target_value
+            url = target_value
             parsed = urllib.parse.urlparse(url if url.startswith("http") else f"https://{url}")
             hostname = parsed.hostname or url
             
-            # Adjust port range based on scan depth
-            scan_depth = scan.config.get("scan_depth", "standard")
-            
-            if scan_depth == "quick":
-                # Quick: Only common web and secure ports
-                ports_to_scan = [21, 22, 80, 443, 3306, 5432, 8080, 8443]
-            elif scan_depth == "deep":
-                # Deep: Extended common ports
-                ports_to_scan = [
-                    21, 22, 23, 25, 53, 80, 110, 143, 443, 445, 993, 995,
-                    3306, 3389, 5432, 5900, 6379, 8080, 8443, 27017, 3000, 5000, 8000, 9000
-                ]
-            else:  # standard
-                # Standard: Common services
-                ports_to_scan = [21, 22, 23, 25, 80, 110, 143, 443, 3306, 3389, 5432, 8080, 8443]
+            scan_depth = config.get("scan_depth", "standard")
+            ports_to_scan = self._ports_for_depth(scan_depth)
             
-            dangerous_ports = {
-                21: "FTP", 23: "Telnet", 3389: "RDP",
-                3306: "MySQL", 5432: "PostgreSQL", 27017: "MongoDB",
-                6379: "Redis", 9200: "Elasticsearch"
-            }
+            # All ports at once on the event loop (bounded by the prober's per-host limit)
+            probes = await self.prober.scan_ports(hostname, ports_to_scan)
             
             open_ports = []
             
-            for port in ports_to_scan:
-                try:
-                    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                        sock.settimeout(1)
-                        result = sock.connect_ex((hostname, port))
-                        if result == 0:
-                            port_info = {
-                                "port": port,
-                                "state": "open",
-                                "service": dangerous_ports.get(port, self._get_service_name(port)),
-                                "is_secure": port not in dangerous_ports
-                            }
-                            open_ports.append(port_info)
-                            
-                            # Create vulnerability for dangerous ports
-                            if port in dangerous_ports:
-                                await self._create_vulnerability(
-                                    scan=scan, target=target,
-                                    title=f"Dangerous Port Open: {port} ({dangerous_ports[port]})",
-                                    description=f"Port {port} ({dangerous_ports[port]}) is publicly accessible",
-                                    category=VulnerabilityCategory.PORT_EXPOSURE,
-                                    severity=SeverityLevel.HIGH,
-                                    cvss_score=7.5,
-                                    remediation=f"Consider closing port {port} or restricting access"
-                                )
-                except:
-                    pass
+            for probe in probes:
+                if probe.state != "open":
+                    continue
+                port = probe.port
+                port_info = {
+                    "port": port,
+                    "state": "open",
+                    "service": DANGEROUS_PORTS.get(port, self._get_service_name(port)),
+                    "is_secure": port not in DANGEROUS_PORTS,
+                    "rtt_ms": probe.rtt_ms
+                }
+                open_ports.append(port_info)
+                
+                # Create vulnerability for dangerous ports
+                if port in DANGEROUS_PORTS:
+                    outcome.report(
+                        title=f"Dangerous Port Open: {port} ({DANGEROUS_PORTS[port]})",
+                        description=f"Port {port} ({DANGEROUS_PORTS[port]}) is publicly accessible",
+                        category=VulnerabilityCategory.PORT_EXPOSURE,
+                        severity=SeverityLevel.HIGH,
+                        cvss_score=7.5,
+                        remediation=f"Consider closing port {port} or restricting access"
+                    )
             
-            target.open_ports = open_ports
+            outcome.target_fields["open_ports"] = open_ports
             
         except Exception as e:
-            target.open_ports = [{"error": str(e)}]
+            outcome.target_fields["open_ports"] = [{"error": str(e)}]
+        
+        return outcome
     
-    async def _discover_subdomains(self, scan: SecurityScan, target: ScanTarget):
+    async def _discover_subdomains(self, config: Dict[str, Any], target_value: str) -> CheckOutcome:
         """Discover subdomains using multiple methods"""
+        outcome = CheckOutcome()
         try:
             from app.services.certificate_transparency import CertificateTransparencyService
             
-            url = target.target_value
+            url = target_value
             parsed = urllib.parse.urlparse(url if url.startswith("http") else f"https://{url}")
             domain = parsed.hostname or url
             
@@ -581,42 +688,17 @@ class SecurityScanningService:
                 print(f"CT log query failed: {e}")
             
             # Method 2: Common subdomain DNS bruteforce (fallback/supplement)
-            # Adjust subdomain list based on scan depth
-            scan_depth = scan.config.get("scan_depth", "standard")
+            # Adjust subdomain list based on scan depth; all candidates resolve concurrently
+            scan_depth = config.get("scan_depth", "standard")
+            candidates = [f"{subdomain}.{domain}" for subdomain in self._subdomains_for_depth(scan_depth)]
+            resolved = await self.prober.resolve_many(candidates)
+            discovered.update(resolved)
             
-            if scan_depth == "quick":
-                # Quick: Only most common subdomains
-                common_subdomains = ["www", "mail", "api", "admin"]
-            elif scan_depth == "deep":
-                # Deep: Extended subdomain list
-                common_subdomains = [
-                    "www", "mail", "ftp", "admin", "api", "dev", "staging",
-                    "test", "beta", "app", "portal", "vpn", "remote", "cdn",
-                    "assets", "static", "media", "blog", "shop", "store",
-                    "mobile", "m", "dashboard", "secure", "login", "support"
-                ]
-            else:  # standard
-                # Standard: Common subdomains
-                common_subdomains = [
-                    "www", "mail", "ftp", "admin", "api", "dev", "staging",
-                    "test", "beta", "app", "portal", "vpn", "remote", "cdn",
-                    "assets", "static", "media", "blog", "shop", "store"
-                ]
-            
-            for subdomain in common_subdomains:
-                full_domain = f"{subdomain}.{domain}"
-                try:
-                    socket.gethostbyname(full_domain)
-                    discovered.add(full_domain)
-                except socket.gaierror:
-                    pass
-            
-            target.subdomains_discovered = list(discovered)
+            outcome.target_fields["subdomains_discovered"] = list(discovered)
             
             # Flag if too many subdomains (potential attack surface)
             if len(discovered) > 10:
-                await self._create_vulnerability(
-                    scan=scan, target=target,
+                outcome.report(
                     title="Large Attack Surface: Many Subdomains",
                     description=f"Discovered {len(discovered)} subdomains - large attack surface",
                     category=VulnerabilityCategory.SUBDOMAIN,
@@ -624,7 +706,22 @@ class SecurityScanningService:
                 )
                 
         except Exception as e:
-            target.subdomains_discovered = []
+            outcome.target_fields["subdomains_discovered"] = []
+        
+        return outcome
+    
+    def _ports_for_depth(self, scan_depth: str) -> List[int]:
+        """Ports probed at a scan depth; deep scans add a sweep of 1..SECURITY_DEEP_SCAN_PORTS"""
+        ports = set(SCAN_DEPTH_PORTS.get(scan_depth, SCAN_DEPTH_PORTS["standard"]))
+        if scan_depth == "deep":
+            ports.update(range(1, settings.SECURITY_DEEP_SCAN_PORTS + 1))
+        return sorted(ports)
+    
+    def _subdomains_for_depth(self, scan_depth: str) -> List[str]:
+        """Subdomain wordlist for a scan depth"""
+        if scan_depth == "deep":
+            return SUBDOMAIN_WORDLIST[:settings.SECURITY_SUBDOMAIN_WORDLIST_SIZE]
+        return SUBDOMAIN_DEPTH_WORDLIST.get(scan_depth, SUBDOMAIN_DEPTH_WORDLIST["standard"])
     
     def _get_service_name(self, port: int) -> str:
         """Get common service name for port"""
@@ -785,14 +882,17 @@ class SecurityScanningService:
         remediation: Optional[str] = None,
         evidence: Optional[str] = None
     ) -> Vulnerability:
-        """Create a vulnerability record"""
+        """
+        Create a vulnerability record.
+        During a URL scan, records are queued instead and written in batches by
+        _flush_pending_vulnerabilities.
+        """
         
-        human_id = await _generate_security_human_id(self.db, "VULN", Vulnerability, "human_id")
+        collecting = self._pending_vulnerabilities is not None
         
         vuln = Vulnerability(
             scan_id=scan.id,
             target_id=target.id if target else None,
-            human_id=human_id,
             title=title,
             description=description,
             category=category,
@@ -804,8 +904,10 @@ class SecurityScanningService:
             evidence=evidence
         )
         
-        self.db.add(vuln)
-        await self.db.flush()
+        if collecting:
+            self._pending_vulnerabilities.append(vuln)
+        else:
+            await self._write_vulnerabilities([vuln])
         
         # Update target vulnerability count
         if target:
@@ -813,6 +915,21 @@ class SecurityScanningService:
         
         return vuln
     
+    async def _flush_pending_vulnerabilities(self):
+        """Write queued vulnerabilities in one flush"""
+        pending, self._pending_vulnerabilities = self._pending_vulnerabilities, []
+        if pending:
+            await self._write_vulnerabilities(pending)
+    
+    async def _write_vulnerabilities(self, vulnerabilities: List[Vulnerability]):
+        """Number vulnerabilities from the human ID sequence (one round trip) and flush them"""
+        numbers = await allocate_sequence_range(self.db, VULNERABILITY_HUMAN_ID_SEQ, len(vulnerabilities))
+        for vuln, number in zip(vulnerabilities, numbers):
+            vuln.human_id = f"VULN-{number:05d}"
+        
+        self.db.add_all(vulnerabilities)
+        await self.db.flush()
+    
     async def get_vulnerability(self, vuln_id: UUID) -> Optional[Vulnerability]:
         """Get vulnerability by ID"""
         result = await self.db.execute(
@@ -1133,12 +1250,13 @@ Keep response concise and actionable."""
             return scan
 
 
-    async def _run_active_scan(self, scan: SecurityScan, target: ScanTarget):
+    async def _run_active_scan(self, config: Dict[str, Any], target_value: str) -> CheckOutcome:
         """Run active penetration testing scans"""
+        outcome = CheckOutcome()
         from app.services.active_scanner import ActiveScanner
         
         try:
-            url = target.target_value
+            url = target_value
             if not url.startswith("http"):
                 url = f"https://{url}"
             
@@ -1147,8 +1265,7 @@ Keep response concise and actionable."""
             # XSS Scanning
             xss_vulns = await scanner.scan_xss(url)
             for vuln in xss_vulns:
-                await self._create_vulnerability(
-                    scan=scan, target=target,
+                outcome.report(
                     title=f"XSS Vulnerability: {vuln['parameter']}",
                     description=vuln["description"],
                     category=VulnerabilityCategory.XSS,
@@ -1160,8 +1277,7 @@ Keep response concise and actionable."""
             # SQL Injection Scanning
             sqli_vulns = await scanner.scan_sqli(url)
             for vuln in sqli_vulns:
-                await self._create_vulnerability(
-                    scan=scan, target=target,
+                outcome.report(
                     title=f"SQL Injection: {vuln['parameter']}",
                     description=vuln["description"],
                     category=VulnerabilityCategory.SQL_INJECTION,
@@ -1173,8 +1289,7 @@ Keep response concise and actionable."""
             # CSRF Scanning
             csrf_vulns = await scanner.check_csrf(url)
             for vuln in csrf_vulns:
-                await self._create_vulnerability(
-                    scan=scan, target=target,
+                outcome.report(
                     title="CSRF Protection Missing",
                     description=vuln["description"],
                     category=VulnerabilityCategory.CSRF,
@@ -1185,3 +1300,5 @@ Keep response concise and actionable."""
                 
         except Exception as e:
             print(f"Active scan failed: {e}")
+        
+        return outcome
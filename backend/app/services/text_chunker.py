@@ -0,0 +1,237 @@
+"""
+Streaming Text Chunker
+Sentence- and heading-aware chunks sized in tokens, produced lazily from a stream of text pieces
+"""
+import logging
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+# Blank line(s) between paragraphs
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+# Sentence ends and line breaks inside a paragraph
+_BOUNDARY = re.compile(r"(?<=[.!?])[ \t]+|[ \t]*\n\s*")
+_WORD = re.compile(r"\S+")
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+_MARKDOWN_HEADING = re.compile(r"^#{1,6}\s+\S")
+
+# Paragraphs longer than this are cut at the last line/sentence break so a
+# file without blank lines can't grow the buffer without bound
+MAX_PARAGRAPH_CHARS = 32_000
+
+
+def approximate_tokens(text: str) -> int:
+    """Roughly one token per word or punctuation mark, plus one per 6 characters of long words"""
+    return sum(1 + len(part) // 6 for part in _APPROX_TOKEN.findall(text))
+
+
+_token_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """
+    Token counter for CHUNK_TOKENIZER (a tiktoken encoding), loaded once per
+    process. Falls back to ``approximate_tokens`` when tiktoken or its
+    encoding file isn't available.
+    """
+    global _token_counter
+    if _token_counter is None:
+        counter: TokenCounter = approximate_tokens
+        if settings.CHUNK_TOKENIZER:
+            try:
+                import tiktoken
+                encoding = tiktoken.get_encoding(settings.CHUNK_TOKENIZER)
+                counter = lambda text: len(encoding.encode(text, disallowed_special=()))  # noqa: E731
+            except Exception as e:
+                logger.warning(f"Tokenizer {settings.CHUNK_TOKENIZER!r} unavailable, using approximate counts: {e}")
+        _token_counter = counter
+    return _token_counter
+
+
+def _looks_like_heading(paragraph: str) -> bool:
+    if _MARKDOWN_HEADING.match(paragraph):
+        return True
+    if "\n" in paragraph or len(paragraph) > 80 or paragraph[-1] in ".!?,;:)]}\"'":
+        return False
+    if paragraph[0] in "{[(<-*|" or not any(c.isalpha() for c in paragraph):
+        return False
+    return len(paragraph.split()) <= 12
+
+
+class _Piece:
+    """A sentence (or line) with its source offsets and the separator that preceded it"""
+
+    __slots__ = ("text", "start", "end", "tokens", "sep")
+
+    def __init__(self, text: str, start: int, end: int, tokens: int, sep: str):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.tokens = tokens
+        self.sep = sep
+
+
+class StreamingChunker:
+    """
+    Turns a stream of text pieces (file lines, PDF pages, DOCX paragraphs...)
+    into chunks of at most ``max_tokens`` tokens without holding the whole
+    document in memory.
+
+    Chunks end on sentence or line boundaries (a single sentence longer than
+    ``max_tokens`` is split between words), a heading always starts a new
+    chunk, and each chunk repeats up to ``overlap_tokens`` worth of trailing
+    sentences from the previous chunk of the same section.
+
+    Each chunk is a dict with ``text``, ``start``/``end`` (character offsets in
+    the concatenated stream), ``length``, ``tokens`` and ``heading`` (the most
+    recent heading, if any).
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+        count_tokens: Optional[TokenCounter] = None,
+    ):
+        self.max_tokens = max(1, max_tokens or settings.CHUNK_MAX_TOKENS)
+        overlap = settings.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        self.overlap_tokens = max(0, min(overlap, self.max_tokens // 2))
+        self.count_tokens = count_tokens or get_token_counter()
+        # Sections shorter than this are merged with the next one instead of
+        # being flushed at every heading
+        self.min_section_tokens = self.max_tokens // 4
+        self.characters = 0
+
+    def chunks(self, pieces: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        current: List[_Piece] = []
+        current_tokens = 0
+        heading: Optional[str] = None
+        chunk_heading: Optional[str] = None
+
+        def emit() -> Dict[str, Any]:
+            text = "".join((piece.sep if i else "") + piece.text for i, piece in enumerate(current))
+            return {
+                "text": text,
+                "start": current[0].start,
+                "end": current[-1].end,
+                "length": len(text),
+                "tokens": current_tokens,
+                "heading": chunk_heading,
+            }
+
+        for paragraph, offset in self._paragraphs(pieces):
+            is_heading = _looks_like_heading(paragraph)
+            if is_heading:
+                if current and current_tokens >= self.min_section_tokens:
+                    yield emit()
+                    current, current_tokens = [], 0
+                heading = paragraph.lstrip("#").strip()
+            if not current:
+                chunk_heading = heading
+
+            for i, piece in enumerate(self._pieces(paragraph, offset)):
+                if i == 0:
+                    piece.sep = "\n\n"
+                if current and current_tokens + piece.tokens > self.max_tokens:
+                    yield emit()
+                    current, current_tokens = self._overlap(current, piece.tokens)
+                    chunk_heading = heading
+                current.append(piece)
+                current_tokens += piece.tokens
+
+        if current:
+            yield emit()
+
+    def _overlap(self, previous: List[_Piece], incoming_tokens: int) -> Tuple[List[_Piece], int]:
+        carried: List[_Piece] = []
+        tokens = 0
+        budget = min(self.overlap_tokens, self.max_tokens - incoming_tokens)
+        for piece in reversed(previous):
+            if tokens + piece.tokens > budget:
+                break
+            carried.insert(0, piece)
+            tokens += piece.tokens
+        if len(carried) == len(previous):
+            # Never repeat a whole chunk
+            return [], 0
+        return carried, tokens
+
+    def _paragraphs(self, pieces: Iterable[str]) -> Iterator[Tuple[str, int]]:
+        """(paragraph text, offset) with surrounding whitespace stripped"""
+        buffer = ""
+        base = 0  # stream offset of buffer[0]
+        for text in pieces:
+            if not text:
+                continue
+            search_from = len(buffer.rstrip())
+            buffer += text
+            self.characters += len(text)
+            cut = 0
+            for match in _PARAGRAPH_BREAK.finditer(buffer, search_from):
+                yield from self._stripped(buffer[cut:match.start()], base + cut)
+                cut = match.end()
+            if len(buffer) - cut > MAX_PARAGRAPH_CHARS:
+                split = max(buffer.rfind("\n", cut, len(buffer) - 1), buffer.rfind(". ", cut, len(buffer) - 1) + 1)
+                if split <= cut:
+                    split = len(buffer)
+                yield from self._stripped(buffer[cut:split], base + cut)
+                cut = split
+            if cut:
+                buffer = buffer[cut:]
+                base += cut
+        yield from self._stripped(buffer, base)
+
+    @staticmethod
+    def _stripped(paragraph: str, offset: int) -> Iterator[Tuple[str, int]]:
+        stripped = paragraph.lstrip()
+        offset += len(paragraph) - len(stripped)
+        stripped = stripped.rstrip()
+        if stripped:
+            yield stripped, offset
+
+    def _pieces(self, paragraph: str, offset: int) -> Iterator[_Piece]:
+        position = 0
+        sep = ""
+        for match in _BOUNDARY.finditer(paragraph):
+            yield from self._sized(paragraph[position:match.start()], offset + position, sep)
+            sep = "\n" if "\n" in match.group() else " "
+            position = match.end()
+        yield from self._sized(paragraph[position:], offset + position, sep)
+
+    def _sized(self, sentence: str, offset: int, sep: str) -> Iterator[_Piece]:
+        if not sentence:
+            return
+        tokens = self.count_tokens(sentence)
+        if tokens <= self.max_tokens:
+            yield _Piece(sentence, offset, offset + len(sentence), tokens, sep)
+            return
+
+        # Oversized sentence: split between words
+        start = end = None
+        part_tokens = 0
+        for word in _WORD.finditer(sentence):
+            word_tokens = self.count_tokens(word.group())
+            if start is not None and part_tokens + word_tokens > self.max_tokens:
+                yield _Piece(sentence[start:end], offset + start, offset + end, part_tokens, sep)
+                sep = " "
+                start = None
+            if start is None:
+                start, part_tokens = word.start(), 0
+            end = word.end()
+            part_tokens += word_tokens
+        if start is not None:
+            yield _Piece(sentence[start:end], offset + start, offset + end, part_tokens, sep)
+
+
+def chunk_text(
+    text: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Chunk an in-memory string"""
+    return list(StreamingChunker(max_tokens, overlap_tokens).chunks([text]))
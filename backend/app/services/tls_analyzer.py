@@ -2,27 +2,34 @@
 TLS Cipher Suite Analyzer
 Detects weak encryption protocols and cipher suites
 """
+import asyncio
 import ssl
-import socket
 from typing import List, Dict, Optional
 
+from app.services.network_probe import NetworkProber
+
 
 class TLSAnalyzer:
     """Analyzes TLS configuration for weaknesses"""
-    
+
     # Weak/deprecated cipher suites
     WEAK_CIPHERS = [
         "DES", "3DES", "RC4", "MD5", "NULL", "EXPORT", "anon"
     ]
-    
-    # Vulnerable TLS versions
-    WEAK_PROTOCOLS = [
-        ssl.PROTOCOL_SSLv2, ssl.PROTOCOL_SSLv3, ssl.PROTOCOL_TLSv1, ssl.PROTOCOL_TLSv1_1
+
+    # Protocol versions to offer, one handshake each (SSLv2 cannot be negotiated by any current OpenSSL)
+    PROTOCOL_VERSIONS = [
+        ("SSLv3", ssl.TLSVersion.SSLv3),
+        ("TLSv1.0", ssl.TLSVersion.TLSv1),
+        ("TLSv1.1", ssl.TLSVersion.TLSv1_1),
+        ("TLSv1.2", ssl.TLSVersion.TLSv1_2),
+        ("TLSv1.3", ssl.TLSVersion.TLSv1_3),
     ]
-    
-    def __init__(self):
+
+    def __init__(self, prober: Optional[NetworkProber] = None):
         self.vulnerabilities = []
-    
+        self.prober = prober or NetworkProber.from_settings()
+
     async def analyze_tls(self, hostname: str, port: int = 443) -> Dict:
         """
         Analyze TLS configuration for a host
@@ -34,19 +41,19 @@ class TLSAnalyzer:
             "weak_ciphers": [],
             "vulnerabilities": []
         }
-        
+
         try:
-            # Test different TLS versions
-results["supported_protocols"] = self._test_protocols(hostname, port)
-            
-            # Get supported cipher suites
-            results["cipher_suites"] = self._get_cipher_suites(hostname, port)
-            
+            # Protocol handshakes and the cipher probe all run at once
+            results["supported_protocols"], results["cipher_suites"] = await asyncio.gather(
+                self._test_protocols(hostname, port),
+                self._get_cipher_suites(hostname, port),
+            )
+
             # Detect weak ciphers
             for cipher in results["cipher_suites"]:
                 cipher_name = cipher.get("name", "")
                 for weak in self.WEAK_CIPHERS:
-                    if weak in cipher_name.upper():
+                    if weak.upper() in cipher_name.upper():
                         results["weak_ciphers"].append(cipher_name)
                         results["vulnerabilities"].append({
                             "type": "weak_cipher",
@@ -54,7 +61,7 @@ results["supported_protocols"] = self._test_protocols(hostname, port)
                             "severity": "high",
                             "description": f"Weak cipher suite detected: {cipher_name}"
                         })
-            
+
             # Check for protocol vulnerabilities
             for protocol in results["supported_protocols"]:
                 if protocol in ["SSLv2", "SSLv3"]:
@@ -71,61 +78,56 @@ results["supported_protocols"] = self._test_protocols(hostname, port)
                         "severity": "medium",
                         "description": f"{protocol} is outdated, upgrade to TLS 1.2+"
                     })
-        
+
         except Exception as e:
             results["error"] = str(e)
-        
+
         return results
-    
-    def _test_protocols(self, hostname: str, port: int) -> List[str]:
+
+    @staticmethod
+    def _protocol_context(version: ssl.TLSVersion) -> Optional[ssl.SSLContext]:
+        """Client context pinned to exactly one protocol version, or None if this OpenSSL cannot offer it"""
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        try:
+            if version < ssl.TLSVersion.TLSv1_2:
+                # Security level 0 so OpenSSL is willing to offer legacy protocols at all
+                context.set_ciphers("ALL:@SECLEVEL=0")
+            context.minimum_version = version
+            context.maximum_version = version
+        except (ValueError, ssl.SSLError):
+            return None
+        return context
+
+    async def _test_protocols(self, hostname: str, port: int) -> List[str]:
         """Test which TLS/SSL protocols are supported"""
-        supported = []
-        
-        protocols_to_test = [
-            ("SSLv2", ssl.PROTOCOL_SSLv2) if hasattr(ssl, "PROTOCOL_SSLv2") else None,
-            ("SSLv3", ssl.PROTOCOL_SSLv3) if hasattr(ssl, "PROTOCOL_SSLv3") else None,
-            ("TLSv1.0", ssl.PROTOCOL_TLSv1),
-            ("TLSv1.1", ssl.PROTOCOL_TLSv1_1) if hasattr(ssl, "PROTOCOL_TLSv1_1") else None,
-            ("TLSv1.2", ssl.PROTOCOL_TLSv1_2) if hasattr(ssl, "PROTOCOL_TLSv1_2") else None,
-            ("TLSv1.3", ssl.PROTOCOL_TLS) if hasattr(ssl, "PROTOCOL_TLS") else None,
-        ]
-        
-        for protocol_name, protocol_const in protocols_to_test:
-            if protocol_const is None:
-                continue
-                
-            try:
-                context = ssl.SSLContext(protocol_const)
-                context.check_hostname = False
-                context.verify_mode = ssl.CERT_NONE
-                
-                with socket.create_connection((hostname, port), timeout=5) as sock:
-                    with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                        supported.append(protocol_name)
-            except:
-                pass
-        
-        return supported
-    
-    def _get_cipher_suites(self, hostname: str, port: int) -> List[Dict]:
+        contexts = [(name, self._protocol_context(version)) for name, version in self.PROTOCOL_VERSIONS]
+        contexts = [(name, context) for name, context in contexts if context is not None]
+
+        outcomes = await asyncio.gather(
+            *(self.prober.tls_handshake(hostname, port, context) for _, context in contexts),
+            return_exceptions=True,
+        )
+        return [name for (name, _), outcome in zip(contexts, outcomes) if not isinstance(outcome, BaseException)]
+
+    async def _get_cipher_suites(self, hostname: str, port: int) -> List[Dict]:
         """Get list of supported cipher suites"""
         cipher_suites = []
-        
+
         try:
             context = ssl.create_default_context()
             context.check_hostname = False
             context.verify_mode = ssl.CERT_NONE
-            
-            with socket.create_connection((hostname, port), timeout=5) as sock:
-                with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                    cipher = ssock.cipher()
-                    if cipher:
-                        cipher_suites.append({
-                            "name": cipher[0],
-                            "version": cipher[1],
-                            "bits": cipher[2]
-                        })
-        except Exception as e:
+
+            handshake = await self.prober.tls_handshake(hostname, port, context)
+            if handshake.cipher:
+                cipher_suites.append({
+                    "name": handshake.cipher[0],
+                    "version": handshake.cipher[1],
+                    "bits": handshake.cipher[2]
+                })
+        except Exception:
             pass
-        
+
         return cipher_suites
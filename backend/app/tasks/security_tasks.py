@@ -400,11 +400,34 @@ def process_scheduled_scans() -> Dict[str, Any]:
     return run_async(process())
 
 
+# ============================================================================
+# OSV Mirror Refresh Task
+# ============================================================================
+
+@shared_task(name="app.tasks.security_tasks.refresh_osv_mirror")
+def refresh_osv_mirror(source_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Rebuild the local OSV vulnerability mirror used by SCA scans
+    
+    Args:
+        source_dir: Directory of already-downloaded OSV dumps (downloads when omitted)
+    """
+    from app.services.osv_mirror import refresh_mirror
+    
+    try:
+        stats = run_async(refresh_mirror(source_dir=source_dir))
+        return {"status": "success", **stats}
+    except Exception as e:
+        logger.error(f"OSV mirror refresh failed: {e}")
+        return {"status": "error", "message": str(e)}
+
+
 # Export all
 __all__ = [
     "run_url_scan",
     "run_repo_scan", 
     "run_vapt_scan",
     "generate_compliance_report",
-    "process_scheduled_scans"
+    "process_scheduled_scans",
+    "refresh_osv_mirror"
 ]
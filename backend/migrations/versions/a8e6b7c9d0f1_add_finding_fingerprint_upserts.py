@@ -0,0 +1,52 @@
+"""add_finding_fingerprint_upserts
+
+Revision ID: a8e6b7c9d0f1
+Revises: f7d5a6b8c9e0
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e6b7c9d0f1'
+down_revision: Union[str, Sequence[str], None] = 'f7d5a6b8c9e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Unique (scan_id, fingerprint) for SAST/SCA findings and a sequence for SAST finding human IDs."""
+    # Keep the oldest copy of findings saved more than once for the same scan
+    op.execute("""
+        DELETE FROM sast_findings f
+        USING sast_findings dup
+        WHERE f.scan_id = dup.scan_id
+          AND f.fingerprint = dup.fingerprint
+          AND (f.created_at, f.id) > (dup.created_at, dup.id)
+    """)
+    op.create_index('uq_sast_findings_scan_fingerprint', 'sast_findings', ['scan_id', 'fingerprint'], unique=True)
+
+    op.add_column('sca_findings', sa.Column('fingerprint', sa.String(length=64), nullable=True))
+    op.create_index('uq_sca_findings_scan_fingerprint', 'sca_findings', ['scan_id', 'fingerprint'], unique=True)
+
+    # Continue after the highest SAST-F-<n> already handed out
+    op.execute("CREATE SEQUENCE IF NOT EXISTS sast_finding_human_id_seq")
+    op.execute("""
+        SELECT setval(
+            'sast_finding_human_id_seq',
+            COALESCE((
+                SELECT MAX(CAST(substring(human_id FROM '[0-9]+$') AS BIGINT))
+                FROM sast_findings
+                WHERE human_id ~ '^SAST-F-[0-9]+$'
+            ), 0) + 1,
+            false
+        )
+    """)
+
+def downgrade() -> None:
+    """Drop finding fingerprint upsert support."""
+    op.execute("DROP SEQUENCE IF EXISTS sast_finding_human_id_seq")
+    op.drop_index('uq_sca_findings_scan_fingerprint', table_name='sca_findings')
+    op.drop_column('sca_findings', 'fingerprint')
+    op.drop_index('uq_sast_findings_scan_fingerprint', table_name='sast_findings')
@@ -0,0 +1,26 @@
+"""add_dropped_iterations_to_performance_metrics
+
+Revision ID: b3f1c2d4e5a6
+Revises: fe948715253c
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c2d4e5a6'
+down_revision: Union[str, Sequence[str], None] = 'fe948715253c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Add arrival-rate dropped iteration metrics to performance_metrics table."""
+    op.add_column('performance_metrics', sa.Column('dropped_iterations', sa.Integer(), nullable=True))
+    op.add_column('performance_metrics', sa.Column('dropped_iterations_timeline', sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    """Remove arrival-rate dropped iteration metrics from performance_metrics table."""
+    op.drop_column('performance_metrics', 'dropped_iterations_timeline')
+    op.drop_column('performance_metrics', 'dropped_iterations')
@@ -0,0 +1,49 @@
+"""add_sast_incremental_file_states
+
+Revision ID: b9f7c8d0e1a2
+Revises: a8e6b7c9d0f1
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9f7c8d0e1a2'
+down_revision: Union[str, Sequence[str], None] = 'a8e6b7c9d0f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Per-file SAST state (content hash + cached findings per engine) and incremental scan counters."""
+    op.create_table(
+        'sast_file_states',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', UUID(as_uuid=True), sa.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('engine', sa.String(50), nullable=False),
+        sa.Column('file_path', sa.String(2000), nullable=False),
+        sa.Column('content_hash', sa.String(64), nullable=False),
+        sa.Column('rules_hash', sa.String(64), nullable=False),
+        sa.Column('findings', sa.JSON, default=list),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        'uq_sast_file_states_project_engine_path', 'sast_file_states',
+        ['project_id', 'engine', 'file_path'], unique=True,
+    )
+
+    op.add_column('sast_scans', sa.Column('incremental', sa.Boolean(), nullable=True, server_default=sa.true()))
+    op.add_column('sast_scans', sa.Column('files_changed', sa.Integer(), nullable=True, server_default='0'))
+    op.add_column('sast_scans', sa.Column('files_reused', sa.Integer(), nullable=True, server_default='0'))
+    op.add_column('sast_scans', sa.Column('files_deleted', sa.Integer(), nullable=True, server_default='0'))
+
+def downgrade() -> None:
+    """Drop incremental SAST state."""
+    op.drop_column('sast_scans', 'files_deleted')
+    op.drop_column('sast_scans', 'files_reused')
+    op.drop_column('sast_scans', 'files_changed')
+    op.drop_column('sast_scans', 'incremental')
+    op.drop_index('uq_sast_file_states_project_engine_path', table_name='sast_file_states')
+    op.drop_table('sast_file_states')
@@ -0,0 +1,24 @@
+"""add_sast_engine_timings
+
+Revision ID: c0a8d9e1f2b3
+Revises: b9f7c8d0e1a2
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c0a8d9e1f2b3'
+down_revision: Union[str, Sequence[str], None] = 'b9f7c8d0e1a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Per-engine timing of SAST scans."""
+    op.add_column('sast_scans', sa.Column('engine_timings', sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    """Drop per-engine timing of SAST scans."""
+    op.drop_column('sast_scans', 'engine_timings')
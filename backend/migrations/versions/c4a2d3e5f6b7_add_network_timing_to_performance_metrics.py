@@ -0,0 +1,30 @@
+"""add_network_timing_to_performance_metrics
+
+Revision ID: c4a2d3e5f6b7
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a2d3e5f6b7'
+down_revision: Union[str, Sequence[str], None] = 'b3f1c2d4e5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Add request phase timing and widen byte counters on performance_metrics table."""
+    op.add_column('performance_metrics', sa.Column('timing_breakdown', sa.JSON(), nullable=True))
+    op.add_column('performance_metrics', sa.Column('network_timeline', sa.JSON(), nullable=True))
+    op.alter_column('performance_metrics', 'data_received_bytes', existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=True)
+    op.alter_column('performance_metrics', 'data_sent_bytes', existing_type=sa.Integer(), type_=sa.BigInteger(), existing_nullable=True)
+
+def downgrade() -> None:
+    """Remove request phase timing from performance_metrics table."""
+    op.alter_column('performance_metrics', 'data_sent_bytes', existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=True)
+    op.alter_column('performance_metrics', 'data_received_bytes', existing_type=sa.BigInteger(), type_=sa.Integer(), existing_nullable=True)
+    op.drop_column('performance_metrics', 'network_timeline')
+    op.drop_column('performance_metrics', 'timing_breakdown')
@@ -0,0 +1,24 @@
+"""add_security_scan_check_timings
+
+Revision ID: d1b9e0f2a3c4
+Revises: c0a8d9e1f2b3
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1b9e0f2a3c4'
+down_revision: Union[str, Sequence[str], None] = 'c0a8d9e1f2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Per-check timing of URL security scans."""
+    op.add_column('security_scans', sa.Column('check_timings', sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    """Drop per-check timing of URL security scans."""
+    op.drop_column('security_scans', 'check_timings')
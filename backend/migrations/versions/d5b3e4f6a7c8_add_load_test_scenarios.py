@@ -0,0 +1,26 @@
+"""add_load_test_scenarios
+
+Revision ID: d5b3e4f6a7c8
+Revises: c4a2d3e5f6b7
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b3e4f6a7c8'
+down_revision: Union[str, Sequence[str], None] = 'c4a2d3e5f6b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Add scripted scenarios to performance_tests and per-step results to performance_metrics."""
+    op.add_column('performance_tests', sa.Column('scenarios', sa.JSON(), nullable=True))
+    op.add_column('performance_metrics', sa.Column('step_metrics', sa.JSON(), nullable=True))
+
+def downgrade() -> None:
+    """Remove scripted scenarios and per-step results."""
+    op.drop_column('performance_metrics', 'step_metrics')
+    op.drop_column('performance_tests', 'scenarios')
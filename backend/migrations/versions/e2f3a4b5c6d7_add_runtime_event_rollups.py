@@ -0,0 +1,56 @@
+"""add_runtime_event_rollups
+
+Revision ID: e2f3a4b5c6d7
+Revises: d1b9e0f2a3c4
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f3a4b5c6d7'
+down_revision: Union[str, Sequence[str], None] = 'd1b9e0f2a3c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Per-minute RASP event rollups and occurrence counts for merged events and findings."""
+    op.add_column('rasp_events', sa.Column('occurrences', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('rasp_events', sa.Column('last_occurred_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('iast_findings', sa.Column('occurrences', sa.Integer(), nullable=False, server_default='1'))
+
+    op.create_table(
+        'rasp_event_rollups',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('project_id', UUID(as_uuid=True), sa.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('minute', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('attack_type', sa.String(50), nullable=False),
+        sa.Column('was_blocked', sa.Boolean(), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index(
+        'uq_rasp_event_rollups_bucket', 'rasp_event_rollups',
+        ['project_id', 'minute', 'attack_type', 'was_blocked'], unique=True,
+    )
+
+    # Existing events, so statistics don't restart from zero
+    op.execute("""
+        INSERT INTO rasp_event_rollups (id, project_id, minute, attack_type, was_blocked, event_count)
+        SELECT md5(project_id::text || date_trunc('minute', occurred_at)::text || attack_type
+                   || coalesce(was_blocked, true)::text)::uuid,
+               project_id, date_trunc('minute', occurred_at), attack_type, coalesce(was_blocked, true), count(*)
+        FROM rasp_events
+        WHERE occurred_at IS NOT NULL
+        GROUP BY project_id, date_trunc('minute', occurred_at), attack_type, coalesce(was_blocked, true)
+    """)
+
+def downgrade() -> None:
+    """Drop RASP event rollups and occurrence counts."""
+    op.drop_index('uq_rasp_event_rollups_bucket', table_name='rasp_event_rollups')
+    op.drop_table('rasp_event_rollups')
+    op.drop_column('iast_findings', 'occurrences')
+    op.drop_column('rasp_events', 'last_occurred_at')
+    op.drop_column('rasp_events', 'occurrences')
@@ -0,0 +1,42 @@
+"""add_performance_metric_samples
+
+Revision ID: e6c4f5a7b8d9
+Revises: d5b3e4f6a7c8
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c4f5a7b8d9'
+down_revision: Union[str, Sequence[str], None] = 'd5b3e4f6a7c8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Create performance_metric_samples table for batched per-second load test samples."""
+    op.create_table(
+        'performance_metric_samples',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('test_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('second', sa.Integer(), nullable=False),
+        sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('requests', sa.Integer(), nullable=True),
+        sa.Column('errors', sa.Integer(), nullable=True),
+        sa.Column('virtual_users', sa.Integer(), nullable=True),
+        sa.Column('requests_per_second', sa.Float(), nullable=True),
+        sa.Column('latency_avg', sa.Float(), nullable=True),
+        sa.Column('latency_p95', sa.Float(), nullable=True),
+        sa.Column('point', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['test_id'], ['performance_tests.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_performance_metric_samples_test_id_second', 'performance_metric_samples', ['test_id', 'second'], unique=False)
+
+def downgrade() -> None:
+    """Drop performance_metric_samples table."""
+    op.drop_index('ix_performance_metric_samples_test_id_second', table_name='performance_metric_samples')
+    op.drop_table('performance_metric_samples')
@@ -0,0 +1,36 @@
+"""add_vulnerability_human_id_sequence
+
+Revision ID: f3a4b5c6d7e8
+Revises: e2f3a4b5c6d7
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a4b5c6d7e8'
+down_revision: Union[str, Sequence[str], None] = 'e2f3a4b5c6d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """Sequence for vulnerability human IDs, so concurrent scans never number two findings alike."""
+    # Continue after the highest VULN-<n> already handed out
+    op.execute("CREATE SEQUENCE IF NOT EXISTS vulnerability_human_id_seq")
+    op.execute("""
+        SELECT setval(
+            'vulnerability_human_id_seq',
+            COALESCE((
+                SELECT MAX(CAST(substring(human_id FROM '[0-9]+$') AS BIGINT))
+                FROM vulnerabilities
+                WHERE human_id ~ '^VULN-[0-9]+$'
+            ), 0) + 1,
+            false
+        )
+    """)
+
+def downgrade() -> None:
+    """Drop the vulnerability human ID sequence."""
+    op.execute("DROP SEQUENCE IF EXISTS vulnerability_human_id_seq")
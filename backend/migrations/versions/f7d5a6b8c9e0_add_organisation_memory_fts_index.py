@@ -0,0 +1,30 @@
+"""add_organisation_memory_fts_index
+
+Revision ID: f7d5a6b8c9e0
+Revises: e6c4f5a7b8d9
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d5a6b8c9e0'
+down_revision: Union[str, Sequence[str], None] = 'e6c4f5a7b8d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+def upgrade() -> None:
+    """GIN full-text index on organisation_memory.searchable_content for keyword retrieval."""
+    op.create_index(
+        'ix_organisation_memory_searchable_tsv',
+        'organisation_memory',
+        [sa.text("to_tsvector('english', searchable_content)")],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+def downgrade() -> None:
+    """Drop the organisation_memory full-text index."""
+    op.drop_index('ix_organisation_memory_searchable_tsv', table_name='organisation_memory')
@@ -0,0 +1,98 @@
+"""
+Benchmark: SCAN-based pattern invalidation vs. tag generations
+
+Fills Redis with N cached entries spread over many organisations, then
+times invalidating one organisation both ways:
+
+  * pattern: CacheService.delete_pattern("org:<id>:*") (SCAN over every key)
+  * tags:    CacheService.invalidate_tags("org:<id>") (one INCR)
+
+Uses the Redis at REDIS_URL and a dedicated key prefix (removed afterwards).
+
+Usage:
+    python scripts/benchmark_cache_invalidation.py --keys 1000000 --orgs 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.cache import CacheService, close_redis, get_redis_client, org_tag, tag_key
+
+KEY_PREFIX = "bench"
+BATCH_SIZE = 10_000
+
+
+def entry_key(org: int, index: int) -> str:
+    return f"{KEY_PREFIX}:org:{org}:item:{index}"
+
+
+async def populate(client, keys: int, orgs: int, ttl: int) -> None:
+    started = time.perf_counter()
+    for batch_start in range(0, keys, BATCH_SIZE):
+        pipe = client.pipeline(transaction=False)
+        for index in range(batch_start, min(batch_start + BATCH_SIZE, keys)):
+            org = index % orgs
+            envelope = {"v": {"id": index}, "d": 0.001, "t": {org_tag(f"{KEY_PREFIX}-{org}"): 0}}
+            pipe.setex(entry_key(org, index), ttl, json.dumps(envelope))
+        await pipe.execute()
+    print(f"Populated {keys:,} keys in {time.perf_counter() - started:.1f}s")
+
+
+async def cleanup(client, orgs: int) -> None:
+    pipe = client.pipeline(transaction=False)
+    count = 0
+    async for key in client.scan_iter(match=f"{KEY_PREFIX}:*", count=BATCH_SIZE):
+        pipe.delete(key)
+        count += 1
+        if count % BATCH_SIZE == 0:
+            await pipe.execute()
+    await pipe.execute()
+    await client.delete(*[tag_key(org_tag(f"{KEY_PREFIX}-{org}")) for org in range(orgs)])
+
+
+async def main(args) -> None:
+    client = await get_redis_client()
+    await populate(client, args.keys, args.orgs, args.ttl)
+
+    pattern_times, tag_times = [], []
+    for run in range(args.runs):
+        org = run % args.orgs
+
+        started = time.perf_counter()
+        deleted = await CacheService.delete_pattern(f"{KEY_PREFIX}:org:{org}:*")
+        pattern_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await CacheService.invalidate_tags(org_tag(f"{KEY_PREFIX}-{org}"))
+        tag_times.append(time.perf_counter() - started)
+        print(f"  org {org}: pattern deleted {deleted} keys in {pattern_times[-1] * 1000:,.1f}ms, "
+              f"tag bump {tag_times[-1] * 1000:.2f}ms")
+
+    pattern_avg = sum(pattern_times) / len(pattern_times)
+    tag_avg = sum(tag_times) / len(tag_times)
+    print()
+    print(f"{'strategy':<10} {'avg ms':>12}")
+    print(f"{'pattern':<10} {pattern_avg * 1000:>12,.1f}")
+    print(f"{'tags':<10} {tag_avg * 1000:>12,.2f}")
+    print(f"Speedup: {pattern_avg / tag_avg:,.0f}x")
+
+    if not args.keep:
+        await cleanup(client, args.orgs)
+    await close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--orgs", type=int, default=1_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ttl", type=int, default=3600)
+    parser.add_argument("--keep", action="store_true", help="Leave the benchmark keys in Redis")
+    args = parser.parse_args()
+    asyncio.run(main(args))
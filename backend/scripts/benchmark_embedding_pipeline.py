@@ -0,0 +1,107 @@
+"""
+Benchmark: document chunk embedding + vector storage throughput
+
+Uses a local fake embedder (fixed latency per request plus a small cost per
+text, optional random rate-limit errors) and a fake vector store with
+per-upsert latency, and compares:
+
+  * sequential: one embedding request and one upsert per chunk (old path)
+  * pipeline:   EmbeddingPipeline batches with bounded concurrency and paged upserts
+
+Usage:
+    python scripts/benchmark_embedding_pipeline.py --chunks 2000 --request-ms 80 --upsert-ms 15
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.embedding_pipeline import EmbeddingPipeline
+
+
+class FakeEmbedder:
+    def __init__(self, request_ms: float, per_text_ms: float, dimensions: int, rate_limit_probability: float):
+        self.request_ms = request_ms
+        self.per_text_ms = per_text_ms
+        self.dimensions = dimensions
+        self.rate_limit_probability = rate_limit_probability
+        self.requests = 0
+        self.rng = random.Random(3)
+
+    async def __call__(self, texts):
+        self.requests += 1
+        await asyncio.sleep((self.request_ms + self.per_text_ms * len(texts)) / 1000)
+        if self.rng.random() < self.rate_limit_probability:
+            raise RuntimeError("429 Too Many Requests")
+        return [[float(len(text))] * self.dimensions for text in texts]
+
+
+class FakeVectorStore:
+    def __init__(self, upsert_ms: float):
+        self.upsert_ms = upsert_ms
+        self.points = 0
+        self.upserts = 0
+
+    async def upsert(self, indexes, vectors):
+        await asyncio.sleep(self.upsert_ms / 1000)
+        self.upserts += 1
+        self.points += len(indexes)
+
+
+async def run_sequential(texts, embedder, store):
+    started = time.perf_counter()
+    for index, text in enumerate(texts):
+        vector = (await embedder([text]))[0]
+        await store.upsert([index], [vector])
+    return time.perf_counter() - started
+
+
+async def main(args):
+    texts = [f"chunk {i} " * 40 for i in range(args.chunks)]
+
+    def embedder(rate_limits=0.0):
+        return FakeEmbedder(args.request_ms, args.per_text_ms, args.dimensions, rate_limits)
+
+    sequential_count = min(args.chunks, args.sequential_chunks)
+    sequential_store = FakeVectorStore(args.upsert_ms)
+    sequential_embedder = embedder()
+    elapsed = await run_sequential(texts[:sequential_count], sequential_embedder, sequential_store)
+    print(f"{'sequential':<12} {sequential_count / elapsed:10,.1f} chunks/s  "
+          f"({sequential_embedder.requests} embed requests, {sequential_store.upserts} upserts, "
+          f"measured on {sequential_count} chunks)")
+
+    store = FakeVectorStore(args.upsert_ms)
+    pipeline_embedder = embedder(args.rate_limit_probability)
+    pipeline = EmbeddingPipeline(
+        pipeline_embedder,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        upsert_batch_size=args.upsert_batch_size,
+        base_backoff=0.05,
+    )
+    stats = await pipeline.run(texts, store.upsert)
+    print(f"{'pipeline':<12} {stats.chunks_per_second:10,.1f} chunks/s  "
+          f"({pipeline_embedder.requests} embed requests, {store.upserts} upserts, "
+          f"{stats.retries} retries, {stats.failed} failed, {args.chunks} chunks)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--sequential-chunks", type=int, default=200,
+                        help="Chunks used for the (slow) sequential baseline")
+    parser.add_argument("--request-ms", type=float, default=80.0, help="Fixed latency per embedding request")
+    parser.add_argument("--per-text-ms", type=float, default=0.5, help="Additional latency per text in a request")
+    parser.add_argument("--upsert-ms", type=float, default=15.0, help="Latency per upsert request")
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--upsert-batch-size", type=int, default=256)
+    parser.add_argument("--rate-limit-probability", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,77 @@
+"""
+Microbenchmark: LatencyHistogram vs. the old list + sort-per-report approach
+
+Simulates the local load engine's metrics reporter: N samples arrive per
+second and a summary (p50/p95/p99) is produced once per second.
+
+Usage:
+    python scripts/benchmark_latency_histogram.py --seconds 60 --rps 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.latency_histogram import IntervalLatencyRecorder
+
+
+def run_list(samples_per_second, seconds):
+    latencies = []
+    report_time = 0.0
+    for second in range(seconds):
+        latencies.extend(samples_per_second[second])
+        start = time.perf_counter()
+        ordered = sorted(latencies.copy())
+        count = len(ordered)
+        _ = (ordered[int(count * 0.5)], ordered[int(count * 0.95)], ordered[int(count * 0.99)])
+        report_time += time.perf_counter() - start
+    return report_time, len(latencies) * 8  # lower bound: one pointer per float
+
+
+def run_histogram(samples_per_second, seconds):
+    recorder = IntervalLatencyRecorder()
+    report_time = 0.0
+    record_time = 0.0
+    for second in range(seconds):
+        start = time.perf_counter()
+        for value in samples_per_second[second]:
+            recorder.record(value)
+        record_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        recorder.take_interval()
+        recorder.cumulative.summary()
+        report_time += time.perf_counter() - start
+    return report_time, record_time, len(recorder.cumulative._counts) * 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--rps", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    samples = [
+        [rng.lognormvariate(3.5, 0.6) for _ in range(args.rps)]
+        for _ in range(args.seconds)
+    ]
+
+    list_report, list_bytes = run_list(samples, args.seconds)
+    hist_report, hist_record, hist_bytes = run_histogram(samples, args.seconds)
+
+    total = args.seconds * args.rps
+    print(f"Samples: {total:,} ({args.rps:,}/s for {args.seconds}s)")
+    print(f"list + sort   : report {list_report:8.3f}s total, "
+          f"{list_report / args.seconds * 1000:8.2f} ms/report, ~{list_bytes / 1e6:8.1f} MB")
+    print(f"histogram     : report {hist_report:8.3f}s total, "
+          f"{hist_report / args.seconds * 1000:8.2f} ms/report, ~{hist_bytes / 1e6:8.3f} MB "
+          f"(record {hist_record / total * 1e9:.0f} ns/sample)")
+
+
+if __name__ == "__main__":
+    main()
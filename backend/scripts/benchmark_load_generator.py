@@ -0,0 +1,88 @@
+"""
+Benchmark: in-process vs. multi-process local load generation
+
+Starts a trivial aiohttp target server (SO_REUSEPORT, several processes so the
+target is not the bottleneck) and drives it with the local load generator at
+increasing worker counts, printing achieved requests/second.
+
+Usage:
+    python scripts/benchmark_load_generator.py --vus 200 --seconds 10 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.load_generator import (
+    LoadGeneratorConfig, LocalLoadRunner, DistributedLoadRunner
+)
+
+
+def _serve(port):
+    from aiohttp import web
+
+    async def handler(request):
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(("127.0.0.1", port))
+    web.run_app(app, sock=sock, print=None, access_log=None)
+
+
+async def _run(config, workers):
+    start_time = time.time()
+    if workers > 1:
+        runner = DistributedLoadRunner(config, start_time, workers)
+    else:
+        runner = LocalLoadRunner(config, start_time)
+    await runner.start()
+    await asyncio.sleep(config.duration_seconds)
+    await runner.stop()
+    hist = runner.stats.latencies.total()
+    elapsed = time.time() - start_time
+    return runner.stats.total_requests / elapsed, runner.stats.errors, hist.percentile(95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--vus", type=int, default=200)
+    parser.add_argument("--seconds", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--server-procs", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--port", type=int, default=18089)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    servers = [ctx.Process(target=_serve, args=(args.port,), daemon=True) for _ in range(args.server_procs)]
+    for server in servers:
+        server.start()
+    time.sleep(2)
+
+    config = LoadGeneratorConfig(
+        target_url=f"http://127.0.0.1:{args.port}/",
+        stages=[{"duration": args.seconds, "target": args.vus}],
+        duration_seconds=args.seconds,
+        max_vus=args.vus,
+    )
+
+    try:
+        for workers in args.workers:
+            rps, errors, p95 = asyncio.run(_run(config, workers))
+            print(f"workers={workers:<3} rps={rps:10.1f} errors={errors:<6} p95={p95:8.2f} ms")
+    finally:
+        for server in servers:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: URL scan port sweep, blocking sequential connects vs. the async prober
+
+Builds a local target on 127.0.0.1: a block of --ports consecutive ports of
+which some are listening (open), some are "tarpits" whose accept backlog is
+full so SYNs go unanswered (filtered, the expensive case), and the rest are
+closed. It then times:
+
+  * legacy: socket.connect_ex one port at a time with a 1s timeout, as the
+            URL scan did before (run on the first --legacy-ports ports and
+            extrapolated)
+  * prober: NetworkProber.scan_ports with the configured limits
+
+Usage:
+    python scripts/benchmark_network_probe.py --ports 1024 --open 20 --filtered 40
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.network_probe import NetworkProber  # noqa: E402
+
+HOST = "127.0.0.1"
+
+
+def find_port_block(count: int) -> int:
+    """First port of ``count`` consecutive free ports"""
+    for base in range(20000, 60000 - count, count):
+        sockets = []
+        try:
+            for port in range(base, base + count):
+                sock = socket.socket()
+                sockets.append(sock)
+                sock.bind((HOST, port))
+            return base
+        except OSError:
+            continue
+        finally:
+            for sock in sockets:
+                sock.close()
+    raise SystemExit("No free port block found")
+
+
+def open_listener(port: int) -> socket.socket:
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, port))
+    sock.listen(128)
+    return sock
+
+
+def open_tarpit(port: int) -> list:
+    """A listener that never accepts, with its backlog filled so further SYNs are dropped"""
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((HOST, port))
+    sock.listen(0)
+    fillers = []
+    for _ in range(4):
+        filler = socket.socket()
+        filler.setblocking(False)
+        filler.connect_ex((HOST, port))
+        fillers.append(filler)
+    return [sock, *fillers]
+
+
+def legacy_sweep(ports: list) -> list:
+    open_ports = []
+    for port in ports:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1)
+            if sock.connect_ex((HOST, port)) == 0:
+                open_ports.append(port)
+    return open_ports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ports", type=int, default=1024, help="Ports in the sweep")
+    parser.add_argument("--open", type=int, default=20, help="Listening ports among them")
+    parser.add_argument("--filtered", type=int, default=40, help="Unanswered (tarpit) ports among them")
+    parser.add_argument("--legacy-ports", type=int, default=64, help="Ports swept the legacy way before extrapolating")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    base = find_port_block(args.ports)
+    ports = list(range(base, base + args.ports))
+    chosen = random.sample(ports, args.open + args.filtered)
+    open_ports, filtered_ports = sorted(chosen[:args.open]), sorted(chosen[args.open:])
+
+    held = [open_listener(port) for port in open_ports]
+    for port in filtered_ports:
+        held.extend(open_tarpit(port))
+    time.sleep(0.2)
+
+    print(f"Target: {args.ports} ports on {HOST} ({args.open} open, {args.filtered} filtered, rest closed)")
+    try:
+        legacy_ports = ports[:args.legacy_ports]
+        started = time.perf_counter()
+        legacy_open = legacy_sweep(legacy_ports)
+        legacy_sample = time.perf_counter() - started
+        sample_filtered = sum(1 for port in legacy_ports if port in filtered_ports)
+        # Each filtered port costs the full 1s timeout; closed/open ones cost what the sample measured
+        per_fast_port = (legacy_sample - sample_filtered) / max(1, len(legacy_ports) - sample_filtered)
+        legacy_estimate = args.filtered * 1.0 + (args.ports - args.filtered) * max(per_fast_port, 0.0)
+        assert legacy_open == [port for port in legacy_ports if port in open_ports]
+        print(f"  legacy  {legacy_sample:8.3f}s for {len(legacy_ports)} ports -> ~{legacy_estimate:.1f}s for the sweep")
+
+        prober = NetworkProber.from_settings()
+        started = time.perf_counter()
+        probes = asyncio.run(prober.scan_ports(HOST, ports))
+        prober_seconds = time.perf_counter() - started
+        states = {state: sum(1 for probe in probes if probe.state == state) for state in ("open", "closed", "filtered")}
+        assert [probe.port for probe in probes if probe.state == "open"] == open_ports
+        assert [probe.port for probe in probes if probe.state == "filtered"] == filtered_ports
+        print(f"  prober  {prober_seconds:8.3f}s  {states}  "
+              f"(adapted connect timeout {prober.timeout_for(HOST).timeout * 1000:.0f}ms)")
+        print(f"Speedup: {legacy_estimate / prober_seconds:,.0f}x")
+    finally:
+        for sock in held:
+            sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: SCA vulnerability lookups for a 3,000-dependency manifest
+
+Generates synthetic OSV dumps (PyPI advisories in the real OSV schema),
+builds a local mirror from them, writes a requirements.txt with
+--dependencies pinned packages and times:
+
+  * build:        importing the dumps into the on-disk index
+  * per-package:  one mirror lookup per dependency (the old one-call-per-package shape)
+  * batched:      NativeSCAService.run_osv_scan, one batched lookup for the whole manifest
+
+The old path made one HTTP POST per dependency to api.osv.dev; the
+"sequential API" line is that count times --api-rtt-ms, for reference.
+
+Usage:
+    python scripts/benchmark_osv_lookup.py --dependencies 3000 --packages 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.services.native_sca_service import NativeSCAService
+from app.services.osv_mirror import OSVMirror, build_index
+
+
+def advisory(index: int, package: str, rng: random.Random) -> dict:
+    introduced = f"{rng.randint(0, 3)}.{rng.randint(0, 9)}.0"
+    fixed = f"{int(introduced.split('.')[0]) + 1}.{rng.randint(0, 9)}.{rng.randint(0, 9)}"
+    return {
+        "id": f"PYSEC-2026-{index}",
+        "modified": "2026-01-01T00:00:00Z",
+        "summary": f"Synthetic issue {index} in {package}",
+        "details": "Lorem ipsum " * rng.randint(5, 60),
+        "aliases": [f"CVE-2026-{10000 + index}"],
+        "database_specific": {"severity": rng.choice(["LOW", "MODERATE", "HIGH", "CRITICAL"])},
+        "references": [{"type": "WEB", "url": f"https://example.com/advisory/{index}"}],
+        "affected": [{
+            "package": {"ecosystem": "PyPI", "name": package},
+            "ranges": [{"type": "ECOSYSTEM", "events": [{"introduced": introduced}, {"fixed": fixed}]}],
+            "versions": [],
+        }],
+    }
+
+
+def write_dump(path: str, packages: int, advisories: int, rng: random.Random) -> None:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for index in range(advisories):
+            package = f"package-{rng.randrange(packages)}"
+            archive.writestr(f"PYSEC-2026-{index}.json", json.dumps(advisory(index, package, rng)))
+
+
+async def main(args) -> None:
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="osv-bench-") as workdir:
+        dump = os.path.join(workdir, "PyPI.zip")
+        write_dump(dump, args.packages, args.advisories, rng)
+        mirror_path = os.path.join(workdir, "osv-mirror.sqlite")
+        stats = build_index(mirror_path, [("PyPI", dump)])
+        print(f"Built mirror: {stats['advisories']:,} advisories, {stats['packages']:,} packages, "
+              f"{stats['size_bytes'] / 1e6:.1f} MB in {stats['seconds']:.1f}s")
+
+        deps = [(f"package-{rng.randrange(args.packages)}", f"{rng.randint(0, 4)}.{rng.randint(0, 9)}.{rng.randint(0, 9)}")
+                for _ in range(args.dependencies)]
+        manifest = os.path.join(workdir, "requirements.txt")
+        with open(manifest, "w") as f:
+            f.write("\n".join(f"{name}=={version}" for name, version in deps))
+
+        mirror = OSVMirror(mirror_path)
+        started = time.perf_counter()
+        single = [mirror.lookup_batch([("pypi", name, version)])[0] for name, version in deps]
+        per_package = time.perf_counter() - started
+
+        settings.OSV_MIRROR_PATH = mirror_path
+        service = NativeSCAService(db=None)
+        started = time.perf_counter()
+        result = await service.run_osv_scan(manifest, "pypi")
+        batched = time.perf_counter() - started
+
+        assert result.success, result.error
+        assert len(result.findings) == sum(len(found) for found in single), "batched and per-package lookups disagree"
+
+        api_estimate = args.dependencies * args.api_rtt_ms / 1000
+        print(f"{args.dependencies:,} dependencies, {len(result.findings):,} findings "
+              f"in {result.vulnerable_dependencies:,} vulnerable packages")
+        print()
+        print(f"{'strategy':<24} {'seconds':>10}")
+        print(f"{'sequential API (est.)':<24} {api_estimate:>10,.2f}")
+        print(f"{'per-package mirror':<24} {per_package:>10,.3f}")
+        print(f"{'batched mirror':<24} {batched:>10,.3f}")
+        print(f"Speedup: {per_package / batched:,.1f}x over per-package mirror lookups, "
+              f"{api_estimate / batched:,.0f}x over sequential API calls")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dependencies", type=int, default=3_000)
+    parser.add_argument("--packages", type=int, default=20_000, help="Distinct packages in the synthetic database")
+    parser.add_argument("--advisories", type=int, default=60_000)
+    parser.add_argument("--api-rtt-ms", type=float, default=150, help="Assumed round trip per OSV API call")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,142 @@
+"""
+Benchmark: guarded-endpoint latency with and without the permission cache
+
+A simulated guarded endpoint runs the checks a typical org route does
+(permission + role hierarchy + plan feature). The database is replaced by a
+session that sleeps for a lognormal query latency behind a pool-sized
+semaphore, so the numbers show the effect of removing round trips under
+concurrency; Redis is the real one at REDIS_URL (the in-process tier is
+enabled when the invalidation listener can subscribe).
+
+  * before: every check loads membership/role (and plan) from the database
+  * after:  checks go through resolve_org_permissions (request memo,
+            local tier, Redis, then database)
+
+Usage:
+    python scripts/benchmark_permission_cache.py --requests 20000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import app.api.v1  # noqa: F401  (routers first; permissions <-> auth import cycle)
+from app.core.cache import close_redis, start_cache_invalidation_listener
+from app.core.permissions import (
+    check_org_permission, check_role_hierarchy, get_org_subscription, get_user_org_membership,
+)
+from app.models.organisation import UserOrganisation
+from app.models.subscription import OrganizationSubscription, SubscriptionPlan
+from app.core.latency_histogram import LatencyHistogram
+
+
+class SimulatedSession:
+    """AsyncSession stand-in: each execute() costs one simulated query"""
+
+    def __init__(self, pool: asyncio.Semaphore, latency_ms: float, rng: random.Random, membership, subscription):
+        self.info = {}
+        self.queries = 0
+        self._pool = pool
+        self._latency_ms = latency_ms
+        self._rng = rng
+        self._membership = membership
+        self._subscription = subscription
+
+    async def execute(self, statement):
+        self.queries += 1
+        async with self._pool:
+            await asyncio.sleep(self._rng.lognormvariate(0, 0.5) * self._latency_ms / 1000)
+        entity = statement.column_descriptions[0]["entity"]
+        row = self._membership if entity is UserOrganisation else self._subscription
+        return SimpleNamespace(scalar_one_or_none=lambda: row)
+
+
+async def guarded_endpoint_before(user, org_id, db):
+    membership = await get_user_org_membership(user.id, org_id, db)
+    if not membership or not membership.has_permission("can_manage_users"):
+        raise RuntimeError("denied")
+    subscription = await get_org_subscription(org_id, db)
+    if "api_testing" not in subscription.plan.features:
+        raise RuntimeError("feature")
+    membership = await get_user_org_membership(user.id, org_id, db)
+    return membership.hierarchy_level > 1
+
+
+async def guarded_endpoint_after(user, org_id, db):
+    await check_org_permission(user, org_id, "can_manage_users", db, require_feature="api_testing")
+    return await check_role_hierarchy(user, org_id, "member", db)
+
+
+async def run(endpoint, args, tenants):
+    pool = asyncio.Semaphore(args.pool_size)
+    rng = random.Random(7)
+    histogram = LatencyHistogram()
+    queries = 0
+    pending = iter(range(args.requests))
+
+    async def client():
+        nonlocal queries
+        for _ in pending:
+            user, org_id, membership, subscription = tenants[rng.randrange(len(tenants))]
+            db = SimulatedSession(pool, args.db_latency_ms, rng, membership, subscription)
+            started = time.perf_counter()
+            await endpoint(user, org_id, db)
+            histogram.record((time.perf_counter() - started) * 1000)
+            queries += db.queries
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return histogram, queries, elapsed
+
+
+def make_tenants(count):
+    tenants = []
+    for _ in range(count):
+        user = SimpleNamespace(id=uuid.uuid4(), is_superuser=False)
+        org_id = uuid.uuid4()
+        membership = UserOrganisation(id=uuid.uuid4(), user_id=user.id, organisation_id=org_id, role="admin")
+        subscription = OrganizationSubscription(
+            organisation_id=org_id, plan=SubscriptionPlan(features=["api_testing"])
+        )
+        tenants.append((user, org_id, membership, subscription))
+    return tenants
+
+
+def report(name, histogram, queries, elapsed, requests):
+    summary = histogram.percentiles([50, 95, 99])
+    print(f"{name:<8} p50 {summary[50]:7.2f}ms  p95 {summary[95]:7.2f}ms  p99 {summary[99]:7.2f}ms  "
+          f"{requests / elapsed:8,.0f} req/s  {queries / requests:4.2f} queries/req")
+
+
+async def main(args):
+    local_tier = await start_cache_invalidation_listener()
+    print(f"Local cache tier: {'enabled' if local_tier else 'disabled (Redis unavailable?)'}")
+    tenants = make_tenants(args.tenants)
+
+    before = await run(guarded_endpoint_before, args, tenants)
+    after = await run(guarded_endpoint_after, args, tenants)
+
+    print(f"{args.requests:,} requests, concurrency {args.concurrency}, "
+          f"{args.tenants} user/org pairs, simulated query {args.db_latency_ms}ms, pool {args.pool_size}")
+    report("before", *before, args.requests)
+    report("after", *after, args.requests)
+    await close_redis()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tenants", type=int, default=200)
+    parser.add_argument("--db-latency-ms", type=float, default=1.5)
+    parser.add_argument("--pool-size", type=int, default=15)
+    args = parser.parse_args()
+    asyncio.run(main(args))
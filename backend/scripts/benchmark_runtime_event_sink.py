@@ -0,0 +1,151 @@
+"""
+Benchmark: RASP event logging during an attack burst
+
+Uses a fake database: a pool of --pool connections where every statement
+and commit costs --rtt-ms. It replays --events blocked attacks from
+--attackers source IPs cycling through --payloads payloads, issued by
+--concurrency simultaneous requests, and compares:
+
+  * legacy: NativeRASPService.log_event as before, one INSERT + COMMIT per
+            event on the request's own session
+  * sink:   RuntimeEventSink, identical events merged in memory and written by
+            the background flusher (bulk insert + rollup upsert per flush)
+
+It reports the latency logging adds to each request, the time until every
+event is durable, and the number of database round trips.
+
+Usage:
+    python scripts/benchmark_runtime_event_sink.py --events 20000 --attackers 50 --rtt-ms 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models.security_advanced_models import AttackType, FindingSeverity  # noqa: E402
+from app.services.runtime_event_sink import RuntimeEventSink  # noqa: E402
+
+PROJECT = uuid.uuid4()
+CONFIG = uuid.uuid4()
+
+
+class FakeDatabase:
+    def __init__(self, pool: int, rtt_ms: float):
+        self.pool = asyncio.Semaphore(pool)
+        self.rtt = rtt_ms / 1000
+        self.round_trips = 0
+        self.rows = 0
+
+    def session(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, database: FakeDatabase):
+        self.database = database
+
+    async def __aenter__(self):
+        await self.database.pool.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.database.pool.release()
+        return False
+
+    async def _round_trip(self):
+        self.database.round_trips += 1
+        await asyncio.sleep(self.database.rtt)
+
+    def add(self, row):
+        self.database.rows += 1
+
+    async def execute(self, statement, params=None):
+        if statement.table.name == "rasp_events":
+            self.database.rows += len(params)
+        await self._round_trip()
+
+    async def commit(self):
+        await self._round_trip()
+
+
+def event_row(n: int, attackers: int, payloads: int):
+    return {
+        "project_id": PROJECT, "config_id": CONFIG, "attack_type": AttackType.SQL_INJECTION,
+        "severity": FindingSeverity.CRITICAL, "was_blocked": True, "source_ip": f"198.51.100.{n % attackers}",
+        "http_method": "POST", "request_path": "/login", "attack_payload": f"' or {n % payloads}={n % payloads}",
+    }
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000
+
+
+async def replay(log, events: int, concurrency: int, attackers: int, payloads: int):
+    latencies = []
+    queue = iter(range(events))
+
+    async def client():
+        for n in queue:
+            started = time.perf_counter()
+            await log(event_row(n, attackers, payloads))
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies
+
+
+async def run_legacy(args):
+    database = FakeDatabase(args.pool, args.rtt_ms)
+
+    async def log(row):
+        async with database.session() as session:
+            session.add(row)
+            await session.commit()
+
+    started = time.perf_counter()
+    latencies = await replay(log, args.events, args.concurrency, args.attackers, args.payloads)
+    return latencies, time.perf_counter() - started, database
+
+
+async def run_sink(args):
+    database = FakeDatabase(args.pool, args.rtt_ms)
+    sink = RuntimeEventSink(session_factory=database.session, flush_interval=args.flush_seconds)
+
+    async def log(row):
+        sink.record_rasp_event(row)
+
+    started = time.perf_counter()
+    latencies = await replay(log, args.events, args.concurrency, args.attackers, args.payloads)
+    await sink.close()
+    return latencies, time.perf_counter() - started, database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--attackers", type=int, default=50, help="Distinct source IPs")
+    parser.add_argument("--payloads", type=int, default=20, help="Distinct payloads per source")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight")
+    parser.add_argument("--pool", type=int, default=10, help="Database connections")
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="Cost of each statement and commit")
+    parser.add_argument("--flush-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{args.events:,} events from {args.attackers} IPs x {args.payloads} payloads, "
+          f"{args.concurrency} concurrent requests, {args.pool} connections at {args.rtt_ms} ms\n")
+    for name, run in (("legacy", run_legacy), ("sink", run_sink)):
+        latencies, elapsed, database = asyncio.run(run(args))
+        print(
+            f"  {name:<7} request p50 {percentile(latencies, 0.5):8.3f} ms   p99 {percentile(latencies, 0.99):8.3f} ms   "
+            f"durable after {elapsed:6.2f}s   {database.round_trips:>6,} round trips   {database.rows:>6,} event rows"
+        )
+
+
+if __name__ == "__main__":
+    main()
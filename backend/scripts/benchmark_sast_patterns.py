@@ -0,0 +1,138 @@
+"""
+Benchmark: custom SAST rules, per-pattern line scan vs. single-pass matcher
+
+Generates a synthetic repository (default 100k source files, a few
+vulnerable lines sprinkled in) and times three ways of running the
+NativeSASTService custom rules over it:
+
+  * legacy:   recompile every rule per file, then search every line once per rule
+              (run on the first --legacy-files files and extrapolated)
+  * matcher:  MultiPatternMatcher in-process (one combined pass per file)
+  * parallel: scan_tree across --workers processes
+
+Matches from the legacy and matcher scans are compared on the shared files.
+
+Usage:
+    python scripts/benchmark_sast_patterns.py --files 100000 --workers 0
+"""
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+FILES_PER_DIR = 1_000
+
+FILLER = [
+    "def handler_{n}(request, payload):",
+    "    value = payload.get('field_{n}')",
+    "    if value is None:",
+    "        return None",
+    "    items = [item for item in range({n}) if item % 3]",
+    "    logger.info('processed %d items', len(items))",
+    "    session.add(Record(name=value, size={n}))",
+    "    # keep the query plan stable for large accounts",
+    "    return {{'id': {n}, 'status': 'ok'}}",
+    "",
+]
+
+VULNERABLE = [
+    '    cursor.execute("SELECT * FROM t WHERE id = %s" % value)',
+    "    subprocess.run('convert ' + value, shell=True)",
+    '    API_KEY = "sk_live_{n:012d}"',
+    "    token = random.choice(ALPHABET)",
+    "    return eval(value)",
+    "    obj = pickle.loads(value)",
+    "    digest = hashlib.md5(value).hexdigest()",
+    "    requests.get(BASE_URL + value)",
+    "DEBUG = True",
+]
+
+
+def generate_repo(root: str, files: int, lines: int, vulnerable_ratio: float, seed: int) -> None:
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    for index in range(files):
+        directory = os.path.join(root, f"pkg_{index // FILES_PER_DIR:04d}")
+        if index % FILES_PER_DIR == 0:
+            os.makedirs(directory, exist_ok=True)
+        body = []
+        for n in range(lines):
+            template = rng.choice(VULNERABLE) if rng.random() < vulnerable_ratio else rng.choice(FILLER)
+            body.append(template.format(n=n))
+        with open(os.path.join(directory, f"module_{index}.py"), "w") as f:
+            f.write("\n".join(body))
+    print(f"Generated {files:,} files x {lines} lines in {time.perf_counter() - started:.1f}s")
+
+
+def legacy_scan(service, root: str, filepaths):
+    """The original run_custom_rules inner loop"""
+    matches = []
+    for filepath in filepaths:
+        with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
+            lines = f.read().split("\n")
+        for index, pattern_def in enumerate(service.SECURITY_PATTERNS):
+            pattern = re.compile(pattern_def["pattern"], re.IGNORECASE)
+            for line_num, line in enumerate(lines, 1):
+                if pattern.search(line):
+                    matches.append((os.path.relpath(filepath, root), line_num, index, line.strip()[:200]))
+    return sorted(matches)
+
+
+def main(args) -> None:
+    from app.services.code_scanner import resolve_scan_workers, scan_tree
+    from app.services.native_sast_service import NativeSASTService
+
+    service = NativeSASTService.__new__(NativeSASTService)
+    rules = NativeSASTService.CUSTOM_RULES
+    workers = resolve_scan_workers(args.workers)
+    root = tempfile.mkdtemp(prefix="sast-bench-")
+    try:
+        generate_repo(root, args.files, args.lines, args.vulnerable_ratio, args.seed)
+        filepaths = list(service._iter_code_files(root))
+        legacy_paths = filepaths[:args.legacy_files]
+
+        started = time.perf_counter()
+        legacy = legacy_scan(service, root, legacy_paths)
+        legacy_seconds = time.perf_counter() - started
+        legacy_estimate = legacy_seconds * len(filepaths) / max(1, len(legacy_paths))
+
+        inline = scan_tree(root, rules, filepaths, workers=1)
+        parallel = scan_tree(root, rules, service._iter_code_files(root), workers=workers,
+                             batch_files=args.batch_files)
+
+        sampled = {os.path.relpath(path, root) for path in legacy_paths}
+        assert [m for m in inline.matches if m[0] in sampled] == legacy, "matcher disagrees with legacy scan"
+        assert parallel.matches == inline.matches, "parallel scan disagrees with inline scan"
+
+        print(f"Scanned {inline.files_scanned:,} files, {inline.lines_scanned:,} lines, "
+              f"{inline.bytes_scanned / 1e6:,.0f} MB: {len(inline.matches):,} matches")
+        print()
+        print(f"{'strategy':<22} {'seconds':>10} {'files/s':>12}")
+        print(f"{'legacy (extrapolated)':<22} {legacy_estimate:>10,.1f} {len(filepaths) / legacy_estimate:>12,.0f}")
+        print(f"{'matcher':<22} {inline.duration_seconds:>10,.1f} "
+              f"{len(filepaths) / inline.duration_seconds:>12,.0f}")
+        print(f"{f'parallel x{parallel.workers}':<22} {parallel.duration_seconds:>10,.1f} "
+              f"{len(filepaths) / parallel.duration_seconds:>12,.0f}")
+        print(f"Speedup: matcher {legacy_estimate / inline.duration_seconds:,.1f}x, "
+              f"parallel {legacy_estimate / parallel.duration_seconds:,.1f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--lines", type=int, default=60, help="Lines per file")
+    parser.add_argument("--vulnerable-ratio", type=float, default=0.01, help="Share of lines that trigger a rule")
+    parser.add_argument("--legacy-files", type=int, default=10_000, help="Files timed with the legacy scan")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (0 = one per CPU core)")
+    parser.add_argument("--batch-files", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
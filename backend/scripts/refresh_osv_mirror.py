@@ -0,0 +1,32 @@
+"""
+Build or refresh the local OSV vulnerability mirror used by SCA scans
+
+Downloads the OSV data dump (all.zip) of each ecosystem and rebuilds the
+index at OSV_MIRROR_PATH. For air-gapped installs, download the dumps
+elsewhere and point --source-dir at them (<dir>/<Ecosystem>/all.zip or
+<dir>/<Ecosystem>.zip).
+
+Usage:
+    python scripts/refresh_osv_mirror.py
+    python scripts/refresh_osv_mirror.py --ecosystems PyPI npm Go --source-dir /mnt/osv
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.osv_mirror import refresh_mirror
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", help="Index file (default OSV_MIRROR_PATH)")
+    parser.add_argument("--ecosystems", nargs="+", help="OSV ecosystem names (default OSV_MIRROR_ECOSYSTEMS)")
+    parser.add_argument("--source-dir", help="Use already-downloaded dumps instead of downloading")
+    args = parser.parse_args()
+    stats = asyncio.run(refresh_mirror(args.path, args.ecosystems, args.source_dir))
+    print(json.dumps(stats, indent=2))
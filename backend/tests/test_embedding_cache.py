@@ -0,0 +1,143 @@
+"""
+Unit tests for the content-addressed embedding cache
+"""
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.core import cache as cache_module
+from app.services import embedding_cache as embedding_cache_module
+from app.services.ai_service import AIService
+from app.services.embedding_cache import EmbeddingCache, embedding_key, pack_vector, unpack_vector
+from app.services.gemini_service import GeminiService
+
+
+class _FakePipeline:
+    def __init__(self, store):
+        self.store = store
+        self.ops = []
+
+    def set(self, key, value, ex=None):
+        self.ops.append((key, value))
+
+    async def execute(self):
+        self.store.update(self.ops)
+        return [True] * len(self.ops)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.mget_calls = 0
+
+    async def mget(self, keys):
+        self.mget_calls += 1
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self.store)
+
+
+class _Embedder:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+@pytest.fixture
+def redis_client():
+    client = _FakeRedis()
+
+    async def get_client():
+        return client
+
+    cache_module._redis_unavailable_until = 0.0
+    with patch.object(embedding_cache_module, "get_redis_client", get_client):
+        yield client
+
+
+def test_key_includes_model_and_vector_roundtrip():
+    assert embedding_key("openai:a", "text") != embedding_key("openai:b", "text")
+    assert embedding_key("openai:a", "text") == embedding_key("openai:a", "text")
+    assert list(unpack_vector(pack_vector([0.25, -1.5, 3.0]))) == [0.25, -1.5, 3.0]
+
+
+@pytest.mark.asyncio
+async def test_only_distinct_uncached_texts_are_embedded(redis_client):
+    cache = EmbeddingCache(max_entries=100, ttl=60)
+    embedder = _Embedder()
+
+    first = await cache.embed("m", ["a", "bb", "a"], embedder)
+    second = await cache.embed("m", ["bb", "ccc"], embedder)
+
+    assert first == [[1.0, 0.5], [2.0, 0.5], [1.0, 0.5]]
+    assert second == [[2.0, 0.5], [3.0, 0.5]]
+    assert embedder.calls == [["a", "bb"], ["ccc"]]
+    stats = cache.stats()
+    assert stats["local_hits"] == 1 and stats["misses"] == 4 and stats["embedded"] == 3
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_between_processes(redis_client):
+    embedder = _Embedder()
+    await EmbeddingCache(max_entries=100, ttl=60).embed("m", ["shared text"], embedder)
+
+    other_worker = EmbeddingCache(max_entries=100, ttl=60)
+    vectors = await other_worker.embed("m", ["shared text"], embedder)
+
+    assert vectors == [[11.0, 0.5]]
+    assert len(embedder.calls) == 1
+    assert other_worker.stats()["redis_hits"] == 1
+    assert len(other_worker) == 1  # promoted to the local tier
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_without_redis():
+    cache = EmbeddingCache(max_entries=2, ttl=60, use_redis=False)
+    embedder = _Embedder()
+
+    await cache.embed("m", ["a", "b"], embedder)
+    await cache.embed("m", ["a"], embedder)  # "a" becomes most recent
+    await cache.embed("m", ["c"], embedder)  # evicts "b"
+    await cache.embed("m", ["a", "b"], embedder)
+
+    assert embedder.calls[-1] == ["b"]
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_gemini_embedding_does_not_block_the_event_loop(monkeypatch):
+    gemini = GeminiService.__new__(GeminiService)
+    gemini.embedding_model = "models/embedding-001"
+    monkeypatch.setattr(gemini, "_check_api_key", lambda: None)
+
+    def embed_content(model, content, task_type):
+        time.sleep(0.2)  # the SDK call blocks
+        if isinstance(content, str):
+            return {"embedding": [1.0, 2.0]}
+        return {"embedding": [[1.0, 2.0] for _ in content]}
+
+    monkeypatch.setattr("app.services.gemini_service.genai.embed_content", embed_content)
+    service = AIService.__new__(AIService)
+    service.provider = "gemini"
+    service._gemini_service = gemini
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        assert await service._embed_texts(["one text"]) == [[1.0, 2.0]]
+    finally:
+        task.cancel()
+    assert ticks >= 5
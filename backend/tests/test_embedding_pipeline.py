@@ -0,0 +1,99 @@
+"""
+Unit tests for the batched embedding pipeline and bulk chunk storage
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.document_knowledge_service import DocumentKnowledgeService
+from app.services.embedding_pipeline import EmbeddingPipeline, is_rate_limit_error
+
+
+class FakeEmbedder:
+    """Embeds each text as [len(text)] and fails on request"""
+
+    def __init__(self, fail_batches=(), rate_limited_calls=0):
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_batches = set(fail_batches)
+        self.rate_limited_calls = rate_limited_calls
+
+    async def __call__(self, texts):
+        self.calls += 1
+        call = self.calls
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if call <= self.rate_limited_calls:
+                raise RuntimeError("429 Resource has been exhausted (e.g. check quota)")
+            if texts[0] in self.fail_batches:
+                raise ValueError("bad input")
+            return [[float(len(text))] for text in texts]
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_batches_concurrency_and_paged_upserts():
+    texts = [f"chunk-{i}" for i in range(25)]
+    embedder = FakeEmbedder(rate_limited_calls=1)
+    pages = []
+    progress = []
+
+    async def upsert(indexes, vectors):
+        pages.append(list(indexes))
+
+    pipeline = EmbeddingPipeline(
+        embedder, batch_size=4, concurrency=3, max_retries=2, upsert_batch_size=10, base_backoff=0.01
+    )
+    stats = await pipeline.run(texts, upsert, on_progress=lambda *args: progress.append(args))
+
+    assert embedder.calls == 7 + 1  # 7 batches plus one rate-limited retry
+    assert embedder.max_in_flight <= 3
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sorted(i for page in pages for i in page) == list(range(25))
+    assert stats.stored == 25 and stats.failed == 0
+    assert stats.rate_limited == 1 and stats.retries == 1
+    assert progress[-1] == (25, 25, 0, 25)
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_skipped():
+    texts = [f"chunk-{i}" for i in range(6)]
+    embedder = FakeEmbedder(fail_batches={"chunk-2"})
+    upsert = AsyncMock()
+
+    stats = await EmbeddingPipeline(embedder, batch_size=2, concurrency=2, max_retries=1, base_backoff=0.01).run(
+        texts, upsert
+    )
+
+    assert stats.failed_indexes == [2, 3]
+    assert stats.stored == 4
+    assert embedder.calls == 4  # the failing batch is tried twice
+
+
+def test_rate_limit_detection():
+    assert is_rate_limit_error(RuntimeError("429 Too Many Requests"))
+    assert is_rate_limit_error(type("ResourceExhausted", (Exception,), {})("slow down"))
+    assert not is_rate_limit_error(ValueError("invalid argument"))
+
+
+@pytest.mark.asyncio
+async def test_store_document_chunks_bulk_upserts():
+    service = DocumentKnowledgeService.__new__(DocumentKnowledgeService)
+    service.ai_service = MagicMock(create_embeddings_batch=FakeEmbedder())
+    service.qdrant_service = MagicMock(ensure_collection_exists=AsyncMock(), store_vectors=AsyncMock())
+    chunks = [{"text": "x" * (i + 1), "length": i + 1} for i in range(5)]
+
+    point_ids = await service.store_document_chunks("p1", "doc1", chunks, {"source": "text_input"})
+
+    assert point_ids == [f"doc1_chunk_{i}" for i in range(5)]
+    service.qdrant_service.ensure_collection_exists.assert_awaited_once_with("project_p1_documents", vector_size=1)
+    call = service.qdrant_service.store_vectors.await_args.kwargs
+    assert call["point_ids"] == point_ids
+    assert call["payloads"][4] == {
+        "document_id": "doc1", "chunk_index": 4, "text": "xxxxx", "chunk_length": 5, "source": "text_input"
+    }
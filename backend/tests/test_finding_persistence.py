@@ -0,0 +1,145 @@
+"""
+Unit tests for bulk SAST/SCA finding persistence
+"""
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.security_advanced_models import (
+    FindingSeverity, FindingStatus, LicenseRisk, SASTEngine, SASTFinding, SAST_FINDING_HUMAN_ID_SEQ,
+)
+from app.services.finding_persistence import allocate_sequence_range, bulk_upsert_findings
+from app.services.native_sast_service import CodeFinding, NativeSASTService
+from app.services.native_sca_service import DependencyVuln, LicenseIssue, NativeSCAService
+
+
+def _db(sequence_start=1, earlier=()):
+    """Fake session; ``earlier`` holds (fingerprint, *triage values) rows of the project's previous scans"""
+    db = AsyncMock(spec=AsyncSession)
+    statements = []
+
+    async def execute(stmt, params=None):
+        statements.append((stmt, params))
+        result = MagicMock()
+        if params is None and "nextval" in _sql(stmt):  # sequence range
+            count = max(stmt.compile().params.values())  # generate_series(1, count)
+            result.scalars.return_value.all.return_value = list(range(sequence_start, sequence_start + count))
+        elif params is None:  # triage lookup
+            (fingerprints,) = [value for value in stmt.compile().params.values() if isinstance(value, list)]
+            result.all.return_value = [row for row in earlier if row[0] in fingerprints]
+        return result
+
+    db.execute.side_effect = execute
+    return db, statements
+
+
+def _sql(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def _code_finding(i, rule="python.sqli"):
+    return CodeFinding(
+        rule_id=rule, rule_name="SQL injection", engine=SASTEngine.CUSTOM, severity=FindingSeverity.HIGH,
+        confidence="high", file_path=f"app/module_{i}.py", start_line=i, end_line=i, start_column=None,
+        end_column=None, code_snippet=f"cursor.execute(q{i})", title="SQL injection", description=None,
+        remediation=None, cwe_id="CWE-89", owasp_id=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sequence_range_is_one_query():
+    db, statements = _db(sequence_start=41)
+
+    assert await allocate_sequence_range(db, SAST_FINDING_HUMAN_ID_SEQ, 3) == [41, 42, 43]
+    assert len(statements) == 1
+    assert "nextval('sast_finding_human_id_seq')" in _sql(statements[0][0])
+    assert "generate_series" in _sql(statements[0][0])
+
+
+@pytest.mark.asyncio
+async def test_upserts_in_pages_with_one_commit_each():
+    db, statements = _db()
+    rows = [{"scan_id": uuid.uuid4(), "fingerprint": f"fp{i % 5}", "title": str(i)} for i in range(7)]
+
+    written = await bulk_upsert_findings(db, SASTFinding, rows, ["title"], page_size=2)
+
+    assert written == 5  # duplicate fingerprints collapse, last one wins
+    assert [len(params) for _, params in statements] == [2, 2, 1]
+    assert [row["title"] for _, params in statements for row in params] == ["5", "6", "2", "3", "4"]
+    assert db.commit.await_count == 3
+    sql = _sql(statements[0][0])
+    assert "ON CONFLICT (scan_id, fingerprint) DO UPDATE SET title = excluded.title" in sql
+    assert "updated_at = now()" in sql
+    assert "status" not in sql.split("DO UPDATE")[1]
+
+
+@pytest.mark.asyncio
+async def test_sast_scan_saves_all_findings_in_bulk(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.FINDINGS_BATCH_SIZE", 1000)
+    db, statements = _db(sequence_start=120)
+    service = NativeSASTService.__new__(NativeSASTService)
+    service.db = db
+    scan = SimpleNamespace(id=uuid.uuid4(), project_id=uuid.uuid4())
+
+    assert await service._save_findings(scan, [_code_finding(i) for i in range(2500)]) == 2500
+
+    assert len(statements) == 1 + 1 + 3  # id range + triage lookup + three pages
+    assert db.commit.await_count == 3
+    rows = [row for _, params in statements[2:] for row in params]
+    assert rows[0]["human_id"] == "SAST-F-00120"
+    assert rows[-1]["human_id"] == "SAST-F-02619"
+    assert len({row["fingerprint"] for row in rows}) == 2500
+
+
+@pytest.mark.asyncio
+async def test_sca_findings_get_stable_fingerprints():
+    db, statements = _db()
+    service = NativeSCAService.__new__(NativeSCAService)
+    service.db = db
+    scan = SimpleNamespace(id=uuid.uuid4(), project_id=uuid.uuid4())
+    vuln = DependencyVuln(
+        package_name="requests", package_version="2.0.0", ecosystem="pypi", manifest_file="requirements.txt",
+        cve_id="CVE-2023-1", ghsa_id=None, severity=FindingSeverity.HIGH, cvss_score=7.5, cvss_vector=None,
+        title="Leak", description=None, fixed_version="2.31.0",
+    )
+    issue = LicenseIssue("gpl-lib", "1.0", "pypi", "GPL-3.0", LicenseRisk.HIGH, "Copyleft")
+
+    await service._save_findings(scan, [vuln, vuln], [issue])
+    await service._save_findings(scan, [vuln], [])
+
+    upserts = [(stmt, params) for stmt, params in statements if params is not None]
+    first, second = upserts[0][1], upserts[1][1]
+    assert len(first) == 2
+    assert first[0]["fingerprint"] == second[0]["fingerprint"]
+    assert first[0]["fingerprint"] != first[1]["fingerprint"]
+    assert set(first[0]) == set(first[1])  # one executemany shape
+    assert "ON CONFLICT (scan_id, fingerprint)" in _sql(upserts[0][0])
+
+
+@pytest.mark.asyncio
+async def test_rescan_keeps_triage_decisions_but_reopens_fixed_findings():
+    service = NativeSASTService.__new__(NativeSASTService)
+    findings = [_code_finding(i) for i in range(3)]
+    fingerprints = [service._generate_fingerprint(finding) for finding in findings]
+    db, statements = _db(earlier=[
+        (fingerprints[0], FindingStatus.FALSE_POSITIVE, "test fixture"),
+        (fingerprints[1], FindingStatus.FIXED, None),
+    ])
+    service.db = db
+    scan = SimpleNamespace(id=uuid.uuid4(), project_id=uuid.uuid4())
+
+    await service._save_findings(scan, findings)
+
+    lookup = _sql(statements[1][0])
+    assert "DISTINCT ON (sast_findings.fingerprint)" in lookup
+    assert "sast_scans.project_id" in lookup and "sast_findings.scan_id !=" in lookup
+    rows = {row["fingerprint"]: row for row in statements[2][1]}
+    assert (rows[fingerprints[0]]["status"], rows[fingerprints[0]]["suppression_reason"]) == (
+        FindingStatus.FALSE_POSITIVE, "test fixture",
+    )
+    assert rows[fingerprints[1]]["status"] == FindingStatus.OPEN  # a fixed finding that came back is open again
+    assert rows[fingerprints[2]]["status"] == FindingStatus.OPEN
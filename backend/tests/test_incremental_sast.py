@@ -0,0 +1,283 @@
+"""
+Unit tests for incremental SAST scanning and parallel engine orchestration
+"""
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import app.api.v1  # noqa: F401  (resolves model relationships)
+from app.services import native_sast_service as sast_module
+from app.models.security_advanced_models import FindingSeverity, SASTEngine
+from app.services.native_sast_service import CodeFinding, NativeSASTService, SASTResult
+from app.services import sast_file_state
+from app.services.sast_file_state import build_manifest, diff_file_states, load_cached_findings, relative_path
+
+
+class _StateStore:
+    """In-memory stand-in for the sast_file_states table"""
+
+    def __init__(self):
+        self.rows = {}
+
+    async def load_file_states(self, db, project_id, engine):
+        return {path: (row["content_hash"], row["rules_hash"])
+                for (p, e, path), row in self.rows.items() if (p, e) == (project_id, engine)}
+
+    async def load_cached_findings(self, db, project_id, engine, paths):
+        return {path: self.rows[(project_id, engine, path)]["findings"] for path in paths}
+
+    async def save_file_states(self, db, project_id, engine, rows):
+        for row in rows:
+            self.rows[(project_id, engine, row["file_path"])] = row
+
+    async def delete_file_states(self, db, project_id, engine, paths):
+        for path in paths:
+            del self.rows[(project_id, engine, path)]
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = _StateStore()
+    for name in ("load_file_states", "load_cached_findings", "save_file_states", "delete_file_states"):
+        monkeypatch.setattr(sast_module, name, getattr(store, name))
+    monkeypatch.setattr("app.core.config.settings.SAST_SCAN_WORKERS", 1)
+    return store
+
+
+def _service(monkeypatch):
+    service = NativeSASTService.__new__(NativeSASTService)
+    service.db = None
+    scanned = []
+    original = service.run_custom_rules
+
+    async def run_custom_rules(path, exclude_patterns=None, targets=None):
+        scanned.append(sorted(os.path.relpath(t, path) for t in targets) if targets is not None else None)
+        return await original(path, exclude_patterns, targets)
+
+    monkeypatch.setattr(service, "run_custom_rules", run_custom_rules)
+    return service, scanned
+
+
+async def _scan(service, root, project_id, incremental=True):
+    scan = SimpleNamespace(project_id=project_id, ruleset="default", exclude_patterns=[], incremental=incremental)
+    manifest = build_manifest(str(root), service._iter_scan_files(str(root)))
+    outcome = await service._run_engine_incremental(scan, "custom", str(root), manifest)
+    return outcome, sorted((f.file_path, f.start_line, f.rule_id) for f in outcome.findings)
+
+
+def test_diff_detects_changed_unchanged_deleted_and_rule_changes():
+    states = {"a.py": ("h1", "r1"), "b.py": ("h2", "r1"), "gone.py": ("h3", "r1")}
+    manifest = {"a.py": "h1", "b.py": "h2-edited", "new.py": "h4"}
+
+    delta = diff_file_states(manifest, states, "r1")
+    assert (delta.changed, delta.unchanged, delta.deleted) == (["b.py", "new.py"], ["a.py"], ["gone.py"])
+
+    assert diff_file_states(manifest, states, "r2").unchanged == []
+    assert diff_file_states(manifest, states, "r1", reuse=False).changed == ["a.py", "b.py", "new.py"]
+
+
+def test_relative_path_normalizes_engine_output():
+    assert relative_path("/repo", "/repo/src/app.py") == os.path.join("src", "app.py")
+    assert relative_path("repo", "repo/src/app.py") == os.path.join("src", "app.py")
+    assert relative_path("/repo", "src/app.py") == os.path.join("src", "app.py")
+
+
+def test_hash_file_reads_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(sast_file_state, "HASH_CHUNK_SIZE", 7)
+    content = os.urandom(100)
+    (tmp_path / "blob.bin").write_bytes(content)
+    assert sast_file_state.hash_file(str(tmp_path / "blob.bin")) == hashlib.sha256(content).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_cached_findings_are_filtered_by_path_in_chunks(monkeypatch):
+    monkeypatch.setattr(sast_file_state, "PATH_CHUNK_SIZE", 2)
+    requested = []
+
+    async def execute(statement):
+        paths = next(value for value in statement.compile().params.values() if isinstance(value, list))
+        requested.append(paths)
+        result = MagicMock()
+        result.all.return_value = [SimpleNamespace(file_path=path, findings=[{"rule_id": path}]) for path in paths]
+        return result
+
+    cached = await load_cached_findings(MagicMock(execute=execute), uuid.uuid4(), "custom", ["e", "a", "c", "b", "a"])
+    assert requested == [["a", "b"], ["c", "e"]]
+    assert sorted(cached) == ["a", "b", "c", "e"]
+    assert await load_cached_findings(MagicMock(execute=execute), uuid.uuid4(), "custom", []) == {}
+    assert len(requested) == 2
+
+
+@pytest.mark.asyncio
+async def test_only_changed_files_are_rescanned(tmp_path, monkeypatch, store):
+    service, scanned = _service(monkeypatch)
+    project_id = uuid.uuid4()
+    (tmp_path / "a.py").write_text("x = eval(y)\n")
+    (tmp_path / "b.py").write_text("DEBUG = True\n")
+    (tmp_path / "c.py").write_text("data = pickle.loads(blob)\n")
+    (tmp_path / "README.md").write_text("eval(x)\n")
+
+    first, first_findings = await _scan(service, tmp_path, project_id)
+    assert scanned == [None]  # nothing cached yet: whole tree
+    assert first.scoped == {"a.py", "b.py", "c.py"}
+    assert [path for path, _, _ in first_findings] == ["a.py", "b.py", "c.py"]
+
+    (tmp_path / "a.py").write_text("x = 1\ny = eval(z)\n")
+    (tmp_path / "c.py").unlink()
+    (tmp_path / "d.py").write_text("h = hashlib.md5(data)\n")
+
+    second, second_findings = await _scan(service, tmp_path, project_id)
+    assert scanned[-1] == ["a.py", "d.py"]
+    assert (second.changed, second.deleted) == (["a.py", "d.py"], ["c.py"])
+    assert second_findings == [
+        ("a.py", 2, "custom.eval-usage"), ("b.py", 1, "custom.debug-enabled"), ("d.py", 1, "custom.weak-crypto"),
+    ]
+    assert {path for _, _, path in store.rows} == {"a.py", "b.py", "d.py"}
+
+    # Nothing changed: nothing scanned, everything carried forward
+    third, third_findings = await _scan(service, tmp_path, project_id)
+    assert len(scanned) == 2 and third.changed == []
+    assert third_findings == second_findings
+
+
+@pytest.mark.asyncio
+async def test_manifest_prunes_directory_names_not_substrings(tmp_path, monkeypatch, store):
+    root = tmp_path / "builds" / "repo"
+    for name in ("src/distance.py", "lib/distributed_lock.py", "rebuild.py", "builder/tasks.py",
+                 ".github/workflows/ci.yml", "dist/bundle.py", "src/build/gen.py", "node_modules/x/index.js",
+                 "vendor/lib.py"):
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text("x = 1\n")
+    service = NativeSASTService.__new__(NativeSASTService)
+    service.db = None
+
+    manifest = build_manifest(str(root), service._iter_scan_files(str(root), ["vendor/"]))
+    assert sorted(manifest) == [
+        os.path.join(".github", "workflows", "ci.yml"), os.path.join("builder", "tasks.py"),
+        os.path.join("lib", "distributed_lock.py"), "rebuild.py", os.path.join("src", "distance.py"),
+    ]
+
+    async def run_engine(engine, scan, path, targets):
+        findings = [
+            CodeFinding(
+                rule_id="B307", rule_name="eval", engine=SASTEngine.BANDIT, severity=FindingSeverity.MEDIUM,
+                confidence="high", file_path=os.path.join(path, name), start_line=1, end_line=1, start_column=None,
+                end_column=None, code_snippet="x = 1", title="eval", description=None, remediation=None,
+                cwe_id=None, owasp_id=None,
+            )
+            for name in ("src/distance.py", "builder/tasks.py", "rebuild.py")
+        ]
+        return SASTResult(success=True, findings=findings, engine=engine)
+
+    monkeypatch.setattr(service, "_run_engine", run_engine)
+    scan = SimpleNamespace(project_id=uuid.uuid4(), ruleset="default", exclude_patterns=["vendor/"], incremental=True)
+    outcome = await service._run_engine_incremental(scan, "bandit", str(root), manifest)
+    assert sorted(f.file_path for f in outcome.findings) == [
+        os.path.join("builder", "tasks.py"), "rebuild.py", os.path.join("src", "distance.py"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_full_rescan_when_rules_change_or_requested(tmp_path, monkeypatch, store):
+    service, scanned = _service(monkeypatch)
+    project_id = uuid.uuid4()
+    (tmp_path / "a.py").write_text("x = eval(y)\n")
+    (tmp_path / "b.py").write_text("y = 2\n")
+    await _scan(service, tmp_path, project_id)
+
+    await _scan(service, tmp_path, project_id, incremental=False)
+    assert scanned[-1] is None
+
+    patterns = [dict(p) for p in NativeSASTService.SECURITY_PATTERNS]
+    patterns[4]["severity"] = sast_module.FindingSeverity.CRITICAL
+    monkeypatch.setattr(NativeSASTService, "SECURITY_PATTERNS", patterns)
+    outcome, _ = await _scan(service, tmp_path, project_id)
+    assert scanned[-1] is None and outcome.changed == ["a.py", "b.py"]
+
+
+@pytest.mark.asyncio
+async def test_engines_run_concurrently_and_stream_deduplicated_findings(tmp_path, monkeypatch, store):
+    monkeypatch.setattr("app.core.config.settings.SAST_ENGINE_CONCURRENCY", 3)
+    (tmp_path / "app.py").write_text("x = 1\n")
+    (tmp_path / "ui.js").write_text("let x = 1\n")
+    scan = SimpleNamespace(
+        id=uuid.uuid4(), project_id=uuid.uuid4(), local_path=str(tmp_path), repo_url=None, ruleset="default",
+        exclude_patterns=[], incremental=True, started_at=None,
+    )
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = scan
+    service = NativeSASTService.__new__(NativeSASTService)
+    service.db = MagicMock(execute=AsyncMock(return_value=result), commit=AsyncMock())
+    saved = []
+
+    def finding(engine, rule, severity):
+        return CodeFinding(
+            rule_id=rule, rule_name=rule, engine=engine, severity=severity, confidence="high",
+            file_path=str(tmp_path / "app.py"), start_line=1, end_line=1, start_column=None, end_column=None,
+            code_snippet="x = 1", title=rule, description=None, remediation=None, cwe_id=None, owasp_id=None,
+        )
+
+    async def run_engine(engine, scan, path, targets):
+        await asyncio.sleep({"semgrep": 0.3, "bandit": 0.2, "custom": 0.1}[engine])
+        findings = [finding(SASTEngine.CUSTOM, "shared", FindingSeverity.HIGH)]
+        if engine == "semgrep":
+            findings.append(finding(SASTEngine.SEMGREP, "semgrep-only", FindingSeverity.CRITICAL))
+        return SASTResult(success=True, findings=findings, engine=engine)
+
+    async def save_findings(scan, findings):
+        saved.append([f.rule_id for f in findings])
+        return len(findings)
+
+    monkeypatch.setattr(service, "_scan_engines", lambda scan: ["semgrep", "bandit", "custom"])
+    monkeypatch.setattr(service, "_run_engine", run_engine)
+    monkeypatch.setattr(service, "_save_findings", save_findings)
+
+    started = time.perf_counter()
+    await service.run_scan(scan.id)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.5  # slowest engine, not the 0.6s sum
+    assert saved == [["shared"], [], ["semgrep-only"]]  # saved as each engine finishes, fastest first
+    assert (scan.status, scan.total_findings, scan.critical_count, scan.high_count) == ("completed", 2, 1, 1)
+    assert list(scan.engine_timings) == ["semgrep", "bandit", "custom"]
+    assert scan.engine_timings["semgrep"]["duration_ms"] >= 300
+    assert scan.engine_timings["bandit"]["files_scanned"] == 1  # .py only
+    assert scan.engine_timings["bandit"]["new_findings"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_scan_keeps_engine_timings(tmp_path, monkeypatch, store):
+    (tmp_path / "app.py").write_text("x = 1\n")
+    scan = SimpleNamespace(
+        id=uuid.uuid4(), project_id=uuid.uuid4(), local_path=str(tmp_path), repo_url=None, ruleset="default",
+        exclude_patterns=[], incremental=True, started_at=None,
+    )
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = scan
+    service = NativeSASTService.__new__(NativeSASTService)
+    service.db = MagicMock(execute=AsyncMock(return_value=result), commit=AsyncMock())
+
+    async def run_engine(engine, scan, path, targets):
+        await asyncio.sleep(0.05)
+        if engine == "semgrep":
+            raise RuntimeError("semgrep crashed")
+        return SASTResult(success=True, findings=[], engine=engine)
+
+    monkeypatch.setattr(service, "_scan_engines", lambda scan: ["semgrep", "custom"])
+    monkeypatch.setattr(service, "_run_engine", run_engine)
+    monkeypatch.setattr(service, "_save_findings", AsyncMock(return_value=0))
+
+    with pytest.raises(RuntimeError):
+        await service.run_scan(scan.id)
+
+    assert scan.status == "failed"
+    assert scan.engine_timings["semgrep"]["success"] is False
+    assert scan.engine_timings["semgrep"]["error"] == "semgrep crashed"
+    assert scan.engine_timings["semgrep"]["duration_ms"] >= 50
+    assert scan.engine_timings["custom"]["success"] is True
@@ -0,0 +1,88 @@
+"""
+Unit tests for the load test latency histogram
+"""
+import random
+
+import pytest
+
+from app.core.latency_histogram import LatencyHistogram, IntervalLatencyRecorder
+
+
+def exact_percentile(values, p):
+    ordered = sorted(values)
+    rank = max(1, int(len(ordered) * p / 100.0 + 0.5))
+    return ordered[rank - 1]
+
+
+class TestLatencyHistogram:
+    """Accuracy and bookkeeping of LatencyHistogram"""
+
+    def test_empty_histogram(self):
+        hist = LatencyHistogram()
+        assert hist.total_count == 0
+        assert hist.mean == 0.0
+        assert hist.summary()["latency_p95"] == 0.0
+
+    def test_percentiles_within_relative_error(self):
+        rng = random.Random(7)
+        values = [rng.lognormvariate(4, 0.8) for _ in range(20000)]
+        hist = LatencyHistogram(significant_figures=2)
+        for v in values:
+            hist.record(v)
+
+        for p in (50, 90, 95, 99, 99.9):
+            expected = exact_percentile(values, p)
+            assert hist.percentile(p) == pytest.approx(expected, rel=0.01, abs=0.002)
+
+        assert hist.min == pytest.approx(min(values), abs=0.001)
+        assert hist.max == pytest.approx(max(values), abs=0.001)
+        assert hist.mean == pytest.approx(sum(values) / len(values), rel=0.001)
+
+    def test_values_above_max_are_clamped(self):
+        hist = LatencyHistogram(max_value_ms=1000)
+        hist.record(5000)
+        assert hist.max == 1000
+
+    def test_merge_matches_single_histogram(self):
+        a, b, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i in range(1, 1001):
+            (a if i % 2 else b).record(i / 10)
+            combined.record(i / 10)
+
+        a.merge(b)
+        assert a.total_count == combined.total_count
+        assert a.percentiles() == combined.percentiles()
+
+    def test_dict_round_trip(self):
+        hist = LatencyHistogram()
+        for v in (0.5, 12.3, 250, 4000):
+            hist.record(v)
+
+        restored = LatencyHistogram.from_dict(hist.to_dict())
+        assert restored.total_count == 4
+        assert restored.percentiles() == hist.percentiles()
+        assert restored.mean == hist.mean
+
+    def test_merge_rejects_different_layouts(self):
+        with pytest.raises(ValueError):
+            LatencyHistogram(significant_figures=2).merge(LatencyHistogram(significant_figures=3))
+
+
+class TestIntervalLatencyRecorder:
+    """Interval vs. cumulative views"""
+
+    def test_interval_and_cumulative(self):
+        recorder = IntervalLatencyRecorder()
+        for v in (10, 20, 30):
+            recorder.record(v)
+        first = recorder.take_interval()
+        assert first.total_count == 3
+
+        recorder.record(1000)
+        second = recorder.take_interval()
+        assert second.total_count == 1
+        assert second.min == pytest.approx(1000, rel=0.01)
+
+        assert recorder.cumulative.total_count == 4
+        recorder.record(5)
+        assert recorder.total().total_count == 5
@@ -0,0 +1,148 @@
+"""
+Unit tests for the local load generator scheduling helpers and scenarios
+"""
+import random
+
+import pytest
+
+from app.services.load_generator import (
+    EXECUTOR_RAMPING_VUS, EXECUTOR_CONSTANT_ARRIVAL_RATE, EXECUTOR_RAMPING_ARRIVAL_RATE,
+    LoadGeneratorConfig, ArrivalRateRunner, LocalLoadRunner, LoadStats, RequestTiming,
+    _decode_sample, _encode_sample, arrival_rate_at, create_runner, resolve_executor, resolve_worker_count, target_vus_at
+)
+from app.services.load_scenarios import (
+    ScenarioError, ScenarioMix, Template, api_request_to_step, compile_path, extract_path
+)
+
+
+class TestStages:
+    """Closed-model VU stages and open-model rate stages"""
+
+    def test_target_vus_ramp(self):
+        stages = [{"duration": 10, "target": 100}, {"duration": 10, "target": 100}]
+        assert target_vus_at(stages, 5) == 50
+        assert target_vus_at(stages, 15) == 100
+        assert target_vus_at(stages, 25) == 0
+
+    def test_resolve_executor(self):
+        assert resolve_executor([{"duration": 10, "target": 5}]) == EXECUTOR_RAMPING_VUS
+        assert resolve_executor([{"duration": 10, "rate": 50}]) == EXECUTOR_CONSTANT_ARRIVAL_RATE
+        assert resolve_executor(
+            [{"duration": 10, "rate": 50}, {"duration": 10, "rate": 100}]
+        ) == EXECUTOR_RAMPING_ARRIVAL_RATE
+
+    def test_mixed_stages_rejected(self):
+        with pytest.raises(ValueError):
+            resolve_executor([{"duration": 10, "rate": 50}, {"duration": 10, "target": 5}])
+
+    def test_arrival_rate_ramp(self):
+        stages = [{"duration": 10, "rate": 100, "start_rate": 0}, {"duration": 10, "rate": 100}]
+        assert arrival_rate_at(stages, 5) == pytest.approx(50)
+        assert arrival_rate_at(stages, 15) == pytest.approx(100)
+        assert arrival_rate_at(stages, 30) == 0
+
+
+class TestRunnerSelection:
+    """Runner construction for in-process and per-worker shares"""
+
+    def test_worker_count_bounds(self):
+        assert resolve_worker_count(4, 2) == 2
+        assert resolve_worker_count(1, 100) == 1
+        assert resolve_worker_count(0, 100) >= 1
+
+    def test_vu_runner_interleaves_ids(self):
+        config = LoadGeneratorConfig(target_url="http://localhost", max_vus=10,
+                                     stages=[{"duration": 1, "target": 10}])
+        runner = create_runner(config, 0.0, worker_index=1, worker_count=3)
+        assert isinstance(runner, LocalLoadRunner)
+        assert runner.vu_ids == [1, 4, 7]
+
+    def test_arrival_rate_runner_splits_rate_and_pool(self):
+        config = LoadGeneratorConfig(
+            target_url="http://localhost", max_vus=10,
+            stages=[{"duration": 1, "rate": 90}],
+            executor=EXECUTOR_CONSTANT_ARRIVAL_RATE,
+        )
+        runner = create_runner(config, 0.0, worker_index=0, worker_count=3)
+        assert isinstance(runner, ArrivalRateRunner)
+        assert runner.pool_size == 4
+        assert runner.config.stages[0]["rate"] == pytest.approx(30)
+
+
+class TestLoadStats:
+    """Byte accounting and timing phases survive the worker round trip"""
+
+    def test_worker_sample_round_trip(self):
+        worker = LoadStats()
+        timing = RequestTiming()
+        timing.ttfb = 12.0
+        timing.body = 3.0
+        timing.bytes_sent = 120
+        timing.bytes_received = 2048
+        worker.record(15.0, False, timing)
+        worker.record(40.0, True)
+
+        coordinator = LoadStats()
+        coordinator.absorb(_decode_sample(_encode_sample(0, worker.take_interval())))
+
+        sample = coordinator.take_interval()
+        assert sample.requests == 2
+        assert sample.errors == 1
+        assert sample.bytes_sent == 120
+        assert sample.bytes_received == 2048
+        assert sample.phases["ttfb"].total_count == 1
+        assert coordinator.timing_breakdown()["ttfb"]["p50"] == pytest.approx(12.0, rel=0.01)
+
+    def test_step_metrics_round_trip(self):
+        worker = LoadStats()
+        worker.register_steps(["flow/login"])
+        worker.record(10.0, False, step=worker.steps["flow/login"])
+        worker.record_iteration(failed=False)
+
+        coordinator = LoadStats()
+        coordinator.absorb(_decode_sample(_encode_sample(0, worker.take_interval())))
+
+        assert coordinator.iterations == 1
+        assert coordinator.step_metrics()["flow/login"]["requests"] == 1
+
+
+class TestScenarios:
+    """Scenario compilation, templating and extraction"""
+
+    def test_template_render(self):
+        template = Template("{{base}}/items/{{ id }}")
+        assert template.render({"base": "http://api", "id": 7}) == "http://api/items/7"
+        assert Template("http://static").is_static
+
+    def test_extract_path(self):
+        document = {"data": {"items": [{"id": 7}]}}
+        assert extract_path(document, compile_path("$.data.items[0].id")) == 7
+        assert extract_path(document, compile_path("data.items.0.id")) == 7
+        assert extract_path(document, compile_path("data.missing.id")) is None
+
+    def test_api_request_to_step(self):
+        step = api_request_to_step({
+            "name": "Create",
+            "method": "POST",
+            "url": "{{base}}/items",
+            "params": [{"key": "v", "value": "1", "enabled": True}],
+            "headers": [{"key": "X-Skip", "value": "1", "enabled": False}],
+            "body": {"type": "json", "rawContent": '{"a": 1}'},
+            "auth": {"type": "bearer", "token": "{{token}}"},
+        })
+        assert step["url"] == "{{base}}/items?v=1"
+        assert step["headers"] == {"Authorization": "Bearer {{token}}", "Content-Type": "application/json"}
+        assert step["body"] == '{"a": 1}'
+
+    def test_mix_validation_and_weights(self):
+        with pytest.raises(ScenarioError):
+            ScenarioMix([{"name": "empty", "steps": []}])
+
+        mix = ScenarioMix([
+            {"name": "a", "weight": 3, "steps": [{"url": "http://a"}]},
+            {"name": "b", "weight": 1, "steps": [{"url": "http://b", "extract": {"id": "$.id"}}]},
+        ])
+        picks = [mix.pick(random.Random(seed)).name for seed in range(400)]
+        assert 240 < picks.count("a") < 360
+        assert mix.step_keys == ["a/step_1", "b/step_1"]
+        assert not mix.scenarios[0].extracts and mix.scenarios[1].extracts
@@ -0,0 +1,72 @@
+"""
+Unit tests for the write-behind load test metrics sink
+"""
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.load_metrics_sink import LoadMetricsSink
+
+
+def _mock_session():
+    session = AsyncMock(spec=AsyncSession)
+    session.__aenter__.return_value = session
+    session.__aexit__.return_value = False
+    return session
+
+
+def _point(requests):
+    return {"timestamp": "00:00:01", "requests": requests, "errors": 0, "vus": 5, "rps": requests}
+
+
+@pytest.mark.asyncio
+async def test_samples_are_flushed_in_batches():
+    flush_session = _mock_session()
+    on_flush = AsyncMock()
+    sink = LoadMetricsSink(
+        uuid.uuid4(), session_factory=MagicMock(return_value=flush_session),
+        flush_interval=0.2, on_flush=on_flush,
+    )
+
+    with patch("app.services.load_metrics_sink.publish_test_progress", AsyncMock(return_value=True)) as publish:
+        await sink.start()
+        for second in range(3):
+            sink.add(second, _point(10), {"total_requests_made": 10 * (second + 1)}, progress=second)
+        await asyncio.sleep(0.3)
+
+        final_session = _mock_session()
+        sink.add(3, _point(10), {"total_requests_made": 40}, progress=3)
+        await sink.close(final_session)
+
+    # One bulk insert + progress update + partial metrics per flush, one commit
+    assert flush_session.execute.await_count == 2
+    assert len(flush_session.execute.await_args_list[0].args[1]) == 3
+    flush_session.commit.assert_awaited_once()
+    on_flush.assert_awaited_once_with(flush_session)
+
+    # Leftover samples are staged on the caller's session without committing
+    assert len(final_session.execute.await_args.args[1]) == 1
+    final_session.commit.assert_not_awaited()
+    assert sink.samples_written == 4
+    assert publish.await_args.args[1]["summary"] == {"total_requests_made": 40}
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_samples():
+    flush_session = _mock_session()
+    flush_session.execute.side_effect = RuntimeError("database unavailable")
+    sink = LoadMetricsSink(uuid.uuid4(), session_factory=MagicMock(return_value=flush_session), flush_interval=60)
+
+    with patch("app.services.load_metrics_sink.publish_test_progress", AsyncMock(return_value=False)):
+        sink.add(0, _point(1), {}, progress=0)
+        sink.add(1, _point(2), {}, progress=1)
+        await sink._flush()
+
+        final_session = _mock_session()
+        await sink.close(final_session)
+
+    rows = final_session.execute.await_args.args[1]
+    assert [row["second"] for row in rows] == [0, 1]
@@ -0,0 +1,164 @@
+"""
+Unit tests for the async network probing engine, run against local listeners
+"""
+import asyncio
+import datetime
+import ssl
+import time
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from app.services import network_probe
+from app.services.network_probe import AdaptiveTimeout, NetworkProber
+from app.services.security_scanning_service import SecurityScanningService
+from app.services.tls_analyzer import TLSAnalyzer
+
+
+async def _drop(reader, writer):
+    writer.close()
+
+
+@pytest_asyncio.fixture
+async def listeners():
+    servers = [await asyncio.start_server(_drop, "127.0.0.1", 0) for _ in range(3)]
+    ports = [server.sockets[0].getsockname()[1] for server in servers]
+    # A port that was listening a moment ago is now refused
+    servers[-1].close()
+    await servers[-1].wait_closed()
+    yield ports[:2], ports[2]
+    for server in servers[:2]:
+        server.close()
+        await server.wait_closed()
+
+
+@pytest.fixture
+def tls_context(tmp_path):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1)).not_valid_after(now + datetime.timedelta(days=30))
+        .sign(key, hashes.SHA256())
+    )
+    (tmp_path / "cert.pem").write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    (tmp_path / "key.pem").write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(tmp_path / "cert.pem", tmp_path / "key.pem")
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    return context
+
+
+def test_adaptive_timeout_tracks_round_trips():
+    timing = AdaptiveTimeout(maximum=1.0, minimum=0.05)
+    assert timing.timeout == 1.0  # no samples yet
+
+    for _ in range(20):
+        timing.observe(0.01)
+    assert timing.timeout == pytest.approx(0.05)
+
+    for _ in range(20):
+        timing.observe(0.4)
+    assert 0.4 < timing.timeout <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_scan_ports_reports_open_and_closed(listeners):
+    open_ports, closed_port = listeners
+    prober = NetworkProber(connect_timeout=1.0, min_timeout=0.1)
+
+    probes = await prober.scan_ports("localhost", [*open_ports, closed_port])
+
+    assert {probe.port: probe.state for probe in probes} == {
+        open_ports[0]: "open", open_ports[1]: "open", closed_port: "closed",
+    }
+    assert prober.timeout_for("localhost").timeout == pytest.approx(0.1)  # adapted from the local round trips
+    with pytest.raises(OSError):
+        await prober.scan_ports("host.invalid", open_ports)
+
+
+@pytest.mark.asyncio
+async def test_filtered_ports_are_bounded_by_per_host_and_global_limits(monkeypatch):
+    in_flight = {"now": 0, "peak": 0}
+
+    async def blackhole(host, port, **kwargs):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            await asyncio.sleep(10)
+        finally:
+            in_flight["now"] -= 1
+
+    monkeypatch.setattr(network_probe.asyncio, "open_connection", blackhole)
+    prober = NetworkProber(concurrency=8, per_host=5, connect_timeout=0.1)
+
+    started = time.perf_counter()
+    probes = await asyncio.gather(
+        prober.scan_ports("127.0.0.1", range(1, 21)), prober.scan_ports("localhost", range(1, 21))
+    )
+    elapsed = time.perf_counter() - started
+
+    assert {probe.state for probe in probes[0] + probes[1]} == {"filtered"}
+    assert in_flight["peak"] == 8  # 5 per host, 8 overall
+    assert elapsed < 1.0  # 40 probes x 0.1s in waves of 8, not 4s sequentially
+
+
+@pytest.mark.asyncio
+async def test_resolve_many_keeps_only_resolving_names():
+    prober = NetworkProber(dns_timeout=2.0)
+
+    resolved = await prober.resolve_many(["localhost", "www.nothing.invalid", "localhost"])
+
+    assert list(resolved) == ["localhost"] and "127.0.0.1" in resolved["localhost"]
+
+
+@pytest.mark.asyncio
+async def test_tls_analyzer_handshakes_with_local_server(tls_context):
+    server = await asyncio.start_server(_drop, "127.0.0.1", 0, ssl=tls_context)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        results = await TLSAnalyzer(prober=NetworkProber()).analyze_tls("127.0.0.1", port)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert results["supported_protocols"] == ["TLSv1.2", "TLSv1.3"]
+    assert results["cipher_suites"][0]["version"] == "TLSv1.3"
+    assert results["vulnerabilities"] == []
+
+
+@pytest.mark.asyncio
+async def test_service_port_check_records_open_ports(listeners, monkeypatch):
+    open_ports, closed_port = listeners
+    service = SecurityScanningService.__new__(SecurityScanningService)
+    service.prober = NetworkProber(min_timeout=0.1)
+    monkeypatch.setattr(service, "_ports_for_depth", lambda depth: [*open_ports, closed_port])
+    scan = SimpleNamespace(config={"scan_depth": "deep"})
+    target = SimpleNamespace(target_value=f"http://127.0.0.1:{open_ports[0]}")
+
+    outcome = await service._check_open_ports(scan.config, target.target_value)
+
+    open_entries = outcome.target_fields["open_ports"]
+    assert [entry["port"] for entry in open_entries] == sorted(open_ports)
+    assert all(entry["service"] == "Unknown" and entry["is_secure"] for entry in open_entries)
+
+
+def test_deep_scan_sizes_follow_settings(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.SECURITY_DEEP_SCAN_PORTS", 100)
+    monkeypatch.setattr("app.core.config.settings.SECURITY_SUBDOMAIN_WORDLIST_SIZE", 30)
+    service = SecurityScanningService.__new__(SecurityScanningService)
+
+    deep_ports = service._ports_for_depth("deep")
+    assert deep_ports[:100] == list(range(1, 101)) and 27017 in deep_ports
+    assert service._ports_for_depth("quick") == [21, 22, 80, 443, 3306, 5432, 8080, 8443]
+    assert len(service._subdomains_for_depth("deep")) == 30
+    assert service._subdomains_for_depth("quick") == ["www", "mail", "api", "admin"]
@@ -0,0 +1,112 @@
+"""
+Unit tests for hybrid (vector + full-text) organisation memory retrieval
+"""
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from qdrant_client import AsyncQdrantClient
+
+import app.api.v1  # noqa: F401  (resolves model relationships)
+from app.services import organisation_memory_service as memory_module
+from app.services.organisation_memory_service import OrganisationMemoryService, reciprocal_rank_fusion
+from app.services.qdrant_service import QdrantService
+
+ORG_ID = uuid.uuid4()
+PROJECT_ID = uuid.uuid4()
+
+
+def _memory(description, times_referenced=0, project_id=PROJECT_ID):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        organisation_id=ORG_ID,
+        project_id=project_id,
+        user_description=description,
+        searchable_content=description,
+        has_images=0,
+        total_images=0,
+        extracted_features=[],
+        ui_elements=[],
+        workflows=[],
+        tags=[],
+        times_referenced=times_referenced,
+        created_at=datetime(2026, 1, 1),
+    )
+
+
+class _Row(tuple):
+    """(OrganisationMemory, keyword_match, keyword_score) result row"""
+
+    def __new__(cls, memory, keyword_match, keyword_score):
+        return super().__new__(cls, (memory, keyword_match, keyword_score))
+
+    keyword_match = property(lambda self: self[1])
+    keyword_score = property(lambda self: self[2])
+
+
+class _FakeEmbedder:
+    """Two-dimensional embeddings: login-ish texts point one way, everything else the other"""
+
+    async def create_embedding(self, text):
+        return [1.0, 0.1] if "login" in text.lower() else [0.1, 1.0]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    scores = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    assert scores["a"] == pytest.approx(1 / 61 + 1 / 62)
+    assert scores["c"] == pytest.approx(1 / 63 + 1 / 61)
+    assert sorted(scores, key=scores.get, reverse=True) == ["a", "c", "b"]
+
+
+@pytest.mark.asyncio
+async def test_results_fuse_vector_and_keyword_rankings():
+    both, vector_only, keyword_only = _memory("login both"), _memory("sign in", 3), _memory("login keyword")
+    rows = [_Row(both, True, 0.2), _Row(vector_only, False, 0.0), _Row(keyword_only, True, 0.5)]
+    result = MagicMock()
+    result.all.return_value = rows
+    db = MagicMock(execute=AsyncMock(return_value=result))
+    vector_candidates = [(str(vector_only.id), 0.95), (str(both.id), 0.9), (str(uuid.uuid4()), 0.8)]
+
+    service = OrganisationMemoryService(db)
+    with patch.object(service, "_vector_candidates", AsyncMock(return_value=vector_candidates)):
+        memories = await service.get_relevant_memories(ORG_ID, "login", PROJECT_ID, limit=2)
+
+    db.execute.assert_awaited_once()
+    assert [m["memory_id"] for m in memories] == [str(both.id), str(vector_only.id)]
+    assert memories[0]["similarity_score"] == 0.9
+    assert memories[0]["keyword_score"] == 0.2
+    assert memories[0]["relevance_score"] == pytest.approx(1 / 62 + 1 / 62)
+
+
+@pytest_asyncio.fixture
+async def qdrant():
+    service = QdrantService(AsyncQdrantClient(location=":memory:"))
+
+    async def get_service():
+        return service
+
+    with patch.object(memory_module, "get_qdrant_service", get_service), \
+            patch.object(memory_module, "get_ai_service", lambda: _FakeEmbedder()):
+        yield service
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_vector_store_and_project_filtered_search(qdrant, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.MEMORY_VECTOR_SCORE_THRESHOLD", 0.5)
+    service = OrganisationMemoryService(MagicMock())
+    login = _memory("Login page with MFA")
+    other_project = _memory("Login via SSO", project_id=uuid.uuid4())
+    billing = _memory("Billing invoices")
+
+    for memory in (login, other_project, billing):
+        assert await service._store_in_vector_db(memory)
+
+    assert login.qdrant_collection == f"org_{ORG_ID}_memory"
+    candidates = await service._vector_candidates(ORG_ID, "login errors", PROJECT_ID, limit=5)
+
+    assert [memory_id for memory_id, _ in candidates] == [str(login.id)]
@@ -0,0 +1,171 @@
+"""
+Unit tests for the local OSV mirror and batched SCA lookups
+"""
+import json
+import zipfile
+
+import pytest
+from aiohttp import web
+
+from app.models.security_advanced_models import FindingSeverity
+from app.services.native_sca_service import NativeSCAService
+from app.services.osv_mirror import OSVMirror, build_index, match_affected
+
+
+def _range(*events, kind="ECOSYSTEM"):
+    return [{"type": kind, "events": list(events)}]
+
+
+def _advisory(vuln_id, ecosystem, package, ranges, versions=(), **extra):
+    return {
+        "id": vuln_id,
+        "summary": f"{vuln_id} summary",
+        "aliases": [f"CVE-2026-{vuln_id[-1]}"],
+        "affected": [{"package": {"ecosystem": ecosystem, "name": package}, "ranges": ranges, "versions": list(versions)}],
+        **extra,
+    }
+
+
+@pytest.mark.parametrize("version,expected", [
+    ("0.9", (False, None)),
+    ("1.0", (True, "1.4.2")),
+    ("1.4.1", (True, "1.4.2")),
+    ("1.4.2", (False, None)),
+    ("2.0.0rc1", (True, "2.1")),  # PEP 440: pre-release of 2.0.0 is inside the second range
+    ("2.1", (False, None)),
+    ("", (True, "1.4.2")),  # unpinned: every advisory applies
+])
+def test_pypi_ranges(version, expected):
+    ranges = _range({"introduced": "1.0"}, {"fixed": "1.4.2"}) + _range({"introduced": "1.9"}, {"fixed": "2.1"})
+
+    assert match_affected(ranges, [], "PyPI", version) == expected
+
+
+def test_npm_semver_last_affected_and_listed_versions():
+    ranges = _range({"introduced": "0"}, {"last_affected": "4.17.20"}, kind="SEMVER")
+
+    assert match_affected(ranges, [], "npm", "4.17.20") == (True, None)
+    assert match_affected(ranges, [], "npm", "4.17.21") == (False, None)
+    assert match_affected(ranges, [], "npm", "4.17.21-beta.1")[0] is False
+    assert match_affected(_range({"introduced": "5.0.0"}, {"fixed": "5.1.0"}), ["4.0.0"], "npm", "4.0.0") == (True, "5.1.0")
+    assert match_affected(_range({"introduced": "abc123"}, kind="GIT"), [], "npm", "1.0.0") == (False, None)
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    records = [
+        _advisory("GHSA-0001", "PyPI", "Requests_OAuthlib", _range({"introduced": "0"}, {"fixed": "1.3.1"}),
+                  database_specific={"severity": "HIGH"}),
+        _advisory("PYSEC-0002", "PyPI", "django", _range({"introduced": "4.0"}, {"fixed": "4.2.7"})),
+        _advisory("PYSEC-0003", "PyPI", "django", _range({"introduced": "0"}, {"fixed": "3.0"})),
+        _advisory("PYSEC-0004", "PyPI", "django", _range({"introduced": "0"}), withdrawn="2026-01-01T00:00:00Z"),
+        _advisory("GHSA-0005", "npm", "lodash", _range({"introduced": "0"}, {"fixed": "4.17.21"}, kind="SEMVER"),
+                  database_specific={"severity": "CRITICAL"}),
+    ]
+    dump = tmp_path / "dump.zip"
+    with zipfile.ZipFile(dump, "w") as archive:
+        for record in records:
+            archive.writestr(f"{record['id']}.json", json.dumps(record))
+        archive.writestr("README.txt", "not an advisory")
+
+    path = str(tmp_path / "mirror.sqlite")
+    stats = build_index(path, [("PyPI", str(dump)), ("npm", str(dump))])
+    assert (stats["advisories"], stats["packages"]) == (4, 3)
+    return path
+
+
+def test_lookup_batch_normalizes_names_and_matches_versions(mirror):
+    results = OSVMirror(mirror).lookup_batch([
+        ("pypi", "requests-oauthlib", "1.3.0"),
+        ("pypi", "Django", "4.1"),
+        ("pypi", "django", "4.2.7"),
+        ("npm", "lodash", "4.17.20"),
+        ("pypi", "lodash", "4.17.20"),  # wrong ecosystem
+    ])
+
+    assert [[(advisory["id"], fixed) for advisory, fixed in found] for found in results] == [
+        [("GHSA-0001", "1.3.1")],
+        [("PYSEC-0002", "4.2.7")],
+        [],
+        [("GHSA-0005", "4.17.21")],
+        [],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sca_batch_uses_local_mirror(mirror, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.OSV_MIRROR_PATH", mirror)
+    requirements = tmp_path / "requirements.txt"
+    requirements.write_text("requests_oauthlib==1.3.0\ndjango==4.1\nflask==3.0\n")
+
+    result = await NativeSCAService(db=None).run_osv_scan(str(requirements), "pypi")
+
+    assert result.success and result.total_dependencies == 3
+    assert [(f.package_name, f.ghsa_id, f.fixed_version) for f in result.findings] == [
+        ("requests_oauthlib", "GHSA-0001", "1.3.1"), ("django", "PYSEC-0002", "4.2.7"),
+    ]
+    assert result.findings[0].severity == FindingSeverity.HIGH
+    assert result.findings[1].severity == FindingSeverity.MEDIUM
+    assert result.findings[0].manifest_file == str(requirements)
+    assert result.findings[1].cve_id == "CVE-2026-2"
+
+
+@pytest.mark.asyncio
+async def test_no_mirror_without_api_fallback_fails_cleanly(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.OSV_MIRROR_PATH", str(tmp_path / "missing.sqlite"))
+    monkeypatch.setattr("app.core.config.settings.OSV_API_FALLBACK", False)
+
+    result = await NativeSCAService(db=None).run_osv_batch([{"name": "django", "version": "4.1", "ecosystem": "pypi"}])
+
+    assert not result.success and "OSV_MIRROR_PATH" in result.error
+
+
+@pytest.mark.asyncio
+async def test_api_fallback_follows_pages_and_survives_failed_advisories(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.OSV_MIRROR_PATH", str(tmp_path / "missing.sqlite"))
+    monkeypatch.setattr("app.core.config.settings.OSV_API_FALLBACK", True)
+    batches = []
+
+    async def querybatch(request):
+        queries = (await request.json())["queries"]
+        batches.append(queries)
+        results = []
+        for query in queries:
+            if query["package"]["name"] != "django":
+                results.append({})
+            elif "page_token" not in query:
+                results.append({"vulns": [{"id": "PYSEC-0002"}], "next_page_token": "page-2"})
+            else:
+                results.append({"vulns": [{"id": "PYSEC-0009"}]})
+        return web.json_response({"results": results})
+
+    async def vuln(request):
+        if request.match_info["vuln_id"] == "PYSEC-0009":
+            return web.Response(status=503)
+        return web.json_response(_advisory("PYSEC-0002", "PyPI", "django", _range({"introduced": "0"}, {"fixed": "4.2.7"})))
+
+    app = web.Application()
+    app.router.add_post("/v1/querybatch", querybatch)
+    app.router.add_get("/v1/vulns/{vuln_id}", vuln)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    service = NativeSCAService(db=None)
+    service.osv_batch_url = f"http://127.0.0.1:{port}/v1/querybatch"
+    service.osv_vulns_url = f"http://127.0.0.1:{port}/v1/vulns"
+    try:
+        result = await service.run_osv_batch([
+            {"name": "flask", "version": "3.0", "ecosystem": "pypi"},
+            {"name": "django", "version": "4.1", "ecosystem": "pypi"},
+        ])
+    finally:
+        await runner.cleanup()
+
+    assert [len(queries) for queries in batches] == [2, 1]  # only the paginated query is re-sent
+    assert batches[1][0]["page_token"] == "page-2"
+    assert result.success
+    assert [(f.ghsa_id, f.fixed_version, f.title) for f in result.findings] == [
+        ("PYSEC-0002", "4.2.7", "PYSEC-0002 summary"), ("PYSEC-0009", None, "PYSEC-0009"),
+    ]
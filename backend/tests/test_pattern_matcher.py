@@ -0,0 +1,118 @@
+"""
+Unit tests for the multi-pattern matcher and the custom SAST rule scan
+"""
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app.api.v1  # noqa: F401  (resolves model relationships)
+from app.services.code_scanner import scan_tree
+from app.services.native_sast_service import NativeSASTService
+from app.services.pattern_matcher import MultiPatternMatcher, PatternRule
+
+RULES = NativeSASTService.CUSTOM_RULES
+
+LINES = [
+    'cursor.execute("SELECT * FROM users WHERE id = %s" % user_id)',
+    'query = f"SELECT name FROM t WHERE id = {uid}"',
+    'subprocess.run("ls " + path, shell=True)',
+    'API_KEY = "abcdef1234567890"',
+    "token = random.choice(alphabet)",
+    "result = eval(expression)",
+    "data = pickle.loads(blob)",
+    "digest = hashlib.md5(payload).hexdigest()",
+    "resp = requests.get(base + path)",
+    "DEBUG = True",
+    "app.run(host='0.0.0.0', debug=True)",
+    "def evaluate(x):  # not eval",
+    "password = os.environ['PASSWORD']",
+    "    return value",
+    "",
+]
+
+
+def _naive_scan(text):
+    """The original scan: every rule's regex over every line"""
+    hits = []
+    lines = text.split("\n")
+    for index, rule in enumerate(RULES):
+        pattern = re.compile(rule.pattern, re.IGNORECASE)
+        hits.extend((index, n, line) for n, line in enumerate(lines, 1) if pattern.search(line))
+    return sorted(hits, key=lambda hit: (hit[1], hit[0]))
+
+
+def test_single_pass_matches_per_line_scan():
+    rng = random.Random(7)
+    matcher = MultiPatternMatcher(RULES)
+    for _ in range(50):
+        text = "\n".join(rng.choice(LINES) for _ in range(rng.randint(0, 40)))
+        assert list(matcher.scan(text)) == _naive_scan(text)
+
+
+def test_literals_skip_rules_that_cannot_match():
+    matcher = MultiPatternMatcher([
+        PatternRule("eval", r"\beval\s*\(", ("eval",)),
+        PatternRule("pickle", r"pickle\.loads?\(", ("pickle.",)),
+    ])
+
+    assert matcher.candidate_rules("x = EVAL(y)") == (0,)
+    assert matcher.candidate_rules("plain text") == ()
+    assert list(matcher.scan("a\nx = EVAL(y)\npickle.load(f)")) == [
+        (0, 2, "x = EVAL(y)"), (1, 3, "pickle.load(f)"),
+    ]
+
+
+def test_multiline_hint_does_not_hide_later_lines():
+    # \s* lets the combined search start a hit on line 1 that only completes on line 2
+    matcher = MultiPatternMatcher([PatternRule("call", r"run\s*\(")])
+
+    assert list(matcher.scan("run\n(x)\nrun(y)")) == [(0, 3, "run(y)")]
+
+
+def test_combined_cache_is_safe_to_share_across_threads(monkeypatch):
+    monkeypatch.setattr("app.services.pattern_matcher.COMBINED_CACHE_SIZE", 2)
+    words = [f"w{n}" for n in range(12)]
+    matcher = MultiPatternMatcher([PatternRule(word, rf"\b{word}\b", (word,)) for word in words])
+    texts = [" ".join(random.Random(seed).sample(words, 3)) for seed in range(200)]
+
+    def search_all(_):
+        return [[index for index, _ in matcher.search(text)] for text in texts]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(search_all, range(8)))
+
+    expected = [sorted(words.index(word) for word in text.split()) for text in texts]
+    assert all(result == expected for result in results)
+    assert len(matcher._combined) <= 2
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_scan_tree_inline_and_in_worker_processes(tmp_path, workers):
+    for i in range(12):
+        (tmp_path / f"module_{i}.py").write_text(f"x = {i}\nresult = eval(expr_{i})\n")
+
+    result = scan_tree(str(tmp_path), RULES, sorted(map(str, tmp_path.iterdir())), workers=workers, batch_files=3)
+
+    assert result.workers == workers
+    assert result.files_scanned == 12
+    assert result.lines_scanned == 36
+    assert len(result.matches) == 12
+    assert result.matches[0] == ("module_0.py", 2, 4, "result = eval(expr_0)")
+
+
+@pytest.mark.asyncio
+async def test_run_custom_rules_reports_findings(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.SAST_SCAN_WORKERS", 1)
+    (tmp_path / "app.py").write_text("DEBUG = True\nrows = pickle.loads(data)\n")
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "lib.js").write_text("eval(x)\n")
+    (tmp_path / "notes.txt").write_text("eval(x)\n")
+
+    result = await NativeSASTService.__new__(NativeSASTService).run_custom_rules(str(tmp_path))
+
+    assert result.success and result.files_scanned == 1
+    assert [(f.rule_id, f.file_path, f.start_line) for f in result.findings] == [
+        ("custom.debug-enabled", "app.py", 1), ("custom.pickle-usage", "app.py", 2),
+    ]
@@ -0,0 +1,101 @@
+"""
+Unit tests for compiled, cached RBAC permission sets
+"""
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.api.v1  # noqa: F401  (routers first, as in the app; permissions <-> auth import cycle)
+from app.core import permissions
+from app.core.permissions import (
+    FeatureNotAvailable, OrgPermissionSet, PermissionDenied,
+    check_org_permission, check_role_hierarchy, rbac_member_tag, rbac_org_tag,
+)
+from app.models.organisation import OrganizationRole, UserOrganisation
+from app.models.subscription import OrganizationSubscription, SubscriptionPlan
+
+
+def _membership(user_id, org_id, role="member", role_obj=None):
+    return UserOrganisation(id=uuid.uuid4(), user_id=user_id, organisation_id=org_id, role=role, role_obj=role_obj)
+
+
+def _subscription(org_id, features):
+    return OrganizationSubscription(organisation_id=org_id, plan=SubscriptionPlan(features=features))
+
+
+async def _uncached(key, compute, **kwargs):
+    return await compute()
+
+
+def test_compile_round_trip():
+    user_id, org_id = uuid.uuid4(), uuid.uuid4()
+    role = OrganizationRole(role_type="admin", permissions={"can_manage_users": True, "can_manage_billing": False})
+    membership = _membership(user_id, org_id, role="admin", role_obj=role)
+
+    compiled = OrgPermissionSet.compile(user_id, org_id, membership, _subscription(org_id, ["api_testing"]))
+    restored = OrgPermissionSet.from_dict(user_id, org_id, compiled.to_dict())
+
+    assert restored.membership_id == membership.id
+    assert restored.has_permission("can_manage_users")
+    assert not restored.has_permission("can_manage_billing")
+    assert restored.has_feature("api_testing")
+    assert restored.hierarchy_level == membership.hierarchy_level
+
+    outsider = OrgPermissionSet.from_dict(
+        user_id, org_id, OrgPermissionSet.compile(user_id, org_id, None, None).to_dict()
+    )
+    assert not outsider.is_member and not outsider.has_permission("can_manage_users")
+
+
+@pytest.mark.asyncio
+async def test_repeated_checks_in_a_request_are_memoized():
+    user = SimpleNamespace(id=uuid.uuid4(), is_superuser=False)
+    org_id = uuid.uuid4()
+    db = AsyncMock(spec=AsyncSession)
+    db.info = {}
+    get_membership = AsyncMock(return_value=_membership(user.id, org_id, role="owner"))
+    get_subscription = AsyncMock(return_value=_subscription(org_id, []))
+
+    with patch.object(permissions, "get_user_org_membership", get_membership), \
+            patch.object(permissions, "get_org_subscription", get_subscription), \
+            patch.object(permissions.CacheService, "get_or_set", side_effect=_uncached) as get_or_set:
+        await check_org_permission(user, org_id, "can_manage_users", db)
+        await check_org_permission(user, org_id, "can_manage_roles", db)
+        assert await check_role_hierarchy(user, org_id, "admin", db)
+        with pytest.raises(FeatureNotAvailable):
+            await check_org_permission(user, org_id, "can_manage_users", db, require_feature="sso")
+
+        # A fresh request goes back to the shared cache
+        other_db = AsyncMock(spec=AsyncSession)
+        other_db.info = {}
+        with pytest.raises(PermissionDenied):
+            await check_org_permission(user, org_id, "not_a_permission", other_db)
+
+    assert get_or_set.await_count == 2
+    assert get_membership.await_count == 2
+    assert get_or_set.await_args.kwargs["tags"][:2] == [rbac_org_tag(org_id), rbac_member_tag(org_id, user.id)]
+
+
+@pytest.mark.asyncio
+async def test_committed_rbac_changes_invalidate_tags():
+    user_id, org_id = uuid.uuid4(), uuid.uuid4()
+    session = SimpleNamespace(
+        new=[_membership(user_id, org_id)],
+        dirty=[OrganizationRole(organisation_id=org_id)],
+        deleted=[],
+        info={permissions._MEMO_KEY: {"stale": True}},
+    )
+
+    with patch.object(permissions, "invalidate_tags", AsyncMock()) as invalidate:
+        permissions._collect_rbac_changes(session, None)
+        assert permissions._MEMO_KEY not in session.info
+
+        permissions._invalidate_committed_rbac_changes(session)
+        await asyncio.gather(*permissions._invalidation_tasks)
+
+    invalidate.assert_awaited_once_with(*sorted([rbac_member_tag(org_id, user_id), rbac_org_tag(org_id)]))
+    assert permissions._PENDING_TAGS_KEY not in session.info
@@ -0,0 +1,59 @@
+"""
+Unit tests for the async Qdrant access layer (in-memory Qdrant)
+"""
+import pytest
+import pytest_asyncio
+from qdrant_client import AsyncQdrantClient
+
+from app.services.qdrant_service import QdrantService, point_id_to_int
+
+
+@pytest_asyncio.fixture
+async def qdrant():
+    service = QdrantService(AsyncQdrantClient(location=":memory:"))
+    yield service
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_ensure_collection_is_memoized(qdrant, monkeypatch):
+    assert await qdrant.ensure_collection_exists("docs", vector_size=2)
+
+    async def unexpected(*args, **kwargs):
+        raise AssertionError("collection lookup should be memoized")
+
+    monkeypatch.setattr(qdrant.client, "get_collection", unexpected)
+    assert await qdrant.ensure_collection_exists("docs", vector_size=2)
+
+    monkeypatch.undo()
+    assert await qdrant.delete_collection("docs")
+    assert "docs" not in qdrant._known_collections
+
+
+@pytest.mark.asyncio
+async def test_bulk_store_and_batch_search(qdrant):
+    await qdrant.ensure_collection_exists("docs", vector_size=2)
+    ids = [f"doc1_chunk_{i}" for i in range(5)]
+    vectors = [[1.0, 0.0], [0.9, 0.1], [0.0, 1.0], [0.1, 0.9], [0.7, 0.7]]
+    payloads = [{"chunk_index": i} for i in range(5)]
+
+    assert await qdrant.store_vectors("docs", ids, vectors, payloads, batch_size=2) == ids
+    assert (await qdrant.get_collection_stats("docs"))["points_count"] == 5
+
+    results = await qdrant.search_vectors_batch("docs", [[1.0, 0.0], [0.0, 1.0]], limit=2, score_threshold=0.5)
+
+    assert [[m["payload"]["chunk_index"] for m in batch] for batch in results] == [[0, 1], [2, 3]]
+    assert results[0][0]["id"] == str(point_id_to_int("doc1_chunk_0"))
+    assert "stored_at" in results[0][0]["payload"]
+
+
+@pytest.mark.asyncio
+async def test_batch_search_missing_collection_returns_empty_lists(qdrant):
+    assert await qdrant.search_vectors_batch("missing", [[1.0, 0.0], [0.0, 1.0]]) == [[], []]
+
+
+def test_point_ids_are_stable():
+    uid = "3f2b8c1e-2d4a-4f7e-9a1b-0c2d3e4f5a6b"
+    assert point_id_to_int("doc_chunk_1") == point_id_to_int("doc_chunk_1")
+    assert point_id_to_int("doc_chunk_1") != point_id_to_int("doc_chunk_2")
+    assert point_id_to_int(uid) == int(uid.replace("-", ""), 16) % (2 ** 63)
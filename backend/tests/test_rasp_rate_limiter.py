@@ -0,0 +1,128 @@
+"""
+Unit tests for RASP sliding-window rate limiting
+"""
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError, RedisError
+
+from app.core.config import settings
+from app.services import rasp_rate_limiter
+from app.services.native_rasp_service import NativeRASPService
+from app.services.rasp_rate_limiter import (
+    RATE_LIMIT_KEY_PREFIX, LocalRateLimitStore, RateLimitStore, RedisRateLimitStore,
+)
+
+
+@pytest_asyncio.fixture
+async def lua_redis():
+    """A Redis that runs Lua: fakeredis (with lupa) when installed, else the server at REDIS_URL"""
+    try:
+        import fakeredis
+        import lupa  # noqa: F401  (fakeredis needs it for EVAL)
+        client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    except ImportError:
+        client = redis.from_url(settings.REDIS_URL, decode_responses=True, socket_connect_timeout=1)
+        try:
+            await client.ping()
+        except (RedisError, OSError):
+            await client.aclose()
+            pytest.skip(f"No Redis at {settings.REDIS_URL} and fakeredis/lupa not installed")
+    yield client
+    await client.aclose()
+
+
+def test_sliding_window_weights_the_previous_window():
+    store = LocalRateLimitStore()
+
+    assert [store.consume("ip", 4, 10, now=1 + n) for n in range(5)] == [True] * 4 + [False]
+    # Halfway into the next window half of the previous count still applies: 2 + 2 = 4
+    assert [store.consume("ip", 4, 10, now=15) for _ in range(3)] == [True, True, False]
+    # A quarter in, 2 * 0.75 = 1.5 still counts, so three more fit under 4
+    assert [store.consume("ip", 4, 10, now=22.5) for _ in range(4)] == [True, True, True, False]
+    # After a whole idle window nothing carries over
+    assert [store.consume("ip", 4, 10, now=40 + n / 10) for n in range(5)] == [True] * 4 + [False]
+
+
+def test_local_store_is_bounded_and_evicts_least_recent():
+    store = LocalRateLimitStore(max_keys=3)
+    for ip in ("a", "b", "c"):
+        store.consume(ip, 1, 60, now=0)
+    assert store.consume("a", 1, 60, now=1) is False  # "a" is now the most recent key
+
+    store.consume("d", 1, 60, now=2)  # evicts "b"
+
+    assert len(store) == 3 and store.evictions == 1
+    assert store.consume("b", 1, 60, now=3) is True  # starts counting afresh
+    assert store.consume("a", 1, 60, now=4) is False
+
+
+@pytest.mark.asyncio
+async def test_redis_store_runs_script_and_falls_back_when_unreachable(monkeypatch):
+    script = AsyncMock(side_effect=[1, 0, RedisConnectionError("down")])
+    client = MagicMock(register_script=MagicMock(return_value=script))
+    errors = []
+    monkeypatch.setattr(rasp_rate_limiter, "get_redis_client", AsyncMock(return_value=client))
+    monkeypatch.setattr(rasp_rate_limiter, "redis_available", lambda: not errors)
+    monkeypatch.setattr(rasp_rate_limiter, "note_redis_error", errors.append)
+    store = RedisRateLimitStore(fallback=LocalRateLimitStore())
+
+    assert await store.allow("cfg:1.2.3.4", 100, 60) is True
+    assert await store.allow("cfg:1.2.3.4", 100, 60) is False
+    script.assert_awaited_with(keys=["rasp:rl:cfg:1.2.3.4"], args=[100, 60000], client=client)
+    assert client.register_script.call_count == 1
+
+    assert [await store.allow("cfg:1.2.3.4", 2, 60) for _ in range(3)] == [True, True, False]
+    assert store.errors == 1 and len(errors) == 1 and script.await_count == 3  # later checks skip Redis
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_script_on_redis(lua_redis, monkeypatch):
+    monkeypatch.setattr(rasp_rate_limiter, "get_redis_client", AsyncMock(return_value=lua_redis))
+    monkeypatch.setattr(rasp_rate_limiter, "redis_available", lambda: True)
+    store = RedisRateLimitStore(fallback=LocalRateLimitStore())
+    key = f"test:{uuid.uuid4().hex}"
+    counter = f"{RATE_LIMIT_KEY_PREFIX}{key}"
+    window = 3600
+    try:
+        assert [await store.allow(key, 3, window) for _ in range(4)] == [True, True, True, False]
+        state = await lua_redis.hgetall(counter)
+        assert (state["current"], state["previous"]) == ("3", "0")
+        assert 0 < await lua_redis.pttl(counter) <= window * 2000
+
+        # A busy previous window still weighs in; one from two windows back doesn't
+        start = int(state["start"])
+        await lua_redis.hset(counter, mapping={"start": start - window * 1000, "current": 100_000, "previous": 0})
+        assert await store.allow(key, 3, window) is False
+        await lua_redis.hset(counter, mapping={"start": start - window * 2000, "current": 100_000, "previous": 0})
+        assert await store.allow(key, 3, window) is True
+        assert store.errors == 0
+    finally:
+        await lua_redis.delete(counter)
+
+
+def test_rate_limit_store_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitStore()
+
+
+@pytest.mark.asyncio
+async def test_rasp_limits_each_config_and_ip_separately(monkeypatch):
+    monkeypatch.setattr(rasp_rate_limiter, "_rate_limit_store", LocalRateLimitStore())
+    service = NativeRASPService()
+    config = SimpleNamespace(id="a", enable_rate_limiting=True, rate_limit_requests=2, rate_limit_window=60)
+    other = SimpleNamespace(id="b", enable_rate_limiting=True, rate_limit_requests=2, rate_limit_window=60)
+
+    results = [await service.check_rate_limit(config, "10.0.0.1") for _ in range(3)]
+    assert results == [(False, None), (False, None), (True, "Rate limit exceeded")]
+    assert await service.check_rate_limit(config, "10.0.0.2") == (False, None)
+    assert await service.check_rate_limit(other, "10.0.0.1") == (False, None)
+    # Another service instance (e.g. the next API request) sees the same counters
+    assert await NativeRASPService().check_rate_limit(config, "10.0.0.1") == (True, "Rate limit exceeded")
+
+    config.enable_rate_limiting = False
+    assert await service.check_rate_limit(config, "10.0.0.1") == (False, None)
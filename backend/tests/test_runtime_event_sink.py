@@ -0,0 +1,188 @@
+"""
+Unit tests for write-behind RASP/IAST event logging and rollup-based statistics
+"""
+import asyncio
+import contextlib
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DataError, ProgrammingError
+
+from app.models.security_advanced_models import AttackType, FindingSeverity
+from app.services import runtime_event_sink
+from app.services.native_rasp_service import NativeRASPService, RASPAnalysisResult
+from app.services.runtime_event_sink import RuntimeEventSink
+
+PROJECT = uuid.uuid4()
+CONFIG = uuid.uuid4()
+
+
+class FakeSession:
+    """Records (table, params) per statement; optionally fails the next commits or rejects rows"""
+
+    def __init__(self, writes, failures, reject=None):
+        self.writes = writes
+        self.failures = failures
+        self.reject = reject
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin_nested(self):
+        return contextlib.nullcontext()
+
+    async def execute(self, statement, params):
+        params = list(params)
+        if self.reject and any(self.reject(row) for row in params):
+            raise DataError(str(statement), params, Exception("value too long"))
+        compiled = str(statement.compile(dialect=postgresql.dialect()))
+        self.writes.append((statement.table.name, "ON CONFLICT" in compiled, list(params)))
+
+    async def commit(self):
+        if self.failures:
+            raise self.failures.pop()
+
+
+def _sink(writes, failures=None, reject=None, **kwargs):
+    return RuntimeEventSink(
+        session_factory=lambda: FakeSession(writes, failures or [], reject), flush_interval=60, **kwargs,
+    )
+
+
+def _event(ip="1.2.3.4", attack_type=AttackType.SQL_INJECTION, blocked=True):
+    return {
+        "project_id": PROJECT, "config_id": CONFIG, "attack_type": attack_type,
+        "severity": FindingSeverity.CRITICAL, "was_blocked": blocked, "source_ip": ip,
+        "http_method": "POST", "request_path": "/login", "attack_payload": "' or 1=1",
+    }
+
+
+@pytest.mark.asyncio
+async def test_repeats_are_merged_and_written_in_one_transaction():
+    writes = []
+    sink = _sink(writes)
+
+    for _ in range(3):
+        sink.record_rasp_event(_event())
+    sink.record_rasp_event(_event(ip="5.6.7.8", attack_type=AttackType.XSS, blocked=False))
+    sink.record_iast_finding({"session_id": uuid.uuid4(), "vulnerability_type": "SQL Injection", "title": "t"})
+
+    assert await sink.flush() == 3
+    tables = {table: (upsert, params) for table, upsert, params in writes}
+    events = tables["rasp_events"][1]
+    assert [(event["source_ip"], event["occurrences"]) for event in events] == [("1.2.3.4", 3), ("5.6.7.8", 1)]
+    assert events[0]["last_occurred_at"] >= events[0]["occurred_at"]
+    assert tables["iast_findings"][1][0]["occurrences"] == 1
+    upsert, rollups = tables["rasp_event_rollups"]
+    assert upsert and sorted((r["attack_type"], r["was_blocked"], r["event_count"]) for r in rollups) == [
+        (AttackType.SQL_INJECTION, True, 3), (AttackType.XSS, False, 1),
+    ]
+    assert sink.stats()["merged"] == 2 and sink.pending == 0
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_overload_sheds_rows_but_keeps_rollups_exact():
+    writes = []
+    dropping = _sink(writes, max_pending=4, overload_policy="drop")
+    accepted = [dropping.record_rasp_event(_event(ip=f"10.0.0.{n}")) for n in range(10)]
+    assert accepted == [True] * 4 + [False] * 6
+    assert dropping.record_rasp_event(_event(ip="10.0.0.1"))  # repeats still merge
+
+    sampling = _sink([], max_pending=10, overload_policy="sample", sample_rate=0.0)
+    assert sum(sampling.record_rasp_event(_event(ip=f"10.1.0.{n}")) for n in range(10)) == 5
+    assert sampling.stats()["sampled_out"] == 5
+
+    await dropping.flush()
+    (_, _, events), (_, _, rollups) = writes
+    assert len(events) == 4 and rollups[0]["event_count"] == 11
+    await dropping.close()
+    await sampling.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried_with_newer_repeats_merged():
+    writes = []
+    sink = _sink(writes, failures=[ConnectionError("database unavailable")])
+    sink.record_rasp_event(_event())
+    sink.record_rasp_event(_event())
+
+    assert await sink.flush() == 0 and sink.errors == 1
+    sink.record_rasp_event(_event())
+    writes.clear()
+    assert await sink.flush() == 1
+
+    events = writes[0][2]
+    rollups = writes[1][2]
+    assert events[0]["occurrences"] == 3 and rollups[0]["event_count"] == 3
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_rejected_rows_are_dropped_without_blocking_the_rest():
+    writes = []
+    sink = _sink(writes, reject=lambda row: row.get("attack_payload") == "bad")
+    sink.record_rasp_event(_event())
+    sink.record_rasp_event(dict(_event(ip="5.6.7.8"), attack_payload="bad"))
+    sink.record_rasp_event(dict(_event(ip="9" * 80), user_agent="x" * 5000))
+
+    assert await sink.flush() == 2
+    events = [row for table, _, params in writes if table == "rasp_events" for row in params]
+    assert [event["source_ip"] for event in events] == ["1.2.3.4", "9" * 50]
+    assert len(events[1]["user_agent"]) == 1000
+    rollups = [row for table, _, params in writes if table == "rasp_event_rollups" for row in params]
+    assert rollups[0]["event_count"] == 3
+    assert sink.rejected == 1 and sink.errors == 0 and sink.pending == 0
+
+    # Neither the rejected row nor a batch failing for other reasons comes back
+    writes.clear()
+    assert await sink.flush() == 0 and writes == []
+    sink.record_rasp_event(_event())
+    sink.session_factory = lambda: FakeSession(writes, [ProgrammingError("INSERT", {}, Exception("no such column"))])
+    assert await sink.flush() == 0 and sink.errors == 1 and sink.pending == 0
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_background_flush_on_batch_size_and_close():
+    writes = []
+    sink = _sink(writes, batch_size=3)
+
+    for n in range(3):
+        sink.record_rasp_event(_event(ip=f"10.0.0.{n}"))
+    await asyncio.sleep(0.05)  # batch full: written without waiting for the 60s interval
+    assert sink.written == 3
+
+    sink.record_rasp_event(_event(ip="10.0.0.9"))
+    await sink.close()
+    assert sink.written == 4 and sink.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_rasp_logs_through_sink_and_reads_stats_from_rollups(monkeypatch):
+    writes = []
+    monkeypatch.setattr(runtime_event_sink, "_runtime_event_sink", _sink(writes))
+    result = MagicMock()
+    result.all.return_value = [
+        (AttackType.SQL_INJECTION, True, 40), (AttackType.SQL_INJECTION, False, 2), (AttackType.XSS, True, 8),
+    ]
+    service = NativeRASPService(db=MagicMock(execute=AsyncMock(return_value=result), commit=AsyncMock()))
+    analysis = RASPAnalysisResult(
+        is_attack=True, should_block=True, attack_type=AttackType.XSS, severity=FindingSeverity.HIGH,
+        matched_pattern="<script>",
+    )
+
+    assert await service.log_event(PROJECT, CONFIG, analysis, "1.2.3.4", "GET", "/") is True
+    service.db.commit.assert_not_awaited()  # nothing written on the request path
+    assert service.event_sink.pending == 1
+
+    stats = await service.get_event_stats(PROJECT, hours=1)
+    assert stats == {"total": 50, "blocked": 48, "by_attack_type": {"sql_injection": 42, "xss": 8}}
+    query = str(service.db.execute.await_args.args[0])
+    assert "rasp_event_rollups" in query and "rasp_events " not in query
+    await service.event_sink.close()
@@ -0,0 +1,134 @@
+"""
+Unit tests for concurrent URL scan orchestration and batched result writes
+"""
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.orm import configure_mappers
+
+import app.api.v1  # noqa: F401  (resolves model relationships)
+from app.models.security_scan import ScanStatus, SeverityLevel, VulnerabilityCategory
+from app.services.scan_orchestrator import CheckJob, ScanOrchestrator
+from app.services.security_scanning_service import CheckOutcome, SecurityScanningService
+
+# One-off mapper setup would otherwise land inside the timed scan
+configure_mappers()
+
+
+def _jobs(count, in_flight, key="t", fail_every=0):
+    async def check(n):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            await asyncio.sleep(0.02)
+            if fail_every and n % fail_every == 0:
+                raise RuntimeError("boom")
+        finally:
+            in_flight["now"] -= 1
+
+    return [CheckJob(key=(key, n), check="even" if n % 2 == 0 else "odd", run=lambda n=n: check(n)) for n in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_bounds_scan_concurrency_and_records_telemetry():
+    in_flight = {"now": 0, "peak": 0}
+    orchestrator = ScanOrchestrator(scan_concurrency=4)
+
+    results = [result async for result in orchestrator.run(_jobs(20, in_flight, fail_every=5))]
+
+    assert in_flight["peak"] == 4
+    assert sorted(result.key[1] for result in results) == list(range(20))
+    assert sum(result.error is not None for result in results) == 4
+    timings = orchestrator.timings()
+    assert (timings["even"]["runs"], timings["odd"]["runs"]) == (10, 10)
+    assert timings["even"]["failures"] + timings["odd"]["failures"] == 4
+    assert timings["even"]["avg_ms"] >= 20
+
+
+@pytest.mark.asyncio
+async def test_organisation_limit_is_shared_across_scans():
+    in_flight = {"now": 0, "peak": 0}
+    organisation_id = uuid.uuid4()
+
+    async def drain(orchestrator, jobs):
+        return [result async for result in orchestrator.run(jobs)]
+
+    await asyncio.gather(
+        drain(ScanOrchestrator(5, organisation_id, 6), _jobs(15, in_flight, key="a")),
+        drain(ScanOrchestrator(5, organisation_id, 6), _jobs(15, in_flight, key="b")),
+    )
+    assert in_flight["peak"] == 6
+
+
+@pytest.mark.asyncio
+async def test_url_scan_runs_checks_concurrently_with_batched_writes(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.SECURITY_SCAN_CONCURRENCY", 32)
+    monkeypatch.setattr("app.core.config.settings.SECURITY_SCAN_FLUSH_SECONDS", 60.0)
+    targets = [
+        SimpleNamespace(id=uuid.uuid4(), target_value=f"site{n}.test", status=ScanStatus.PENDING, vulnerability_count=0)
+        for n in range(4)
+    ]
+    scan = SimpleNamespace(
+        id=uuid.uuid4(), organisation_id=uuid.uuid4(), status=ScanStatus.PENDING, started_at=None,
+        config={"check_subdomains": False}, progress_percentage=0,
+    )
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = targets
+    result.all.return_value = []
+    drawn = []
+
+    async def execute(statement, *args):
+        if "vulnerability_human_id_seq" not in str(statement):
+            return result
+        count = statement.compile().params["generate_series_2"]
+        numbers = MagicMock()
+        numbers.scalars.return_value.all.return_value = list(range(101 + len(drawn), 101 + len(drawn) + count))
+        drawn.extend(numbers.scalars.return_value.all.return_value)
+        return numbers
+
+    db = MagicMock(execute=execute, commit=AsyncMock(), flush=AsyncMock(), refresh=AsyncMock())
+    service = SecurityScanningService.__new__(SecurityScanningService)
+    service.db = db
+    service._pending_vulnerabilities = None
+
+    async def slow_check(name, config, target_value):
+        assert isinstance(target_value, str) and config == scan.config  # plain values, no ORM objects
+        await asyncio.sleep(0.1)
+        if name == "ports" and target_value == "site1.test":
+            raise ConnectionError("unreachable")
+        outcome = CheckOutcome(target_fields={f"{name}_checked": True})
+        outcome.report(
+            title=f"{name} finding", description=name,
+            category=VulnerabilityCategory.OTHER, severity=SeverityLevel.LOW,
+        )
+        return outcome
+
+    for name, method in (("ssl", "_check_ssl_certificate"), ("headers", "_check_security_headers"),
+                         ("ports", "_check_open_ports")):
+        monkeypatch.setattr(service, method, lambda config, target_value, name=name: slow_check(name, config, target_value))
+
+    started = time.perf_counter()
+    await service.run_url_security_scan(scan)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.6  # 12 checks x 0.1s would take 1.2s one after another
+    assert scan.status == ScanStatus.COMPLETED and scan.progress_percentage == 100
+    assert [target.status for target in targets] == [
+        ScanStatus.COMPLETED, ScanStatus.FAILED, ScanStatus.COMPLETED, ScanStatus.COMPLETED,
+    ]
+    assert db.commit.await_count == 2  # running + final, not one per status change
+
+    (written,), _ = db.add_all.call_args
+    assert db.add_all.call_count == 1 and len(written) == 12  # 11 findings + 1 scan error, one batch
+    assert sorted(vuln.human_id for vuln in written) == [f"VULN-{n:05d}" for n in range(101, 113)]
+    assert any(vuln.title == "Scan Error: unreachable" for vuln in written)
+    assert targets[1].vulnerability_count == 3
+    assert targets[0].ports_checked and not hasattr(targets[1], "ports_checked")  # applied by the scan loop
+    assert {check: timing["runs"] for check, timing in scan.check_timings.items()} == {
+        "ssl": 4, "headers": 4, "ports": 4,
+    }
+    assert scan.check_timings["ports"]["failures"] == 1
@@ -0,0 +1,90 @@
+"""
+Unit tests for the streaming chunker and concurrent batch ingestion
+"""
+import asyncio
+
+import pytest
+
+from app.services.document_ingestion_service import DocumentIngestionService
+from app.services.text_chunker import StreamingChunker, approximate_tokens
+
+
+def _chunker(max_tokens=40, overlap_tokens=10):
+    return StreamingChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens, count_tokens=approximate_tokens)
+
+
+DOCUMENT = (
+    "# Login\n\n"
+    + " ".join(f"Users sign in with password number {i}." for i in range(12))
+    + "\n\n## Logout\n\nSessions expire after thirty minutes. Tokens are revoked on logout.\n"
+)
+
+
+def test_chunks_respect_sentences_tokens_and_offsets():
+    chunks = list(_chunker().chunks(DOCUMENT.splitlines(keepends=True)))
+
+    assert len(chunks) > 2
+    for chunk in chunks:
+        assert chunk["tokens"] <= 40
+        assert chunk["text"].endswith((".", "Login"))
+        assert DOCUMENT[chunk["start"]:chunk["end"]].split() == chunk["text"].split()
+
+    # Headings start a new chunk and label the chunks that follow
+    assert chunks[0]["text"].startswith("# Login")
+    assert chunks[-1]["text"].startswith("## Logout")
+    assert chunks[-1]["heading"] == "Logout"
+    assert {chunk["heading"] for chunk in chunks[:-1]} == {"Login"}
+
+
+def test_overlap_repeats_trailing_sentences():
+    first, second = list(_chunker().chunks([DOCUMENT]))[:2]
+    last_sentence = first["text"].rsplit(". ", 1)[-1]
+
+    assert second["text"].startswith(last_sentence)
+    assert second["start"] < first["end"]
+
+
+def test_streamed_pieces_match_whole_text():
+    whole = list(_chunker().chunks([DOCUMENT]))
+    streamed = list(_chunker().chunks(DOCUMENT[i:i + 7] for i in range(0, len(DOCUMENT), 7)))
+
+    assert streamed == whole
+
+
+def test_oversized_sentence_is_split_between_words():
+    chunks = list(_chunker(max_tokens=10, overlap_tokens=0).chunks(["word " * 35]))
+
+    assert [chunk["tokens"] for chunk in chunks] == [10, 10, 10, 5]
+    assert all(chunk["text"].split() == ["word"] * chunk["tokens"] for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_batch_ingestion_is_concurrent_and_ordered(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.INGESTION_CONCURRENCY", 2)
+    monkeypatch.setattr("app.services.text_chunker._token_counter", approximate_tokens)
+    service = DocumentIngestionService()
+    in_flight = max_in_flight = 0
+    original = service.ingest_text_input
+
+    async def ingest_text_input(**kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return await original(**kwargs)
+
+    monkeypatch.setattr(service, "ingest_text_input", ingest_text_input)
+    path = tmp_path / "notes.md"
+    path.write_text(DOCUMENT, encoding="utf-8")
+
+    results = await service.ingest_batch_inputs(
+        [{"type": "text", "content": f"Item {i}."} for i in range(5)]
+        + [{"type": "file", "path": str(path)}, {"type": "unknown"}]
+    )
+
+    assert max_in_flight == 2
+    assert [result["chunks"][0]["text"] for result in results[:5]] == [f"Item {i}." for i in range(5)]
+    assert results[5]["content_length"] == len(DOCUMENT)
+    assert [chunk["heading"] for chunk in results[5]["chunks"]] == ["Login", "Logout"]
+    assert "error" in results[6]